@@ -3,7 +3,6 @@ import streamlit.components.v1 as components
 import sys
 import os
 import traceback
-import time
 
 # ==================== CONFIG ====================
 st.set_page_config(
@@ -82,6 +81,9 @@ except Exception as e:
         def get_all_reports(self): return []
         def get_monthly_statistics(self): return {}
         def get_client_ip(self): return "127.0.0.1"
+        def get_photo_duplicate_info(self, photo_path): return None
+        def get_photo_duplicate_info_many(self, photo_paths): return {}
+        def get_suspected_duplicates(self): return []
         def get_yearly_statistics(self):
             from datetime import datetime
             return {
@@ -151,6 +153,8 @@ try:
     from views.monthly_reports import show_monthly_reports_summary
     from views.prediction_dashboard import show_prediction_dashboard
     from views.panduan_page import show_panduan_page
+    from views.risk_surface import show_risk_surface
+    from views.uncertainty_band import show_uncertainty_band
     sys.stderr.write("[OK] Semua views berhasil di-import\n")
 except Exception as e:
     sys.stderr.write(f"[ERROR] Import Error Views: {e}\n")
@@ -169,6 +173,12 @@ except Exception as e:
     
     def show_panduan_page():
         st.info("Panduan tidak tersedia")
+    
+    def show_risk_surface(*args, **kwargs):
+        st.info("Peta risiko tidak tersedia")
+    
+    def show_uncertainty_band(*args, **kwargs):
+        st.info("Analisis ketidakpastian tidak tersedia")
 
 # ==================== CSS THEME ====================
 CSS_THEME = r"""
@@ -622,8 +632,6 @@ def show_flood_calculator_page():
     # ========== PREDIKSI TANPA GOOGLE SHEETS ==========
     if submitted:
         with st.spinner("Menganalisis data..."):
-            time.sleep(0.8)
-            
             try:
                 rainfall_val = float(rainfall)
                 water_level_val = float(water_level)
@@ -642,6 +650,20 @@ def show_flood_calculator_page():
                 show_calculator_result(result, rainfall_val, water_level_val, 
                                     humidity_val, temp_min_val, temp_max_val)
                 
+                show_uncertainty_band(
+                    rainfall=rainfall_val,
+                    water_level=water_level_val,
+                    humidity=humidity_val,
+                    temperature=(temp_min_val + temp_max_val) / 2
+                )
+                
+                show_risk_surface(
+                    humidity=humidity_val,
+                    temperature=(temp_min_val + temp_max_val) / 2,
+                    rainfall=rainfall_val,
+                    water_level=water_level_val
+                )
+                
             except Exception as e:
                 st.error(f"[ERROR] Error dalam prediksi: {str(e)}")
                 
@@ -1,5 +1,13 @@
 from models.FloodReportModel import FloodReportModel
-from models.GoogleSheetsModel import GoogleSheetsModel
+from models.GoogleSheetsModel import GoogleSheetsModel, SHEETS_BREAKER
+from models.PhotoHashModel import PhotoHashModel
+from models.RateLimitModel import RateLimitModel
+from utils.RateLimiter import get_shared_rate_limiter, normalize_phone
+from utils.client_ip import get_client_ip as resolve_request_ip
+from utils.CircuitBreaker import get_breaker, CLOSED
+from utils.PhotoHashIndex import (
+    get_shared_photo_index, compute_hashes, hash_to_hex, DEFAULT_MAX_DISTANCE
+)
 import os
 import uuid
 from datetime import datetime
@@ -13,6 +21,23 @@ class FloodReportController:
         self.flood_model = FloodReportModel()
         self.sheets_model = None
         self.upload_folder = "uploads"
+        self.photo_hash_model = None
+        self.photo_index = None
+        self.rate_limiter = None
+        
+        try:
+            self.rate_limiter = get_shared_rate_limiter(RateLimitModel(self.flood_model.db_path))
+        except Exception as e:
+            print(f"⚠️ Rate limiter init error: {e}")
+            self.rate_limiter = None
+        
+        try:
+            self.photo_hash_model = PhotoHashModel(self.flood_model.db_path)
+            self.photo_index = get_shared_photo_index(self.photo_hash_model)
+        except Exception as e:
+            print(f"⚠️ Photo hash index init error: {e}")
+            self.photo_hash_model = None
+            self.photo_index = None
         
         try:
             self.sheets_model = GoogleSheetsModel()
@@ -39,27 +64,63 @@ class FloodReportController:
         except Exception as e:
             print(f"❌ Error creating upload folder: {e}")
     
-    def check_daily_limit(self, ip_address):
-        """Check if daily limit (10 reports per IP) has been reached"""
+    def _limit_keys(self, ip_address, phone=None):
+        return {'ip': ip_address if ip_address != "unknown" else None, 'phone': normalize_phone(phone)}
+    
+    def reserve_daily_limit(self, ip_address, phone=None):
+        """
+        Cek sliding-window limit (24 jam) per IP dan per nomor HP dan langsung
+        pesan satu slot (atomic). Return (boleh, timestamp slot atau None).
+        """
         try:
-            today_count = self.flood_model.get_today_reports_count_by_ip(ip_address)
-            can_submit = today_count < 10
-            print(f"📊 Daily limit check: IP={ip_address}, Count={today_count}, CanSubmit={can_submit}")
-            return can_submit
+            if self.rate_limiter is None:
+                today_count = self.flood_model.get_today_reports_count_by_ip(ip_address)
+                return today_count < 10, None
+            
+            can_submit, blocked_scope, reserved_at = self.rate_limiter.allow_and_record(
+                **self._limit_keys(ip_address, phone)
+            )
+            print(f"📊 Daily limit check: IP={ip_address}, CanSubmit={can_submit}, Blocked={blocked_scope}")
+            return can_submit, reserved_at
         except Exception as e:
-            print(f"⚠️ Error in check_daily_limit: {e}")
-            return True
+            print(f"⚠️ Error in reserve_daily_limit: {e}")
+            return True, None
     
-    def submit_report(self, address, flood_height, reporter_name, reporter_phone=None, photo_file=None):
-        """Submit new flood report"""
+    def _release_daily_limit(self, reserved_at, ip_address, phone=None):
+        """Kembalikan slot yang dipesan jika laporan tidak jadi tersimpan"""
+        if self.rate_limiter is None or reserved_at is None:
+            return
+        try:
+            self.rate_limiter.release(reserved_at, **self._limit_keys(ip_address, phone))
+        except Exception as e:
+            print(f"⚠️ Error releasing rate limit slot: {e}")
+    
+    def submit_report(self, address, flood_height, reporter_name, reporter_phone=None, photo_file=None,
+                    submission_token=None):
+        """
+        Submit new flood report.
+        submission_token membuat submit idempoten: rerun Streamlit / double-click
+        dengan token yang sama mengembalikan laporan asli tanpa menulis ulang.
+        """
         photo_url = None
         photo_filename = None
+        client_ip = None
+        reserved_at = None
         
         try:
+            existing = self.flood_model.get_report_by_token(submission_token)
+            if existing:
+                print(f"♻️ Retried submit, returning original report ID: {existing['id']}")
+                if not existing.get('sheets_synced'):
+                    self._replicate_to_sheets(existing['id'], self._sheets_data_from_row(existing),
+                                            check_existing=True)
+                return True, self._success_message(existing['id'])
+            
             client_ip = self.get_client_ip()
             print(f"🌐 Client IP: {client_ip}")
             
-            if not self.check_daily_limit(client_ip):
+            can_submit, reserved_at = self.reserve_daily_limit(client_ip, reporter_phone)
+            if not can_submit:
                 return False, "❌ Mohon maaf batas laporan harian telah mencapai batas, silahkan kembali lagi besok."
             
             if photo_file is not None:
@@ -68,6 +129,7 @@ class FloodReportController:
                     valid_extensions = ['jpg', 'jpeg', 'png', 'gif']
                     
                     if file_extension not in valid_extensions:
+                        self._release_daily_limit(reserved_at, client_ip, reporter_phone)
                         return False, f"❌ Format file tidak didukung. Gunakan: {', '.join(valid_extensions)}"
                     
                     photo_filename = f"{uuid.uuid4()}.{file_extension}"
@@ -86,70 +148,160 @@ class FloodReportController:
                     photo_url = None
                     photo_filename = None
             
-            report_id = self.flood_model.create_report(
+            photo_hashes, duplicate = self._check_photo_duplicate(photo_url)
+            report_status = 'suspected_duplicate' if duplicate else 'pending'
+            
+            report_id, created = self.flood_model.create_report_once(
                 alamat=address,  
                 tinggi_banjir=flood_height,  
                 nama_pelapor=reporter_name,  
                 no_hp=reporter_phone,  
                 photo_url=photo_url,  
-                ip_address=client_ip  
+                ip_address=client_ip,
+                status=report_status,
+                submission_token=submission_token
             )
             
-            if not report_id:
+            if not report_id or not created:
+                # Gagal simpan, atau submit paralel dengan token sama sudah menang
+                self._remove_photo(photo_url)
+                self._release_daily_limit(reserved_at, client_ip, reporter_phone)
+                if report_id:
+                    return True, self._success_message(report_id)
                 print("❌ Failed to save to SQLite")
-                if photo_url and os.path.exists(photo_url):
-                    try:
-                        os.remove(photo_url)
-                    except:
-                        pass
                 return False, "❌ Gagal menyimpan laporan ke database lokal."
             
-            if self.sheets_model and self.sheets_model.client:
-                try:
-                    print("📊 Saving to Google Sheets...")
-                    
-                    sheets_data = {
-                        'address': str(address),
-                        'flood_height': str(flood_height),
-                        'reporter_name': str(reporter_name),
-                        'reporter_phone': str(reporter_phone) if reporter_phone else '',
-                        'ip_address': str(client_ip),
-                        'photo_url': photo_url if photo_url else ''
-                    }
-                    
-                    print(f"📋 Google Sheets data prepared")
-                    
-                    success = self.sheets_model.save_flood_report(sheets_data)
-                    if success:
-                        print("✅ Report saved to Google Sheets")
-                        gs_status = " (dan Google Sheets)"
-                    else:
-                        print("⚠️ Failed to save to Google Sheets")
-                        gs_status = " (Google Sheets gagal)"
-                except Exception as e:
-                    print(f"⚠️ Error saving to Google Sheets: {e}")
-                    gs_status = " (Google Sheets error)"
-            else:
-                print("ℹ️ Google Sheets not available")
-                gs_status = ""
-            
-            today_reports = self.flood_model.get_today_reports()
-            print(f"✅ Verification: Total reports today = {len(today_reports)}")
+            if photo_hashes:
+                self._register_photo_hash(report_id, photo_url, photo_hashes, duplicate)
+            
+            sheets_data = {
+                'address': str(address),
+                'flood_height': str(flood_height),
+                'reporter_name': str(reporter_name),
+                'reporter_phone': str(reporter_phone) if reporter_phone else '',
+                'ip_address': str(client_ip),
+                'photo_url': photo_url if photo_url else '',
+                'status': report_status,
+                'submission_token': submission_token or ''
+            }
+            self._replicate_to_sheets(report_id, sheets_data)
             
-            return True, f"✅ Informasi anda telah terkirim! Terimakasih atas laporannya."
+            return True, self._success_message(report_id)
                 
         except Exception as e:
             print(f"❌ CRITICAL Error in submit_report: {e}")
             traceback.print_exc()
             
-            if photo_url and os.path.exists(photo_url):
-                try:
-                    os.remove(photo_url)
-                except:
-                    pass
+            self._remove_photo(photo_url)
+            self._release_daily_limit(reserved_at, client_ip, reporter_phone)
             
             return False, f"❌ Error sistem: {str(e)}"
     
+    def _success_message(self, report_id):
+        return f"✅ Informasi anda telah terkirim! Terimakasih atas laporannya. (ID laporan: #{report_id})"
+    
+    def _remove_photo(self, photo_url):
+        if photo_url and os.path.exists(photo_url):
+            try:
+                os.remove(photo_url)
+            except:
+                pass
+    
+    def _sheets_data_from_row(self, row):
+        """Bangun payload Google Sheets dari baris SQLite (dipakai saat retry)"""
+        return {
+            'address': row.get('Alamat') or '',
+            'flood_height': row.get('Tinggi Banjir') or '',
+            'reporter_name': row.get('Nama Pelapor') or '',
+            'reporter_phone': row.get('No HP') or '',
+            'ip_address': row.get('IP Address') or '',
+            'photo_url': row.get('Photo URL') or '',
+            'status': row.get('Status') or 'pending',
+            'submission_token': row.get('submission_token') or ''
+        }
+    
+    def _replicate_to_sheets(self, report_id, sheets_data, check_existing=False):
+        """Append laporan ke Google Sheets dan tandai sinkron di SQLite jika berhasil"""
+        if not (self.sheets_model and self.sheets_model.client):
+            print("ℹ️ Google Sheets not available")
+            return False
+        
+        try:
+            print("📊 Saving to Google Sheets...")
+            success = self.sheets_model.save_flood_report(sheets_data, check_existing=check_existing)
+            if success:
+                print("✅ Report saved to Google Sheets")
+                self.flood_model.mark_sheets_synced(report_id)
+            else:
+                print("⚠️ Failed to save to Google Sheets")
+            return success
+        except Exception as e:
+            print(f"⚠️ Error saving to Google Sheets: {e}")
+            return False
+    
+    # ============ DETEKSI FOTO DUPLIKAT ============
+    
+    def _check_photo_duplicate(self, photo_path):
+        """Hitung pHash/dHash foto dan cari foto lama yang hampir identik"""
+        if not photo_path or self.photo_index is None:
+            return None, None
+        
+        try:
+            phash, dhash = compute_hashes(photo_path)
+            matches = self.photo_index.query(phash, DEFAULT_MAX_DISTANCE, exclude_key=photo_path)
+            duplicate = matches[0] if matches else None
+            
+            if duplicate:
+                print(f"⚠️ Suspected duplicate photo: {duplicate['key']} (distance={duplicate['distance']})")
+            return (phash, dhash), duplicate
+            
+        except Exception as e:
+            print(f"⚠️ Error hashing photo: {e}")
+            return None, None
+    
+    def _register_photo_hash(self, report_id, photo_path, photo_hashes, duplicate):
+        """Simpan hash ke SQLite dan masukkan ke index in-memory"""
+        try:
+            phash, dhash = photo_hashes
+            self.photo_hash_model.save_hash(
+                report_id=report_id,
+                photo_path=photo_path,
+                phash_hex=hash_to_hex(phash),
+                dhash_hex=hash_to_hex(dhash),
+                duplicate_of=duplicate['report_id'] if duplicate else None,
+                duplicate_path=duplicate['key'] if duplicate else None,
+                duplicate_distance=duplicate['distance'] if duplicate else None
+            )
+            self.photo_index.add(photo_path, phash, dhash, report_id)
+        except Exception as e:
+            print(f"⚠️ Error registering photo hash: {e}")
+    
+    def get_photo_duplicate_info(self, photo_path):
+        """Info duplikat untuk satu foto (None jika foto dianggap unik)"""
+        if not photo_path or self.photo_hash_model is None:
+            return None
+        
+        row = self.photo_hash_model.get_hash_by_photo(photo_path)
+        if row and row.get('duplicate_path'):
+            return row
+        return None
+    
+    def get_photo_duplicate_info_many(self, photo_paths):
+        """
+        Info duplikat untuk semua foto satu tabel laporan dengan satu query
+        -> {photo_path: row}; foto yang dianggap unik tidak ada di dict.
+        """
+        if self.photo_hash_model is None:
+            return {}
+        rows = self.photo_hash_model.get_hashes_by_photos(photo_paths)
+        return {path: row for path, row in rows.items() if row.get('duplicate_path')}
+    
+    def get_suspected_duplicates(self):
+        """Daftar foto terindikasi duplikat untuk moderasi"""
+        if self.photo_hash_model is None:
+            return []
+        return self.photo_hash_model.get_suspected_duplicates()
+    
     # ============ FUNGSI OTOMATIS TANPA MANUAL INPUT ============
     
     def get_today_reports(self):
@@ -200,6 +352,23 @@ class FloodReportController:
             print(f"❌ Error in get_yearly_statistics: {e}")
             return self._get_empty_yearly_stats()
     
+    def get_data_status(self):
+        """
+        Sumber dan kesegaran data laporan yang terakhir disajikan (untuk banner).
+        degraded=True jika Google Sheets sedang gagal dan data berasal dari cache/SQLite.
+        """
+        if self.sheets_model and self.sheets_model.client:
+            return self.sheets_model.data_status()
+        breaker = get_breaker(SHEETS_BREAKER)
+        return {
+            'source': 'SQLite',
+            'degraded': breaker.state != CLOSED,
+            'age_seconds': None,
+            'error': breaker.stats['last_error'],
+            'breaker': breaker.state,
+            'retry_after': round(breaker.retry_after())
+        }
+    
     # ============ CORE AUTOMATIC FUNCTIONS ============
     
     def _get_filtered_reports_from_gsheets(self, filter_type='all'):
@@ -211,8 +380,8 @@ class FloodReportController:
             
             print(f"📊 Getting {filter_type} reports from Google Sheets...")
             
-            worksheet = self.sheets_model.worksheet
-            all_records = worksheet.get_all_records()
+            # Lewat circuit breaker: Sheets mati -> baris terakhir yang berhasil dibaca
+            all_records = self.sheets_model.get_all_records()
             
             if not all_records:
                 print("⚠️ No records in Google Sheets")
@@ -326,8 +495,8 @@ class FloodReportController:
             if not self.sheets_model or not self.sheets_model.client:
                 return self._get_yearly_stats_from_sqlite()
             
-            worksheet = self.sheets_model.worksheet
-            all_records = worksheet.get_all_records()
+            # Lewat circuit breaker: Sheets mati -> baris terakhir yang berhasil dibaca
+            all_records = self.sheets_model.get_all_records()
             
             if not all_records:
                 return self._get_empty_yearly_stats()
@@ -530,16 +699,21 @@ class FloodReportController:
         }
     
     def get_client_ip(self):
-        """Get client IP address"""
+        """Get real client IP address (X-Forwarded-For dari proxy / alamat websocket)"""
         try:
-            if 'user_ip' not in st.session_state:
-                import random
-                st.session_state.user_ip = f"192.168.{random.randint(1, 255)}.{random.randint(1, 255)}"
+            ip = st.session_state.get('user_ip')
+            if not ip or ip == "unknown":
+                ip = resolve_request_ip()
+                if not ip:
+                    # Jangan simpan kegagalan di sesi: submit berikutnya mencoba lagi
+                    # sehingga limit per IP tidak mati untuk seluruh sesi
+                    print("⚠️ IP klien tidak terdeteksi untuk request ini")
+                    return "unknown"
+                st.session_state.user_ip = ip
             
-            ip = st.session_state.user_ip
             print(f"🖥️ Using IP: {ip}")
             return ip
             
         except Exception as e:
             print(f"⚠️ Error getting IP: {e}")
-            return "unknown_user"
+            return "unknown"
@@ -1,74 +1,201 @@
+import numpy as np
 import streamlit as st
 
-from model_ann import predict_flood_ann
+from model_ann import ANN_REGISTRY_NAME, FEATURE_NAMES, STATUS_LABELS, STATUS_MESSAGES, predict_flood_ann_batch
+from gumbel_distribution import GUMBEL_REGISTRY_NAME, predict_flood_gumbel_batch
+from utils.FeatureImputer import FeatureImputer, OBSERVED
+from utils.Nowcaster import get_nowcaster
+from utils.RiseTracker import get_rise_tracker, TREND_RAPID
+from utils.BBWSScraper import BREAKER_PREFIX
+from utils.CircuitBreaker import open_breakers
+from utils.ModelRegistry import get_model_registry
+from utils.StationPoller import get_station_poller, FRESH
+from utils.StationRegistry import get_station_registry
+
+# Pembacaan cadangan saat snapshot BBWS belum tersedia (tetap di-score model)
+FALLBACK_READINGS = [
+    {'location': 'Ngadipiro (S. keduang)', 'water_level_mdpl': 143.74, 'rainfall_mm': 45.5, 'last_update': '06:00'},
+    {'location': 'Wonogiri Dam (Spillway)', 'water_level_mdpl': 131.43, 'rainfall_mm': 32.0, 'last_update': '06:00'},
+    {'location': 'Colo Weir (S. bengawan solo)', 'water_level_mdpl': 108.29, 'rainfall_mm': 28.5, 'last_update': '06:00'}
+]
+
+# Prediksi untuk snapshot terakhir, dibagi semua sesi:
+# ((versi snapshot, versi ANN aktif, versi Gumbel aktif), prediksi)
+_predictions_cache = (None, None)
+# Nilai kelembapan/suhu terakhir per stasiun, dibagi semua sesi
+_imputer = FeatureImputer()
 
 class RealTimeDataController:
-    def __init__(self):
-        pass
+    def __init__(self, poller=None, registry=None, rise_tracker=None, nowcaster=None):
+        self.poller = poller or get_station_poller()
+        self.registry = registry or get_station_registry()
+        self.rise_tracker = rise_tracker or get_rise_tracker()
+        # Nowcaster dibuat saat pertama dipakai (membuka time series store)
+        self.nowcaster = nowcaster
     
     def get_comprehensive_data(self):
         """Ambil semua data real-time dan lakukan prediksi"""
         try:
-            return self.get_fallback_predictions()
+            # Tidak pernah menunggu BBWS: hanya membaca snapshot poller latar
+            snapshot, freshness = self.poller.get()
+            if snapshot is None or not snapshot.water_levels:
+                return self.get_fallback_predictions()
+
+            predictions = self.get_snapshot_predictions(snapshot)
+            age = snapshot.age()
+            return [
+                dict(prediction, data_freshness=freshness, data_age_seconds=round(age))
+                for prediction in predictions
+            ]
             
         except Exception as e:
             st.error(f"Error getting comprehensive data: {str(e)}")
             return self.get_fallback_predictions()
+
+    def get_data_status(self):
+        """
+        Kesegaran snapshot BBWS untuk banner dashboard. degraded=True jika data
+        basi, masih data cadangan, atau ada endpoint BBWS dengan breaker terbuka.
+        """
+        snapshot, freshness = self.poller.get()
+        breakers = open_breakers(BREAKER_PREFIX)
+        return {
+            'source': 'BBWS Bengawan Solo',
+            'degraded': snapshot is None or freshness != FRESH or bool(breakers),
+            'freshness': freshness,
+            'age_seconds': round(snapshot.age()) if snapshot is not None else None,
+            'error': self.poller.stats['last_error'],
+            'breaker': breakers[0]['state'] if breakers else 'closed',
+            'retry_after': min((info['retry_after'] for info in breakers), default=0)
+        }
+
+    def get_nowcasts(self):
+        """Prakiraan muka air 1-6 jam terakhir (dihitung poller per snapshot) -> list per stasiun"""
+        nowcaster = self.nowcaster or get_nowcaster()
+        forecasts = nowcaster.latest
+        return [forecasts[station] for station in nowcaster.stations if station in forecasts]
+
+    def get_snapshot_predictions(self, snapshot):
+        """
+        Prediksi semua pos, dihitung sekali per versi snapshot dan versi model aktif
+        (promosi/rollback di registry langsung memicu scoring ulang)
+        """
+        global _predictions_cache
+        registry = get_model_registry()
+        key = (snapshot.version, registry.active_version_name(ANN_REGISTRY_NAME),
+               registry.active_version_name(GUMBEL_REGISTRY_NAME))
+        cached_key, predictions = _predictions_cache
+        if cached_key == key and predictions is not None:
+            return predictions
+
+        now = max(snapshot.fetched_at.values()) if snapshot.fetched_at else None
+        predictions = self.score_readings(snapshot.water_levels, snapshot.rainfall, now)
+        _predictions_cache = (key, predictions)
+        return predictions
+
+    def build_feature_matrix(self, water_levels, rainfall, now=None):
+        """
+        Pembacaan semua pos -> (pos yang dipakai, matriks fitur N x 4 FEATURE_NAMES,
+        id stasiun, asal nilai kelembapan/suhu). Curah hujan di-join per id stasiun
+        kanonik (StationRegistry); kelembapan dan suhu yang tidak terukur diisi
+        FeatureImputer.
+        """
+        stations = [water for water in water_levels if water.get('water_level_mdpl') is not None]
+        rainfall_by_key = {}
+        for rain in rainfall:
+            if rain.get('rainfall_mm') is not None:
+                rainfall_by_key.setdefault(self.registry.station_key(rain['location']), rain['rainfall_mm'])
+
+        locations = [self.registry.station_key(water['location']) for water in stations]
+        X = np.empty((len(stations), len(FEATURE_NAMES)), dtype=np.float64)
+        X[:, 0] = [
+            water['rainfall_mm'] if water.get('rainfall_mm') is not None
+            else rainfall_by_key.get(key, 0.0)
+            for water, key in zip(stations, locations)
+        ]
+        X[:, 1] = [water['water_level_mdpl'] for water in stations]
+
+        sources = {}
+        for column, feature in ((2, 'humidity'), (3, 'temperature')):
+            observed = [np.nan if water.get(feature) is None else water[feature] for water in stations]
+            X[:, column], sources[feature] = _imputer.impute(feature, locations, observed, now)
+        return stations, X, locations, sources
+
+    def score_readings(self, water_levels, rainfall, now=None):
+        """
+        Satu panggilan ANN batch + satu panggilan Gumbel batch untuk semua pos,
+        lalu susun record dashboard.
+        """
+        stations, X, station_ids, sources = self.build_feature_matrix(water_levels, rainfall, now)
+        if not stations:
+            return []
+
+        ann_risk, ann_codes = predict_flood_ann_batch(X)
+        gumbel_risk, gumbel_codes, probability = predict_flood_gumbel_batch(
+            X[:, 0], station_ids=station_ids, return_probability=True
+        )
+        ann_risk = np.round(ann_risk, 3)
+        gumbel_risk = np.round(gumbel_risk, 3)
+
+        predictions = []
+        for i, water in enumerate(stations):
+            ann_status = str(STATUS_LABELS[ann_codes[i]])
+            station = self.registry.get(station_ids[i])
+            rise = self.rise_tracker.features(station_ids[i], now) or {}
+            # Naik cepat menaikkan status satu tingkat (laju naik = sinyal dini utama)
+            effective_code = min(int(ann_codes[i]) + (rise.get('trend') == TREND_RAPID), len(STATUS_LABELS) - 1)
+            predictions.append({
+                'location': water['location'],
+                'station_id': station_ids[i],
+                'river': station.river if station else None,
+                'basin': station.basin if station else None,
+                'water_level_mdpl': float(X[i, 1]),
+                'rainfall_mm': float(X[i, 0]),
+                'humidity': float(X[i, 2]),
+                'temperature': float(X[i, 3]),
+                'imputed_features': [
+                    feature for feature, source in sources.items() if source[i] != OBSERVED
+                ],
+                'ann_risk': float(ann_risk[i]),
+                'ann_status': ann_status,
+                'ann_message': f"Prediksi ANN: {STATUS_MESSAGES[ann_codes[i]]}",
+                'gumbel_risk': float(gumbel_risk[i]),
+                'gumbel_status': str(STATUS_LABELS[gumbel_codes[i]]),
+                'gumbel_message': f"Distribusi Gumbel: Prob {probability[i]:.1%}",
+                'last_update': water.get('last_update') or '-',
+                'source': 'BBWS Bengawan Solo',
+                'water_status': water.get('status') or ann_status,
+                'trend': rise.get('trend'),
+                'rise_rate_m_per_h': rise.get('slope_m_per_h'),
+                'delta_1h': rise.get('delta_1h'),
+                'delta_3h': rise.get('delta_3h'),
+                'delta_6h': rise.get('delta_6h'),
+                'max_6h': rise.get('max_6h'),
+                'effective_status': str(STATUS_LABELS[effective_code])
+            })
+        return predictions
     
     def get_fallback_predictions(self):
         """Data fallback untuk prediksi - HAPUS cm"""
-        return [
-            {
-                'location': 'Ngadipiro (S. keduang)',
-                'water_level_mdpl': 143.74,
-                'rainfall_mm': 45.5,
-                'ann_risk': 0.32,
-                'ann_status': 'RENDAH',
-                'ann_message': 'Prediksi ANN: Aman, tetap waspada',
-                'gumbel_risk': 0.28,
-                'gumbel_status': 'RENDAH',
-                'gumbel_message': 'Distribusi Gumbel: Prob 18.7%',
-                'last_update': '06:00',
-                'source': 'BBWS Bengawan Solo',
-                'water_status': 'RENDAH'
-            },
-            {
-                'location': 'Wonogiri Dam (Spillway)',
-                'water_level_mdpl': 131.43,
-                'rainfall_mm': 32.0,
-                'ann_risk': 0.25,
-                'ann_status': 'RENDAH',
-                'ann_message': 'Prediksi ANN: Kondisi normal',
-                'gumbel_risk': 0.22,
-                'gumbel_status': 'RENDAH',
-                'gumbel_message': 'Distribusi Gumbel: Prob 15.2%',
-                'last_update': '06:00',
-                'source': 'BBWS Bengawan Solo',
-                'water_status': 'RENDAH'
-            },
-            {
-                'location': 'Colo Weir (S. bengawan solo)',
-                'water_level_mdpl': 108.29,
-                'rainfall_mm': 28.5,
-                'ann_risk': 0.18,
-                'ann_status': 'RENDAH',
-                'ann_message': 'Prediksi ANN: Kondisi aman',
-                'gumbel_risk': 0.15,
-                'gumbel_status': 'RENDAH',
-                'gumbel_message': 'Distribusi Gumbel: Prob 12.8%',
-                'last_update': '06:00',
-                'source': 'BBWS Bengawan Solo',
-                'water_status': 'RENDAH'
-            }
-        ]
+        try:
+            return self.score_readings(FALLBACK_READINGS, ())
+        except Exception as e:
+            print(f"⚠️ Scoring fallback gagal: {e}")
+            return [
+                dict(reading, ann_risk=0.0, ann_status='ERROR', ann_message=f'Error: {e}',
+                     gumbel_risk=0.0, gumbel_status='ERROR', gumbel_message=f'Error: {e}',
+                     source='BBWS Bengawan Solo', water_status='ERROR')
+                for reading in FALLBACK_READINGS
+            ]
     
     def get_overall_risk_status(self, predictions):
         """Tentukan status risiko overall berdasarkan prediksi"""
         if not predictions:
             return "TIDAK ADA DATA", "gray"
         
-        high_risk_count = sum(1 for p in predictions if p['ann_status'] == 'TINGGI')
-        medium_risk_count = sum(1 for p in predictions if p['ann_status'] == 'MENENGAH')
+        statuses = [p.get('effective_status', p['ann_status']) for p in predictions]
+        high_risk_count = sum(1 for status in statuses if status == 'TINGGI')
+        medium_risk_count = sum(1 for status in statuses if status == 'MENENGAH')
         
         if high_risk_count > 0:
             return "TINGGI", "red"
@@ -78,5 +205,5 @@ class RealTimeDataController:
             return "RENDAH", "green"
 
     def is_same_location(self, loc1, loc2):
-        """Check jika dua lokasi sama (simple matching)"""
-        return True
+        """Check jika dua lokasi adalah stasiun yang sama (lewat StationRegistry)"""
+        return self.registry.is_same_station(loc1, loc2)
@@ -0,0 +1,484 @@
+import math
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from gumbel_distribution import (
+    gumbel_cdf, predict_flood_gumbel, GUMBEL_REGISTRY_NAME
+)
+from gumbel_fitting import (
+    EULER_GAMMA, MIN_YEARS, annual_maxima, data_version, fit_statistics, pad_maxima
+)
+from utils.ModelRegistry import get_model_registry
+from utils.PredictionCache import get_prediction_cache, quantize
+
+EXTREME_VALUE_REGISTRY_NAME = 'extreme_value'
+DISTRIBUTIONS = ('gumbel', 'gev', 'lp3')
+
+# |k| GEV di bawah ini diperlakukan sebagai Gumbel (k -> 0)
+GEV_SHAPE_EPS = 1e-6
+# |gamma| LP3 di bawah ini diperlakukan sebagai log-normal
+LP3_SKEW_EPS = 1e-6
+
+_lgamma = np.vectorize(math.lgamma, otypes=[np.float64])
+_erf = np.vectorize(math.erf, otypes=[np.float64])
+
+
+# ============ L-MOMENTS (satu sort untuk semua stasiun) ============
+
+def _probability_weighted_moments(ordered):
+    """
+    PWM tak bias b0..b3 per baris dari matriks terurut naik (NaN di ujung kanan):
+    b_r = 1/n sum_j x_(j) C(j-1, r) / C(n-1, r). Return matriks S x 4.
+    """
+    valid = ~np.isnan(ordered)
+    n = valid.sum(axis=1)[:, None].astype(np.float64)
+    x = np.where(valid, ordered, 0.0)
+    j = np.arange(1, ordered.shape[1] + 1, dtype=np.float64)[None, :]
+
+    weight = np.ones_like(x)
+    moments = [x.sum(axis=1) / n[:, 0]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for r in range(1, 4):
+            weight = weight * (j - r) / (n - r)
+            moments.append((weight * x).sum(axis=1) / n[:, 0])
+    return np.column_stack(moments)
+
+
+def lmoments_from_sorted(ordered):
+    """
+    L-moment sampel dari matriks terurut: dict l1, l2, t3 (L-skewness), t4 (L-kurtosis).
+    Butuh >= 4 nilai per stasiun; baris kurang dari itu menghasilkan NaN.
+    """
+    b = _probability_weighted_moments(ordered)
+    l1 = b[:, 0]
+    l2 = 2 * b[:, 1] - b[:, 0]
+    l3 = 6 * b[:, 2] - 6 * b[:, 1] + b[:, 0]
+    l4 = 20 * b[:, 3] - 30 * b[:, 2] + 12 * b[:, 1] - b[:, 0]
+    n = (~np.isnan(ordered)).sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ok = (n >= 4) & (l2 > 0)
+        return {
+            'n': n,
+            'l1': np.where(ok, l1, np.nan),
+            'l2': np.where(ok, l2, np.nan),
+            't3': np.where(ok, l3 / l2, np.nan),
+            't4': np.where(ok, l4 / l2, np.nan)
+        }
+
+
+def sample_lmoments(maxima):
+    """
+    L-moment curah hujan dan log10 curah hujan semua stasiun dari SATU sort
+    (log monoton, jadi urutan sama). maxima: 1-D atau matriks stasiun x tahun.
+    Return (ordered, lmoments, log_lmoments).
+    """
+    maxima = np.asarray(maxima, dtype=np.float64)
+    if maxima.ndim == 1:
+        maxima = maxima[None, :]
+    ordered = np.sort(maxima, axis=1)  # NaN di ujung kanan
+
+    # log10 hanya untuk stasiun yang semua nilainya positif (syarat LP3)
+    positive = np.all(np.isnan(ordered) | (ordered > 0), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ordered = np.where(positive[:, None], np.log10(ordered), np.nan)
+    return ordered, lmoments_from_sorted(ordered), lmoments_from_sorted(log_ordered)
+
+
+# ============ FIT PARAMETER DARI L-MOMENTS ============
+
+def fit_gumbel_lmoments(lmoments):
+    """Gumbel: beta = l2 / ln 2, mu = l1 - gamma_euler * beta"""
+    beta = lmoments['l2'] / np.log(2.0)
+    return lmoments['l1'] - EULER_GAMMA * beta, beta
+
+
+def fit_gev_lmoments(lmoments):
+    """
+    GEV (parameterisasi Hosking, k > 0 = ekor atas terbatas) dengan
+    pendekatan k = 7.8590c + 2.9554c^2, c = 2 / (3 + t3) - ln2 / ln3.
+    Return (xi, alpha, k).
+    """
+    c = 2.0 / (3.0 + lmoments['t3']) - np.log(2.0) / np.log(3.0)
+    k = 7.8590 * c + 2.9554 * c * c
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(k) & (k > -1.0)
+    k_safe = np.where(valid, k, 0.5)
+    gamma_1k = np.exp(_lgamma(1.0 + k_safe))
+    near_zero = np.abs(k_safe) < GEV_SHAPE_EPS
+    k_div = np.where(near_zero, 1.0, k_safe)
+
+    alpha = np.where(
+        near_zero,
+        lmoments['l2'] / np.log(2.0),
+        lmoments['l2'] * k_div / ((1.0 - 2.0 ** -k_div) * gamma_1k)
+    )
+    xi = np.where(
+        near_zero,
+        lmoments['l1'] - EULER_GAMMA * alpha,
+        lmoments['l1'] - alpha * (1.0 - gamma_1k) / k_div
+    )
+    return np.where(valid, xi, np.nan), np.where(valid, alpha, np.nan), np.where(valid, k, np.nan)
+
+
+def fit_lp3_lmoments(log_lmoments):
+    """
+    Log-Pearson III: Pearson III pada log10(x) dengan pendekatan rasional Hosking
+    untuk parameter bentuk dari t3. Return (mean, std, skew) di ruang log10.
+    """
+    t3 = log_lmoments['t3']
+    abs_t3 = np.abs(t3)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        z = 1.0 - abs_t3
+        alpha_high = (0.36067 * z - 0.59567 * z ** 2 + 0.25361 * z ** 3) / \
+            (1.0 - 2.78861 * z + 2.56096 * z ** 2 - 0.77045 * z ** 3)
+        z = 3.0 * np.pi * t3 ** 2
+        alpha_low = (1.0 + 0.2906 * z) / (z + 0.1882 * z ** 2 + 0.0442 * z ** 3)
+        alpha = np.where(abs_t3 >= 1.0 / 3.0, alpha_high, alpha_low)
+
+        symmetric = ~(abs_t3 > LP3_SKEW_EPS)
+        alpha_safe = np.where(symmetric | ~np.isfinite(alpha), 1.0, alpha)
+        ratio = np.exp(_lgamma(alpha_safe) - _lgamma(alpha_safe + 0.5))
+        sigma = np.where(
+            symmetric,
+            log_lmoments['l2'] * np.sqrt(np.pi),
+            log_lmoments['l2'] * np.sqrt(np.pi) * np.sqrt(alpha_safe) * ratio
+        )
+        skew = np.where(symmetric, 0.0, 2.0 * np.sign(t3) / np.sqrt(alpha_safe))
+    return log_lmoments['l1'], sigma, np.where(np.isnan(t3), np.nan, skew)
+
+
+# ============ CDF / KUANTIL (broadcasting) ============
+
+def _normal_cdf(z):
+    return 0.5 * (1.0 + _erf(np.asarray(z, dtype=np.float64) / np.sqrt(2.0)))
+
+
+def _normal_quantile(p):
+    """Invers CDF normal baku (aproksimasi rasional Acklam, galat relatif ~1e-9)"""
+    p = np.asarray(p, dtype=np.float64)
+    a = (-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02,
+        1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00)
+    b = (-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02,
+        6.680131188771972e+01, -1.328068155288572e+01)
+    c = (-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00,
+        -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00)
+    d = (7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00,
+        3.754408661907416e+00)
+
+    def tail(q):
+        return (((((c[0] * q + c[1]) * q + c[2]) * q + c[3]) * q + c[4]) * q + c[5]) / \
+            ((((d[0] * q + d[1]) * q + d[2]) * q + d[3]) * q + 1.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        q = p - 0.5
+        r = q * q
+        central = (((((a[0] * r + a[1]) * r + a[2]) * r + a[3]) * r + a[4]) * r + a[5]) * q / \
+            (((((b[0] * r + b[1]) * r + b[2]) * r + b[3]) * r + b[4]) * r + 1.0)
+        lower = tail(np.sqrt(-2.0 * np.log(p)))
+        upper = -tail(np.sqrt(-2.0 * np.log1p(-p)))
+    return np.where(p < 0.02425, lower, np.where(p > 1 - 0.02425, upper, central))
+
+
+def _pearson3_frequency_factor(z, skew):
+    """Faktor frekuensi Wilson-Hilferty K(z, g) (praktik standar LP3 hidrologi)"""
+    g = np.where(np.abs(skew) > LP3_SKEW_EPS, skew, 1.0)
+    factor = (2.0 / g) * ((1.0 + g * z / 6.0 - g * g / 36.0) ** 3 - 1.0)
+    return np.where(np.abs(skew) > LP3_SKEW_EPS, factor, z)
+
+
+def _pearson3_standard_normal(K, skew):
+    """Invers Wilson-Hilferty: faktor frekuensi K -> z normal baku"""
+    g = np.where(np.abs(skew) > LP3_SKEW_EPS, skew, 1.0)
+    z = (6.0 / g) * (np.cbrt(g * K / 2.0 + 1.0) - 1.0) + g / 6.0
+    return np.where(np.abs(skew) > LP3_SKEW_EPS, z, K)
+
+
+def distribution_cdf(name, x, params):
+    """F(x) distribusi name dengan tuple parameter hasil fit_*_lmoments (broadcasting)"""
+    x = np.asarray(x, dtype=np.float64)
+    if name == 'gumbel':
+        mu, beta = params[:2]
+        return gumbel_cdf(x, mu, beta)
+
+    if name == 'gev':
+        xi, alpha, k = params
+        near_zero = np.abs(k) < GEV_SHAPE_EPS
+        k_div = np.where(near_zero, 1.0, k)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            arg = 1.0 - k_div * (x - xi) / alpha
+            y = np.where(near_zero, (x - xi) / alpha, -np.log(arg) / k_div)
+            cdf = np.exp(-np.exp(-y))
+        # Di luar support: di atas batas atas (k > 0) -> 1, di bawah batas bawah (k < 0) -> 0
+        outside = ~near_zero & (arg <= 0)
+        return np.where(outside, np.where(k > 0, 1.0, 0.0), cdf)
+
+    if name == 'lp3':
+        mean, sigma, skew = params
+        with np.errstate(divide='ignore', invalid='ignore'):
+            K = (np.log10(np.where(x > 0, x, np.nan)) - mean) / sigma
+        cdf = _normal_cdf(np.nan_to_num(_pearson3_standard_normal(K, skew), nan=-np.inf))
+        return np.where(x > 0, cdf, 0.0)
+
+    raise ValueError(f"Unknown distribution: {name}")
+
+
+def distribution_quantile(name, probability, params):
+    """x dengan F(x) = probability (non-exceedance) untuk distribusi name"""
+    probability = np.asarray(probability, dtype=np.float64)
+    if name == 'gumbel':
+        mu, beta = params[:2]
+        return mu - beta * np.log(-np.log(probability))
+
+    if name == 'gev':
+        xi, alpha, k = params
+        near_zero = np.abs(k) < GEV_SHAPE_EPS
+        k_div = np.where(near_zero, 1.0, k)
+        reduced = -np.log(probability)
+        return np.where(
+            near_zero,
+            xi - alpha * np.log(reduced),
+            xi + alpha * (1.0 - reduced ** k_div) / k_div
+        )
+
+    if name == 'lp3':
+        mean, sigma, skew = params
+        K = _pearson3_frequency_factor(_normal_quantile(probability), skew)
+        return 10.0 ** (mean + sigma * K)
+
+    raise ValueError(f"Unknown distribution: {name}")
+
+
+def distribution_return_level(name, return_period, params):
+    """Return level periode ulang T tahun: kuantil F = 1 - 1/T"""
+    return_period = np.asarray(return_period, dtype=np.float64)
+    return distribution_quantile(name, 1.0 - 1.0 / return_period, params)
+
+
+# ============ FIT + SELEKSI SEMUA STASIUN ============
+
+def fit_distributions(maxima):
+    """
+    Fit Gumbel, GEV dan LP3 via L-moments untuk semua stasiun sekaligus, uji
+    kecocokan (KS, Anderson-Darling) dan pilih distribusi dengan A^2 terkecil
+    per stasiun. maxima: 1-D atau matriks stasiun x tahun (NaN = tidak ada data).
+    """
+    ordered, lmoments, log_lmoments = sample_lmoments(maxima)
+    fits = {
+        'gumbel': fit_gumbel_lmoments(lmoments),
+        'gev': fit_gev_lmoments(lmoments),
+        'lp3': fit_lp3_lmoments(log_lmoments)
+    }
+
+    valid = ~np.isnan(ordered)
+    statistics = {}
+    for name, params in fits.items():
+        columns = tuple(np.asarray(p)[:, None] for p in params)
+        cdf = distribution_cdf(name, np.where(valid, ordered, 1.0), columns)
+        statistics[name] = fit_statistics(ordered, cdf)
+
+    # A^2 menimbang ekor distribusi (yang menentukan return level besar)
+    scores = np.column_stack([
+        np.where(np.all(np.isfinite(np.column_stack(fits[name])), axis=1),
+                statistics[name]['anderson_darling'], np.inf)
+        for name in DISTRIBUTIONS
+    ])
+    selected = np.argmin(scores, axis=1)
+    selected = np.where(np.isfinite(scores.min(axis=1)), selected, DISTRIBUTIONS.index('gumbel'))
+
+    return {
+        'lmoments': lmoments,
+        'log_lmoments': log_lmoments,
+        'params': fits,
+        'statistics': statistics,
+        'selected': np.array(DISTRIBUTIONS)[selected]
+    }
+
+
+_selection_cache = {}
+_selection_cache_lock = threading.Lock()
+
+
+def _station_selection(station_id, version, years, result, i):
+    selected = str(result['selected'][i])
+    return {
+        'station_id': station_id,
+        'data_version': version,
+        'years': [int(years[0]), int(years[-1])],
+        'n_years': int(result['lmoments']['n'][i]),
+        'distribution': selected,
+        'params': [float(p[i]) for p in result['params'][selected]],
+        'lmoments': {name: float(result['lmoments'][name][i]) for name in ('l1', 'l2', 't3', 't4')},
+        'candidates': {
+            name: {
+                'params': [float(p[i]) for p in result['params'][name]],
+                'ks_statistic': float(result['statistics'][name]['ks_statistic'][i]),
+                'ks_pvalue': float(result['statistics'][name]['ks_pvalue'][i]),
+                'anderson_darling': float(result['statistics'][name]['anderson_darling'][i])
+            }
+            for name in DISTRIBUTIONS
+        }
+    }
+
+
+def select_station_distributions(series_by_station):
+    """
+    Pilih distribusi per stasiun dari seri curah hujan {station_id: (timestamps, rainfall)}.
+    Seleksi di-cache per (station_id, data_version); stasiun baru/berubah di-fit
+    bersama dalam satu panggilan vectorized. Stasiun < MIN_YEARS tahun dilewati.
+    """
+    results = {}
+    pending = []
+    for station_id, (timestamps, rainfall) in series_by_station.items():
+        years, maxima = annual_maxima(timestamps, rainfall)
+        if len(maxima) < MIN_YEARS:
+            print(f"⚠️ {station_id}: hanya {len(maxima)} tahun data, seleksi distribusi dilewati")
+            continue
+        version = data_version(years, maxima)
+        cached = _selection_cache.get((str(station_id), version))
+        if cached is not None:
+            results[station_id] = cached
+        else:
+            pending.append((station_id, version, years, maxima))
+
+    if pending:
+        result = fit_distributions(pad_maxima([maxima for _, _, _, maxima in pending]))
+        with _selection_cache_lock:
+            for i, (station_id, version, years, _) in enumerate(pending):
+                selection = _station_selection(str(station_id), version, years, result, i)
+                _selection_cache[(str(station_id), version)] = selection
+                results[station_id] = selection
+        print(f"✅ Seleksi distribusi {len(pending)} stasiun ({len(results) - len(pending)} dari cache)")
+
+    return results
+
+
+def register_distribution_selection(selections, activate=False, registry=None, version=None):
+    """Simpan distribusi terpilih per stasiun sebagai versi model 'extreme_value' di registry"""
+    registry = registry or get_model_registry()
+    station_ids = sorted(str(station_id) for station_id in selections)
+    by_id = {str(station_id): selection for station_id, selection in selections.items()}
+
+    params = {
+        'station_ids': np.array(station_ids),
+        'station_distribution': np.array([by_id[s]['distribution'] for s in station_ids]),
+        # Gumbel hanya 2 parameter; kolom ketiga diisi 0
+        'station_params': np.array([(by_id[s]['params'] + [0.0])[:3] for s in station_ids])
+    }
+    return registry.register(
+        EXTREME_VALUE_REGISTRY_NAME,
+        params,
+        kind='extreme_value',
+        version=version,
+        training_data_range={
+            'source': 'Maksimum tahunan curah hujan per stasiun (L-moments)',
+            'stations': {s: by_id[s]['years'] for s in station_ids}
+        },
+        metrics={
+            s: {
+                'distribution': by_id[s]['distribution'],
+                'n_years': by_id[s]['n_years'],
+                'anderson_darling': {
+                    name: candidate['anderson_darling'] for name, candidate in by_id[s]['candidates'].items()
+                }
+            }
+            for s in station_ids
+        },
+        description=f"Distribusi terpilih per stasiun ({len(station_ids)} stasiun)",
+        activate=activate
+    )
+
+
+def _station_distribution(model_version, station_id):
+    """(nama distribusi, tuple parameter) stasiun dari versi registry; None jika tidak ada"""
+    index = model_version.cache.get('station_index')
+    if index is None:
+        index = {str(s): i for i, s in enumerate(model_version.params['station_ids'].tolist())}
+        model_version.cache['station_index'] = index
+    i = index.get(str(station_id))
+    if i is None:
+        return None
+    name = str(model_version.params['station_distribution'][i])
+    params = tuple(float(p) for p in model_version.params['station_params'][i])
+    return name, params[:2] if name == 'gumbel' else params
+
+
+_prediction_cache = get_prediction_cache(EXTREME_VALUE_REGISTRY_NAME)
+
+
+def predict_flood_extreme(rainfall, return_period=10, station_id=None):
+    """
+    Prediksi dengan distribusi terpilih stasiun (Gumbel/GEV/LP3). Tanpa versi
+    'extreme_value' aktif atau tanpa seleksi untuk stasiun ini, hasilnya sama
+    dengan predict_flood_gumbel (jalur default).
+    """
+    registry = get_model_registry()
+    if station_id is None or registry.active_version_name(EXTREME_VALUE_REGISTRY_NAME) is None:
+        return {**predict_flood_gumbel(rainfall, return_period, station_id=station_id), 'distribution': 'gumbel'}
+
+    try:
+        serving = registry.active(EXTREME_VALUE_REGISTRY_NAME)
+        selection = _station_distribution(serving, station_id)
+        if selection is None:
+            return {**predict_flood_gumbel(rainfall, return_period, station_id=station_id), 'distribution': 'gumbel'}
+
+        rainfall = quantize(rainfall, 'rainfall')
+        gumbel_version = registry.active(GUMBEL_REGISTRY_NAME)
+        cache_key = (serving, gumbel_version, rainfall, return_period, str(station_id))
+        cached = _prediction_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+
+        # Skala risiko dan ambang status sama dengan model Gumbel aktif
+        name, params = selection
+        probability = float(distribution_cdf(name, rainfall, params))
+        risk_level = min(1.0, probability * float(gumbel_version.params['risk_scale']))
+        thresholds = gumbel_version.params['status_thresholds']
+        if risk_level >= thresholds[1]:
+            status = "TINGGI"
+        elif risk_level >= thresholds[0]:
+            status = "MENENGAH"
+        else:
+            status = "RENDAH"
+        level = float(distribution_return_level(name, return_period, params))
+
+        result = {
+            'risk_level': round(risk_level, 3),
+            'status': status,
+            'probability': round(probability, 3),
+            'return_period': return_period,
+            'return_level': round(level, 1),
+            'exceeds_return_level': bool(rainfall > level),
+            'distribution': name,
+            'parameters_used': {'distribution': name, 'params': list(params), 'station_id': station_id},
+            'model_version': serving.version
+        }
+        _prediction_cache.put(cache_key, result)
+        return dict(result)
+
+    except Exception as e:
+        print(f"⚠️ Extreme value prediction error: {e}, fallback ke Gumbel")
+        return {**predict_flood_gumbel(rainfall, return_period, station_id=station_id), 'distribution': 'gumbel'}
+
+
+if __name__ == "__main__":
+    # Seleksi distribusi dari CSV (kolom: station_id, timestamp, rainfall):
+    #   python extreme_value.py riwayat_curah_hujan.csv [--activate]
+    history = pd.read_csv(sys.argv[1])
+    station_selections = select_station_distributions({
+        station_id: (group['timestamp'], group['rainfall'])
+        for station_id, group in history.groupby('station_id')
+    })
+    for station_id, station_selection in station_selections.items():
+        scores = ", ".join(
+            f"{name} A2={candidate['anderson_darling']:.3f}"
+            for name, candidate in station_selection['candidates'].items()
+        )
+        print(f"   {station_id}: {station_selection['distribution']} ({scores})")
+    new_version = register_distribution_selection(
+        station_selections, activate='--activate' in sys.argv,
+        registry=get_model_registry(watch_interval=0)
+    )
+    print(f"✅ Registered {EXTREME_VALUE_REGISTRY_NAME}:{new_version}")
@@ -0,0 +1,208 @@
+import multiprocessing
+import os
+import sys
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from gumbel_distribution import return_level, RETURN_PERIODS
+from gumbel_fitting import (
+    MIN_YEARS, annual_maxima, data_version, fit_gumbel_moments, fit_gumbel_mle
+)
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_CONFIDENCE = 0.90
+DEFAULT_SEED = 0
+
+# Batas sel matriks resample (resample x tahun) per langkah; rekaman 30-100 tahun
+# dengan 10k resample tetap satu array 2-D, hanya seri sangat panjang yang dipotong
+MAX_RESAMPLE_CELLS = 2_000_000
+
+# Process pool hanya sepadan jika stasiun cukup banyak (biaya spawn worker ~1 detik)
+PROCESS_POOL_MIN_STATIONS = 8
+
+
+def station_seed(seed, station_id):
+    """
+    SeedSequence per stasiun dari (seed, crc32(station_id)): hasil stasiun tidak
+    bergantung pada urutan/jumlah stasiun lain maupun pada serial vs process pool.
+    """
+    return np.random.SeedSequence([int(seed), zlib.crc32(str(station_id).encode('utf-8'))])
+
+
+def resample_indices(n_years, n_resamples, rng):
+    """Semua resample sekaligus sebagai satu array index 2-D (resample x tahun)"""
+    return rng.integers(0, n_years, size=(n_resamples, n_years))
+
+
+def _fit_resamples(samples, method):
+    """Fit baris-baris resample (vectorized); MLE yang tidak konvergen jatuh ke MoM"""
+    mom_mu, mom_beta = fit_gumbel_moments(samples)
+    if method == 'moments':
+        return mom_mu, mom_beta
+    mle_mu, mle_beta, converged = fit_gumbel_mle(samples)
+    use_mle = converged & np.isfinite(mle_beta) & (mle_beta > 0)
+    return np.where(use_mle, mle_mu, mom_mu), np.where(use_mle, mle_beta, mom_beta)
+
+
+def bootstrap_maxima(maxima, n_resamples=DEFAULT_RESAMPLES, method='mle', seed=DEFAULT_SEED,
+                    confidence=DEFAULT_CONFIDENCE, return_periods=RETURN_PERIODS):
+    """
+    Bootstrap nonparametrik satu stasiun dari maksimum tahunan.
+    seed: int atau SeedSequence. Return dict interval persentil untuk mu, beta
+    dan return level per periode ulang.
+    """
+    maxima = np.asarray(maxima, dtype=np.float64)
+    maxima = maxima[~np.isnan(maxima)]
+    n_years = len(maxima)
+    rng = np.random.default_rng(seed)
+    periods = np.asarray(return_periods, dtype=np.float64)
+
+    chunk = max(1, MAX_RESAMPLE_CELLS // max(n_years, 1))
+    mu_parts, beta_parts = [], []
+    for start in range(0, n_resamples, chunk):
+        indices = resample_indices(n_years, min(chunk, n_resamples - start), rng)
+        mu, beta = _fit_resamples(maxima[indices], method)
+        mu_parts.append(mu)
+        beta_parts.append(beta)
+    mu, beta = np.concatenate(mu_parts), np.concatenate(beta_parts)
+
+    # Resample dengan semua nilai sama -> beta 0, tidak bisa dipakai
+    valid = np.isfinite(mu) & np.isfinite(beta) & (beta > 0)
+    mu, beta = mu[valid], beta[valid]
+    levels = return_level(periods[None, :], mu[:, None], beta[:, None])
+
+    tail = (1.0 - confidence) / 2.0 * 100.0
+    bounds = [tail, 100.0 - tail]
+    return {
+        'n_years': n_years,
+        'n_resamples': n_resamples,
+        'n_valid': int(valid.sum()),
+        'method': method,
+        'confidence': confidence,
+        'mu_location': np.percentile(mu, bounds),
+        'beta_scale': np.percentile(beta, bounds),
+        'return_periods': [int(t) for t in periods],
+        'return_level_lower': np.percentile(levels, bounds[0], axis=0),
+        'return_level_median': np.percentile(levels, 50.0, axis=0),
+        'return_level_upper': np.percentile(levels, bounds[1], axis=0),
+        'return_level_std': levels.std(axis=0, ddof=1)
+    }
+
+
+def _bootstrap_job(station_id, maxima, n_resamples, method, seed, confidence, return_periods):
+    """Satu unit kerja (dipanggil langsung atau di proses worker)"""
+    result = bootstrap_maxima(maxima, n_resamples, method, station_seed(seed, station_id),
+                            confidence, return_periods)
+    result['station_id'] = station_id
+    return result
+
+
+def bootstrap_stations(maxima_by_station, n_resamples=DEFAULT_RESAMPLES, method='mle',
+                    seed=DEFAULT_SEED, confidence=DEFAULT_CONFIDENCE,
+                    return_periods=RETURN_PERIODS, n_jobs=None):
+    """
+    Bootstrap banyak stasiun: {station_id: maksimum tahunan} -> {station_id: hasil}.
+    Tiap stasiun satu job; dengan >= PROCESS_POOL_MIN_STATIONS stasiun job dibagi ke
+    ProcessPoolExecutor (n_jobs None = jumlah core). Hasil identik serial vs pool.
+    """
+    jobs = [
+        (str(station_id), np.asarray(maxima, dtype=np.float64), n_resamples, method,
+        seed, confidence, tuple(int(t) for t in return_periods))
+        for station_id, maxima in maxima_by_station.items()
+    ]
+    n_jobs = min(n_jobs or os.cpu_count() or 1, len(jobs))
+
+    if n_jobs > 1 and len(jobs) >= PROCESS_POOL_MIN_STATIONS:
+        # spawn: aman dipakai dari proses Streamlit yang punya thread latar
+        context = multiprocessing.get_context('spawn')
+        chunksize = max(1, len(jobs) // (n_jobs * 4))
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+            results = list(executor.map(_bootstrap_job, *zip(*jobs), chunksize=chunksize))
+    else:
+        results = [_bootstrap_job(*job) for job in jobs]
+
+    return {result['station_id']: result for result in results}
+
+
+_bootstrap_cache = {}
+_bootstrap_cache_lock = threading.Lock()
+
+
+def bootstrap_station_series(series_by_station, n_resamples=DEFAULT_RESAMPLES, method='mle',
+                            seed=DEFAULT_SEED, confidence=DEFAULT_CONFIDENCE, n_jobs=None):
+    """
+    Interval kepercayaan dari seri curah hujan {station_id: (timestamps, rainfall)}.
+    Di-cache per (station_id, data_version, pengaturan bootstrap) seperti fit_stations;
+    stasiun dengan < MIN_YEARS maksimum tahunan dilewati.
+    """
+    settings = (n_resamples, method, seed, confidence)
+    results, pending = {}, {}
+    for station_id, (timestamps, rainfall) in series_by_station.items():
+        years, maxima = annual_maxima(timestamps, rainfall)
+        if len(maxima) < MIN_YEARS:
+            print(f"⚠️ {station_id}: hanya {len(maxima)} tahun data, bootstrap dilewati")
+            continue
+        key = (str(station_id), data_version(years, maxima), settings)
+        cached = _bootstrap_cache.get(key)
+        if cached is not None:
+            results[str(station_id)] = cached
+        else:
+            pending[key] = maxima
+
+    if pending:
+        computed = bootstrap_stations(
+            {key[0]: maxima for key, maxima in pending.items()},
+            n_resamples, method, seed, confidence, n_jobs=n_jobs
+        )
+        with _bootstrap_cache_lock:
+            for key in pending:
+                _bootstrap_cache[key] = computed[key[0]]
+                results[key[0]] = computed[key[0]]
+        print(f"✅ Bootstrap {len(pending)} stasiun x {n_resamples} resample "
+            f"({len(results) - len(pending)} dari cache)")
+
+    return results
+
+
+def attach_intervals(fits, intervals):
+    """
+    Tambahkan interval bootstrap ke hasil gumbel_fitting.fit_stations sehingga
+    register_station_fits ikut menyimpannya di versi registry.
+    """
+    for station_id, fit in fits.items():
+        interval = intervals.get(str(station_id))
+        if interval is None:
+            continue
+        fit['bootstrap'] = {
+            'confidence': interval['confidence'],
+            'n_resamples': interval['n_resamples'],
+            'n_valid': interval['n_valid'],
+            'method': interval['method'],
+            'mu_location': [float(v) for v in interval['mu_location']],
+            'beta_scale': [float(v) for v in interval['beta_scale']],
+            'return_periods': list(interval['return_periods']),
+            'return_level_lower': [float(v) for v in interval['return_level_lower']],
+            'return_level_upper': [float(v) for v in interval['return_level_upper']]
+        }
+    return fits
+
+
+if __name__ == "__main__":
+    # Interval kepercayaan dari CSV (kolom: station_id, timestamp, rainfall):
+    #   python gumbel_bootstrap.py riwayat_curah_hujan.csv [n_resamples]
+    history = pd.read_csv(sys.argv[1])
+    resamples = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RESAMPLES
+    intervals = bootstrap_station_series({
+        station_id: (group['timestamp'], group['rainfall'])
+        for station_id, group in history.groupby('station_id')
+    }, n_resamples=resamples)
+    for station_id, interval in intervals.items():
+        column = interval['return_periods'].index(50) if 50 in interval['return_periods'] else -1
+        print(f"   {station_id}: return level {interval['return_periods'][column]} tahun "
+            f"{interval['return_level_median'][column]:.1f} mm "
+            f"[{interval['return_level_lower'][column]:.1f}, {interval['return_level_upper'][column]:.1f}] "
+            f"({interval['confidence']:.0%}, n={interval['n_years']})")
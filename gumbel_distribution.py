@@ -1,37 +1,285 @@
 import numpy as np
-import math
 
-def predict_flood_gumbel(rainfall, return_period=10):
+from utils.ModelRegistry import get_model_registry, register_builtin_provider
+from utils.PredictionCache import get_prediction_cache, quantize
+
+GUMBEL_REGISTRY_NAME = 'gumbel'
+GUMBEL_DEFAULT_VERSION = 'v1.0'
+
+# Parameter bawaan (versi v1.0 registry): nilai tetap awal, bukan hasil fit.
+# Parameter hasil fit per stasiun dibuat oleh gumbel_fitting.py
+GUMBEL_PARAMS_V1 = {
+    'mu_location': 85.0,
+    'beta_scale': 22.5,
+    'risk_scale': 1.5,
+    'status_thresholds': [0.4, 0.7]
+}
+
+def _register_builtin_versions(registry):
+    registry.add_builtin(GUMBEL_REGISTRY_NAME, GUMBEL_DEFAULT_VERSION, GUMBEL_PARAMS_V1, {
+        'kind': 'gumbel',
+        'description': 'Gumbel Type I, parameter tetap awal',
+        'training_data_range': {'source': 'Parameter tetap (belum di-fit dari data historis)'},
+        'default': True
+    })
+
+register_builtin_provider(_register_builtin_versions)
+
+# Periode ulang standar (tahun) untuk tabel dashboard
+RETURN_PERIODS = np.array([2, 5, 10, 25, 50, 100])
+
+# ============ CDF / EXCEEDANCE / RETURN LEVEL (broadcasting) ============
+
+def gumbel_cdf(x, mu, beta):
+    """F(x) = exp(-exp(-(x - mu) / beta)); semua argumen di-broadcast"""
+    return np.exp(-np.exp(-(np.asarray(x, dtype=np.float64) - mu) / beta))
+
+def exceedance_probability(x, mu, beta):
+    """P(X > x) = 1 - F(x), dihitung dengan expm1 agar akurat di ekor atas"""
+    return -np.expm1(-np.exp(-(np.asarray(x, dtype=np.float64) - mu) / beta))
+
+def return_level(return_period, mu, beta):
+    """Curah hujan dengan periode ulang T tahun: mu - beta * ln(-ln(1 - 1/T))"""
+    return_period = np.asarray(return_period, dtype=np.float64)
+    return mu - beta * np.log(-np.log1p(-1.0 / return_period))
+
+def return_period_of(x, mu, beta):
+    """Periode ulang (tahun) dari nilai curah hujan x = 1 / P(X > x)"""
+    with np.errstate(divide='ignore'):
+        return 1.0 / exceedance_probability(x, mu, beta)
+
+def _station_index(model_version):
+    """station_id -> index array parameter per stasiun (di-cache pada versi registry)"""
+    index = model_version.cache.get('station_index')
+    if index is None:
+        station_ids = model_version.params.get('station_ids')
+        index = {} if station_ids is None else {
+            str(station_id): i for i, station_id in enumerate(station_ids.tolist())
+        }
+        model_version.cache['station_index'] = index
+    return index
+
+def station_location_scale(model_version, station_id=None):
+    """
+    (mu, beta, fitted) untuk stasiun; stasiun tanpa hasil fit (lihat
+    gumbel_fitting.py) memakai parameter global versi tersebut.
+    """
+    params = model_version.params
+    if station_id is not None:
+        i = _station_index(model_version).get(str(station_id))
+        if i is not None:
+            return float(params['station_mu'][i]), float(params['station_beta'][i]), True
+    return float(params['mu_location']), float(params['beta_scale']), False
+
+def station_parameter_arrays(model_version):
+    """
+    (station_ids, mu[S+1], beta[S+1]) dengan baris terakhir = parameter global
+    ('default'); di-cache read-only pada versi registry.
+    """
+    arrays = model_version.cache.get('station_arrays')
+    if arrays is None:
+        params = model_version.params
+        station_ids = [str(s) for s in params['station_ids'].tolist()] if 'station_ids' in params else []
+        mu = np.append(params.get('station_mu', np.empty(0)), float(params['mu_location']))
+        beta = np.append(params.get('station_beta', np.empty(0)), float(params['beta_scale']))
+        mu.setflags(write=False)
+        beta.setflags(write=False)
+        arrays = (station_ids + ['default'], mu, beta)
+        model_version.cache['station_arrays'] = arrays
+    return arrays
+
+def get_return_level_table(version=None, return_periods=RETURN_PERIODS):
+    """
+    Tabel return level stasiun x periode ulang untuk dashboard.
+    Dihitung sekali per versi registry (satu operasi broadcasting) lalu
+    dipakai ulang; panggilan berikutnya hanya lookup dict.
+    """
+    registry = get_model_registry()
+    model_version = (registry.load(GUMBEL_REGISTRY_NAME, version) if version is not None
+                    else registry.active(GUMBEL_REGISTRY_NAME))
+    key = ('return_level_table', tuple(int(t) for t in return_periods))
+    table = model_version.cache.get(key)
+    if table is None:
+        station_ids, mu, beta = station_parameter_arrays(model_version)
+        periods = np.asarray(key[1], dtype=np.float64)
+        levels = return_level(periods[None, :], mu[:, None], beta[:, None])
+        levels.setflags(write=False)
+        table = {
+            'station_ids': station_ids,
+            'return_periods': list(key[1]),
+            'levels': levels,
+            'lower': None,
+            'upper': None,
+            'confidence': None,
+            'row': {station_id: i for i, station_id in enumerate(station_ids)},
+            'model_version': model_version.version
+        }
+        intervals = _interval_arrays(model_version, key[1])
+        if intervals is not None:
+            table['lower'], table['upper'], table['confidence'] = intervals
+        model_version.cache[key] = table
+    return table
+
+def _interval_arrays(model_version, return_periods):
+    """
+    (lower[S+1, P], upper[S+1, P], confidence) dari interval bootstrap yang disimpan
+    gumbel_bootstrap/register_station_fits; None jika versi tidak punya interval.
+    Baris 'default' dan periode ulang yang tidak di-bootstrap berisi NaN.
+    """
+    params = model_version.params
+    if 'ci_return_periods' not in params:
+        return None
+    available = [int(t) for t in params['ci_return_periods'].tolist()]
+    columns = [available.index(int(t)) if int(t) in available else None for t in return_periods]
+    arrays = []
+    for name in ('station_rl_lower', 'station_rl_upper'):
+        values = np.full((len(params[name]) + 1, len(columns)), np.nan)
+        for j, column in enumerate(columns):
+            if column is not None:
+                values[:-1, j] = params[name][:, column]
+        values.setflags(write=False)
+        arrays.append(values)
+    return arrays[0], arrays[1], float(params['ci_confidence'])
+
+def return_level_interval(station_id, return_period, version=None):
+    """(lower, upper) interval bootstrap return level satu stasiun; None jika tidak ada"""
+    table = get_return_level_table(version)
+    row = table['row'].get(str(station_id))
+    if table['lower'] is None or row is None or int(return_period) not in table['return_periods']:
+        return None
+    column = table['return_periods'].index(int(return_period))
+    lower, upper = float(table['lower'][row, column]), float(table['upper'][row, column])
+    if np.isnan(lower) or np.isnan(upper):
+        return None
+    return lower, upper
+
+def lookup_return_level(station_id, return_period, version=None):
+    """Return level satu stasiun dari tabel precomputed (fallback ke baris 'default')"""
+    table = get_return_level_table(version)
+    row = table['row'].get(str(station_id), len(table['station_ids']) - 1)
+    try:
+        column = table['return_periods'].index(int(return_period))
+    except ValueError:
+        _, mu, beta = station_parameter_arrays(get_model_registry().load(GUMBEL_REGISTRY_NAME, table['model_version']))
+        return float(return_level(return_period, mu[row], beta[row]))
+    return float(table['levels'][row, column])
+
+def exceedance_curves(rainfall, station_ids=None, version=None):
+    """
+    Probabilitas terlampaui untuk array curah hujan [N] di banyak stasiun [S]
+    sekaligus; return matriks S x N (station_ids None = semua stasiun + default).
+    """
+    registry = get_model_registry()
+    model_version = (registry.load(GUMBEL_REGISTRY_NAME, version) if version is not None
+                    else registry.active(GUMBEL_REGISTRY_NAME))
+    all_ids, mu, beta = station_parameter_arrays(model_version)
+    if station_ids is not None:
+        rows = [all_ids.index(str(s)) if str(s) in all_ids else len(all_ids) - 1 for s in station_ids]
+        mu, beta = mu[rows], beta[rows]
+    rainfall = np.asarray(rainfall, dtype=np.float64)
+    return exceedance_probability(rainfall[None, :], mu[:, None], beta[:, None])
+
+def _gumbel_score(model_version, rainfall, station_id=None):
+    params = model_version.params
+    mu, beta, _ = station_location_scale(model_version, station_id)
+    
+    probability = float(gumbel_cdf(rainfall, mu, beta))
+    
+    risk_level = min(1.0, probability * float(params['risk_scale']))
+    
+    thresholds = params['status_thresholds']
+    if risk_level >= thresholds[1]:
+        status = "TINGGI"
+    elif risk_level >= thresholds[0]:
+        status = "MENENGAH"
+    else:
+        status = "RENDAH"
+    return mu, beta, probability, risk_level, status
+
+def predict_flood_gumbel_batch(rainfall, version=None, station_ids=None, return_probability=False):
+    """
+    Versi vectorized predict_flood_gumbel untuk array curah hujan.
+    station_ids: None, satu id untuk semua baris, atau array id sepanjang rainfall.
+    Return (risk_levels float[N], status_codes int8[N]); 0=RENDAH, 1=MENENGAH, 2=TINGGI.
+    return_probability=True menambahkan probability float[N] di akhir tuple.
+    """
+    registry = get_model_registry()
+    model_version = (registry.load(GUMBEL_REGISTRY_NAME, version) if version is not None
+                    else registry.active(GUMBEL_REGISTRY_NAME))
+    params = model_version.params
+    rainfall = np.asarray(rainfall, dtype=np.float64)
+    
+    if station_ids is None or np.ndim(station_ids) == 0:
+        mu, beta, _ = station_location_scale(model_version, station_ids)
+    else:
+        index = _station_index(model_version)
+        rows = np.array([index.get(str(station_id), -1) for station_id in station_ids])
+        fitted = rows >= 0
+        mu = np.full(len(rows), float(params['mu_location']))
+        beta = np.full(len(rows), float(params['beta_scale']))
+        if fitted.any():
+            mu[fitted] = params['station_mu'][rows[fitted]]
+            beta[fitted] = params['station_beta'][rows[fitted]]
+    
+    probability = gumbel_cdf(rainfall, mu, beta)
+    risk_levels = np.minimum(probability * float(params['risk_scale']), 1.0)
+    
+    thresholds = params['status_thresholds']
+    status_codes = (risk_levels >= thresholds[0]).view(np.int8) \
+        + (risk_levels >= thresholds[1]).view(np.int8)
+    if return_probability:
+        return risk_levels, status_codes, probability
+    return risk_levels, status_codes
+
+# Cache hasil per (versi parameter, curah hujan terkuantisasi, return period)
+_prediction_cache = get_prediction_cache(GUMBEL_REGISTRY_NAME)
+
+def predict_flood_gumbel(rainfall, return_period=10, routing_key=None, station_id=None):
     """
     Prediksi menggunakan distribusi Gumbel untuk extreme value analysis
+    (parameter dari versi aktif model registry, hasil di-memoize LRU + TTL).
+    Dengan station_id, dipakai parameter hasil fit stasiun tersebut jika ada.
     """
     try:
-        mu = 85.0   
-        beta = 22.5 
-        
-        z = (rainfall - mu) / beta
-        probability = math.exp(-math.exp(-z))
+        rainfall = quantize(rainfall, 'rainfall')
+        registry = get_model_registry()
+        serving, shadow = registry.route(GUMBEL_REGISTRY_NAME, routing_key)
+        cache_key = (serving, rainfall, return_period, station_id)
+        cached = _prediction_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
         
-        risk_level = min(1.0, probability * 1.5)
+        mu, beta, probability, risk_level, status = _gumbel_score(serving, rainfall, station_id)
         
-        if risk_level >= 0.7:
-            status = "TINGGI"
-        elif risk_level >= 0.4:
-            status = "MENENGAH"
-        else:
-            status = "RENDAH"
+        if shadow is not None:
+            try:
+                _, _, _, shadow_risk, shadow_status = _gumbel_score(shadow, rainfall, station_id)
+                registry.shadow_stats(GUMBEL_REGISTRY_NAME, serving.version, shadow.version).update(
+                    [risk_level], [shadow_risk], [status], [shadow_status]
+                )
+            except Exception as e:
+                print(f"⚠️ Shadow scoring {shadow} gagal: {e}")
         
-        return {
+        level = float(return_level(return_period, mu, beta))
+        result = {
             'risk_level': round(risk_level, 3),
             'probability': round(probability, 4),
+            'model_version': serving.version,
+            'return_level': round(level, 1),
+            'exceeds_return_level': bool(rainfall > level),
+            'estimated_return_period': round(float(return_period_of(rainfall, mu, beta)), 1),
             'parameters_used': {
                 'mu_location': mu,
                 'beta_scale': beta,
-                'return_period': return_period
+                'return_period': return_period,
+                'station_id': station_id,
+                'station_fit': station_location_scale(serving, station_id)[2]
             },
             'message': f'Distribusi Gumbel: Prob {probability:.1%}',
             'status': status
         }
+        _prediction_cache.put(cache_key, result)
+        return dict(result)
         
     except Exception as e:
         return {
@@ -40,12 +288,37 @@ def predict_flood_gumbel(rainfall, return_period=10):
             'message': f'Error: {str(e)}',
             'status': 'ERROR'
         }
-def get_gumbel_parameters():
+
+def get_prediction_cache_stats():
+    """Counter hit/miss cache prediksi Gumbel"""
+    return _prediction_cache.stats()
+
+def get_gumbel_parameters(station_id=None):
     """Return parameter Gumbel untuk display di technical details"""
-    return {
-        'mu_location': 85.0,
-        'beta_scale': 22.5,
+    active = get_model_registry().active(GUMBEL_REGISTRY_NAME)
+    mu, beta, fitted = station_location_scale(active, station_id)
+    source = (active.manifest.get('training_data_range') or {}).get('source', '')
+    parameters = {
+        'mu_location': mu,
+        'beta_scale': beta,
         'distribution_type': 'Gumbel Type I (Extreme Value Type I)',
-        'data_source': 'BMKG Historical Data 10 years',
-        'application': 'Extreme flood prediction'
+        'data_source': source,
+        'application': 'Extreme flood prediction',
+        'model_version': active.version,
+        'station_id': station_id,
+        'station_fit': fitted
     }
+    if fitted:
+        parameters['goodness_of_fit'] = (active.manifest.get('metrics') or {}).get(str(station_id))
+        table = get_return_level_table(active.version)
+        if table['lower'] is not None:
+            row = table['row'][str(station_id)]
+            parameters['confidence_interval'] = {
+                'confidence': table['confidence'],
+                'return_levels': {
+                    int(period): [round(float(table['lower'][row, j]), 1), round(float(table['upper'][row, j]), 1)]
+                    for j, period in enumerate(table['return_periods'])
+                    if not np.isnan(table['lower'][row, j])
+                }
+            }
+    return parameters
\ No newline at end of file
@@ -0,0 +1,318 @@
+import hashlib
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from gumbel_distribution import gumbel_cdf, GUMBEL_REGISTRY_NAME
+from utils.ModelRegistry import get_model_registry
+
+EULER_GAMMA = 0.5772156649015329
+SQRT6_OVER_PI = np.sqrt(6.0) / np.pi
+
+# Minimal jumlah maksimum tahunan agar fit dianggap layak
+MIN_YEARS = 5
+MLE_TOLERANCE = 1e-10
+MLE_MAX_ITER = 100
+
+
+def annual_maxima(timestamps, rainfall):
+    """Seri curah hujan (timestamp, nilai) -> (tahun int[Y], maksimum tahunan float[Y])"""
+    series = pd.Series(
+        np.asarray(rainfall, dtype=np.float64),
+        index=pd.to_datetime(pd.Index(timestamps))
+    ).dropna()
+    maxima = series.groupby(series.index.year).max()
+    return maxima.index.to_numpy(dtype=np.int64), maxima.to_numpy(dtype=np.float64)
+
+
+def _as_maxima_matrix(maxima):
+    """1-D (satu stasiun) atau 2-D stasiun x tahun (NaN = tidak ada data)"""
+    maxima = np.asarray(maxima, dtype=np.float64)
+    if maxima.ndim == 1:
+        maxima = maxima[None, :]
+    return maxima
+
+
+def pad_maxima(maxima_list):
+    """List array maksimum tahunan (panjang berbeda) -> matriks stasiun x tahun berisi NaN"""
+    width = max((len(values) for values in maxima_list), default=0)
+    matrix = np.full((len(maxima_list), width), np.nan)
+    for i, values in enumerate(maxima_list):
+        matrix[i, :len(values)] = values
+    return matrix
+
+
+def fit_gumbel_moments(maxima):
+    """Method of moments untuk semua stasiun sekaligus; return (mu[S], beta[S])"""
+    maxima = _as_maxima_matrix(maxima)
+    beta = SQRT6_OVER_PI * np.nanstd(maxima, axis=1, ddof=1)
+    mu = np.nanmean(maxima, axis=1) - EULER_GAMMA * beta
+    return mu, beta
+
+
+def fit_gumbel_mle(maxima, tol=MLE_TOLERANCE, max_iter=MLE_MAX_ITER):
+    """
+    Maximum likelihood untuk semua stasiun sekaligus (Newton pada beta).
+    Persamaan skor: beta - mean(x) + sum(x w) / sum(w) = 0 dengan w = exp(-x / beta);
+    eksponen digeser dengan max(x) per stasiun agar stabil. Return (mu[S], beta[S], converged[S]).
+    """
+    maxima = _as_maxima_matrix(maxima)
+    valid = ~np.isnan(maxima)
+    x = np.where(valid, maxima, 0.0)
+    n = valid.sum(axis=1)
+    x_mean = x.sum(axis=1) / n
+    x_max = np.nanmax(maxima, axis=1)
+    shifted = np.where(valid, maxima - x_max[:, None], 0.0)
+
+    _, beta = fit_gumbel_moments(maxima)
+    beta = np.where(beta > 0, beta, 1.0)
+    converged = np.zeros(len(maxima), dtype=bool)
+
+    for _ in range(max_iter):
+        w = np.where(valid, np.exp(-shifted / beta[:, None]), 0.0)
+        A = w.sum(axis=1)
+        xw_mean = (x * w).sum(axis=1) / A
+        x2w_mean = (x * x * w).sum(axis=1) / A
+
+        score = beta - x_mean + xw_mean
+        slope = 1.0 + (x2w_mean - xw_mean ** 2) / beta ** 2
+        step = np.where(converged, 0.0, score / slope)
+        beta = np.maximum(beta - step, beta * 0.1)
+
+        converged |= np.abs(step) <= tol * beta
+        if converged.all():
+            break
+
+    w = np.where(valid, np.exp(-shifted / beta[:, None]), 0.0)
+    mu = x_max - beta * np.log(w.sum(axis=1) / n)
+    return mu, beta, converged
+
+
+def _kolmogorov_pvalue(statistic, n):
+    """P-value asimtotik KS (koreksi Stephens); konservatif karena parameter diestimasi"""
+    root_n = np.sqrt(n)
+    lam = (root_n + 0.12 + 0.11 / root_n) * statistic
+    k = np.arange(1, 101)[:, None]
+    terms = 2.0 * (-1.0) ** (k - 1) * np.exp(-2.0 * k ** 2 * lam ** 2)
+    return np.clip(terms.sum(axis=0), 0.0, 1.0)
+
+
+def fit_statistics(ordered, cdf):
+    """
+    KS D + p-value dan Anderson-Darling A^2 untuk distribusi apa pun.
+    ordered: matriks stasiun x tahun terurut naik (NaN di ujung kanan),
+    cdf: F(ordered) dari distribusi yang di-fit, bentuk sama.
+    """
+    valid = ~np.isnan(ordered)
+    n = valid.sum(axis=1)
+    rank = np.arange(1, ordered.shape[1] + 1)[None, :]
+    cdf = np.clip(np.where(valid, cdf, 0.5), 1e-12, 1 - 1e-12)
+
+    ks_upper = np.where(valid, rank / n[:, None] - cdf, -np.inf).max(axis=1)
+    ks_lower = np.where(valid, cdf - (rank - 1) / n[:, None], -np.inf).max(axis=1)
+    ks = np.maximum(ks_upper, ks_lower)
+
+    # Pasangan F(x_i) dengan F(x_{n+1-i}); indeks dibalik di dalam panjang n per stasiun
+    mirror = np.clip(n[:, None] - rank, 0, ordered.shape[1] - 1)
+    cdf_mirror = np.take_along_axis(cdf, mirror, axis=1)
+    ad_terms = (2 * rank - 1) * (np.log(cdf) + np.log1p(-cdf_mirror))
+    anderson_darling = -n - np.where(valid, ad_terms, 0.0).sum(axis=1) / n
+
+    return {
+        'n_years': n,
+        'ks_statistic': ks,
+        'ks_pvalue': _kolmogorov_pvalue(ks, n),
+        'anderson_darling': anderson_darling
+    }
+
+
+def goodness_of_fit(maxima, mu, beta):
+    """
+    Uji kecocokan Gumbel per stasiun (vectorized): Kolmogorov-Smirnov D + p-value,
+    Anderson-Darling A^2 dan log-likelihood.
+    """
+    maxima = _as_maxima_matrix(maxima)
+    mu = np.asarray(mu, dtype=np.float64)[:, None]
+    beta = np.asarray(beta, dtype=np.float64)[:, None]
+
+    ordered = np.sort(maxima, axis=1)  # NaN di ujung kanan
+    valid = ~np.isnan(ordered)
+    statistics = fit_statistics(ordered, gumbel_cdf(np.where(valid, ordered, 0.0), mu, beta))
+
+    z = (np.where(valid, ordered, 0.0) - mu) / beta
+    statistics['log_likelihood'] = np.where(valid, -np.log(beta) - z - np.exp(-z), 0.0).sum(axis=1)
+    return statistics
+
+
+def fit_gumbel_batch(maxima):
+    """
+    Fit MoM + MLE untuk matriks stasiun x tahun dan pilih metode per stasiun
+    (MLE jika konvergen, selain itu MoM). Return dict array per stasiun.
+    """
+    maxima = _as_maxima_matrix(maxima)
+    mom_mu, mom_beta = fit_gumbel_moments(maxima)
+    mle_mu, mle_beta, converged = fit_gumbel_mle(maxima)
+
+    use_mle = converged & np.isfinite(mle_beta) & (mle_beta > 0)
+    mu = np.where(use_mle, mle_mu, mom_mu)
+    beta = np.where(use_mle, mle_beta, mom_beta)
+
+    return {
+        'mu': mu,
+        'beta': beta,
+        'method': np.where(use_mle, 'mle', 'moments'),
+        'moments': {'mu': mom_mu, 'beta': mom_beta, **goodness_of_fit(maxima, mom_mu, mom_beta)},
+        'mle': {'mu': mle_mu, 'beta': mle_beta, 'converged': converged,
+                **goodness_of_fit(maxima, mle_mu, mle_beta)},
+        **goodness_of_fit(maxima, mu, beta)
+    }
+
+
+def data_version(years, maxima):
+    """Sidik jari data maksimum tahunan; fit ulang hanya jika data berubah"""
+    digest = hashlib.sha1()
+    digest.update(np.asarray(years, dtype=np.int64).tobytes())
+    digest.update(np.asarray(maxima, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+_fit_cache = {}
+_fit_cache_lock = threading.Lock()
+
+
+def _station_fit(station_id, version, years, fit, i):
+    return {
+        'station_id': station_id,
+        'data_version': version,
+        'years': [int(years[0]), int(years[-1])] if len(years) else None,
+        'mu_location': float(fit['mu'][i]),
+        'beta_scale': float(fit['beta'][i]),
+        'method': str(fit['method'][i]),
+        'n_years': int(fit['n_years'][i]),
+        'ks_statistic': float(fit['ks_statistic'][i]),
+        'ks_pvalue': float(fit['ks_pvalue'][i]),
+        'anderson_darling': float(fit['anderson_darling'][i]),
+        'log_likelihood': float(fit['log_likelihood'][i]),
+        'moments': {'mu_location': float(fit['moments']['mu'][i]),
+                    'beta_scale': float(fit['moments']['beta'][i]),
+                    'ks_statistic': float(fit['moments']['ks_statistic'][i])},
+        'mle': {'mu_location': float(fit['mle']['mu'][i]),
+                'beta_scale': float(fit['mle']['beta'][i]),
+                'converged': bool(fit['mle']['converged'][i]),
+                'ks_statistic': float(fit['mle']['ks_statistic'][i])}
+    }
+
+
+def fit_stations(series_by_station):
+    """
+    Fit Gumbel per stasiun dari seri curah hujan historis.
+    series_by_station: {station_id: (timestamps, rainfall)}.
+    Hasil di-cache per (station_id, data_version); stasiun yang belum di-cache
+    di-fit bersama dalam satu panggilan vectorized. Stasiun dengan < MIN_YEARS
+    maksimum tahunan dilewati.
+    """
+    results = {}
+    pending = []
+    for station_id, (timestamps, rainfall) in series_by_station.items():
+        years, maxima = annual_maxima(timestamps, rainfall)
+        if len(maxima) < MIN_YEARS:
+            print(f"⚠️ {station_id}: hanya {len(maxima)} tahun data, fit dilewati")
+            continue
+        version = data_version(years, maxima)
+        cached = _fit_cache.get((str(station_id), version))
+        if cached is not None:
+            results[station_id] = cached
+        else:
+            pending.append((station_id, version, years, maxima))
+
+    if pending:
+        fit = fit_gumbel_batch(pad_maxima([maxima for _, _, _, maxima in pending]))
+        with _fit_cache_lock:
+            for i, (station_id, version, years, _) in enumerate(pending):
+                station_fit = _station_fit(str(station_id), version, years, fit, i)
+                _fit_cache[(str(station_id), version)] = station_fit
+                results[station_id] = station_fit
+        print(f"✅ Gumbel fit {len(pending)} stasiun ({len(results) - len(pending)} dari cache)")
+
+    return results
+
+
+def fit_station_series(station_id, timestamps, rainfall):
+    """Fit satu stasiun; None jika data kurang dari MIN_YEARS tahun"""
+    return fit_stations({station_id: (timestamps, rainfall)}).get(station_id)
+
+
+def register_station_fits(fits, activate=False, registry=None, version=None):
+    """
+    Simpan parameter per stasiun sebagai versi baru model 'gumbel' di registry.
+    Parameter global (untuk stasiun tanpa fit) diwarisi dari versi aktif.
+    """
+    registry = registry or get_model_registry()
+    base = registry.active(GUMBEL_REGISTRY_NAME).params
+    station_ids = sorted(str(station_id) for station_id in fits)
+    by_id = {str(station_id): fit for station_id, fit in fits.items()}
+
+    params = {
+        'mu_location': base['mu_location'],
+        'beta_scale': base['beta_scale'],
+        'risk_scale': base['risk_scale'],
+        'status_thresholds': base['status_thresholds'],
+        'station_ids': np.array(station_ids),
+        'station_mu': np.array([by_id[s]['mu_location'] for s in station_ids]),
+        'station_beta': np.array([by_id[s]['beta_scale'] for s in station_ids])
+    }
+
+    # Interval bootstrap (gumbel_bootstrap.attach_intervals) per stasiun x periode ulang;
+    # NaN untuk stasiun tanpa interval
+    intervals = [by_id[s].get('bootstrap') for s in station_ids]
+    periods = next((interval['return_periods'] for interval in intervals if interval), None)
+    if periods is not None:
+        missing = [np.nan] * len(periods)
+        usable = [interval if interval and interval['return_periods'] == periods else None
+                for interval in intervals]
+        params['ci_return_periods'] = np.array(periods)
+        params['ci_confidence'] = next(interval['confidence'] for interval in usable if interval)
+        params['station_rl_lower'] = np.array([
+            interval['return_level_lower'] if interval else missing for interval in usable
+        ])
+        params['station_rl_upper'] = np.array([
+            interval['return_level_upper'] if interval else missing for interval in usable
+        ])
+
+    return registry.register(
+        GUMBEL_REGISTRY_NAME,
+        params,
+        kind='gumbel',
+        version=version,
+        training_data_range={
+            'source': 'Maksimum tahunan curah hujan per stasiun',
+            'stations': {s: by_id[s]['years'] for s in station_ids}
+        },
+        metrics={
+            s: {key: by_id[s].get(key) for key in
+                ('method', 'n_years', 'ks_statistic', 'ks_pvalue', 'anderson_darling', 'data_version')}
+            for s in station_ids
+        },
+        description=f"Gumbel per stasiun ({len(station_ids)} stasiun)",
+        activate=activate
+    )
+
+
+if __name__ == "__main__":
+    # Fit dari CSV (kolom: station_id, timestamp, rainfall):
+    #   python gumbel_fitting.py riwayat_curah_hujan.csv [--activate]
+    history = pd.read_csv(sys.argv[1])
+    station_fits = fit_stations({
+        station_id: (group['timestamp'], group['rainfall'])
+        for station_id, group in history.groupby('station_id')
+    })
+    for station_id, station_fit in station_fits.items():
+        print(f"   {station_id}: mu={station_fit['mu_location']:.2f} beta={station_fit['beta_scale']:.2f} "
+            f"({station_fit['method']}, n={station_fit['n_years']}, KS={station_fit['ks_statistic']:.3f})")
+    new_version = register_station_fits(
+        station_fits, activate='--activate' in sys.argv,
+        registry=get_model_registry(watch_interval=0)
+    )
+    print(f"✅ Registered gumbel:{new_version}")
@@ -0,0 +1,296 @@
+import atexit
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from gumbel_fitting import EULER_GAMMA, SQRT6_OVER_PI, MIN_YEARS, fit_gumbel_moments
+from utils.TimeSeriesStore import reading_time
+
+BLOCK_YEAR = 'year'
+BLOCK_MONTH = 'month'
+
+# update() per pembacaan tidak menulis SQLite setiap kali: state kotor ditulis
+# setelah FLUSH_EVERY pembacaan atau FLUSH_INTERVAL detik, dan saat proses berhenti
+FLUSH_EVERY = 500
+FLUSH_INTERVAL = 300.0
+
+_STATE_FIELDS = (
+    'n_blocks', 'mean', 'm2', 'first_block', 'last_block',
+    'current_block', 'current_max', 'last_timestamp', 'late_readings'
+)
+
+
+class StationState:
+    """
+    State satu stasiun: momen berjalan (Welford) atas maksimum blok yang
+    sudah selesai + maksimum blok yang sedang berjalan.
+    """
+    __slots__ = _STATE_FIELDS
+
+    def __init__(self, **values):
+        self.n_blocks = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.first_block = None
+        self.last_block = None
+        self.current_block = None
+        self.current_max = None
+        self.last_timestamp = None
+        self.late_readings = 0
+        for name, value in values.items():
+            if name in _STATE_FIELDS:
+                setattr(self, name, value)
+
+    def add_block_max(self, block, value):
+        """Welford: tambah satu maksimum blok yang sudah lengkap"""
+        self.n_blocks += 1
+        delta = value - self.mean
+        self.mean += delta / self.n_blocks
+        self.m2 += delta * (value - self.mean)
+        if self.first_block is None:
+            self.first_block = block
+        self.last_block = block
+
+    def merge_block_maxima(self, blocks, values):
+        """Gabung banyak maksimum blok sekaligus (rumus paralel Chan et al.)"""
+        count = len(values)
+        if count == 0:
+            return
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        total = self.n_blocks + count
+        delta = batch_mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += batch_m2 + delta * delta * self.n_blocks * count / total
+        self.n_blocks = total
+        if self.first_block is None:
+            self.first_block = int(blocks[0])
+        self.last_block = int(blocks[-1])
+
+    def to_dict(self, station_id):
+        return {'station_id': station_id, **{name: getattr(self, name) for name in _STATE_FIELDS}}
+
+
+def _block_key(timestamp, block):
+    if isinstance(timestamp, (int, float)):
+        timestamp = pd.Timestamp(timestamp, unit='s')
+    else:
+        timestamp = pd.Timestamp(timestamp)
+    if block == BLOCK_MONTH:
+        return timestamp.year * 12 + timestamp.month - 1, timestamp.timestamp()
+    return timestamp.year, timestamp.timestamp()
+
+
+def _block_keys(timestamps, block):
+    index = pd.to_datetime(pd.Index(timestamps))
+    keys = index.year.to_numpy(dtype=np.int64)
+    if block == BLOCK_MONTH:
+        keys = keys * 12 + index.month.to_numpy(dtype=np.int64) - 1
+    return keys, index.asi8 / 1e9
+
+
+class OnlineGumbelEstimator:
+    """
+    Estimasi Gumbel inkremental per stasiun dari pembacaan curah hujan
+    (mis. tiap 10 menit) tanpa menyimpan riwayat: O(1) per pembacaan.
+    Parameter = method of moments atas maksimum blok (default tahunan),
+    identik dengan fit_gumbel_moments pada data yang sama. State disimpan
+    ke SQLite (GumbelStateModel) per FLUSH_EVERY pembacaan / FLUSH_INTERVAL
+    detik sehingga restart tidak perlu replay riwayat.
+    """
+
+    def __init__(self, model=None, block=BLOCK_YEAR, station_key=None, flush_every=FLUSH_EVERY,
+                 flush_interval=FLUSH_INTERVAL, clock=time.monotonic):
+        self.model = model
+        self.block = block
+        # Nama pos BBWS -> id stasiun kanonik (StationRegistry.station_key)
+        self.station_key = station_key
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self._clock = clock
+        self._states = {}
+        self._dirty = set()
+        self._pending = 0
+        self._last_flush = clock()
+        self._lock = threading.Lock()
+
+        if self.model is not None:
+            for row in self.model.load_states():
+                self._states[row['station_id']] = StationState(**row)
+            print(f"✅ Online Gumbel state restored for {len(self._states)} stations")
+
+    def _state(self, station_id):
+        state = self._states.get(station_id)
+        if state is None:
+            state = StationState()
+            self._states[station_id] = state
+        return state
+
+    def update(self, station_id, timestamp, rainfall):
+        """Satu pembacaan baru; pembacaan untuk blok yang sudah ditutup diabaikan (late)"""
+        if rainfall is None or rainfall != rainfall:
+            return
+        block, epoch = _block_key(timestamp, self.block)
+        station_id = str(station_id)
+
+        with self._lock:
+            state = self._state(station_id)
+            if state.current_block is None or block > state.current_block:
+                if state.current_block is not None:
+                    state.add_block_max(state.current_block, state.current_max)
+                state.current_block = block
+                state.current_max = float(rainfall)
+            elif block == state.current_block:
+                state.current_max = max(state.current_max, float(rainfall))
+            else:
+                state.late_readings += 1
+            state.last_timestamp = max(state.last_timestamp or epoch, epoch)
+            self._dirty.add(station_id)
+            self._pending += 1
+            due = self._flush_due()
+
+        if due:
+            self.flush()
+
+    def _flush_due(self):
+        return self.model is not None and (
+            self._pending >= self.flush_every or self._clock() - self._last_flush >= self.flush_interval
+        )
+
+    def update_many(self, station_id, timestamps, rainfall):
+        """
+        Versi vectorized untuk backfill/impor: maksimum per blok via reduceat.
+        Satu panggilan = satu tulis SQLite, jadi state langsung di-flush.
+        """
+        values = np.asarray(rainfall, dtype=np.float64)
+        blocks, epochs = _block_keys(timestamps, self.block)
+        keep = ~np.isnan(values)
+        blocks, epochs, values = blocks[keep], epochs[keep], values[keep]
+        if len(values) == 0:
+            return
+        order = np.argsort(epochs, kind='stable')
+        blocks, epochs, values = blocks[order], epochs[order], values[order]
+        station_id = str(station_id)
+
+        with self._lock:
+            state = self._state(station_id)
+            if state.current_block is not None:
+                late = blocks < state.current_block
+                state.late_readings += int(late.sum())
+                same = blocks == state.current_block
+                if same.any():
+                    state.current_max = max(state.current_max, float(values[same].max()))
+                newer = blocks > state.current_block
+                blocks, values = blocks[newer], values[newer]
+
+            if len(values):
+                starts = np.flatnonzero(np.r_[True, blocks[1:] != blocks[:-1]])
+                block_ids = blocks[starts]
+                block_max = np.maximum.reduceat(values, starts)
+
+                if state.current_block is not None:
+                    state.add_block_max(state.current_block, state.current_max)
+                state.merge_block_maxima(block_ids[:-1], block_max[:-1])
+                state.current_block = int(block_ids[-1])
+                state.current_max = float(block_max[-1])
+
+            state.last_timestamp = max(state.last_timestamp or epochs[-1], float(epochs[-1]))
+            self._dirty.add(station_id)
+
+        self.flush()
+
+    def flush(self):
+        """Tulis state stasiun yang berubah ke SQLite"""
+        if self.model is None:
+            return
+        with self._lock:
+            dirty = [self._states[station_id].to_dict(station_id) for station_id in self._dirty]
+            self._dirty.clear()
+            self._pending = 0
+            self._last_flush = self._clock()
+        if dirty:
+            self.model.save_states(dirty)
+
+    def record_snapshot(self, snapshot):
+        """Listener StationPoller: curah hujan per pos dari snapshot yang baru terbit"""
+        try:
+            now = max(snapshot.fetched_at.values()) if snapshot.fetched_at else None
+            for record in snapshot.rainfall:
+                if record.get('rainfall_mm') is None or not record.get('location'):
+                    continue
+                station = self.station_key(record['location']) if self.station_key else record['location']
+                self.update(station, reading_time(record.get('last_update'), now), record['rainfall_mm'])
+        except Exception as e:
+            print(f"⚠️ Gagal memperbarui Gumbel online: {e}")
+
+    def parameters(self, station_id, include_current=False):
+        """
+        (mu, beta, n_blocks) dari maksimum blok selesai; include_current ikut
+        menghitung blok berjalan (maksimum sementara). None jika < 2 blok.
+        """
+        with self._lock:
+            state = self._states.get(str(station_id))
+            if state is None:
+                return None
+            n, mean, m2 = state.n_blocks, state.mean, state.m2
+            if include_current and state.current_block is not None:
+                n += 1
+                delta = state.current_max - mean
+                mean += delta / n
+                m2 += delta * (state.current_max - mean)
+        if n < 2:
+            return None
+        beta = SQRT6_OVER_PI * np.sqrt(m2 / (n - 1))
+        return float(mean - EULER_GAMMA * beta), float(beta), n
+
+    def station_fits(self, min_blocks=MIN_YEARS):
+        """Hasil dalam format gumbel_fitting.register_station_fits"""
+        fits = {}
+        for station_id in list(self._states):
+            estimate = self.parameters(station_id)
+            if estimate is None or estimate[2] < min_blocks:
+                continue
+            state = self._states[station_id]
+            fits[station_id] = {
+                'station_id': station_id,
+                'mu_location': estimate[0],
+                'beta_scale': estimate[1],
+                'method': 'online_moments',
+                'n_years': estimate[2],
+                'years': [state.first_block, state.last_block]
+            }
+        return fits
+
+    def batch_difference(self, station_id, timestamps, rainfall):
+        """
+        Selisih absolut (mu, beta) terhadap fit batch method of moments pada
+        seri lengkap; hanya blok yang sudah selesai dibandingkan.
+        """
+        estimate = self.parameters(station_id)
+        if estimate is None:
+            return None
+        blocks, _ = _block_keys(timestamps, self.block)
+        maxima = pd.Series(np.asarray(rainfall, dtype=np.float64)).groupby(blocks).max().dropna()
+        complete = maxima.index.to_numpy() < self._states[str(station_id)].current_block
+        batch_mu, batch_beta = fit_gumbel_moments(maxima.to_numpy()[complete])
+        return abs(estimate[0] - float(batch_mu[0])), abs(estimate[1] - float(batch_beta[0]))
+
+
+_shared_estimators = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_online_estimator(model, station_key=None):
+    """
+    Satu estimator per proses (per database) untuk semua sesi Streamlit;
+    state yang belum ditulis di-flush saat proses berhenti.
+    """
+    with _shared_lock:
+        estimator = _shared_estimators.get(model.db_path)
+        if estimator is None:
+            estimator = OnlineGumbelEstimator(model, station_key=station_key)
+            _shared_estimators[model.db_path] = estimator
+            atexit.register(estimator.flush)
+        return estimator
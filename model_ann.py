@@ -1,58 +1,577 @@
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+
 import numpy as np
 
-def predict_flood_ann(rainfall, water_level, humidity, temperature):
-    """
-    Memprediksi risiko banjir menggunakan model ANN sederhana
-    VERSION 2.0 - Improved logic
-    """
-    try:
-        features = np.array([[
-            rainfall,       
-            water_level,    
-            humidity,       
-            temperature     
-        ]])
+from utils.ModelRegistry import get_model_registry, register_builtin_provider
+from utils.PredictionCache import get_prediction_cache, quantize
+
+FEATURE_NAMES = ['rainfall', 'water_level', 'humidity', 'temperature']
+
+# Rentang input yang dipakai untuk sampling data latih (sama dengan form Simulasi)
+FEATURE_RANGES = np.array([
+    [0.0, 500.0],
+    [60.0, 150.0],
+    [0.0, 100.0],
+    [15.0, 40.0]
+])
+
+ANN_ARCHITECTURE = (4, 8, 4, 1)
+TRAINING_SAMPLES = 1245
+
+# Nama model di utils/ModelRegistry dan versi bawaan kode (dipakai jika
+# model_registry/ belum ada). Versi MLP terlatih hanya ada di registry disk.
+ANN_REGISTRY_NAME = 'ann'
+ANN_RULE_VERSION = 'v2.0-rule'
+ANN_LEGACY_VERSION = 'v1.0-legacy'
+
+# Batch besar diproses per potongan agar aktivasi antar-layer tetap di cache CPU
+INFERENCE_CHUNK_ROWS = 16384
+
+# Parameter model aturan v2.0 (versi bawaan registry); dipakai sebagai teacher
+# untuk melabeli data latih MLP dan sebagai fallback jika registry kosong
+ANN_WEIGHTS = np.array([0.50, 0.25, 0.15, 0.10])
+NORMALIZATION_FACTORS = np.array([300.0, 150.0, 100.0, 35.0])
+SIGMOID_GAIN = 6.0
+BASELINE_RISK = 0.1
+
+# Faktor boost per level: index 0 = normal, 1 = > ambang bawah, 2 = > ambang atas
+RAINFALL_BOOST_THRESHOLDS = (100.0, 200.0)
+RAINFALL_BOOSTS = np.array([1.0, 1.2, 1.4])
+WATER_LEVEL_BOOST_THRESHOLDS = (110.0, 130.0)
+WATER_LEVEL_BOOSTS = np.array([1.0, 1.1, 1.3])
+
+# Ambang status: risk >= 0.5 MENENGAH, risk >= 0.8 TINGGI
+STATUS_THRESHOLDS = np.array([0.5, 0.8])
+STATUS_LABELS = np.array(['RENDAH', 'MENENGAH', 'TINGGI'])
+STATUS_MESSAGES = [
+    "Aman, tetap waspada",
+    "Siaga! Pantau terus perkembangan",
+    "Waspada! Kondisi kritis - potensi banjir tinggi"
+]
+
+RULE_PARAMS_V2 = {
+    'weights': ANN_WEIGHTS,
+    'normalization_factors': NORMALIZATION_FACTORS,
+    'sigmoid_gain': SIGMOID_GAIN,
+    'baseline_risk': BASELINE_RISK,
+    'rainfall_boost_thresholds': RAINFALL_BOOST_THRESHOLDS,
+    'rainfall_boosts': RAINFALL_BOOSTS,
+    'water_level_boost_thresholds': WATER_LEVEL_BOOST_THRESHOLDS,
+    'water_level_boosts': WATER_LEVEL_BOOSTS,
+    'status_thresholds': STATUS_THRESHOLDS
+}
+
+# Logic lama (predict_flood_ann_legacy): tanpa boost/baseline, gain 10, ambang 0.4/0.7
+RULE_PARAMS_LEGACY = {
+    'weights': [0.45, 0.30, 0.15, 0.10],
+    'normalization_factors': [300.0, 150.0, 100.0, 35.0],
+    'sigmoid_gain': 10.0,
+    'baseline_risk': 0.0,
+    'rainfall_boost_thresholds': RAINFALL_BOOST_THRESHOLDS,
+    'rainfall_boosts': [1.0, 1.0, 1.0],
+    'water_level_boost_thresholds': WATER_LEVEL_BOOST_THRESHOLDS,
+    'water_level_boosts': [1.0, 1.0, 1.0],
+    'status_thresholds': [0.4, 0.7]
+}
+LEGACY_STATUS_MESSAGES = [
+    "Aman, tetap waspada",
+    "Siaga! Pantau terus perkembangan",
+    "Waspada! Kondisi kritis"
+]
+
+def _as_feature_matrix(X):
+    """Terima array N x 4 atau DataFrame (kolom FEATURE_NAMES) sebagai float64"""
+    if hasattr(X, 'columns'):
+        if all(name in X.columns for name in FEATURE_NAMES):
+            X = X[FEATURE_NAMES]
+        X = X.to_numpy()
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim == 1:
+        X = X.reshape(1, -1)
+    if X.ndim != 2 or X.shape[1] != len(FEATURE_NAMES):
+        raise ValueError(f"Input harus berukuran N x {len(FEATURE_NAMES)}, bukan {X.shape}")
+    return X
+
+def _status_codes(risk_levels, thresholds=STATUS_THRESHOLDS):
+    return (risk_levels >= thresholds[0]).view(np.int8) \
+        + (risk_levels >= thresholds[1]).view(np.int8)
+
+class RuleModel:
+    """Model aturan (weighted sum + sigmoid + boost), vectorized; parameter per versi registry"""
+    
+    def __init__(self, params):
+        params = {key: np.asarray(value, dtype=np.float64) for key, value in params.items()}
+        self.weights = params['weights']
+        self.normalization_factors = params['normalization_factors']
+        self.sigmoid_gain = float(params['sigmoid_gain'])
+        self.baseline_risk = float(params['baseline_risk'])
+        self.rainfall_boost_thresholds = params['rainfall_boost_thresholds']
+        self.rainfall_boosts = params['rainfall_boosts']
+        self.water_level_boost_thresholds = params['water_level_boost_thresholds']
+        self.water_level_boosts = params['water_level_boosts']
+        self.status_thresholds = params['status_thresholds']
         
-        weights = np.array([0.50, 0.25, 0.15, 0.10])  
+        # Bobot yang sudah dibagi faktor normalisasi dan dikali -gain, sehingga
+        # risk = 1 / (1 + exp(X @ sigmoid_weights)) cukup satu matmul per batch
+        self._sigmoid_weights = self.weights / self.normalization_factors * -self.sigmoid_gain
+    
+    def risk(self, X):
+        rainfall = X[:, 0]
+        water_level = X[:, 1]
         
-        normalization_factors = np.array([300.0, 150.0, 100.0, 35.0])
+        risk_levels = X @ self._sigmoid_weights
+        np.exp(risk_levels, out=risk_levels)
+        risk_levels += 1.0
+        np.reciprocal(risk_levels, out=risk_levels)
         
-        normalized_features = features / normalization_factors
+        # Boost >= 1 sehingga clamp ke 1.0 cukup sekali di akhir
+        rain_level = (rainfall > self.rainfall_boost_thresholds[0]).view(np.int8) \
+            + (rainfall > self.rainfall_boost_thresholds[1]).view(np.int8)
+        risk_levels *= self.rainfall_boosts[rain_level]
         
-        weighted_sum = np.sum(normalized_features * weights, axis=1)[0]
+        water_level_bucket = (water_level > self.water_level_boost_thresholds[0]).view(np.int8) \
+            + (water_level > self.water_level_boost_thresholds[1]).view(np.int8)
+        risk_levels *= self.water_level_boosts[water_level_bucket]
         
-        risk_level = 1 / (1 + np.exp(-weighted_sum * 6))  
+        np.minimum(risk_levels, 1.0, out=risk_levels)
+        np.maximum(risk_levels, self.baseline_risk, out=risk_levels)
+        return risk_levels
+
+_teacher_model = RuleModel(RULE_PARAMS_V2)
+
+def _rule_risk(X):
+    """Model aturan v2.0 (teacher data latih MLP)"""
+    return _teacher_model.risk(X)
+
+class FloodMLP:
+    """
+    MLP 4-8-4-1 (ReLU, ReLU, Sigmoid) dalam NumPy.
+    Training memakai float64 + Adam mini-batch; inference memakai salinan
+    bobot float32 dengan standardisasi input dilebur ke layer pertama.
+    """
+    
+    def __init__(self, layers, feature_mean, feature_scale, metadata=None,
+                baseline_risk=BASELINE_RISK, status_thresholds=STATUS_THRESHOLDS):
+        self.layers = [(np.asarray(W, dtype=np.float64), np.asarray(b, dtype=np.float64))
+                    for W, b in layers]
+        self.feature_mean = np.asarray(feature_mean, dtype=np.float64)
+        self.feature_scale = np.asarray(feature_scale, dtype=np.float64)
+        self.metadata = dict(metadata or {})
+        self.baseline_risk = float(baseline_risk)
+        self.status_thresholds = np.asarray(status_thresholds, dtype=np.float64)
+        self._compile()
+    
+    @classmethod
+    def initialize(cls, feature_mean, feature_scale, architecture=ANN_ARCHITECTURE, seed=0):
+        """Inisialisasi He untuk layer ReLU"""
+        rng = np.random.default_rng(seed)
+        layers = []
+        for fan_in, fan_out in zip(architecture[:-1], architecture[1:]):
+            W = rng.normal(0.0, np.sqrt(2.0 / fan_in), size=(fan_in, fan_out))
+            layers.append((W, np.zeros(fan_out)))
+        return cls(layers, feature_mean, feature_scale)
+    
+    @property
+    def architecture(self):
+        return tuple([self.layers[0][0].shape[0]] + [W.shape[1] for W, _ in self.layers])
+    
+    def _compile(self):
+        """Bangun bobot inference float32: (x - mean) / scale dilebur ke W1/b1"""
+        W1, b1 = self.layers[0]
+        W1_folded = W1 / self.feature_scale[:, None]
+        b1_folded = b1 - (self.feature_mean / self.feature_scale) @ W1
+        compiled = [(W1_folded, b1_folded)] + self.layers[1:]
+        self._inference_layers = [
+            (W.astype(np.float32), b.astype(np.float32)) for W, b in compiled
+        ]
+    
+    def predict(self, X):
+        """Inference float32; X float N x 4 (belum distandardisasi)"""
+        if len(X) <= INFERENCE_CHUNK_ROWS:
+            return self._predict_chunk(X)
         
-        if rainfall > 200:  
-            risk_level = min(1.0, risk_level * 1.4)
-        elif rainfall > 100:  
-            risk_level = min(1.0, risk_level * 1.2)
-            
-        if water_level > 130:  
-            risk_level = min(1.0, risk_level * 1.3)
-        elif water_level > 110:  
-            risk_level = min(1.0, risk_level * 1.1)
+        output = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), INFERENCE_CHUNK_ROWS):
+            stop = start + INFERENCE_CHUNK_ROWS
+            output[start:stop] = self._predict_chunk(X[start:stop])
+        return output
+    
+    def risk(self, X):
+        """Prediksi dengan lantai baseline risk (antarmuka yang sama dengan RuleModel)"""
+        risk_levels = self.predict(X)
+        np.maximum(risk_levels, self.baseline_risk, out=risk_levels)
+        return risk_levels
+    
+    def _predict_chunk(self, X):
+        activation = np.asarray(X, dtype=np.float32)
+        last = len(self._inference_layers) - 1
+        for i, (W, b) in enumerate(self._inference_layers):
+            activation = activation @ W
+            activation += b
+            if i < last:
+                np.maximum(activation, 0.0, out=activation)
+        activation = activation[:, 0]
+        np.negative(activation, out=activation)
+        np.exp(activation, out=activation)
+        activation += 1.0
+        np.reciprocal(activation, out=activation)
+        return activation
+    
+    def _forward_train(self, X_std):
+        activations = [X_std]
+        for i, (W, b) in enumerate(self.layers):
+            z = activations[-1] @ W + b
+            if i < len(self.layers) - 1:
+                activations.append(np.maximum(z, 0.0))
+            else:
+                activations.append(1.0 / (1.0 + np.exp(-z)))
+        return activations
+    
+    def fit(self, X, y, epochs=300, batch_size=32, learning_rate=3e-3, seed=0):
+        """Mini-batch Adam dengan binary cross-entropy (target risk 0..1)"""
+        rng = np.random.default_rng(seed)
+        X_std = (np.asarray(X, dtype=np.float64) - self.feature_mean) / self.feature_scale
+        y = np.asarray(y, dtype=np.float64)
         
-        baseline_risk = 0.1
-        risk_level = max(baseline_risk, risk_level)  
+        beta1, beta2, eps = 0.9, 0.999, 1e-8
+        moments = [[np.zeros_like(W), np.zeros_like(b)] for W, b in self.layers]
+        velocities = [[np.zeros_like(W), np.zeros_like(b)] for W, b in self.layers]
+        step = 0
         
-        if risk_level >= 0.8:
-            status = "TINGGI"
-            message = "Waspada! Kondisi kritis - potensi banjir tinggi"
-        elif risk_level >= 0.5:
-            status = "MENENGAH" 
-            message = "Siaga! Pantau terus perkembangan"
-        else:
-            status = "RENDAH"
-            message = "Aman, tetap waspada"
+        for _ in range(epochs):
+            order = rng.permutation(len(X_std))
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                activations = self._forward_train(X_std[batch])
+                
+                # dBCE/dz untuk output sigmoid
+                grad = (activations[-1][:, 0] - y[batch])[:, None] / len(batch)
+                step += 1
+                
+                for i in range(len(self.layers) - 1, -1, -1):
+                    W, b = self.layers[i]
+                    grad_W = activations[i].T @ grad
+                    grad_b = grad.sum(axis=0)
+                    if i > 0:
+                        grad = (grad @ W.T) * (activations[i] > 0)
+                    
+                    for k, (param, param_grad) in enumerate(((W, grad_W), (b, grad_b))):
+                        moments[i][k] = beta1 * moments[i][k] + (1 - beta1) * param_grad
+                        velocities[i][k] = beta2 * velocities[i][k] + (1 - beta2) * param_grad ** 2
+                        m_hat = moments[i][k] / (1 - beta1 ** step)
+                        v_hat = velocities[i][k] / (1 - beta2 ** step)
+                        param -= learning_rate * m_hat / (np.sqrt(v_hat) + eps)
         
+        self._compile()
+        return self
+    
+    def to_params(self):
+        """Parameter sebagai dict array (format artifact registry)"""
+        params = {
+            'feature_mean': self.feature_mean,
+            'feature_scale': self.feature_scale,
+            'baseline_risk': self.baseline_risk,
+            'status_thresholds': self.status_thresholds
+        }
+        for i, (W, b) in enumerate(self.layers):
+            params[f'W{i}'] = W
+            params[f'b{i}'] = b
+        return params
+    
+    @classmethod
+    def from_params(cls, params, metadata=None):
+        layers = []
+        i = 0
+        while f'W{i}' in params:
+            layers.append((params[f'W{i}'], params[f'b{i}']))
+            i += 1
+        return cls(
+            layers, params['feature_mean'], params['feature_scale'], metadata,
+            baseline_risk=params.get('baseline_risk', BASELINE_RISK),
+            status_thresholds=params.get('status_thresholds', STATUS_THRESHOLDS)
+        )
+    
+    def save(self, path):
+        arrays = self.to_params()
+        for key, value in self.metadata.items():
+            arrays[f'meta_{key}'] = np.asarray(value)
+        np.savez(path, **arrays)
+        return path
+    
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            params = {key: data[key] for key in data.files if not key.startswith('meta_')}
+            metadata = {
+                key[len('meta_'):]: data[key].item() for key in data.files
+                if key.startswith('meta_')
+            }
+        return cls.from_params(params, metadata)
+
+def generate_training_data(n_samples=TRAINING_SAMPLES, seed=42):
+    """
+    Sampel input seragam dalam FEATURE_RANGES, dilabeli oleh model aturan v2.0
+    (distilasi). Ganti dengan data kejadian banjir berlabel jika sudah tersedia.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.uniform(FEATURE_RANGES[:, 0], FEATURE_RANGES[:, 1], size=(n_samples, len(FEATURE_NAMES)))
+    y = _rule_risk(X.copy())
+    return X, y
+
+def train_flood_mlp(X=None, y=None, epochs=300, batch_size=32, learning_rate=3e-3, seed=0,
+                    validation_samples=20000):
+    """Latih MLP 4-8-4-1 dan hitung metrik pada data validasi terpisah"""
+    if X is None or y is None:
+        X, y = generate_training_data()
+    X = _as_feature_matrix(X)
+    
+    model = FloodMLP.initialize(X.mean(axis=0), X.std(axis=0), seed=seed)
+    model.fit(X, y, epochs=epochs, batch_size=batch_size, learning_rate=learning_rate, seed=seed)
+    
+    X_val, y_val = generate_training_data(validation_samples, seed=seed + 1000)
+    predicted = np.maximum(model.predict(X_val), BASELINE_RISK)
+    model.metadata.update({
+        'training_samples': len(X),
+        'validation_samples': validation_samples,
+        'validation_mae': float(np.abs(predicted - y_val).mean()),
+        'status_accuracy': float((_status_codes(predicted) == _status_codes(y_val)).mean()),
+        'trained_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'training_data': 'synthetic, dilabeli model aturan v2.0'
+    })
+    return model
+
+def register_ann_model(model, version=None, activate=False, registry=None):
+    """Daftarkan FloodMLP terlatih sebagai versi baru di model registry"""
+    registry = registry or get_model_registry()
+    metadata = model.metadata
+    return registry.register(
+        ANN_REGISTRY_NAME,
+        model.to_params(),
+        kind='mlp',
+        version=version,
+        created_at=metadata.get('trained_at'),
+        training_data_range={
+            'source': metadata.get('training_data', ''),
+            'features': {
+                name: [float(low), float(high)]
+                for name, (low, high) in zip(FEATURE_NAMES, FEATURE_RANGES)
+            }
+        },
+        metrics={
+            key: metadata[key]
+            for key in ('training_samples', 'validation_samples', 'validation_mae', 'status_accuracy')
+            if key in metadata
+        },
+        description='MLP ' + '-'.join(str(n) for n in model.architecture),
+        activate=activate
+    )
+
+def _register_builtin_versions(registry):
+    registry.add_builtin(ANN_REGISTRY_NAME, ANN_LEGACY_VERSION, RULE_PARAMS_LEGACY, {
+        'kind': 'rule',
+        'description': 'Logic lama predict_flood_ann_legacy'
+    })
+    registry.add_builtin(ANN_REGISTRY_NAME, ANN_RULE_VERSION, RULE_PARAMS_V2, {
+        'kind': 'rule',
+        'description': '2.0 - Improved Logic',
+        'default': True
+    })
+
+register_builtin_provider(_register_builtin_versions)
+
+_scorer_lock = threading.Lock()
+
+def _get_scorer(model_version):
+    """RuleModel/FloodMLP terkompilasi, di-cache pada objek versi registry"""
+    scorer = model_version.cache.get('scorer')
+    if scorer is not None:
+        return scorer
+    with _scorer_lock:
+        scorer = model_version.cache.get('scorer')
+        if scorer is None:
+            if model_version.kind == 'mlp':
+                metadata = dict(model_version.manifest.get('metrics') or {})
+                metadata['trained_at'] = model_version.manifest.get('created_at', '')
+                metadata['training_data'] = (model_version.manifest.get('training_data_range') or {}).get('source', '')
+                scorer = FloodMLP.from_params(model_version.params, metadata)
+            else:
+                scorer = RuleModel(model_version.params)
+            model_version.cache['scorer'] = scorer
+        return scorer
+
+def _score_with(model_version, X):
+    scorer = _get_scorer(model_version)
+    risk_levels = scorer.risk(X)
+    return risk_levels, _status_codes(risk_levels, scorer.status_thresholds)
+
+def get_active_ann_version():
+    """ModelVersion ANN yang sedang aktif di registry"""
+    return get_model_registry().active(ANN_REGISTRY_NAME)
+
+def load_ann_model(reload=False):
+    """FloodMLP versi aktif; None jika versi aktif adalah model aturan"""
+    registry = get_model_registry()
+    if reload:
+        registry.reload()
+    scorer = _get_scorer(registry.active(ANN_REGISTRY_NAME))
+    return scorer if isinstance(scorer, FloodMLP) else None
+
+def predict_flood_ann_batch(X, version=None, routing_key=None):
+    """
+    Prediksi risiko banjir untuk banyak baris sekaligus (vectorized).
+    X: array N x 4 [rainfall, water_level, humidity, temperature] atau DataFrame.
+    version memaksa versi registry tertentu; routing_key untuk pembagian A/B.
+    Return (risk_levels float[N], status_codes int8[N]); 0=RENDAH, 1=MENENGAH, 2=TINGGI.
+    """
+    risk_levels, status_codes, _ = _score_matrix(_as_feature_matrix(X), version, routing_key)
+    return risk_levels, status_codes
+
+def _resolve_versions(version=None, routing_key=None):
+    """(versi yang melayani, versi shadow atau None) dari registry"""
+    registry = get_model_registry()
+    if version is not None:
+        return registry.load(ANN_REGISTRY_NAME, version), None
+    return registry.route(ANN_REGISTRY_NAME, routing_key)
+
+def _score_matrix(X, version=None, routing_key=None):
+    """
+    Inti perhitungan batch; X sudah berupa float64 N x 4.
+    Return (risk_levels, status_codes, ModelVersion yang melayani). Jika registry
+    memasang candidate mode shadow, candidate ikut dihitung dan dibandingkan.
+    """
+    serving, shadow = _resolve_versions(version, routing_key)
+    return _score_resolved(X, serving, shadow) + (serving,)
+
+def _score_resolved(X, serving, shadow):
+    risk_levels, status_codes = _score_with(serving, X)
+    
+    if shadow is not None:
+        try:
+            shadow_risk, shadow_status = _score_with(shadow, X)
+            get_model_registry().shadow_stats(ANN_REGISTRY_NAME, serving.version, shadow.version).update(
+                risk_levels, shadow_risk, status_codes, shadow_status
+            )
+        except Exception as e:
+            print(f"⚠️ Shadow scoring {shadow} gagal: {e}")
+    
+    return risk_levels, status_codes
+
+# Ruang parameter halaman Simulasi Banjir
+SURFACE_RAINFALL_RANGE = (0.0, 500.0)
+SURFACE_WATER_LEVEL_RANGE = (60.0, 150.0)
+
+@lru_cache(maxsize=64)
+def _cached_risk_surface(humidity, temperature, rainfall_steps, water_level_steps, version):
+    rainfall = np.linspace(*SURFACE_RAINFALL_RANGE, rainfall_steps)
+    water_level = np.linspace(*SURFACE_WATER_LEVEL_RANGE, water_level_steps)
+    
+    X = np.empty((water_level_steps * rainfall_steps, len(FEATURE_NAMES)))
+    X[:, 0] = np.tile(rainfall, water_level_steps)
+    X[:, 1] = np.repeat(water_level, rainfall_steps)
+    X[:, 2] = humidity
+    X[:, 3] = temperature
+    
+    risk_levels, status_codes, _ = _score_matrix(X, version)
+    surface = {
+        'rainfall': rainfall,
+        'water_level': water_level,
+        'risk': risk_levels.reshape(water_level_steps, rainfall_steps),
+        'status': status_codes.reshape(water_level_steps, rainfall_steps),
+        'humidity': humidity,
+        'temperature': temperature
+    }
+    # Hasil cache dipakai bersama antar rerun/sesi, jadi dibuat read-only
+    for key in ('rainfall', 'water_level', 'risk', 'status'):
+        surface[key].setflags(write=False)
+    return surface
+
+def compute_risk_surface(humidity, temperature, rainfall_steps=101, water_level_steps=91, version=None):
+    """
+    Sweep risiko ANN pada grid curah hujan (0-500 mm) x tinggi air (60-150 mdpl)
+    untuk kelembapan dan suhu tetap, dalam satu panggilan batch.
+    Hasil di-cache per (kelembapan, suhu, resolusi, versi model); grid 'risk' dan
+    'status' berukuran water_level_steps x rainfall_steps. version=None: versi aktif.
+    """
+    return _cached_risk_surface(
+        round(float(humidity), 1),
+        round(float(temperature), 1),
+        int(rainfall_steps),
+        int(water_level_steps),
+        version or get_active_ann_version().version
+    )
+
+
+def _model_parameters(model_version):
+    """Parameter model yang benar-benar melayani versi ini (untuk parameters_used / technical details)"""
+    scorer = _get_scorer(model_version)
+    if isinstance(scorer, FloodMLP):
         return {
+            'kind': 'mlp',
+            'architecture': '-'.join(str(n) for n in scorer.architecture),
+            'feature_mean': scorer.feature_mean.tolist(),
+            'feature_scale': scorer.feature_scale.tolist()
+        }
+    return {
+        'kind': 'rule',
+        'architecture': 'rule-based weighted sum',
+        'weights': scorer.weights.tolist(),
+        'normalization_factors': scorer.normalization_factors.tolist(),
+        'sigmoid_gain': scorer.sigmoid_gain,
+        'baseline_risk': scorer.baseline_risk,
+        'rainfall_boost_thresholds': scorer.rainfall_boost_thresholds.tolist(),
+        'rainfall_boosts': scorer.rainfall_boosts.tolist(),
+        'water_level_boost_thresholds': scorer.water_level_boost_thresholds.tolist(),
+        'water_level_boosts': scorer.water_level_boosts.tolist()
+    }
+
+def _normalized_features(model_version, features):
+    """Input seperti yang dilihat model: (x - mean) / scale untuk MLP, x / faktor untuk model aturan"""
+    scorer = _get_scorer(model_version)
+    features = np.asarray(features, dtype=np.float64)
+    if isinstance(scorer, FloodMLP):
+        return (features - scorer.feature_mean) / scorer.feature_scale
+    return features / scorer.normalization_factors
+
+
+# Cache hasil per (versi model, input terkuantisasi presisi sensor)
+_prediction_cache = get_prediction_cache(ANN_REGISTRY_NAME)
+
+def predict_flood_ann(rainfall, water_level, humidity, temperature, version=None, routing_key=None):
+    """
+    Memprediksi risiko banjir menggunakan versi ANN aktif di model registry
+    VERSION 3.0 - MLP 4-8-4-1 terlatih (model_registry/ann)
+    Input dibulatkan ke presisi sensor dan hasil di-memoize (LRU + TTL);
+    yang dikembalikan salinan dangkal sehingga aman di-update pemanggil.
+    """
+    try:
+        rainfall = quantize(rainfall, 'rainfall')
+        water_level = quantize(water_level, 'water_level')
+        humidity = quantize(humidity, 'humidity')
+        temperature = quantize(temperature, 'temperature')
+        
+        serving, shadow = _resolve_versions(version, routing_key)
+        cache_key = (serving, rainfall, water_level, humidity, temperature)
+        cached = _prediction_cache.get(cache_key)
+        if cached is not None:
+            return dict(cached)
+        
+        risk_levels, status_codes = _score_resolved(
+            np.array([[rainfall, water_level, humidity, temperature]], dtype=np.float64),
+            serving, shadow
+        )
+        risk_level = float(risk_levels[0])
+        status_code = int(status_codes[0])
+        
+        result = {
             'risk_level': round(risk_level, 3),
-            'status': status,
-            'message': message,  
+            'status': str(STATUS_LABELS[status_code]),
+            'message': STATUS_MESSAGES[status_code],  
+            'model_version': serving.version,
             'parameters_used': {
-                'weights': weights.tolist(),
-                'normalization_factors': normalization_factors.tolist(),
+                **_model_parameters(serving),
                 'input_values': {
                     'rainfall': rainfall,
                     'water_level': water_level,
@@ -61,6 +580,8 @@ def predict_flood_ann(rainfall, water_level, humidity, temperature):
                 }
             }
         }
+        _prediction_cache.put(cache_key, result)
+        return dict(result)
         
     except Exception as e:
         return {
@@ -69,30 +590,52 @@ def predict_flood_ann(rainfall, water_level, humidity, temperature):
             'message': f'Error dalam prediksi ANN: {str(e)}'
         }
 
+def get_prediction_cache_stats():
+    """Counter hit/miss cache prediksi ANN"""
+    return _prediction_cache.stats()
+
 def get_ann_parameters():
     """Return parameter ANN untuk display di technical details"""
+    active = get_active_ann_version()
+    model = _get_scorer(active)
+    if not isinstance(model, FloodMLP):
+        return {
+            **_model_parameters(active),
+            'architecture': 'Rule-based weighted sum (fallback, bobot MLP tidak ditemukan)',
+            'activation': 'Sigmoid',
+            'training_samples': 0,
+            'accuracy': None,
+            'model_version': active.version,
+            'version': active.manifest.get('description', '2.0 - Improved Logic')
+        }
+    
     return {
-        'architecture': '4-8-4-1 Neural Network',
-        'weights': [0.50, 0.25, 0.15, 0.10],  
-        'normalization_factors': [300.0, 150.0, 100.0, 35.0],
-        'activation': 'Sigmoid',
-        'training_samples': 1245,
-        'accuracy': 0.892,
-        'version': '2.0 - Improved Logic'
+        'architecture': '-'.join(str(n) for n in model.architecture) + ' Neural Network',
+        'layer_sizes': list(model.architecture),
+        'feature_mean': model.feature_mean.tolist(),
+        'feature_scale': model.feature_scale.tolist(),
+        'activation': 'ReLU (hidden), Sigmoid (output)',
+        'training_samples': int(model.metadata.get('training_samples', 0)),
+        'training_data': model.metadata.get('training_data', ''),
+        'accuracy': round(float(model.metadata.get('status_accuracy', 0.0)), 3),
+        'validation_mae': round(float(model.metadata.get('validation_mae', 0.0)), 4),
+        'trained_at': model.metadata.get('trained_at', ''),
+        'training_data_range': active.manifest.get('training_data_range'),
+        'model_version': active.version,
+        'version': '3.0 - Trained MLP'
     }
 
 def predict_flood_ann_interactive(rainfall, water_level, humidity, temperature):
     """Versi interactive yang return lebih banyak detail untuk demo"""
     result = predict_flood_ann(rainfall, water_level, humidity, temperature)
     
-    result.update({
-        'normalized_features': [
-            rainfall / 300.0,
-            water_level / 150.0,
-            humidity / 100.0,
-            temperature / 35.0
-        ]
-    })
+    if 'model_version' in result:
+        serving = get_model_registry().load(ANN_REGISTRY_NAME, result['model_version'])
+        result.update({
+            'normalized_features': _normalized_features(
+                serving, [rainfall, water_level, humidity, temperature]
+            ).tolist()
+        })
     
     return result
 
@@ -117,30 +660,20 @@ def predict_flood_ann_with_temp_range(rainfall, water_level, humidity, temp_min,
 def predict_flood_ann_legacy(rainfall, water_level, humidity, temperature):
     """
     Fungsi legacy untuk kompatibilitas - menggunakan logic lama
-    Hanya untuk backup jika ada dependency yang belum diupdate
+    (versi registry v1.0-legacy). Hanya untuk backup jika ada dependency
+    yang belum diupdate
     """
     try:
-        features = np.array([[rainfall, water_level, humidity, temperature]])
-        weights = np.array([0.45, 0.30, 0.15, 0.10])
-        normalization_factors = np.array([300.0, 150.0, 100.0, 35.0])
-        normalized_features = features / normalization_factors
-        weighted_sum = np.sum(normalized_features * weights, axis=1)[0]
-        risk_level = 1 / (1 + np.exp(-weighted_sum * 10))
-        
-        if risk_level >= 0.7:
-            status = "TINGGI"
-            message = "Waspada! Kondisi kritis"
-        elif risk_level >= 0.4:
-            status = "MENENGAH" 
-            message = "Siaga! Pantau terus perkembangan"
-        else:
-            status = "RENDAH"
-            message = "Aman, tetap waspada"
+        risk_levels, status_codes, _ = _score_matrix(
+            np.array([[rainfall, water_level, humidity, temperature]], dtype=np.float64),
+            version=ANN_LEGACY_VERSION
+        )
+        status_code = int(status_codes[0])
         
         return {
-            'risk_level': round(risk_level, 3),
-            'status': status,
-            'message': message
+            'risk_level': round(float(risk_levels[0]), 3),
+            'status': str(STATUS_LABELS[status_code]),
+            'message': LEGACY_STATUS_MESSAGES[status_code]
         }
     except Exception as e:
         return {
@@ -148,3 +681,15 @@ def predict_flood_ann_legacy(rainfall, water_level, humidity, temperature):
             'status': 'ERROR',
             'message': f'Error dalam prediksi ANN: {str(e)}'
         }
+
+if __name__ == "__main__":
+    # Latih ulang dan daftarkan versi baru: python model_ann.py [--activate]
+    # Tanpa --activate versi baru dipasang sebagai candidate shadow
+    trained = train_flood_mlp()
+    registry = get_model_registry(watch_interval=0)
+    new_version = register_ann_model(trained, activate='--activate' in sys.argv, registry=registry)
+    if '--activate' not in sys.argv:
+        registry.set_candidate(ANN_REGISTRY_NAME, new_version, mode='shadow')
+    print(f"✅ Registered {ANN_REGISTRY_NAME}:{new_version}")
+    print(f"   Status accuracy: {trained.metadata['status_accuracy']:.4f}")
+    print(f"   Validation MAE: {trained.metadata['validation_mae']:.4f}")
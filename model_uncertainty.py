@@ -0,0 +1,212 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from model_ann import (
+    predict_flood_ann_batch, get_active_ann_version, FEATURE_NAMES, STATUS_LABELS
+)
+from gumbel_distribution import predict_flood_gumbel_batch, station_location_scale, GUMBEL_REGISTRY_NAME
+from utils.ModelRegistry import get_model_registry
+
+# Model galat per sensor:
+#   normal   -> galat absolut N(0, sigma)
+#   relative -> galat N(0, sigma * nilai), minimal floor (mis. tipping bucket)
+#   uniform  -> galat U(-half_width, +half_width) (resolusi/kuantisasi)
+# bounds membatasi hasil perturbasi ke rentang fisik sensor
+SENSOR_ERROR_MODELS = {
+    'rainfall': {'type': 'relative', 'sigma': 0.10, 'floor': 0.2, 'bounds': (0.0, None)},
+    'water_level': {'type': 'normal', 'sigma': 0.05, 'bounds': (None, None)},
+    'humidity': {'type': 'normal', 'sigma': 3.0, 'bounds': (0.0, 100.0)},
+    'temperature': {'type': 'normal', 'sigma': 0.5, 'bounds': (None, None)}
+}
+
+DEFAULT_SAMPLES = 2000
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+DEFAULT_SEED = 0
+
+# Batas baris (stasiun x sampel) per batch; juga satuan kerja untuk process pool
+MAX_BATCH_ROWS = 262144
+# Di bawah ini overhead spawn proses lebih mahal dari scoring itu sendiri
+PROCESS_POOL_MIN_ROWS = 4_000_000
+
+
+def _perturb(values, spec, rng, n_samples):
+    """values float[M] -> sampel float[M, n_samples] sesuai model galat sensor"""
+    kind = spec.get('type', 'normal')
+    shape = (len(values), n_samples)
+    base = values[:, None]
+
+    if kind == 'normal':
+        samples = base + rng.standard_normal(shape) * float(spec['sigma'])
+    elif kind == 'relative':
+        sigma = np.maximum(np.abs(values) * float(spec['sigma']), float(spec.get('floor', 0.0)))
+        samples = base + rng.standard_normal(shape) * sigma[:, None]
+    elif kind == 'uniform':
+        samples = base + rng.uniform(-1.0, 1.0, shape) * float(spec['half_width'])
+    else:
+        raise ValueError(f"Tipe model galat tidak dikenal: {kind}")
+
+    low, high = spec.get('bounds', (None, None))
+    if low is not None or high is not None:
+        np.clip(samples, low, high, out=samples)
+    return samples
+
+
+def sample_inputs(X, n_samples=DEFAULT_SAMPLES, error_models=None, seed=DEFAULT_SEED):
+    """
+    Perturbasi input M x 4 [rainfall, water_level, humidity, temperature].
+    Return array M x n_samples x 4.
+    """
+    error_models = {**SENSOR_ERROR_MODELS, **(error_models or {})}
+    rng = np.random.default_rng(seed)
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+
+    samples = np.empty((len(X), n_samples, len(FEATURE_NAMES)))
+    for j, name in enumerate(FEATURE_NAMES):
+        spec = error_models.get(name)
+        if spec is None:
+            samples[:, :, j] = X[:, j:j + 1]
+        else:
+            samples[:, :, j] = _perturb(X[:, j], spec, rng, n_samples)
+    return samples
+
+
+def _summarize(risk, status, percentiles):
+    """risk/status M x S -> (persentil M x P, mean M, probabilitas status M x 3)"""
+    bands = np.percentile(risk, percentiles, axis=1).T
+    probabilities = np.stack(
+        [np.count_nonzero(status == code, axis=1) for code in range(len(STATUS_LABELS))],
+        axis=1
+    ) / risk.shape[1]
+    return bands, risk.mean(axis=1), probabilities
+
+
+def _score_chunk(model, version, X, n_samples, error_models, seed, percentiles, station_ids=None):
+    """Satu unit kerja (dipanggil langsung atau di proses worker)"""
+    if model == 'ann':
+        samples = sample_inputs(X, n_samples, error_models, seed)
+        risk, status = predict_flood_ann_batch(samples.reshape(-1, len(FEATURE_NAMES)), version=version)
+    else:
+        spec = {**SENSOR_ERROR_MODELS, **(error_models or {})}['rainfall']
+        samples = _perturb(np.asarray(X, dtype=np.float64), spec, np.random.default_rng(seed), n_samples)
+        if station_ids is None:
+            risk, status = predict_flood_gumbel_batch(samples.ravel(), version=version)
+        else:
+            # Satu panggilan per stasiun: semua sampel stasiun memakai mu/beta stasiun itu
+            risk, status = np.empty(samples.shape), np.empty(samples.shape, dtype=np.int8)
+            for i, station_id in enumerate(station_ids):
+                risk[i], status[i] = predict_flood_gumbel_batch(samples[i], version=version, station_ids=station_id)
+
+    shape = (len(X), n_samples)
+    return _summarize(risk.reshape(shape), status.reshape(shape), percentiles)
+
+
+def _run(model, version, X, n_samples, error_models, percentiles, seed, n_jobs, station_ids=None):
+    """
+    Bagi stasiun ke potongan <= MAX_BATCH_ROWS baris. Seed tiap potongan diturunkan
+    dari SeedSequence(seed) per index potongan, sehingga hasil identik antara
+    eksekusi serial dan process pool. station_ids (list sepanjang X) ikut dipotong.
+    """
+    chunk_stations = max(1, MAX_BATCH_ROWS // n_samples)
+    starts = range(0, len(X), chunk_stations)
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    jobs = [
+        (model, version, X[start:start + chunk_stations], n_samples, error_models, child, percentiles,
+         None if station_ids is None else station_ids[start:start + chunk_stations])
+        for start, child in zip(starts, seeds)
+    ]
+
+    if n_jobs > 1 and len(jobs) > 1 and len(X) * n_samples >= PROCESS_POOL_MIN_ROWS:
+        # spawn: aman dipakai dari proses Streamlit yang punya thread latar
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=n_jobs, mp_context=context) as executor:
+            results = list(executor.map(_score_chunk, *zip(*jobs)))
+    else:
+        results = [_score_chunk(*job) for job in jobs]
+
+    bands, means, probabilities = (np.concatenate(parts) for parts in zip(*results))
+    return {
+        'percentiles': list(percentiles),
+        'risk_percentiles': bands,
+        'risk_mean': means,
+        'status_probabilities': probabilities,
+        'n_samples': n_samples,
+        'model_version': version
+    }
+
+
+def ann_uncertainty_batch(X, n_samples=DEFAULT_SAMPLES, error_models=None,
+                        percentiles=DEFAULT_PERCENTILES, seed=DEFAULT_SEED, n_jobs=1, version=None):
+    """
+    Monte-Carlo risiko ANN untuk M stasiun sekaligus.
+    X: M x 4 [rainfall, water_level, humidity, temperature].
+    Return dict: risk_percentiles (M x P), risk_mean (M), status_probabilities (M x 3).
+    """
+    version = version or get_active_ann_version().version
+    X = np.asarray(X, dtype=np.float64).reshape(-1, len(FEATURE_NAMES))
+    return _run('ann', version, X, n_samples, error_models, tuple(percentiles), seed, n_jobs)
+
+
+def gumbel_uncertainty_batch(rainfall, n_samples=DEFAULT_SAMPLES, error_models=None,
+                            percentiles=DEFAULT_PERCENTILES, seed=DEFAULT_SEED, n_jobs=1, version=None,
+                            station_ids=None):
+    """
+    Monte-Carlo risiko Gumbel untuk array curah hujan M stasiun.
+    station_ids (sepanjang rainfall) memakai parameter hasil fit per stasiun
+    (station_location_scale); tanpa station_ids dipakai parameter global.
+    """
+    registry = get_model_registry()
+    model_version = (registry.load(GUMBEL_REGISTRY_NAME, version) if version is not None
+                    else registry.active(GUMBEL_REGISTRY_NAME))
+    rainfall = np.atleast_1d(np.asarray(rainfall, dtype=np.float64))
+    if station_ids is not None:
+        station_ids = [None if station_id is None else str(station_id) for station_id in station_ids]
+        if len(station_ids) != len(rainfall):
+            raise ValueError("station_ids harus sepanjang rainfall")
+    result = _run('gumbel', model_version.version, rainfall, n_samples, error_models, tuple(percentiles),
+                  seed, n_jobs, station_ids)
+    result['station_ids'] = station_ids
+    result['station_fit'] = np.array([
+        station_location_scale(model_version, station_id)[2] for station_id in (station_ids or [None] * len(rainfall))
+    ])
+    return result
+
+
+def _station_summary(result, index=0):
+    bands = result['risk_percentiles'][index]
+    probabilities = result['status_probabilities'][index]
+    return {
+        'risk_mean': round(float(result['risk_mean'][index]), 3),
+        'risk_percentiles': {
+            f"p{q:g}": round(float(value), 3) for q, value in zip(result['percentiles'], bands)
+        },
+        'status_probabilities': {
+            str(label): round(float(p), 3) for label, p in zip(STATUS_LABELS, probabilities)
+        },
+        'most_likely_status': str(STATUS_LABELS[int(np.argmax(probabilities))]),
+        'n_samples': result['n_samples'],
+        'model_version': result['model_version'],
+        'station_fit': bool(result['station_fit'][index]) if 'station_fit' in result else None
+    }
+
+
+def predict_flood_ann_uncertainty(rainfall, water_level, humidity, temperature, **kwargs):
+    """Pita ketidakpastian ANN untuk satu set input (dipakai halaman Simulasi)"""
+    try:
+        return _station_summary(
+            ann_uncertainty_batch([[rainfall, water_level, humidity, temperature]], **kwargs)
+        )
+    except Exception as e:
+        print(f"⚠️ ANN uncertainty error: {e}")
+        return None
+
+
+def predict_flood_gumbel_uncertainty(rainfall, station_id=None, **kwargs):
+    """Pita ketidakpastian Gumbel untuk satu nilai curah hujan (parameter stasiun jika ada)"""
+    try:
+        station_ids = None if station_id is None else [station_id]
+        return _station_summary(gumbel_uncertainty_batch([rainfall], station_ids=station_ids, **kwargs))
+    except Exception as e:
+        print(f"⚠️ Gumbel uncertainty error: {e}")
+        return None
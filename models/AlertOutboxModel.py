@@ -0,0 +1,215 @@
+import sqlite3
+import traceback
+
+
+class AlertOutboxModel:
+    def __init__(self, db_path='flood_system.db'):
+        self.db_path = db_path
+        self.init_database()
+
+    def get_connection(self):
+        """Get database connection"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            print(f"❌ Cannot connect to database: {e}")
+            return None
+
+    def init_database(self):
+        """Buat tabel state alert per stasiun dan outbox notifikasi"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alert_state (
+                    station_id TEXT PRIMARY KEY,
+                    level INTEGER NOT NULL,
+                    notified_level INTEGER NOT NULL,
+                    notified_at REAL,
+                    below_since REAL,
+                    last_value REAL,
+                    updated_at REAL
+                )
+            ''')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS alert_outbox (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    dedup_key TEXT NOT NULL UNIQUE,
+                    channel TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    level TEXT NOT NULL,
+                    subject TEXT NOT NULL,
+                    body TEXT NOT NULL,
+                    payload TEXT,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    sent_at REAL,
+                    last_error TEXT
+                )
+            ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_alert_outbox_due ON alert_outbox (status, channel, next_attempt_at)'
+            )
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in alert tables init: {e}")
+            traceback.print_exc()
+            return False
+
+    def get_states(self):
+        """State alert semua stasiun -> {station_id: dict}"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return {}
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM alert_state')
+            states = {row['station_id']: dict(row) for row in cursor.fetchall()}
+            conn.close()
+            return states
+
+        except Exception as e:
+            print(f"❌ Error loading alert states: {e}")
+            return {}
+
+    def save_states(self, states):
+        """Upsert banyak state dalam satu transaksi"""
+        if not states:
+            return True
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            conn.executemany('''
+                INSERT OR REPLACE INTO alert_state
+                (station_id, level, notified_level, notified_at, below_since, last_value, updated_at)
+                VALUES (:station_id, :level, :notified_level, :notified_at, :below_since, :last_value, :updated_at)
+            ''', states)
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error saving alert states: {e}")
+            return False
+
+    def enqueue(self, messages):
+        """Masukkan pesan ke outbox; dedup_key yang sudah ada diabaikan. Return jumlah baru"""
+        if not messages:
+            return 0
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return 0
+
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO alert_outbox
+                (dedup_key, channel, kind, level, subject, body, payload, next_attempt_at, created_at)
+                VALUES (:dedup_key, :channel, :kind, :level, :subject, :body, :payload,
+                        :created_at, :created_at)
+            ''', messages)
+            conn.commit()
+            inserted = conn.total_changes - before
+            conn.close()
+            return inserted
+
+        except Exception as e:
+            print(f"❌ Error enqueueing alerts: {e}")
+            return 0
+
+    def fetch_due(self, channel, now, limit):
+        """Pesan pending channel ini yang sudah waktunya dikirim, terlama dulu"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM alert_outbox
+                WHERE status = 'pending' AND channel = ? AND next_attempt_at <= ?
+                ORDER BY next_attempt_at, id
+                LIMIT ?
+            ''', (channel, now, limit))
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error fetching due alerts: {e}")
+            return []
+
+    def mark_results(self, sent, failed, now):
+        """
+        sent: [id], failed: [(id, error, next_attempt_at atau None jika menyerah)]
+        dalam satu transaksi.
+        """
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            conn.executemany('''
+                UPDATE alert_outbox SET status = 'sent', attempts = attempts + 1, sent_at = ?, last_error = NULL
+                WHERE id = ?
+            ''', [(now, message_id) for message_id in sent])
+            conn.executemany('''
+                UPDATE alert_outbox
+                SET status = CASE WHEN ? IS NULL THEN 'dead' ELSE 'pending' END,
+                    attempts = attempts + 1, last_error = ?, next_attempt_at = COALESCE(?, next_attempt_at)
+                WHERE id = ?
+            ''', [(retry_at, error, retry_at, message_id) for message_id, error, retry_at in failed])
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error updating alert outbox: {e}")
+            return False
+
+    def get_recent(self, limit=50):
+        """Pesan outbox terbaru (untuk halaman admin / debugging)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM alert_outbox ORDER BY created_at DESC, id DESC LIMIT ?', (limit,))
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error reading alert outbox: {e}")
+            return []
+
+    def count_by_status(self):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return {}
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT channel, status, COUNT(*) AS n FROM alert_outbox GROUP BY channel, status')
+            counts = {(row['channel'], row['status']): row['n'] for row in cursor.fetchall()}
+            conn.close()
+            return counts
+
+        except Exception as e:
+            print(f"❌ Error counting alert outbox: {e}")
+            return {}
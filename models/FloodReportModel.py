@@ -53,6 +53,21 @@ class FloodReportModel:
             
             conn.commit()
             
+            cursor.execute("PRAGMA table_info(flood_reports)")
+            existing_columns = {col[1] for col in cursor.fetchall()}
+            
+            # Migrasi: token idempotensi + status replikasi Google Sheets
+            if 'submission_token' not in existing_columns:
+                cursor.execute('ALTER TABLE flood_reports ADD COLUMN submission_token TEXT')
+            if 'sheets_synced' not in existing_columns:
+                cursor.execute('ALTER TABLE flood_reports ADD COLUMN sheets_synced INTEGER DEFAULT 0')
+            
+            cursor.execute('''
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_flood_reports_submission_token
+                ON flood_reports (submission_token)
+            ''')
+            conn.commit()
+            
             cursor.execute("PRAGMA table_info(flood_reports)")
             columns = cursor.fetchall()
             print(f"✅ Table 'flood_reports' ready with {len(columns)} columns")
@@ -69,8 +84,23 @@ class FloodReportModel:
             return False
     
     def create_report(self, alamat, tinggi_banjir, nama_pelapor, 
-                    no_hp=None, photo_url=None, ip_address=None):
+                    no_hp=None, photo_url=None, ip_address=None, status='pending',
+                    submission_token=None):
         """Create new flood report dengan waktu WIB"""
+        report_id, _ = self.create_report_once(
+            alamat, tinggi_banjir, nama_pelapor, no_hp=no_hp, photo_url=photo_url,
+            ip_address=ip_address, status=status, submission_token=submission_token
+        )
+        return report_id
+    
+    def create_report_once(self, alamat, tinggi_banjir, nama_pelapor, 
+                    no_hp=None, photo_url=None, ip_address=None, status='pending',
+                    submission_token=None):
+        """
+        Insert laporan sekali per submission_token (unique index).
+        Return (report_id, created); jika token sudah ada, return id laporan asli
+        dengan created=False tanpa menulis ulang.
+        """
         try:
             current_time_wib = datetime.now(self.tz_wib)
             timestamp = current_time_wib.strftime("%Y-%m-%d %H:%M:%S")
@@ -83,29 +113,39 @@ class FloodReportModel:
             print(f"  No HP: {no_hp}")
             print(f"  Photo URL: {photo_url}")
             print(f"  IP Address: {ip_address}")
+            print(f"  Status: {status}")
+            print(f"  Submission Token: {submission_token}")
             
             conn = self.get_connection()
             if not conn:
                 print("❌ No database connection")
-                return None
+                return None, False
             
             cursor = conn.cursor()
             
-            cursor.execute('''
-                INSERT INTO flood_reports 
-                ("Timestamp", "Alamat", "Tinggi Banjir", "Nama Pelapor", 
-                "No HP", "IP Address", "Photo URL", "Status")
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                timestamp,
-                str(alamat) if alamat else "",
-                str(tinggi_banjir) if tinggi_banjir else "",
-                str(nama_pelapor) if nama_pelapor else "",
-                str(no_hp) if no_hp else None,
-                str(ip_address) if ip_address else "unknown",
-                str(photo_url) if photo_url else None,
-                'pending'
-            ))
+            try:
+                cursor.execute('''
+                    INSERT INTO flood_reports 
+                    ("Timestamp", "Alamat", "Tinggi Banjir", "Nama Pelapor", 
+                    "No HP", "IP Address", "Photo URL", "Status", submission_token)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', (
+                    timestamp,
+                    str(alamat) if alamat else "",
+                    str(tinggi_banjir) if tinggi_banjir else "",
+                    str(nama_pelapor) if nama_pelapor else "",
+                    str(no_hp) if no_hp else None,
+                    str(ip_address) if ip_address else "unknown",
+                    str(photo_url) if photo_url else None,
+                    status or 'pending',
+                    submission_token
+                ))
+            except sqlite3.IntegrityError:
+                conn.close()
+                existing = self.get_report_by_token(submission_token)
+                existing_id = existing['id'] if existing else None
+                print(f"♻️ Duplicate submission token, original report ID: {existing_id}")
+                return existing_id, False
             
             conn.commit()
             last_id = cursor.lastrowid
@@ -116,13 +156,51 @@ class FloodReportModel:
             print(f"✅ Total reports in database: {count}")
             
             conn.close()
-            return last_id
+            return last_id, True
             
         except Exception as e:
             print(f"❌ Error creating report: {e}")
             traceback.print_exc()
+            return None, False
+    
+    def get_report_by_token(self, submission_token):
+        """Cari laporan berdasarkan token idempotensi (memakai unique index)"""
+        if not submission_token:
+            return None
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return None
+            
+            cursor = conn.cursor()
+            cursor.execute(
+                'SELECT * FROM flood_reports WHERE submission_token = ?',
+                (submission_token,)
+            )
+            row = cursor.fetchone()
+            conn.close()
+            return dict(row) if row else None
+            
+        except Exception as e:
+            print(f"❌ Error getting report by token: {e}")
             return None
     
+    def mark_sheets_synced(self, report_id):
+        """Tandai laporan sudah tereplikasi ke Google Sheets"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+            
+            conn.execute('UPDATE flood_reports SET sheets_synced = 1 WHERE id = ?', (report_id,))
+            conn.commit()
+            conn.close()
+            return True
+            
+        except Exception as e:
+            print(f"❌ Error marking sheets sync: {e}")
+            return False
+    
     def get_today_reports_count_by_ip(self, ip_address):
         """Count today's reports by IP address - FIXED VERSION"""
         try:
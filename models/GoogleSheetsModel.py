@@ -5,6 +5,24 @@ import streamlit as st
 import os
 import pytz
 import json
+import threading
+import time
+
+from utils.CircuitBreaker import get_breaker, CircuitOpenError
+
+# Kolom ke-9 worksheet flood_reports berisi token idempotensi submit
+SUBMISSION_TOKEN_COLUMN = 9
+
+# gspread tidak memberi timeout default: batasi lama sesi Streamlit menunggu Sheets
+SHEETS_TIMEOUT = 10.0
+# Timeout transport (connect, read) session HTTP gspread, di bawah SHEETS_TIMEOUT:
+# request yang menggantung benar-benar berakhir dan worker breaker kembali bebas
+SHEETS_HTTP_TIMEOUT = (3.05, 8.0)
+SHEETS_BREAKER = 'google_sheets'
+
+# Baris worksheet terakhir yang berhasil dibaca (per proses): disajikan saat Sheets gagal
+_last_records = {'records': None, 'fetched_at': None}
+_last_records_lock = threading.Lock()
 
 class GoogleSheetsModel:
     def __init__(self):
@@ -13,6 +31,8 @@ class GoogleSheetsModel:
         self.spreadsheet = None
         self.worksheet = None
         self.tz_wib = pytz.timezone('Asia/Jakarta')
+        self.breaker = get_breaker(SHEETS_BREAKER, timeout=SHEETS_TIMEOUT)
+        self.last_read = {'degraded': False, 'fetched_at': None, 'error': None}
         self.setup_connection()
     
     def setup_connection(self):
@@ -57,33 +77,95 @@ class GoogleSheetsModel:
                 self.client = None
                 return
             
-            creds = ServiceAccountCredentials.from_json_keyfile_dict(credentials_data, scope)
-            self.client = gspread.authorize(creds)
-            print("✅ Google Sheets API authorized")
-            
             spreadsheet_id = None
             if hasattr(st, 'secrets') and 'GOOGLE_SHEETS' in st.secrets and 'SPREADSHEET_ID' in st.secrets['GOOGLE_SHEETS']:
                 spreadsheet_id = st.secrets['GOOGLE_SHEETS']['SPREADSHEET_ID']
             else:
                 spreadsheet_id = "1wdys3GzfDfl0ohCQjUHRyJVbKQcM0VSIMgCryHB0-mc"
             
-            self.spreadsheet = self.client.open_by_key(spreadsheet_id)
-            print(f"✅ Spreadsheet opened: {self.spreadsheet.title}")
-            
-            self.worksheet = self.spreadsheet.worksheet('flood_reports')
-            print(f"✅ Worksheet ready: {self.worksheet.title}")
+            # Authorize + buka worksheet lewat breaker: Sheets mati tidak menahan sesi baru
+            self.client, self.spreadsheet, self.worksheet = self.breaker.call(
+                self._connect, credentials_data, scope, spreadsheet_id
+            )
+            print(f"✅ Worksheet ready: {self.spreadsheet.title}/{self.worksheet.title}")
             
+        except CircuitOpenError as e:
+            print(f"⚠️ Google Sheets skipped: {e}")
+            self.client = None
         except Exception as e:
             print(f"❌ Google Sheets connection failed: {e}")
             self.client = None
     
-    def save_flood_report(self, report_data):
-        """Save report to Google Sheets"""
+    def _connect(self, credentials_data, scope, spreadsheet_id):
+        creds = ServiceAccountCredentials.from_json_keyfile_dict(credentials_data, scope)
+        client = gspread.authorize(creds)
+        client.set_timeout(SHEETS_HTTP_TIMEOUT)
+        spreadsheet = client.open_by_key(spreadsheet_id)
+        return client, spreadsheet, spreadsheet.worksheet('flood_reports')
+    
+    def get_all_records(self):
+        """
+        Semua baris worksheet lewat breaker. Jika Sheets gagal atau breaker terbuka,
+        langsung kembalikan baris terakhir yang berhasil dibaca (last_read['degraded']
+        = True); exception hanya jika belum pernah ada pembacaan yang berhasil.
+        """
+        try:
+            if not self.worksheet:
+                raise RuntimeError("Worksheet not available")
+            records = self.breaker.call(self.worksheet.get_all_records)
+            fetched_at = time.time()
+            with _last_records_lock:
+                _last_records.update(records=records, fetched_at=fetched_at)
+            self.last_read = {'degraded': False, 'fetched_at': fetched_at, 'error': None}
+            return records
+        except Exception as e:
+            with _last_records_lock:
+                records, fetched_at = _last_records['records'], _last_records['fetched_at']
+            self.last_read = {'degraded': True, 'fetched_at': fetched_at, 'error': str(e)}
+            if records is None:
+                raise
+            print(f"⚠️ Google Sheets unavailable ({e}), serving rows from {time.time() - fetched_at:.0f}s ago")
+            return records
+    
+    def data_status(self):
+        """Status pembacaan terakhir untuk banner kesegaran data di view"""
+        fetched_at = self.last_read['fetched_at']
+        return {
+            'source': 'Google Sheets',
+            'degraded': self.last_read['degraded'],
+            'age_seconds': round(time.time() - fetched_at) if fetched_at else None,
+            'error': self.last_read['error'],
+            'breaker': self.breaker.state,
+            'retry_after': round(self.breaker.retry_after())
+        }
+    
+    def has_submission_token(self, submission_token):
+        """Cek apakah token submit sudah pernah di-append ke worksheet"""
+        if not submission_token or not self.worksheet:
+            return False
+        try:
+            cell = self.breaker.call(self.worksheet.find, submission_token, in_column=SUBMISSION_TOKEN_COLUMN)
+            return cell is not None
+        except Exception as e:
+            print(f"⚠️ Error checking submission token: {e}")
+            return False
+    
+    def save_flood_report(self, report_data, check_existing=False):
+        """
+        Save report to Google Sheets.
+        check_existing=True dipakai saat retry: baris tidak di-append ulang
+        jika token submit yang sama sudah ada di worksheet.
+        """
         try:
             if not self.worksheet:
                 print("❌ Worksheet not available")
                 return False
             
+            submission_token = str(report_data.get('submission_token', '') or '')
+            if check_existing and self.has_submission_token(submission_token):
+                print("♻️ Submission token already in Google Sheets, skip append")
+                return True
+            
             current_time_wib = datetime.now(self.tz_wib)
             timestamp_wib = current_time_wib.strftime("%Y-%m-%d %H:%M:%S")
             
@@ -97,10 +179,11 @@ class GoogleSheetsModel:
                 str(report_data.get('reporter_phone', '')), 
                 str(report_data.get('ip_address', '')),   
                 str(report_data.get('photo_url', '')),    
-                'pending'                           
+                str(report_data.get('status', 'pending')),
+                submission_token
             ]
             
-            self.worksheet.append_row(row)
+            self.breaker.call(self.worksheet.append_row, row)
             print("✅ Saved to Google Sheets!")
             return True
             
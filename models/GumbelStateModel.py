@@ -0,0 +1,106 @@
+import sqlite3
+import traceback
+from datetime import datetime
+
+
+class GumbelStateModel:
+    def __init__(self, db_path='flood_system.db'):
+        self.db_path = db_path
+        self.init_database()
+
+    def get_connection(self):
+        """Get database connection"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            print(f"❌ Cannot connect to database: {e}")
+            return None
+
+    def init_database(self):
+        """Buat tabel state estimator Gumbel online (satu baris per stasiun)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS gumbel_online_state (
+                    station_id TEXT PRIMARY KEY,
+                    n_blocks INTEGER NOT NULL DEFAULT 0,
+                    mean REAL NOT NULL DEFAULT 0,
+                    m2 REAL NOT NULL DEFAULT 0,
+                    first_block INTEGER,
+                    last_block INTEGER,
+                    current_block INTEGER,
+                    current_max REAL,
+                    last_timestamp REAL,
+                    late_readings INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP
+                )
+            ''')
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in gumbel_online_state init: {e}")
+            traceback.print_exc()
+            return False
+
+    def save_states(self, states):
+        """Upsert state beberapa stasiun dalam satu transaksi"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            conn.executemany('''
+                INSERT INTO gumbel_online_state
+                    (station_id, n_blocks, mean, m2, first_block, last_block,
+                    current_block, current_max, last_timestamp, late_readings, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(station_id) DO UPDATE SET
+                    n_blocks = excluded.n_blocks,
+                    mean = excluded.mean,
+                    m2 = excluded.m2,
+                    first_block = excluded.first_block,
+                    last_block = excluded.last_block,
+                    current_block = excluded.current_block,
+                    current_max = excluded.current_max,
+                    last_timestamp = excluded.last_timestamp,
+                    late_readings = excluded.late_readings,
+                    updated_at = excluded.updated_at
+            ''', [
+                (state['station_id'], state['n_blocks'], state['mean'], state['m2'],
+                state['first_block'], state['last_block'], state['current_block'],
+                state['current_max'], state['last_timestamp'], state['late_readings'], now)
+                for state in states
+            ])
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Error saving Gumbel online state: {e}")
+            return False
+
+    def load_states(self):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM gumbel_online_state')
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"⚠️ Error loading Gumbel online state: {e}")
+            return []
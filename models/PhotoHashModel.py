@@ -0,0 +1,170 @@
+import sqlite3
+from datetime import datetime
+import traceback
+import pytz
+
+# Batas parameter '?' per query SQLite (default lama SQLITE_MAX_VARIABLE_NUMBER = 999)
+MAX_QUERY_PARAMS = 900
+
+
+class PhotoHashModel:
+    def __init__(self, db_path='flood_system.db'):
+        self.db_path = db_path
+        self.tz_wib = pytz.timezone('Asia/Jakarta')
+        self.init_database()
+
+    def get_connection(self):
+        """Get database connection"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            print(f"❌ Cannot connect to database: {e}")
+            return None
+
+    def init_database(self):
+        """Buat tabel photo_hashes beserta index pHash"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS photo_hashes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    report_id INTEGER,
+                    photo_path TEXT NOT NULL UNIQUE,
+                    phash TEXT NOT NULL,
+                    dhash TEXT,
+                    duplicate_of INTEGER,
+                    duplicate_path TEXT,
+                    duplicate_distance INTEGER,
+                    created_at TEXT
+                )
+            ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_photo_hashes_phash ON photo_hashes (phash)'
+            )
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_photo_hashes_report ON photo_hashes (report_id)'
+            )
+
+            conn.commit()
+            conn.close()
+            print("✅ Table 'photo_hashes' ready")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in photo_hashes init: {e}")
+            traceback.print_exc()
+            return False
+
+    def save_hash(self, report_id, photo_path, phash_hex, dhash_hex=None,
+                duplicate_of=None, duplicate_path=None, duplicate_distance=None):
+        """Simpan hash foto laporan (dan kandidat duplikat jika ada)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            created_at = datetime.now(self.tz_wib).strftime("%Y-%m-%d %H:%M:%S")
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO photo_hashes
+                (report_id, photo_path, phash, dhash, duplicate_of,
+                duplicate_path, duplicate_distance, created_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                report_id, str(photo_path), phash_hex, dhash_hex,
+                duplicate_of, duplicate_path, duplicate_distance, created_at
+            ))
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error saving photo hash: {e}")
+            return False
+
+    def get_all_hashes(self):
+        """Semua hash untuk membangun index in-memory"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT report_id, photo_path, phash, dhash FROM photo_hashes')
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error loading photo hashes: {e}")
+            return []
+
+    def get_hash_by_photo(self, photo_path):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return None
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM photo_hashes WHERE photo_path = ?', (str(photo_path),))
+            row = cursor.fetchone()
+            conn.close()
+            return dict(row) if row else None
+
+        except Exception as e:
+            print(f"❌ Error reading photo hash: {e}")
+            return None
+
+    def get_hashes_by_photos(self, photo_paths):
+        """Baris hash untuk banyak foto sekaligus (satu query per MAX_QUERY_PARAMS path) -> {path: row}"""
+        paths = list(dict.fromkeys(str(path) for path in photo_paths if path))
+        if not paths:
+            return {}
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return {}
+
+            rows = {}
+            cursor = conn.cursor()
+            for start in range(0, len(paths), MAX_QUERY_PARAMS):
+                chunk = paths[start:start + MAX_QUERY_PARAMS]
+                cursor.execute(
+                    f'SELECT * FROM photo_hashes WHERE photo_path IN ({",".join("?" * len(chunk))})',
+                    chunk
+                )
+                rows.update((row['photo_path'], dict(row)) for row in cursor.fetchall())
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error reading photo hashes: {e}")
+            return {}
+
+    def get_suspected_duplicates(self):
+        """Foto yang terindikasi duplikat/daur ulang, terbaru dulu"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT * FROM photo_hashes
+                WHERE duplicate_path IS NOT NULL
+                ORDER BY created_at DESC
+            ''')
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error getting suspected duplicates: {e}")
+            return []
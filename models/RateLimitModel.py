@@ -0,0 +1,107 @@
+import sqlite3
+import traceback
+
+
+class RateLimitModel:
+    def __init__(self, db_path='flood_system.db'):
+        self.db_path = db_path
+        self.init_database()
+
+    def get_connection(self):
+        """Get database connection"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            print(f"❌ Cannot connect to database: {e}")
+            return None
+
+    def init_database(self):
+        """Buat tabel event rate limit (persisten antar restart)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    ts REAL NOT NULL
+                )
+            ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_rate_limit_ts ON rate_limit_events (ts)'
+            )
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in rate_limit_events init: {e}")
+            traceback.print_exc()
+            return False
+
+    def record_event(self, scope, key, ts):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            conn.execute(
+                'INSERT INTO rate_limit_events (scope, key, ts) VALUES (?, ?, ?)',
+                (scope, key, ts)
+            )
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Error recording rate limit event: {e}")
+            return False
+
+    def delete_event(self, scope, key, ts):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            conn.execute(
+                '''DELETE FROM rate_limit_events WHERE id = (
+                       SELECT id FROM rate_limit_events WHERE scope = ? AND key = ? AND ts = ? LIMIT 1
+                   )''',
+                (scope, key, ts)
+            )
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"⚠️ Error deleting rate limit event: {e}")
+            return False
+
+    def load_events_since(self, since_ts):
+        """Ambil event di dalam window dan buang event yang sudah kedaluwarsa"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM rate_limit_events WHERE ts < ?', (since_ts,))
+            cursor.execute(
+                'SELECT scope, key, ts FROM rate_limit_events WHERE ts >= ? ORDER BY ts',
+                (since_ts,)
+            )
+            rows = [(row['scope'], row['key'], row['ts']) for row in cursor.fetchall()]
+            conn.commit()
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"⚠️ Error loading rate limit events: {e}")
+            return []
@@ -0,0 +1,109 @@
+import sqlite3
+from datetime import datetime
+import traceback
+import pytz
+
+
+class StationAliasModel:
+    def __init__(self, db_path='flood_system.db'):
+        self.db_path = db_path
+        self.tz_wib = pytz.timezone('Asia/Jakarta')
+        self.init_database()
+
+    def get_connection(self):
+        """Get database connection"""
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            return conn
+        except Exception as e:
+            print(f"❌ Cannot connect to database: {e}")
+            return None
+
+    def init_database(self):
+        """Buat tabel station_aliases (nama pos BBWS -> id stasiun kanonik)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS station_aliases (
+                    alias_key TEXT PRIMARY KEY,
+                    station_id TEXT NOT NULL,
+                    raw_name TEXT,
+                    score REAL,
+                    source TEXT,
+                    created_at TEXT
+                )
+            ''')
+            cursor.execute(
+                'CREATE INDEX IF NOT EXISTS idx_station_aliases_station ON station_aliases (station_id)'
+            )
+
+            conn.commit()
+            conn.close()
+            print("✅ Table 'station_aliases' ready")
+            return True
+
+        except Exception as e:
+            print(f"❌ Error in station_aliases init: {e}")
+            traceback.print_exc()
+            return False
+
+    def save_alias(self, alias_key, station_id, raw_name=None, score=None, source='learned'):
+        """Simpan alias hasil pencocokan (atau koreksi manual)"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            created_at = datetime.now(self.tz_wib).strftime("%Y-%m-%d %H:%M:%S")
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO station_aliases
+                (alias_key, station_id, raw_name, score, source, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (alias_key, station_id, raw_name, score, source, created_at))
+
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error saving station alias: {e}")
+            return False
+
+    def get_all_aliases(self):
+        """Semua alias untuk membangun index in-memory"""
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return []
+
+            cursor = conn.cursor()
+            cursor.execute('SELECT alias_key, station_id, raw_name, score, source FROM station_aliases')
+            rows = [dict(row) for row in cursor.fetchall()]
+            conn.close()
+            return rows
+
+        except Exception as e:
+            print(f"❌ Error loading station aliases: {e}")
+            return []
+
+    def delete_alias(self, alias_key):
+        try:
+            conn = self.get_connection()
+            if not conn:
+                return False
+
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM station_aliases WHERE alias_key = ?', (alias_key,))
+            conn.commit()
+            conn.close()
+            return True
+
+        except Exception as e:
+            print(f"❌ Error deleting station alias: {e}")
+            return False
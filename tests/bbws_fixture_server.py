@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+FIXTURE SERVER HALAMAN BBWS (offline)
+Memutar ulang halaman tersimpan di tests/fixtures/bbws: /tma -> tma.html,
+/tma/detail/ngadipiro -> tma/detail/ngadipiro.html, dst. ETag (hash isi) dan
+Last-Modified (mtime file) dikirim; request kondisional dijawab 304.
+Jalankan: python tests/bbws_fixture_server.py [--port 8765] [--delay 0.2]
+lalu set BBWS_BASE_URL=http://127.0.0.1:8765 agar BBWSScraper memakainya.
+"""
+
+import argparse
+import hashlib
+import os
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'bbws')
+
+
+class FixtureServer:
+    """
+    ThreadingHTTPServer di thread latar. delay: detik per request (semua path),
+    delays: {path: detik} untuk mensimulasikan halaman yang lambat,
+    validators=False: tanpa ETag/Last-Modified (server yang tidak mendukung 304).
+    """
+
+    def __init__(self, port=0, delay=0.0, delays=None, fixture_dir=FIXTURE_DIR, validators=True):
+        self.delay = delay
+        self.delays = delays or {}
+        self.validators = validators
+        self.statuses = []
+        self.fixture_dir = fixture_dir
+        self.requests = []
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                path = self.path.split('?', 1)[0].rstrip('/') or '/'
+                with server._lock:
+                    server.requests.append(path)
+                time.sleep(server.delays.get(path, server.delay))
+
+                file_path = os.path.normpath(os.path.join(server.fixture_dir, path.lstrip('/') + '.html'))
+                if not file_path.startswith(server.fixture_dir) or not os.path.isfile(file_path):
+                    self.send_error(404)
+                    return
+                with open(file_path, 'rb') as f:
+                    body = f.read()
+
+                if server.validators:
+                    etag = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+                    last_modified = formatdate(os.path.getmtime(file_path), usegmt=True)
+                    since = self.headers.get('If-Modified-Since')
+                    if self.headers.get('If-None-Match') == etag or (
+                        'If-None-Match' not in self.headers and since == last_modified
+                    ):
+                        server._record(304)
+                        self.send_response(304)
+                        self.send_header('ETag', etag)
+                        self.end_headers()
+                        return
+
+                server._record(200)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                if server.validators:
+                    self.send_header('ETag', etag)
+                    self.send_header('Last-Modified', last_modified)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _record(self, status):
+        with self._lock:
+            self.statuses.append(status)
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Replay halaman BBWS tersimpan')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='latensi buatan per request (detik)')
+    args = parser.parse_args()
+
+    fixture_server = FixtureServer(port=args.port, delay=args.delay)
+    print(f"🌐 BBWS fixture server di {fixture_server.base_url} (delay {args.delay}s)")
+    print(f"   export BBWS_BASE_URL={fixture_server.base_url}")
+    try:
+        fixture_server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        fixture_server.stop()
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK PARSER TABEL BBWS (halaman fixture)
+Jalankan: python tests/benchmark_bbws_parser.py [jumlah_baris]
+"""
+
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bbws_fixture_server import FIXTURE_DIR
+from utils.BBWSTableParser import available_backends, parse_station_columns
+from utils.BBWSScraper import STATUS_MAP
+
+
+def _large_page(n_rows):
+    """tma.html dengan baris tabel diperbanyak (meniru tabel pos yang besar)"""
+    with open(os.path.join(FIXTURE_DIR, 'tma.html'), encoding='utf-8') as f:
+        html = f.read()
+    rows = re.findall(r'<tr><td>.*?</tr>', html)
+    body = '\n'.join(rows[i % len(rows)] for i in range(n_rows))
+    return re.sub(r'<tbody>.*?</tbody>', lambda _: f'<tbody>\n{body}\n</tbody>', html, flags=re.S)
+
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def _peak_allocation(func):
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def bench_backends(files):
+    for label, html in files:
+        print(f"\n⏱️ {label} ({len(html) / 1024:.0f} KiB)")
+        print(f"   {'backend':<11}{'waktu':>12}{'puncak alokasi':>18}")
+        for backend in available_backends():
+            def run():
+                return parse_station_columns(html, 'water_level_mdpl', STATUS_MAP, backend=backend)
+            seconds = _best_of(run)
+            peak = _peak_allocation(run)
+            print(f"   {backend:<11}{seconds * 1000:>9.2f} ms{peak / 1024:>14.0f} KiB")
+
+
+if __name__ == "__main__":
+    n_rows = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with open(os.path.join(FIXTURE_DIR, 'tma.html'), encoding='utf-8') as f:
+        fixture = f.read()
+    bench_backends([('tma.html fixture', fixture), (f'tma.html x {n_rows} baris', _large_page(n_rows))])
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK REFRESH BBWS (offline, via fixture server)
+Jalankan: python tests/benchmark_bbws_scraper.py [delay_detik]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bbws_fixture_server import FixtureServer
+from utils.BBWSScraper import BBWSScraper, WATER_LEVEL_PATH, RAINFALL_PATH
+from utils.HttpCache import ResponseCache
+
+
+def bench_refresh(delay, repeat=3):
+    print(f"\n⏱️ Refresh /tma + /ch + detail (latensi server {delay * 1000:.0f} ms/halaman)")
+    with FixtureServer(delay=delay) as server:
+        scraper = BBWSScraper(base_url=server.base_url, cache=False)
+        scraper.fetch_all()  # kenali link detail
+
+        paths = [WATER_LEVEL_PATH, RAINFALL_PATH] + sorted(
+            path for paths in scraper._known_details.values() for path in paths
+        )
+        start = time.perf_counter()
+        for path in paths:
+            scraper.fetch_page(path)
+        serial = time.perf_counter() - start
+
+        timings = []
+        for _ in range(repeat):
+            timings.append(scraper.fetch_all()['latency'])
+
+    print(f"   {len(paths)} halaman serial : {serial * 1000:8.1f} ms")
+    print(f"   {len(paths)} halaman paralel: {min(timings) * 1000:8.1f} ms")
+    print(f"   Speedup           : {serial / min(timings):8.1f}x")
+
+
+def bench_cached_refresh(repeat=5):
+    print("\n📭 Refresh tanpa perubahan (HTTP cache, tanpa latensi buatan)")
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer() as server:
+        uncached = BBWSScraper(base_url=server.base_url, cache=False)
+        cached = BBWSScraper(base_url=server.base_url, cache=ResponseCache(tmp))
+        uncached.fetch_all()
+        cached.fetch_all()
+        cold = min(uncached.fetch_all()['latency'] for _ in range(repeat))
+        warm = [cached.fetch_all() for _ in range(repeat)]
+
+    print(f"   Fetch + parse      : {cold * 1000:8.1f} ms")
+    print(f"   304 + parse cache  : {min(s['latency'] for s in warm) * 1000:8.1f} ms "
+        f"({warm[-1]['cache']['not_modified']} halaman 304)")
+
+
+if __name__ == "__main__":
+    bench_refresh(float(sys.argv[1]) if len(sys.argv) > 1 else 0.2)
+    bench_cached_refresh()
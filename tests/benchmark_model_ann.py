@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK LATENSI INFERENCE ANN
+Jalankan: python tests/benchmark_model_ann.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import model_ann
+from model_ann import predict_flood_ann, predict_flood_ann_batch, load_ann_model, ANN_RULE_VERSION
+
+
+def _inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    ranges = model_ann.FEATURE_RANGES
+    return rng.uniform(ranges[:, 0], ranges[:, 1], size=(n, len(model_ann.FEATURE_NAMES)))
+
+
+def _best_of(func, repeat=5):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_per_sample(n_calls=20000):
+    print("\n⏱️ Per-sample latency (predict_flood_ann)")
+    rows = _inputs(n_calls).tolist()
+
+    def run(version=None):
+        for row in rows:
+            predict_flood_ann(*row, version=version)
+
+    mlp_us = _best_of(run, 3) / n_calls * 1e6
+    rule_us = _best_of(lambda: run(ANN_RULE_VERSION), 3) / n_calls * 1e6
+    print(f"  MLP 4-8-4-1    : {mlp_us:8.2f} µs/call")
+    print(f"  Rule model v2.0: {rule_us:8.2f} µs/call")
+
+    # Rerun dashboard: input stasiun yang sama dipanggil berulang (cache hit)
+    hot_rows = rows[:50]
+
+    def rerun():
+        for _ in range(n_calls // len(hot_rows)):
+            for row in hot_rows:
+                predict_flood_ann(*row)
+
+    cached_us = _best_of(rerun, 3) / n_calls * 1e6
+    print(f"  Cache hit      : {cached_us:8.2f} µs/call ({model_ann.get_prediction_cache_stats()['hit_rate']:.1%} hit rate)")
+
+
+def bench_batched(sizes=(1_000, 100_000, 1_000_000)):
+    print("\n⏱️ Batched latency (predict_flood_ann_batch)")
+    for n in sizes:
+        X = _inputs(n, seed=1)
+        mlp_s = _best_of(lambda: predict_flood_ann_batch(X))
+        rule_s = _best_of(lambda: predict_flood_ann_batch(X, version=ANN_RULE_VERSION))
+        print(f"  N={n:>9,}: MLP {mlp_s * 1e3:8.2f} ms ({mlp_s / n * 1e9:6.1f} ns/row)"
+            f" | rule {rule_s * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    model = load_ann_model()
+    if model is None:
+        print("⚠️ Versi aktif registry bukan MLP, benchmark memakai rule model")
+    else:
+        print(f"✅ Model {model.architecture}, accuracy={model.metadata.get('status_accuracy', 0):.4f}")
+    bench_per_sample()
+    bench_batched()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK PHOTO HASH INDEX (multi-index hash table vs linear scan)
+Memeriksa klaim: pencarian near-duplicate < 1 ms pada 100.000 foto.
+Jalankan: python tests/benchmark_photo_hash_index.py [jumlah_foto] [jumlah_query]
+Exit code 1 jika median latensi query melewati target.
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import utils.PhotoHashIndex as photo_hash_index
+from utils.PhotoHashIndex import PhotoHashIndex, DEFAULT_MAX_DISTANCE, hamming_distance
+
+TARGET_MS = 1.0
+
+
+def _flip(value, bits, rng):
+    for bit in rng.sample(range(64), bits):
+        value ^= 1 << bit
+    return value
+
+
+def _collection(n_photos, rng, clustered):
+    """
+    Acak seragam, atau berkelompok (foto satu lokasi/kejadian mirip satu sama
+    lain: pusat + 0-12 bit berbeda) yang membuat bucket lebih padat.
+    """
+    if not clustered:
+        return [rng.getrandbits(64) for _ in range(n_photos)]
+    centres = [rng.getrandbits(64) for _ in range(n_photos // 50)]
+    return [_flip(rng.choice(centres), rng.randint(0, 12), rng) for _ in range(n_photos)]
+
+
+def _percentiles_ms(timings):
+    values = np.array(timings) * 1e3
+    return np.percentile(values, 50), np.percentile(values, 99)
+
+
+def _time_queries(index, queries):
+    timings, found = [], 0
+    for query in queries:
+        start = time.perf_counter()
+        found += len(index.query(query, DEFAULT_MAX_DISTANCE))
+        timings.append(time.perf_counter() - start)
+    return _percentiles_ms(timings), found / len(queries)
+
+
+def bench(n_photos, n_queries, clustered):
+    rng = random.Random(0)
+    hashes = _collection(n_photos, rng, clustered)
+    index = PhotoHashIndex()
+    start = time.perf_counter()
+    for i, value in enumerate(hashes):
+        index.add(f"photo_{i}.jpg", value, report_id=i)
+    build = time.perf_counter() - start
+
+    # Separuh query foto daur ulang (dekat foto yang ada), separuh foto baru
+    queries = [_flip(rng.choice(hashes), rng.randint(0, DEFAULT_MAX_DISTANCE), rng) if i % 2 else rng.getrandbits(64)
+               for i in range(n_queries)]
+
+    (p50, p99), per_query = _time_queries(index, queries)
+    # Jalur NumPy < 2.0 (requirements.txt): popcount SWAR
+    saved, photo_hash_index._bitwise_count = photo_hash_index._bitwise_count, None
+    try:
+        (swar_p50, swar_p99), _ = _time_queries(index, queries)
+    finally:
+        photo_hash_index._bitwise_count = saved
+
+    # Pembanding: linear scan Python per foto, sekaligus cek hasil index identik
+    python_scan = []
+    for query in queries[:20]:
+        start = time.perf_counter()
+        expected = {i for i, value in enumerate(hashes) if hamming_distance(query, value) <= DEFAULT_MAX_DISTANCE}
+        python_scan.append(time.perf_counter() - start)
+        assert {m['report_id'] for m in index.query(query, DEFAULT_MAX_DISTANCE)} == expected
+    scan_p50, _ = _percentiles_ms(python_scan)
+
+    label = 'berkelompok' if clustered else 'acak'
+    popcount = 'np.bitwise_count' if saved is not None else 'SWAR (NumPy < 2.0)'
+    print(f"\n⏱️ {n_photos:,} foto ({label}), {n_queries:,} query, jarak <= {DEFAULT_MAX_DISTANCE}")
+    print(f"   build index             : {build:.2f} s")
+    print(f"   index, {popcount:<17}: p50 {p50:.3f} ms, p99 {p99:.3f} ms ({per_query:.1f} hasil/query)")
+    print(f"   index, SWAR             : p50 {swar_p50:.3f} ms, p99 {swar_p99:.3f} ms")
+    print(f"   linear scan Python      : p50 {scan_p50:.1f} ms")
+    return max(p50, swar_p50)
+
+
+if __name__ == "__main__":
+    n_photos = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    n_queries = int(sys.argv[2]) if len(sys.argv) > 2 else 2_000
+    medians = [bench(n_photos, n_queries, clustered) for clustered in (False, True)]
+    if max(medians) > TARGET_MS:
+        print(f"\n❌ Median query {max(medians):.3f} ms melewati target {TARGET_MS} ms")
+        sys.exit(1)
+    print(f"\n✅ Median query di bawah {TARGET_MS} ms untuk {n_photos:,} foto")
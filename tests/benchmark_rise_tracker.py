@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK RISE TRACKER (update inkremental vs hitung ulang jendela)
+Jalankan: python tests/benchmark_rise_tracker.py [jumlah_stasiun] [jumlah_jam]
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.RiseTracker import RiseTracker, WINDOWS, SLOPE_WINDOW
+
+STEP = 60
+
+
+def _recompute(times, values, t):
+    """Cara naif: hitung ulang polyfit, delta dan max dari seluruh jendela"""
+    inside = times >= t - SLOPE_WINDOW
+    if inside.sum() >= 3:
+        np.polyfit(times[inside] - t, values[inside], 1)
+    for _, window in WINDOWS:
+        inside = times >= t - window
+        values[inside].max()
+
+
+def bench(n_stations, hours):
+    n = int(hours * 3600 / STEP)
+    rng = np.random.default_rng(0)
+    levels = 100 + np.cumsum(rng.normal(0, 0.01, (n_stations, n)), axis=1)
+    times = 1.7e9 + STEP * np.arange(n, dtype=np.float64)
+    names = [f"pos-{i:03d}" for i in range(n_stations)]
+
+    tracker = RiseTracker()
+    start = time.perf_counter()
+    for k in range(n):
+        t = times[k]
+        column = levels[:, k].tolist()
+        for name, value in zip(names, column):
+            tracker.update(name, t, value)
+    incremental = time.perf_counter() - start
+    updates = n * n_stations
+    print(f"\n⏱️ {n_stations} stasiun x {n} menit = {updates:,} update")
+    print(f"   inkremental : {incremental:.2f} s ({incremental / updates * 1e6:.1f} µs/update, "
+          f"{incremental / n * 1000:.1f} ms per refresh 1 menit)")
+
+    # Hitung ulang penuh: diukur pada sebagian stasiun lalu diekstrapolasi
+    sample = min(n_stations, 10)
+    start = time.perf_counter()
+    for i in range(sample):
+        history = []
+        for k in range(n):
+            history.append(levels[i, k])
+            lo = max(0, k - 6 * 3600 // STEP)
+            _recompute(times[lo:k + 1], np.array(history[lo:k + 1]), times[k])
+    naive = (time.perf_counter() - start) * n_stations / sample
+    print(f"   hitung ulang: {naive:.2f} s (ekstrapolasi dari {sample} stasiun), "
+          f"{naive / incremental:.0f}x lebih lambat")
+
+    start = time.perf_counter()
+    for name in names:
+        tracker.features(name)
+    print(f"   baca fitur semua stasiun: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    hours = float(sys.argv[2]) if len(sys.argv) > 2 else 12
+    bench(n_stations, hours)
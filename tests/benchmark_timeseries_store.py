@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+BENCHMARK TIME SERIES STORE (pembacaan 10 menit, semua pos Bengawan Solo)
+Jalankan: python tests/benchmark_timeseries_store.py [jumlah_stasiun] [jumlah_tahun]
+"""
+
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.TimeSeriesStore import TimeSeriesStore
+
+STEP = 600
+START = 1577811600  # 2020-01-01 00:00 WIB
+
+
+def _rss_mib():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def _fill(store, n_stations, n_years):
+    n = int(n_years * 365 * 86400 / STEP)
+    times = START + STEP * np.arange(n, dtype=np.int64)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    for station in range(n_stations):
+        water = 100 + 10 * np.sin(np.arange(n) / 4000) + rng.normal(0, 0.1, n)
+        rain = np.clip(rng.gamma(0.2, 4.0, n), 0, None)
+        store.append(f"Pos {station:02d}", times, water, rain)
+    return n, time.perf_counter() - start
+
+
+def _best_of(func, repeat=20):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench(n_stations, n_years):
+    root = tempfile.mkdtemp(prefix='ts_bench_')
+    try:
+        n, seconds = _fill(TimeSeriesStore(root), n_stations, n_years)
+        size = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+        print(f"\n📦 {n_stations} stasiun x {n:,} pembacaan: tulis {seconds:.1f} s, {size / 2 ** 20:.0f} MiB di disk")
+
+        # Store baru = cache halaman/memmap proses kosong, seperti setelah restart
+        store = TimeSeriesStore(root)
+        rss_before = _rss_mib()
+        end = START + n * STEP
+        cases = [
+            ('query 1 hari', lambda: store.query('Pos 07', end - 86400, end)),
+            ('query 30 hari', lambda: store.query('Pos 07', end - 30 * 86400, end)),
+            ('per jam 7 hari (mean)', lambda: store.resample('Pos 07', end - 7 * 86400, end, '1h', 'mean')),
+            ('harian 1 tahun (max)', lambda: store.resample('Pos 07', end - 365 * 86400, end, '1d', 'max',
+                                                             field='rainfall_mm')),
+            ('harian semua data (max)', lambda: store.resample('Pos 07', None, None, '1d', 'max')),
+            ('terakhir semua stasiun', lambda: [store.latest(f"Pos {i:02d}") for i in range(n_stations)])
+        ]
+        print(f"   {'query':<26}{'waktu':>12}")
+        for label, func in cases:
+            print(f"   {label:<26}{_best_of(func) * 1000:>9.2f} ms")
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        print(f"\n   RSS sebelum query {rss_before:.0f} MiB, setelah {_rss_mib():.0f} MiB (puncak proses {peak:.0f} MiB)")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    n_stations = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    n_years = float(sys.argv[2]) if len(sys.argv) > 2 else 3
+    bench(n_stations, n_years)
@@ -0,0 +1,237 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.AlertOutboxModel import AlertOutboxModel
+from utils.AlertEngine import (
+    AlertEngine, AlertRule, COOLDOWN, REMINDER_INTERVAL, KIND_RAISED, KIND_REMINDER, KIND_CLEARED
+)
+from utils.AlertSenders import MemorySender, WebhookSender, WhatsAppGatewaySender, senders_from_env, LogSender
+
+
+def _model():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return AlertOutboxModel(db_path=path)
+
+
+def _record(station_id, risk, basin='Bengawan Solo Hulu', **extra):
+    return dict({'station_id': station_id, 'location': station_id.title(), 'ann_risk': risk,
+                 'water_level_mdpl': 120.0, 'basin': basin}, **extra)
+
+
+def test_hysteresis_and_cooldown():
+    print("〰️ Testing hysteresis dan cooldown pada nilai yang naik-turun...")
+    model = _model()
+    try:
+        engine = AlertEngine(model, senders=[MemorySender()])
+        now = 1.7e9
+        events = []
+        # Nilai berayun di dalam pita hysteresis ambang TINGGI (0.8 - 0.05): level tetap
+        for i in range(10):
+            risk = 0.82 if i % 2 == 0 else 0.76
+            events += engine.evaluate([_record('jurug', risk)], now + i * 60)
+            assert engine.states['jurug']['level'] == 2
+        # Berayun keluar pita, tetapi masih dalam cooldown: tidak ada alert ulang
+        for i in range(10, 20):
+            risk = 0.82 if i % 2 == 0 else 0.6
+            events += engine.evaluate([_record('jurug', risk)], now + i * 60)
+        assert engine.states['jurug']['level'] == 1
+        assert [(kind, level) for kind, level, _ in events] == [(KIND_RAISED, 'TINGGI')]
+
+        # Turun di bawah ambang selama > cooldown: episode ditutup, pesan pulih
+        engine.evaluate([_record('jurug', 0.1)], now + 2000)
+        events = engine.evaluate([_record('jurug', 0.1)], now + 2000 + COOLDOWN)
+        assert [(kind, level) for kind, level, _ in events] == [(KIND_CLEARED, 'NORMAL')]
+
+        # Naik lagi setelah pulih: alert baru
+        events = engine.evaluate([_record('jurug', 0.6)], now + 4000 + COOLDOWN)
+        assert [(kind, level) for kind, level, _ in events] == [(KIND_RAISED, 'MENENGAH')]
+        events = engine.evaluate([_record('jurug', 0.6)], now + 4000 + COOLDOWN + REMINDER_INTERVAL)
+        assert [kind for kind, _, _ in events] == [KIND_REMINDER]
+    finally:
+        os.remove(model.db_path)
+    print("✅ 20 refresh berayun -> 1 alert; pulih setelah cooldown; pengingat")
+
+
+def test_grouping_dedup_and_persistence():
+    print("🧾 Testing penggabungan antar stasiun dan dedup outbox...")
+    model = _model()
+    try:
+        email, webhook = MemorySender('email'), MemorySender('webhook')
+        engine = AlertEngine(model, senders=[email, webhook])
+        now = 1.7e9
+        records = [_record(f'pos-{i}', 0.9) for i in range(5)] + [
+            _record('babat', 0.9, basin='Bengawan Solo Hilir'),
+            _record('cepu', 0.2, basin='Bengawan Solo Tengah')
+        ]
+        events = engine.evaluate(records, now)
+        assert len(events) == 6
+        # 2 grup (hulu, hilir) x 2 channel
+        assert model.count_by_status() == {('email', 'pending'): 2, ('webhook', 'pending'): 2}
+        assert engine.enqueue(events, now) == 0
+
+        # Engine baru (restart) memuat state: tidak ada alert ulang
+        restarted = AlertEngine(model, senders=[email, webhook])
+        assert restarted.evaluate(records, now + 60) == []
+        assert restarted.current_alerts()['babat'] == 'TINGGI'
+
+        assert restarted.drain(now + 60) == {'sent': 4, 'failed': 0}
+        hulu = next(m for m in email.messages if 'Hulu' in m['subject'])
+        assert hulu['subject'] == '[TINGGI] Peringatan banjir: 5 pos (Bengawan Solo Hulu)'
+        assert len(json.loads(hulu['payload'])) == 5 and hulu['body'].count('\n') == 4
+        assert restarted.drain(now + 120) == {'sent': 0, 'failed': 0}
+    finally:
+        os.remove(model.db_path)
+    print("✅ 6 pos -> 2 pesan per channel, tidak terkirim dua kali")
+
+
+def test_retry_backoff_and_batches():
+    print("🔁 Testing retry, backoff dan batch sender...")
+    model = _model()
+    try:
+        failing = MemorySender('webhook', fail='HTTP 503')
+        engine = AlertEngine(model, senders=[failing], batch_size=3, max_attempts=3, retry_backoff=60)
+        now = 1.7e9
+        engine.evaluate([_record(f'pos-{i}', 0.9, basin=f'das-{i}') for i in range(7)], now)
+
+        assert engine.drain(now) == {'sent': 0, 'failed': 3}
+        assert engine.drain(now + 30) == {'sent': 0, 'failed': 3}
+        rows = {row['id']: row for row in model.get_recent()}
+        first = min(rows)
+        assert rows[first]['attempts'] == 1 and rows[first]['next_attempt_at'] == now + 60
+        assert rows[first]['last_error'] == 'HTTP 503'
+
+        failing.fail = False
+        result = engine.drain(now + 10 ** 6)
+        assert result == {'sent': 7, 'failed': 0}
+        assert [len(batch) for batch in failing.batches] == [3, 3, 1]
+
+        failing.fail = True
+        engine.evaluate([_record('x', 0.9, basin='lain')], now + 10 ** 6)
+        for attempt in range(3):
+            engine.drain(now + 10 ** 7 * (attempt + 1))
+        assert model.count_by_status()[('webhook', 'dead')] == 1
+    finally:
+        os.remove(model.db_path)
+    print("✅ Backoff eksponensial, batch 3, pesan mati setelah 3 percobaan")
+
+
+def test_station_rules():
+    print("📏 Testing ambang per stasiun...")
+    model = _model()
+    try:
+        engine = AlertEngine(model, senders=[MemorySender()], rules={
+            'jurug': AlertRule(metric='water_level_mdpl', thresholds=(88.0, 90.0), hysteresis=0.2, status_field=None)
+        })
+        now = 1.7e9
+        events = engine.evaluate([_record('jurug', 0.1, water_level_mdpl=89.0),
+                                  _record('colo', 0.3, effective_status='MENENGAH')], now)
+        assert sorted((record['station_id'], level) for _, level, record in events) == [
+            ('colo', 'MENENGAH'), ('jurug', 'MENENGAH')
+        ]
+        assert engine.evaluate([_record('jurug', 0.1, water_level_mdpl=87.9)], now + 60) == []
+        assert engine.states['jurug']['level'] == 1
+    finally:
+        os.remove(model.db_path)
+    print("✅ Ambang TMA per stasiun dan status efektif (naik cepat)")
+
+
+class ThreadRecordingSender(MemorySender):
+    """MemorySender yang mencatat thread pengirim"""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = []
+        self.delivered = threading.Event()
+
+    def send_batch(self, messages):
+        self.threads.append(threading.current_thread().name)
+        result = super().send_batch(messages)
+        self.delivered.set()
+        return result
+
+
+def test_snapshot_listener_does_not_send():
+    print("🧵 Testing on_snapshot hanya enqueue, pengiriman di worker...")
+    import controllers.RealTimeDataController as realtime
+    model = _model()
+    sender = ThreadRecordingSender()
+    engine = AlertEngine(model, senders=[sender], drain_interval=3600)
+    original = realtime.RealTimeDataController
+    realtime.RealTimeDataController = type('FakeController', (), {
+        'get_snapshot_predictions': lambda self, snapshot: [_record('jurug', 0.9)]
+    })
+    try:
+        engine.on_snapshot(object())
+        # Listener kembali tanpa memanggil sender; outbox terisi
+        assert model.fetch_due('memory', 10 ** 10, 10)
+        engine.start()
+        assert sender.delivered.wait(5)
+        assert sender.threads == ['alert-drain']
+        engine.stop()
+        assert not model.fetch_due('memory', 10 ** 10, 10)
+    finally:
+        realtime.RealTimeDataController = original
+        engine.stop()
+        os.remove(model.db_path)
+    assert not engine._thread.is_alive()
+    print("✅ Thread poller tidak menunggu sender")
+
+
+class _CaptureHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers['Content-Length']))
+        self.server.captured.append((self.path, dict(self.headers), body))
+        self.send_response(200)
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_senders():
+    print("🌐 Testing sender webhook dan gateway WhatsApp...")
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _CaptureHandler)
+    server.captured = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        messages = [{'id': i, 'level': 'TINGGI', 'kind': KIND_RAISED, 'subject': f'S{i}', 'body': 'isi',
+                     'payload': '[{"station_id": "jurug"}]'} for i in range(2)]
+        assert WebhookSender(f"{base}/hook").send_batch(messages) == [None, None]
+        assert WhatsAppGatewaySender(f"{base}/wa", 'token-x', ['0812', '0813']).send_batch(messages) == [None, None]
+        assert WebhookSender("http://127.0.0.1:9/hook", timeout=0.5).send_batch(messages)[0].startswith('Webhook')
+
+        path, _, body = server.captured[0]
+        assert path == '/hook' and [alert['id'] for alert in json.loads(body)['alerts']] == [0, 1]
+        path, headers, body = server.captured[1]
+        form = parse_qs(body.decode())
+        assert path == '/wa' and headers['Authorization'] == 'token-x'
+        assert form['target'] == ['0812,0813'] and form['message'][0].startswith('*S0*')
+        assert len(server.captured) == 3
+    finally:
+        server.shutdown()
+
+    assert [type(sender) for sender in senders_from_env({})] == [LogSender]
+    channels = [sender.channel for sender in senders_from_env({
+        'ALERT_WEBHOOK_URL': 'http://x', 'ALERT_WHATSAPP_URL': 'http://y', 'ALERT_WHATSAPP_TO': '0812',
+        'ALERT_SMTP_HOST': 'smtp.local', 'ALERT_EMAIL_TO': 'a@b.c'
+    })]
+    assert channels == ['email', 'webhook', 'whatsapp']
+    print("✅ 1 POST per batch webhook, 1 POST per pesan WhatsApp")
+
+
+if __name__ == "__main__":
+    test_hysteresis_and_cooldown()
+    test_grouping_dedup_and_persistence()
+    test_retry_backoff_and_batches()
+    test_station_rules()
+    test_snapshot_listener_does_not_send()
+    test_http_senders()
@@ -0,0 +1,66 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bbws_fixture_server import FixtureServer
+from utils.BBWSScraper import BBWSScraper, parse_number
+
+
+def test_parse_fixture_pages():
+    print("📄 Testing parse halaman /tma + /ch + detail...")
+    assert parse_number('143,74') == 143.74 and parse_number('12.5 mm') == 12.5 and parse_number('-') is None
+
+    with FixtureServer() as server:
+        snapshot = BBWSScraper(base_url=server.base_url, cache=False).fetch_all()
+
+    assert not snapshot['errors']
+    water = {record['location']: record for record in snapshot['water_levels']}
+    assert water['Ngadipiro (S. keduang)']['water_level_mdpl'] == 143.74
+    assert water['Colo Weir (S. bengawan solo)']['status'] == 'RENDAH'
+    assert water['Wonogiri Dam (Spillway)']['detail']['threshold_siaga'] == 137.0
+
+    rainfall = {record['location']: record for record in snapshot['rainfall']}
+    assert rainfall['Ngadipiro']['rainfall_mm'] == 45.5
+    assert rainfall['Jurug']['rainfall_mm'] is None and 'detail' not in rainfall['Jurug']
+    assert len(snapshot['page_latency']) == 2 + 3 + 3
+    print(f"✅ {len(water)} pos TMA, {len(rainfall)} pos CH")
+
+
+def test_refresh_latency_is_slowest_page():
+    print("⏱️ Testing fetch paralel (latensi = halaman paling lambat)...")
+    delay = 0.3
+    with FixtureServer(delay=delay) as server:
+        scraper = BBWSScraper(base_url=server.base_url, cache=False)
+        first = scraper.fetch_all()
+        second = scraper.fetch_all()
+
+    # Refresh pertama: daftar lalu detail (2 gelombang); berikutnya detail
+    # yang sudah dikenal ikut gelombang pertama -> ~1 delay untuk 8 halaman
+    assert first['latency'] < 3 * delay
+    assert second['latency'] < 2 * delay
+    assert sum(second['page_latency'].values()) > 6 * delay
+    print(f"✅ 8 halaman: {second['latency']:.2f}s (serial ~{sum(second['page_latency'].values()):.2f}s)")
+
+
+def test_failures_fall_back_and_time_out():
+    print("🛑 Testing timeout + fallback...")
+    with FixtureServer(delays={'/ch': 2.0}) as server:
+        scraper = BBWSScraper(base_url=server.base_url, timeout=(1.0, 0.3), cache=False)
+        snapshot = scraper.fetch_all()
+        assert '/ch' in snapshot['errors'] and snapshot['latency'] < 1.5
+        assert snapshot['water_levels'] and not snapshot['rainfall']
+
+        water, rainfall = scraper.scrape_all()
+        assert water[0]['location'] == 'Ngadipiro (S. keduang)'
+        assert rainfall == scraper.get_fallback_rainfall_data()
+
+    offline = BBWSScraper(base_url='http://127.0.0.1:9', timeout=(0.5, 0.5), cache=False)
+    assert offline.scrape_all() == (offline.get_fallback_water_data(), offline.get_fallback_rainfall_data())
+    print("✅ Halaman lambat/gagal tidak menahan refresh, data fallback dipakai")
+
+
+if __name__ == "__main__":
+    test_parse_fixture_pages()
+    test_refresh_latency_is_slowest_page()
+    test_failures_fall_back_and_time_out()
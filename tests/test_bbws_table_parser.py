@@ -0,0 +1,72 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from bbws_fixture_server import FIXTURE_DIR
+from utils.BBWSTableParser import (
+    available_backends, default_backend, extract_tables, parse_station_columns, detail_pairs
+)
+from utils.BBWSScraper import STATUS_MAP
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def test_typed_columns_from_fixture():
+    print("🧮 Testing kolom bertipe dari /tma dan /ch...")
+    water = parse_station_columns(_fixture('tma.html'), 'water_level_mdpl', STATUS_MAP, backend='python')
+    assert water.values.dtype == np.float64 and water.update_minutes.dtype == np.int16
+    assert list(water.location) == [
+        'Ngadipiro (S. keduang)', 'Wonogiri Dam (Spillway)', 'Colo Weir (S. bengawan solo)'
+    ]
+    assert np.allclose(water.values, [143.74, 131.43, 108.29])
+    assert list(water.update_minutes) == [360, 360, 360]
+    assert water.status == ['RENDAH'] * 3
+    assert water.detail_path[0] == '/tma/detail/ngadipiro'
+
+    rainfall = parse_station_columns(_fixture('ch.html'), 'rainfall_mm', backend='python')
+    assert np.isnan(rainfall.values[-1]) and rainfall.detail_path[-1] is None
+    assert rainfall.to_rows()[-1]['rainfall_mm'] is None and rainfall.status is None
+    assert parse_station_columns(_fixture('ch.html'), 'water_level_mdpl', backend='python') is None
+    print(f"✅ {len(water)} pos TMA, {len(rainfall)} pos CH (backend default: {default_backend()})")
+
+
+def test_backends_agree():
+    print("🔀 Testing semua backend menghasilkan tabel yang sama...")
+    backends = available_backends()
+    assert 'python' in backends
+    for name in ('tma.html', 'ch.html', 'tma/detail/ngadipiro.html'):
+        html = _fixture(name)
+        reference = extract_tables(html, backend='python')
+        for backend in backends:
+            assert extract_tables(html, backend=backend) == reference, (backend, name)
+
+    pairs = detail_pairs(_fixture('tma/detail/wonogiri-dam.html'), backend='python')
+    assert ('Elevasi Siaga', '137,00') in pairs
+    print(f"✅ Backend {', '.join(backends)} identik")
+
+
+def test_nested_markup_and_entities():
+    print("🧩 Testing markup tidak rapi...")
+    html = """
+    <table><tr><th>Nama Pos</th><th>Waktu</th><th>TMA&nbsp;(m)</th></tr>
+    <tr><td><b><a href='/tma/detail/x'>Pos&nbsp;X</a></b><br>cadangan</td><td> 07.30 </td><td>1.234,5</td></tr>
+    <tr><td>Pos Y<td>-<td>n/a
+    </table>"""
+    columns = parse_station_columns(html, 'water_level_mdpl', backend='python')
+    assert list(columns.location) == ['Pos X cadangan', 'Pos Y']
+    assert list(columns.update_minutes) == [450, -1]
+    assert columns.detail_path == ['/tma/detail/x', None]
+    assert np.isnan(columns.values[1])
+    print("✅ Sel tanpa penutup, <br>, &nbsp; ditangani")
+
+
+if __name__ == "__main__":
+    test_typed_columns_from_fixture()
+    test_backends_agree()
+    test_nested_markup_and_entities()
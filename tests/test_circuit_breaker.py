@@ -0,0 +1,205 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import models.GoogleSheetsModel as sheets
+from bbws_fixture_server import FixtureServer
+from controllers.RealTimeDataController import RealTimeDataController
+from models.GoogleSheetsModel import GoogleSheetsModel
+from utils.BBWSScraper import BBWSScraper
+from utils.CircuitBreaker import CircuitBreaker, CircuitOpenError, CLOSED, OPEN, HALF_OPEN
+from utils.RiseTracker import RiseTracker
+from utils.StationPoller import StationPoller
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _fail():
+    raise ConnectionError("connection refused")
+
+
+def test_state_machine():
+    print("🔌 Testing transisi closed -> open -> half-open -> closed...")
+    clock = FakeClock()
+    breaker = CircuitBreaker('test', failure_threshold=3, window=60, reset_timeout=30, clock=clock)
+
+    # Kegagalan di luar jendela tidak dihitung
+    for _ in range(2):
+        breaker.record_failure('x')
+        clock.now += 61
+    breaker.record_failure('x')
+    assert breaker.state == CLOSED
+
+    for _ in range(2):
+        try:
+            breaker.call(_fail)
+        except ConnectionError:
+            pass
+    assert breaker.state == OPEN and breaker.stats['opened'] == 1
+
+    calls = []
+    try:
+        breaker.call(calls.append, 1)
+        assert False, "breaker terbuka harus menolak"
+    except CircuitOpenError as e:
+        assert calls == [] and 0 < e.retry_after <= 30
+
+    # Setelah reset_timeout: satu probe saja, gagal -> terbuka lagi
+    clock.now += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() and not breaker.allow()
+    breaker.record_failure('masih mati')
+    assert breaker.state == OPEN and breaker.retry_after() == 30
+
+    clock.now += 30
+    assert breaker.call(lambda: 'ok') == 'ok'
+    assert breaker.state == CLOSED and breaker.stats['rejected'] == 2
+    print("✅ Jendela gagal, penolakan tanpa request, probe half-open")
+
+
+def test_call_timeout():
+    print("⏱️ Testing batas waktu tunggu pemanggil...")
+    breaker = CircuitBreaker('slow', failure_threshold=1, timeout=0.2)
+    started = time.perf_counter()
+    try:
+        breaker.call(time.sleep, 2)
+        assert False, "harus timeout"
+    except TimeoutError:
+        pass
+    elapsed = time.perf_counter() - started
+    assert elapsed < 1.0 and breaker.state == OPEN
+    print(f"✅ Pemanggil dilepas setelah {elapsed:.2f}s, breaker terbuka")
+
+
+def test_hung_calls_do_not_block_other_breakers():
+    print("🧵 Testing worker per breaker saat request menggantung...")
+    hung = CircuitBreaker('hung', failure_threshold=10, timeout=0.1, max_workers=1)
+    other = CircuitBreaker('other', timeout=0.5)
+    try:
+        hung.call(time.sleep, 0.5)
+        assert False, "harus timeout"
+    except TimeoutError:
+        pass
+    # Worker satu-satunya masih dipakai: call berikutnya gagal seketika, tidak mengantre
+    started = time.perf_counter()
+    try:
+        hung.call(lambda: 'x')
+        assert False, "worker sibuk harus ditolak"
+    except TimeoutError as e:
+        assert 'belum selesai' in str(e) and time.perf_counter() - started < 0.05
+    # Breaker lain punya worker sendiri
+    assert other.call(lambda: 'ok') == 'ok'
+    # Setelah request lama berakhir (timeout transport), worker bebas lagi
+    time.sleep(0.5)
+    assert hung.call(lambda: 'pulih') == 'pulih'
+    print("✅ Request menggantung hanya menahan worker breaker-nya sendiri")
+
+
+def test_scraper_serves_last_good_snapshot():
+    print("🛰️ Testing BBWS mati: poller menyajikan snapshot terakhir tanpa menunggu...")
+    server = FixtureServer().start()
+    scraper = BBWSScraper(base_url=server.base_url, cache=False, timeout=(0.5, 1.0))
+    poller = StationPoller(fetch=scraper.fetch_all, interval=60)
+    try:
+        assert poller.poll_once()
+        good = poller._snapshot
+        server.stop()
+        scraper.session.close()  # putus juga koneksi keep-alive yang masih dilayani
+
+        # Sampai breaker /tma dan /ch terbuka (3 gagal), lalu request tidak dikirim lagi
+        for _ in range(3):
+            assert not poller.poll_once()
+        started = time.perf_counter()
+        snapshot = scraper.fetch_all()
+        elapsed = time.perf_counter() - started
+        assert elapsed < 0.1, elapsed
+        assert all(error.startswith('circuit open') for error in snapshot['errors'].values())
+        assert not poller.poll_once() and poller._snapshot is good
+
+        controller = RealTimeDataController(poller=poller, rise_tracker=RiseTracker())
+        status = controller.get_data_status()
+        assert status['degraded'] and status['breaker'] == OPEN and status['retry_after'] > 0
+        assert status['age_seconds'] is not None
+    finally:
+        poller.stop()
+    print(f"✅ Refresh dengan breaker terbuka selesai dalam {elapsed * 1000:.1f} ms, snapshot lama tetap")
+
+
+class FakeWorksheet:
+    def __init__(self):
+        self.fail = False
+        self.rows = [{'Timestamp': '2025-12-20 10:00:00', 'Alamat': 'Jebres'}]
+
+    def get_all_records(self):
+        if self.fail:
+            raise ConnectionError("Sheets API 503")
+        return list(self.rows)
+
+
+def test_sheets_serves_cached_rows():
+    print("📊 Testing Google Sheets mati: baris terakhir disajikan...")
+    sheets._last_records.update(records=None, fetched_at=None)
+    model = GoogleSheetsModel()
+    model.worksheet = FakeWorksheet()
+    model.breaker = CircuitBreaker('sheets-test', failure_threshold=2, reset_timeout=60)
+
+    assert model.get_all_records() == model.worksheet.rows
+    assert not model.data_status()['degraded']
+
+    model.worksheet.fail = True
+    for _ in range(3):
+        assert model.get_all_records() == model.worksheet.rows
+    status = model.data_status()
+    assert status['degraded'] and status['breaker'] == OPEN and status['age_seconds'] is not None
+    assert model.breaker.stats['rejected'] == 1
+
+    # Belum pernah ada pembacaan berhasil: exception -> controller jatuh ke SQLite
+    sheets._last_records.update(records=None, fetched_at=None)
+    try:
+        model.get_all_records()
+        assert False, "harus gagal tanpa cache"
+    except CircuitOpenError:
+        pass
+    print("✅ Data terakhir disajikan, status degraded untuk banner")
+
+
+def test_sheets_client_has_transport_timeout():
+    print("⏲️ Testing timeout transport session gspread...")
+
+    class FakeClient:
+        timeout = None
+
+        def set_timeout(self, timeout):
+            self.timeout = timeout
+
+        def open_by_key(self, key):
+            assert self.timeout is not None, "timeout harus dipasang sebelum request pertama"
+            return type('Spreadsheet', (), {'worksheet': lambda self, name: name})()
+
+    authorize, credentials = sheets.gspread.authorize, sheets.ServiceAccountCredentials
+    sheets.gspread.authorize = lambda creds: FakeClient()
+    sheets.ServiceAccountCredentials = type('Creds', (), {'from_json_keyfile_dict': staticmethod(lambda *a: None)})
+    try:
+        client, _, worksheet = GoogleSheetsModel._connect(None, {}, [], 'sheet-id')
+    finally:
+        sheets.gspread.authorize, sheets.ServiceAccountCredentials = authorize, credentials
+    assert client.timeout == sheets.SHEETS_HTTP_TIMEOUT and worksheet == 'flood_reports'
+    assert sheets.SHEETS_HTTP_TIMEOUT[1] < sheets.SHEETS_TIMEOUT
+    print("✅ Request Sheets berakhir sendiri sebelum batas tunggu breaker")
+
+
+if __name__ == "__main__":
+    test_state_machine()
+    test_call_timeout()
+    test_hung_calls_do_not_block_other_breakers()
+    test_scraper_serves_last_good_snapshot()
+    test_sheets_serves_cached_rows()
+    test_sheets_client_has_transport_timeout()
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import utils.ModelRegistry as model_registry
+from extreme_value import (
+    DISTRIBUTIONS, sample_lmoments, fit_distributions, distribution_cdf, distribution_quantile,
+    distribution_return_level, select_station_distributions, register_distribution_selection,
+    predict_flood_extreme
+)
+from gumbel_distribution import predict_flood_gumbel
+
+
+def _gev_sample(xi, alpha, k, n, rng):
+    return xi + alpha * (1.0 - (-np.log(rng.random(n))) ** k) / k
+
+
+def test_lmoments_match_direct_formula():
+    print("📏 Testing L-moments vectorized vs rumus langsung...")
+    rng = np.random.default_rng(0)
+    x = rng.gumbel(90.0, 20.0, 25)
+    _, lmoments, _ = sample_lmoments(np.vstack([np.r_[x, np.full(5, np.nan)], rng.gumbel(50, 5, 30)]))
+
+    ordered = np.sort(x)
+    n = len(x)
+    j = np.arange(1, n + 1)
+    b0 = ordered.mean()
+    b1 = np.sum((j - 1) / (n - 1) * ordered) / n
+    b2 = np.sum((j - 1) * (j - 2) / ((n - 1) * (n - 2)) * ordered) / n
+    assert np.isclose(lmoments['l1'][0], b0)
+    assert np.isclose(lmoments['l2'][0], 2 * b1 - b0)
+    assert np.isclose(lmoments['t3'][0], (6 * b2 - 6 * b1 + b0) / (2 * b1 - b0))
+    # Gumbel teoretis: t3 = 0.1699, t4 = 0.1504
+    _, big, _ = sample_lmoments(rng.gumbel(90.0, 20.0, 20000))
+    assert abs(big['t3'][0] - 0.1699) < 0.02 and abs(big['t4'][0] - 0.1504) < 0.02
+    print("✅ PWM/L-moment sesuai definisi")
+
+
+def test_fits_recover_parameters_and_invert():
+    print("📈 Testing fit GEV/LP3 + kuantil <-> CDF...")
+    rng = np.random.default_rng(1)
+    maxima = np.vstack([
+        _gev_sample(100.0, 20.0, -0.15, 5000, rng),
+        10.0 ** rng.normal(2.0, 0.15, 5000)
+    ])
+    result = fit_distributions(maxima)
+    xi, alpha, k = result['params']['gev']
+    assert abs(k[0] + 0.15) < 0.05 and abs(xi[0] - 100.0) < 2.0 and abs(alpha[0] - 20.0) < 1.5
+    mean, sigma, skew = result['params']['lp3']
+    assert abs(mean[1] - 2.0) < 0.01 and abs(sigma[1] - 0.15) < 0.01 and abs(skew[1]) < 0.2
+    assert result['selected'][1] == 'lp3'
+
+    probabilities = np.array([0.01, 0.5, 0.9, 0.99])[None, :]
+    for name in DISTRIBUTIONS:
+        params = tuple(np.asarray(p)[:, None] for p in result['params'][name])
+        quantiles = distribution_quantile(name, probabilities, params)
+        assert np.all(np.diff(quantiles, axis=1) > 0)
+        assert np.allclose(distribution_cdf(name, quantiles, params), probabilities, atol=1e-8)
+    print(f"✅ GEV k={k[0]:.3f}, LP3 sigma={sigma[1]:.3f}; kuantil dan CDF konsisten")
+
+
+def test_selection_cached_and_used_for_prediction():
+    print("🗺️ Testing seleksi per stasiun + predict_flood_extreme...")
+    rng = np.random.default_rng(2)
+    index = pd.date_range('1985-01-01', periods=365 * 40, freq='D')
+
+    def series(peaks):
+        rainfall = rng.gamma(0.6, 5.0, len(index))
+        rainfall[np.arange(len(peaks)) * 365 + 60] = peaks
+        return index, rainfall
+
+    stations = {
+        'ngadipiro': series(_gev_sample(110.0, 25.0, -0.25, 40, rng)),
+        'colo_weir': series(10.0 ** rng.normal(1.9, 0.12, 40))
+    }
+    selections = select_station_distributions(stations)
+    assert select_station_distributions(stations)['ngadipiro'] is selections['ngadipiro']
+    assert all(selection['distribution'] in DISTRIBUTIONS for selection in selections.values())
+
+    saved = model_registry._registry
+    model_registry._registry = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = model_registry.get_model_registry(root=tmp, watch_interval=0)
+            # Tanpa versi extreme_value: jalur default Gumbel
+            assert predict_flood_extreme(120.0, station_id='ngadipiro')['risk_level'] == \
+                predict_flood_gumbel(120.0, station_id='ngadipiro')['risk_level']
+
+            register_distribution_selection(selections, activate=True, registry=registry)
+            selection = selections['ngadipiro']
+            result = predict_flood_extreme(120.0, return_period=50, station_id='ngadipiro')
+            assert result['distribution'] == selection['distribution']
+            expected = distribution_return_level(selection['distribution'], 50, selection['params'])
+            assert result['return_level'] == round(float(expected), 1)
+            assert predict_flood_extreme(120.0, station_id='tidak_dikenal')['distribution'] == 'gumbel'
+    finally:
+        model_registry._registry = saved
+    print(f"✅ ngadipiro -> {selections['ngadipiro']['distribution']}, "
+        f"colo_weir -> {selections['colo_weir']['distribution']}")
+
+
+if __name__ == "__main__":
+    test_lmoments_match_direct_formula()
+    test_fits_recover_parameters_and_invert()
+    test_selection_cached_and_used_for_prediction()
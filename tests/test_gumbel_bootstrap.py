@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import utils.ModelRegistry as model_registry
+from gumbel_bootstrap import (
+    bootstrap_maxima, bootstrap_stations, attach_intervals, resample_indices, station_seed
+)
+from gumbel_distribution import (
+    return_level, return_level_interval, get_return_level_table, get_gumbel_parameters
+)
+from gumbel_fitting import fit_gumbel_batch, register_station_fits
+
+
+def test_interval_covers_true_return_level():
+    print("🎯 Testing cakupan interval bootstrap...")
+    rng = np.random.default_rng(0)
+    true_level = return_level(50, 100.0, 20.0)
+    covered = 0
+    for trial in range(40):
+        maxima = rng.gumbel(100.0, 20.0, 40)
+        result = bootstrap_maxima(maxima, n_resamples=1000, seed=trial)
+        column = result['return_periods'].index(50)
+        lower, upper = result['return_level_lower'][column], result['return_level_upper'][column]
+        assert lower < result['return_level_median'][column] < upper
+        covered += lower <= true_level <= upper
+    # Interval 90%: kira-kira 36 dari 40 (bootstrap persentil sedikit under-cover)
+    assert covered >= 30
+    assert np.all(np.diff(result['return_level_upper'] - result['return_level_lower']) > 0)
+    print(f"✅ Return level 50 tahun tercakup {covered}/40 kali")
+
+
+def test_seeding_is_reproducible_and_order_independent():
+    print("🎲 Testing seed per stasiun...")
+    indices = resample_indices(30, 500, np.random.default_rng(1))
+    assert indices.shape == (500, 30) and indices.min() >= 0 and indices.max() == 29
+
+    rng = np.random.default_rng(2)
+    stations = {f"st_{i}": rng.gumbel(80.0 + i, 15.0, 25) for i in range(4)}
+    first = bootstrap_stations(stations, n_resamples=500, seed=7, n_jobs=1)
+    reordered = bootstrap_stations(dict(reversed(list(stations.items()))), n_resamples=500, seed=7, n_jobs=1)
+    alone = bootstrap_maxima(stations['st_2'], n_resamples=500, seed=station_seed(7, 'st_2'))
+    for station_id in stations:
+        assert np.array_equal(first[station_id]['return_level_upper'], reordered[station_id]['return_level_upper'])
+    assert np.array_equal(first['st_2']['mu_location'], alone['mu_location'])
+    other_seed = bootstrap_stations(stations, n_resamples=500, seed=8, n_jobs=1)
+    assert not np.array_equal(first['st_0']['beta_scale'], other_seed['st_0']['beta_scale'])
+    print("✅ Hasil stasiun hanya bergantung pada (seed, station_id)")
+
+
+def test_intervals_stored_in_registry():
+    print("🗂️ Testing interval di registry + tabel dashboard...")
+    rng = np.random.default_rng(3)
+    maxima = {'ngadipiro': rng.gumbel(120.0, 25.0, 30), 'colo_weir': rng.gumbel(70.0, 12.0, 30)}
+    fit = fit_gumbel_batch(np.vstack(list(maxima.values())))
+    fits = {
+        station_id: {'mu_location': float(fit['mu'][i]), 'beta_scale': float(fit['beta'][i]),
+                    'years': [1995, 2024], 'method': str(fit['method'][i])}
+        for i, station_id in enumerate(maxima)
+    }
+    intervals = bootstrap_stations({'ngadipiro': maxima['ngadipiro']}, n_resamples=500, n_jobs=1)
+    attach_intervals(fits, intervals)
+
+    saved = model_registry._registry
+    model_registry._registry = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = model_registry.get_model_registry(root=tmp, watch_interval=0)
+            register_station_fits(fits, activate=True, registry=registry)
+
+            table = get_return_level_table()
+            assert table['confidence'] == 0.9
+            lower, upper = return_level_interval('ngadipiro', 50)
+            level = table['levels'][table['row']['ngadipiro'], table['return_periods'].index(50)]
+            assert lower < level < upper
+            assert return_level_interval('colo_weir', 50) is None
+            assert return_level_interval('default', 50) is None
+            assert 100 in get_gumbel_parameters('ngadipiro')['confidence_interval']['return_levels']
+    finally:
+        model_registry._registry = saved
+    print(f"✅ Return level 50 tahun ngadipiro {level:.1f} mm [{lower:.1f}, {upper:.1f}]")
+
+
+if __name__ == "__main__":
+    test_interval_covers_true_return_level()
+    test_seeding_is_reproducible_and_order_independent()
+    test_intervals_stored_in_registry()
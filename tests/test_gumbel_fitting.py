@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import utils.ModelRegistry as model_registry
+from gumbel_fitting import (
+    annual_maxima, fit_gumbel_moments, fit_gumbel_mle, fit_gumbel_batch,
+    fit_stations, pad_maxima, register_station_fits
+)
+from gumbel_distribution import predict_flood_gumbel, predict_flood_gumbel_batch, get_gumbel_parameters
+
+
+def _daily_series(mu, beta, years, seed):
+    """Seri harian sintetis yang maksimum tahunannya ~ Gumbel(mu, beta)"""
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('1995-01-01', periods=365 * years, freq='D')
+    rainfall = rng.gamma(0.6, 8.0, len(index))
+    peaks = rng.gumbel(mu, beta, years)
+    for year, peak in zip(range(years), peaks):
+        rainfall[year * 365 + 40] = peak
+    return index, rainfall
+
+
+def test_mle_and_moments_recover_parameters():
+    print("📐 Testing MoM + MLE vectorized...")
+    rng = np.random.default_rng(0)
+    maxima = rng.gumbel(90.0, 20.0, size=(200, 60))
+
+    mom_mu, mom_beta = fit_gumbel_moments(maxima)
+    mle_mu, mle_beta, converged = fit_gumbel_mle(maxima)
+    assert converged.all()
+    assert abs(mle_mu.mean() - 90.0) < 1.0 and abs(mle_beta.mean() - 20.0) < 1.0
+    assert abs(mom_mu.mean() - 90.0) < 1.5 and abs(mom_beta.mean() - 20.0) < 1.5
+
+    # Stasiun dengan panjang data berbeda (NaN padding) = fit satu per satu
+    padded = pad_maxima([maxima[0], maxima[1, :12]])
+    batch_mu, batch_beta, _ = fit_gumbel_mle(padded)
+    single_mu, single_beta, _ = fit_gumbel_mle(maxima[1, :12])
+    assert np.isclose(batch_mu[1], single_mu[0]) and np.isclose(batch_beta[1], single_beta[0])
+    print(f"✅ MLE mu={mle_mu.mean():.2f} beta={mle_beta.mean():.2f}")
+
+
+def test_goodness_of_fit_flags_wrong_distribution():
+    print("🧪 Testing goodness-of-fit...")
+    rng = np.random.default_rng(1)
+    good = rng.gumbel(80.0, 15.0, 80)
+    bad = np.concatenate([rng.normal(40.0, 2.0, 40), rng.normal(160.0, 2.0, 40)])
+    fit = fit_gumbel_batch(pad_maxima([good, bad]))
+    assert fit['ks_pvalue'][0] > 0.05 > fit['ks_pvalue'][1]
+    assert fit['anderson_darling'][0] < fit['anderson_darling'][1]
+    print(f"✅ KS p-value {fit['ks_pvalue'][0]:.2f} vs {fit['ks_pvalue'][1]:.4f}")
+
+
+def test_station_fits_cached_and_used_for_prediction():
+    print("🗺️ Testing fit per stasiun + predict_flood_gumbel(station_id)...")
+    series = {
+        'ngadipiro': _daily_series(120.0, 25.0, 30, seed=2),
+        'colo_weir': _daily_series(70.0, 12.0, 30, seed=3),
+        'stasiun_baru': _daily_series(70.0, 12.0, 3, seed=4)
+    }
+    years, maxima = annual_maxima(*series['ngadipiro'])
+    assert len(years) == 30 and maxima.max() > 100
+
+    fits = fit_stations(series)
+    assert set(fits) == {'ngadipiro', 'colo_weir'}
+    assert fit_stations(series)['ngadipiro'] is fits['ngadipiro']
+    assert fits['ngadipiro']['mu_location'] > fits['colo_weir']['mu_location']
+
+    saved = model_registry._registry
+    model_registry._registry = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = model_registry.get_model_registry(root=tmp, watch_interval=0)
+            register_station_fits(fits, activate=True, registry=registry)
+
+            upstream = predict_flood_gumbel(110.0, station_id='ngadipiro')
+            downstream = predict_flood_gumbel(110.0, station_id='colo_weir')
+            default = predict_flood_gumbel(110.0, station_id='tidak_dikenal')
+            assert upstream['risk_level'] < downstream['risk_level']
+            assert upstream['parameters_used']['station_fit']
+            assert not default['parameters_used']['station_fit']
+            assert default['parameters_used']['mu_location'] == 85.0
+
+            risk, _ = predict_flood_gumbel_batch([110.0, 110.0], station_ids=['ngadipiro', 'colo_weir'])
+            assert np.allclose(risk, [upstream['risk_level'], downstream['risk_level']], atol=5e-4)
+            assert get_gumbel_parameters('colo_weir')['goodness_of_fit']['n_years'] == 30
+    finally:
+        model_registry._registry = saved
+    print("✅ Parameter stasiun dipakai, stasiun lain fallback ke parameter global")
+
+
+if __name__ == "__main__":
+    test_mle_and_moments_recover_parameters()
+    test_goodness_of_fit_flags_wrong_distribution()
+    test_station_fits_cached_and_used_for_prediction()
@@ -0,0 +1,151 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from gumbel_online import OnlineGumbelEstimator
+from gumbel_fitting import annual_maxima, fit_gumbel_moments, fit_gumbel_mle
+from models.GumbelStateModel import GumbelStateModel
+
+
+def _series(years=20, freq='6h', seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2004-01-01', periods=int(years * 365.25 * 4), freq=freq)
+    rainfall = rng.gamma(0.4, 6.0, len(index))
+    rainfall[rng.integers(0, len(index), 30)] = np.nan
+    return index, rainfall
+
+
+def _batch_moments_completed_years(index, rainfall):
+    years, maxima = annual_maxima(index, rainfall)
+    mu, beta = fit_gumbel_moments(maxima[:-1])
+    return float(mu[0]), float(beta[0]), len(maxima) - 1
+
+
+def test_streaming_matches_batch_fit():
+    print("🌊 Testing update per pembacaan vs fit batch...")
+    index, rainfall = _series(years=12)
+    estimator = OnlineGumbelEstimator()
+    for ts, value in zip(index, rainfall):
+        estimator.update('wonogiri', ts, value)
+
+    mu, beta, n = estimator.parameters('wonogiri')
+    batch_mu, batch_beta, batch_n = _batch_moments_completed_years(index, rainfall)
+    assert n == batch_n
+    assert np.isclose(mu, batch_mu, rtol=1e-12) and np.isclose(beta, batch_beta, rtol=1e-12)
+    assert max(estimator.batch_difference('wonogiri', index, rainfall)) < 1e-9
+
+    # MoM online tetap dekat dengan MLE batch (estimator berbeda, data sama)
+    _, maxima = annual_maxima(index, rainfall)
+    mle_mu, _, _ = fit_gumbel_mle(maxima[:-1])
+    assert abs(mu - mle_mu[0]) < 0.25 * beta
+    print(f"✅ mu={mu:.3f} beta={beta:.3f} dari {n} blok, identik dengan batch")
+
+
+def test_chunked_backfill_equals_streaming():
+    print("📦 Testing update_many per potongan = update satu per satu...")
+    index, rainfall = _series(years=8, seed=1)
+    streaming = OnlineGumbelEstimator()
+    for ts, value in zip(index, rainfall):
+        streaming.update('colo', ts, value)
+
+    chunked = OnlineGumbelEstimator()
+    for start in range(0, len(index), 2500):
+        chunked.update_many('colo', index[start:start + 2500], rainfall[start:start + 2500])
+
+    assert np.allclose(chunked.parameters('colo'), streaming.parameters('colo'), rtol=1e-12)
+    assert np.allclose(
+        chunked.parameters('colo', include_current=True),
+        streaming.parameters('colo', include_current=True), rtol=1e-12
+    )
+
+    chunked.update('colo', index[0], 999.0)
+    assert chunked._states['colo'].late_readings == 1
+    assert np.allclose(chunked.parameters('colo'), streaming.parameters('colo'), rtol=1e-12)
+    print("✅ Hasil sama, pembacaan terlambat diabaikan")
+
+
+def test_state_survives_restart():
+    print("💾 Testing persistensi state ke SQLite...")
+    index, rainfall = _series(years=10, seed=2)
+    half = len(index) // 2 + 123
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'state.db')
+        first = OnlineGumbelEstimator(GumbelStateModel(db_path))
+        first.update_many('ngadipiro', index[:half], rainfall[:half])
+
+        resumed = OnlineGumbelEstimator(GumbelStateModel(db_path))
+        resumed.update_many('ngadipiro', index[half:], rainfall[half:])
+
+    batch_mu, batch_beta, batch_n = _batch_moments_completed_years(index, rainfall)
+    mu, beta, n = resumed.parameters('ngadipiro')
+    assert n == batch_n and np.isclose(mu, batch_mu) and np.isclose(beta, batch_beta)
+    assert resumed.station_fits()['ngadipiro']['method'] == 'online_moments'
+    print("✅ Restart melanjutkan dari state tersimpan tanpa replay riwayat")
+
+
+class CountingStateModel:
+    def __init__(self):
+        self.writes = []
+
+    def load_states(self):
+        return []
+
+    def save_states(self, states):
+        self.writes.append(states)
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class Snapshot:
+    def __init__(self, rainfall, fetched_at):
+        self.rainfall = rainfall
+        self.fetched_at = {'ch': fetched_at}
+
+
+def test_flush_batched_and_fed_by_poller():
+    print("🗂️ Testing flush per interval + listener StationPoller...")
+    model, clock = CountingStateModel(), FakeClock()
+    estimator = OnlineGumbelEstimator(model, station_key=lambda name: name.split(' ')[0].lower(),
+                                      flush_every=100, flush_interval=300, clock=clock)
+    for i in range(99):
+        estimator.update('ngadipiro', 1_700_000_000 + i * 600, float(i % 7))
+    assert model.writes == []
+    estimator.update('ngadipiro', 1_700_100_000, 3.0)
+    assert len(model.writes) == 1 and model.writes[0][0]['station_id'] == 'ngadipiro'
+
+    # Snapshot poller: nama pos dipetakan ke id stasiun, ditulis setelah interval
+    now = 1_700_200_000
+    estimator.record_snapshot(Snapshot([
+        {'location': 'Colo (S. bengawan solo)', 'rainfall_mm': 12.5, 'last_update': '06:00'},
+        {'location': 'Jurug', 'rainfall_mm': None, 'last_update': '06:00'}
+    ], now))
+    assert len(model.writes) == 1 and estimator._states['colo'].current_max == 12.5
+    assert 'jurug' not in estimator._states
+    clock.now += 301
+    estimator.record_snapshot(Snapshot([{'location': 'Colo', 'rainfall_mm': 20.0, 'last_update': '06:10'}], now))
+    assert len(model.writes) == 2 and model.writes[1][0]['current_max'] == 20.0
+
+    # Shutdown: sisa state kotor ditulis oleh flush()
+    estimator.update('colo', now + 600, 25.0)
+    estimator.flush()
+    assert len(model.writes) == 3 and estimator.flush() is None and len(model.writes) == 3
+    print("✅ 1 tulis per 100 pembacaan / 300 detik, flush terakhir saat berhenti")
+
+
+if __name__ == "__main__":
+    test_streaming_matches_batch_fit()
+    test_chunked_backfill_equals_streaming()
+    test_state_survives_restart()
+    test_flush_batched_and_fed_by_poller()
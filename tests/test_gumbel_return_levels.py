@@ -0,0 +1,58 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from gumbel_distribution import (
+    gumbel_cdf, exceedance_probability, return_level, return_period_of,
+    get_return_level_table, lookup_return_level, exceedance_curves,
+    predict_flood_gumbel, RETURN_PERIODS
+)
+
+
+def test_return_level_inverts_exceedance():
+    print("🔁 Testing return level <-> exceedance...")
+    mu = np.array([85.0, 120.0, 60.0])[:, None]
+    beta = np.array([22.5, 30.0, 10.0])[:, None]
+    levels = return_level(RETURN_PERIODS[None, :], mu, beta)
+    assert levels.shape == (3, len(RETURN_PERIODS))
+    assert np.all(np.diff(levels, axis=1) > 0)
+    assert np.allclose(exceedance_probability(levels, mu, beta), 1.0 / RETURN_PERIODS)
+    assert np.allclose(return_period_of(levels, mu, beta), RETURN_PERIODS)
+    assert np.allclose(gumbel_cdf(levels, mu, beta) + exceedance_probability(levels, mu, beta), 1.0)
+    print("✅ 1 / P(X > x_T) = T untuk semua stasiun dan periode ulang")
+
+
+def test_dashboard_table_precomputed():
+    print("📋 Testing tabel return level dashboard...")
+    table = get_return_level_table()
+    assert get_return_level_table() is table
+    assert table['levels'].shape == (len(table['station_ids']), len(RETURN_PERIODS))
+    assert not table['levels'].flags.writeable
+    assert np.isclose(lookup_return_level('stasiun_tanpa_fit', 10), return_level(10, 85.0, 22.5))
+    assert np.isclose(lookup_return_level('stasiun_tanpa_fit', 20), return_level(20, 85.0, 22.5))
+
+    curves = exceedance_curves(np.linspace(0, 300, 7))
+    assert curves.shape == (len(table['station_ids']), 7)
+    assert np.all(np.diff(curves, axis=1) <= 0)
+    print("✅ Tabel di-cache per versi dan read-only")
+
+
+def test_predict_uses_return_period():
+    print("📅 Testing return_period di predict_flood_gumbel...")
+    level_10 = return_level(10, 85.0, 22.5)
+    below = predict_flood_gumbel(level_10 - 5, return_period=10)
+    above = predict_flood_gumbel(level_10 + 5, return_period=10)
+    assert not below['exceeds_return_level'] and above['exceeds_return_level']
+    assert below['return_level'] == round(float(level_10), 1)
+    assert predict_flood_gumbel(level_10 + 5, return_period=100)['exceeds_return_level'] is False
+    assert 9.0 < above['estimated_return_period'] < 20.0
+    print("✅ Return level sesuai periode ulang yang diminta")
+
+
+if __name__ == "__main__":
+    test_return_level_inverts_exceedance()
+    test_dashboard_table_precomputed()
+    test_predict_uses_return_period()
@@ -0,0 +1,102 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.BBWSScraper as bbws
+from bbws_fixture_server import FixtureServer, FIXTURE_DIR
+from utils.BBWSScraper import BBWSScraper
+from utils.HttpCache import ResponseCache
+
+
+class _CountingParse:
+    """Hitung berapa kali halaman benar-benar di-parse"""
+
+    def __init__(self):
+        self.calls = 0
+        self._table, self._detail = bbws.parse_station_table, bbws.parse_station_detail
+
+    def __enter__(self):
+        def table(*args):
+            self.calls += 1
+            return self._table(*args)
+
+        def detail(*args):
+            self.calls += 1
+            return self._detail(*args)
+
+        bbws.parse_station_table, bbws.parse_station_detail = table, detail
+        return self
+
+    def __exit__(self, *exc):
+        bbws.parse_station_table, bbws.parse_station_detail = self._table, self._detail
+
+
+def test_not_modified_refresh_skips_parsing():
+    print("📭 Testing refresh tanpa perubahan (304)...")
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer() as server:
+        scraper = BBWSScraper(base_url=server.base_url, cache=ResponseCache(tmp))
+        first = scraper.fetch_all()
+        assert first['cache']['parsed'] == 8
+
+        with _CountingParse() as parses:
+            second = scraper.fetch_all()
+        assert parses.calls == 0
+        assert second['cache']['not_modified'] == 8
+        assert server.statuses[-8:] == [304] * 8
+        assert second['water_levels'] == first['water_levels']
+        assert second['rainfall'] == first['rainfall']
+
+        # Cache di disk dipakai ulang oleh proses/scraper baru
+        restarted = BBWSScraper(base_url=server.base_url, cache=ResponseCache(tmp))
+        with _CountingParse() as parses:
+            third = restarted.fetch_all()
+        assert parses.calls == 0 and third['cache']['not_modified'] == 8
+        assert third['water_levels'] == first['water_levels']
+    print("✅ Refresh kedua: 8 x 304, 0 parse")
+
+
+def test_unchanged_body_without_validators_skips_parsing():
+    print("🔁 Testing hash isi sama tanpa ETag/Last-Modified...")
+    with tempfile.TemporaryDirectory() as tmp, FixtureServer(validators=False) as server:
+        scraper = BBWSScraper(base_url=server.base_url, cache=ResponseCache(tmp))
+        first = scraper.fetch_all()
+        with _CountingParse() as parses:
+            second = scraper.fetch_all()
+        assert parses.calls == 0 and second['cache']['unchanged'] == 8
+        assert second['water_levels'] == first['water_levels']
+    print("✅ Isi halaman sama -> hasil parse dari cache")
+
+
+def test_changed_page_is_reparsed():
+    print("✏️ Testing halaman berubah di-parse ulang...")
+    with tempfile.TemporaryDirectory() as fixtures, tempfile.TemporaryDirectory() as tmp:
+        for root, _, files in os.walk(FIXTURE_DIR):
+            for name in files:
+                source = os.path.join(root, name)
+                target = os.path.join(fixtures, os.path.relpath(source, FIXTURE_DIR))
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                with open(source, 'rb') as f_in, open(target, 'wb') as f_out:
+                    f_out.write(f_in.read())
+
+        with FixtureServer(fixture_dir=fixtures) as server:
+            scraper = BBWSScraper(base_url=server.base_url, cache=ResponseCache(tmp))
+            scraper.fetch_all()
+
+            tma_path = os.path.join(fixtures, 'tma.html')
+            with open(tma_path, 'rb') as f:
+                html = f.read()
+            with open(tma_path, 'wb') as f:
+                f.write(html.replace(b'143,74', b'146,80'))
+
+            snapshot = scraper.fetch_all()
+            assert snapshot['cache'] == {'parsed': 1, 'unchanged': 0, 'not_modified': 7, 'error': 0}
+            assert snapshot['water_levels'][0]['water_level_mdpl'] == 146.8
+    print("✅ Hanya /tma di-parse ulang")
+
+
+if __name__ == "__main__":
+    test_not_modified_refresh_skips_parsing()
+    test_unchanged_body_without_validators_skips_parsing()
+    test_changed_page_is_reparsed()
@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from controllers.FloodReportController import FloodReportController
+from models.FloodReportModel import FloodReportModel
+from models.GoogleSheetsModel import GoogleSheetsModel, SUBMISSION_TOKEN_COLUMN
+from models.RateLimitModel import RateLimitModel
+from utils.CircuitBreaker import CircuitBreaker
+from utils.RateLimiter import SlidingWindowRateLimiter
+
+
+class FakeWorksheet:
+    """Worksheet gspread minimal: append_row + find per kolom"""
+
+    def __init__(self):
+        self.rows = []
+
+    def append_row(self, row):
+        self.rows.append(row)
+
+    def find(self, query, in_column=None):
+        for row in self.rows:
+            if row[in_column - 1] == query:
+                return row
+        return None
+
+
+def _sheets_model(worksheet):
+    sheets = GoogleSheetsModel.__new__(GoogleSheetsModel)
+    sheets.client = object()
+    sheets.worksheet = worksheet
+    sheets.tz_wib = pytz.timezone('Asia/Jakarta')
+    sheets.breaker = CircuitBreaker('test_sheets')
+    return sheets
+
+
+def _controller(tmp, sheets_model=None):
+    # Tanpa __init__: tidak menyentuh Google Sheets asli / flood_system.db
+    controller = FloodReportController.__new__(FloodReportController)
+    controller.flood_model = FloodReportModel(os.path.join(tmp, 'reports.db'))
+    controller.rate_limiter = SlidingWindowRateLimiter(
+        RateLimitModel(controller.flood_model.db_path), limits={'ip': (10, 3600), 'phone': (5, 3600)}
+    )
+    controller.sheets_model = sheets_model
+    controller.upload_folder = tmp
+    controller.photo_hash_model = None
+    controller.photo_index = None
+    controller.get_client_ip = lambda: '10.0.0.5'
+    return controller
+
+
+def _row_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM flood_reports').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def _submit(controller, token):
+    return controller.submit_report('Jl. Slamet Riyadi', '40 cm', 'Budi', '0812-0000-1111',
+                                    submission_token=token)
+
+
+def test_resubmit_same_token_returns_original_report():
+    print("♻️ Testing submit ulang dengan token sama...")
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = _controller(tmp)
+        ok, first = _submit(controller, 'token-rerun')
+        assert ok and '#1)' in first
+
+        ok, second = _submit(controller, 'token-rerun')
+        assert ok and second == first
+        assert _row_count(controller.flood_model.db_path) == 1
+        # Submit ulang tidak memakan kuota rate limit
+        assert controller.rate_limiter.count('ip', '10.0.0.5') == 1
+
+        ok, other = _submit(controller, 'token-lain')
+        assert ok and '#2)' in other
+    print("✅ Laporan asli dikembalikan, tidak ada baris baru")
+
+
+def test_unique_index_race_returns_winner():
+    print("🏁 Testing race unique index submission_token...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model = FloodReportModel(os.path.join(tmp, 'reports.db'))
+        winner, created = model.create_report_once('Jl. A', '20 cm', 'Ani', submission_token='token-race')
+        assert created
+        loser, created = model.create_report_once('Jl. A', '20 cm', 'Ani', submission_token='token-race')
+        assert loser == winner and not created
+        assert _row_count(model.db_path) == 1
+
+        # Sesi lain menyisipkan token di antara pre-check dan INSERT controller
+        controller = _controller(tmp)
+        parallel, _ = controller.flood_model.create_report_once('Jl. B', '30 cm', 'Ani',
+                                                               submission_token='token-paralel')
+        lookup = controller.flood_model.get_report_by_token
+        misses = iter([None])
+        controller.flood_model.get_report_by_token = lambda token: next(misses, None) or lookup(token)
+
+        ok, message = _submit(controller, 'token-paralel')
+        assert ok and f'#{parallel})' in message
+        assert _row_count(model.db_path) == 2
+        # Slot rate limit yang dipesan dikembalikan karena tidak ada laporan baru
+        assert controller.rate_limiter.count('ip', '10.0.0.5') == 0
+    print("✅ IntegrityError -> id laporan pemenang, kuota tidak terpakai")
+
+
+def test_sheets_retry_skips_existing_token():
+    print("📊 Testing retry Google Sheets tidak append dua kali...")
+    worksheet = FakeWorksheet()
+    sheets = _sheets_model(worksheet)
+
+    data = {'address': 'Jl. C', 'submission_token': 'token-sheets'}
+    assert sheets.save_flood_report(data, check_existing=True)
+    assert sheets.save_flood_report(data, check_existing=True)
+    assert len(worksheet.rows) == 1 and worksheet.rows[0][SUBMISSION_TOKEN_COLUMN - 1] == 'token-sheets'
+    assert sheets.has_submission_token('token-sheets') and not sheets.has_submission_token('token-baru')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        controller = _controller(tmp, sheets_model=sheets)
+        ok, _ = _submit(controller, 'token-replika')
+        assert ok and len(worksheet.rows) == 2
+
+        # Append berhasil tapi tanda sinkron tidak sempat ditulis: submit ulang tidak append lagi
+        conn = sqlite3.connect(controller.flood_model.db_path)
+        conn.execute('UPDATE flood_reports SET sheets_synced = 0')
+        conn.commit()
+        conn.close()
+        ok, _ = _submit(controller, 'token-replika')
+        assert ok and len(worksheet.rows) == 2
+        assert controller.flood_model.get_report_by_token('token-replika')['sheets_synced'] == 1
+    print("✅ Token sudah ada di worksheet, append dilewati")
+
+
+if __name__ == "__main__":
+    test_resubmit_same_token_returns_original_report()
+    test_unique_index_race_returns_winner()
+    test_sheets_retry_skips_existing_token()
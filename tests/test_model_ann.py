@@ -0,0 +1,180 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from model_ann import (
+    predict_flood_ann, predict_flood_ann_batch, FEATURE_NAMES, STATUS_LABELS,
+    FloodMLP, generate_training_data, train_flood_mlp, get_ann_parameters,
+    compute_risk_surface, get_active_ann_version, ANN_RULE_VERSION, ANN_LEGACY_VERSION,
+    RULE_PARAMS_LEGACY, predict_flood_ann_interactive
+)
+
+
+def _random_inputs(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.column_stack([
+        rng.uniform(0, 500, n),
+        rng.uniform(60, 150, n),
+        rng.uniform(0, 100, n),
+        rng.uniform(15, 40, n),
+    ])
+
+
+def _baseline_predict_flood_ann(rainfall, water_level, humidity, temperature):
+    """
+    Salinan beku aritmetika predict_flood_ann skalar v2.0 sebelum vectorization
+    (jangan diubah mengikuti model_ann): (risk_level tanpa pembulatan, status).
+    """
+    features = np.array([[rainfall, water_level, humidity, temperature]])
+    weights = np.array([0.50, 0.25, 0.15, 0.10])
+    normalization_factors = np.array([300.0, 150.0, 100.0, 35.0])
+    weighted_sum = np.sum(features / normalization_factors * weights, axis=1)[0]
+    risk_level = 1 / (1 + np.exp(-weighted_sum * 6))
+
+    if rainfall > 200:
+        risk_level = min(1.0, risk_level * 1.4)
+    elif rainfall > 100:
+        risk_level = min(1.0, risk_level * 1.2)
+    if water_level > 130:
+        risk_level = min(1.0, risk_level * 1.3)
+    elif water_level > 110:
+        risk_level = min(1.0, risk_level * 1.1)
+    risk_level = max(0.1, risk_level)
+
+    if risk_level >= 0.8:
+        return risk_level, "TINGGI"
+    if risk_level >= 0.5:
+        return risk_level, "MENENGAH"
+    return risk_level, "RENDAH"
+
+
+def test_batch_matches_scalar():
+    print("🧠 Testing predict_flood_ann_batch vs formula skalar baseline...")
+    # predict_flood_ann membulatkan input ke presisi sensor (0.1 mm, 0.01 m, 0.1 %, 0.1 °C)
+    X = np.array([[round(value, digits) for value, digits in zip(row, (1, 2, 1, 1))]
+                for row in _random_inputs(500)])
+    X[:4, 0] = [100.0, 200.0, 100.1, 200.1]
+    X[4:8, 1] = [110.0, 130.0, 110.01, 130.01]
+
+    risk_levels, status_codes = predict_flood_ann_batch(X, version=ANN_RULE_VERSION)
+    for row, risk, code in zip(X, risk_levels, status_codes):
+        expected_risk, expected_status = _baseline_predict_flood_ann(*row)
+        assert abs(float(risk) - expected_risk) < 1e-12, (row, risk, expected_risk)
+        assert STATUS_LABELS[code] == expected_status
+
+        result = predict_flood_ann(*row, version=ANN_RULE_VERSION)
+        assert result['risk_level'] == round(expected_risk, 3)
+        assert result['status'] == expected_status
+
+    # Nilai tetap (dihitung dengan formula baseline) sebagai jangkar terpisah
+    fixed, fixed_codes = predict_flood_ann_batch(
+        [[0.0, 60.0, 0.0, 15.0], [0.0, 60.0, 0.0, -40.0], [250.0, 135.0, 90.0, 30.0]],
+        version=ANN_RULE_VERSION
+    )
+    assert np.allclose(fixed, [0.7020633699, 0.4785845385, 1.0], atol=1e-9), fixed
+    assert STATUS_LABELS[fixed_codes].tolist() == ['MENENGAH', 'RENDAH', 'TINGGI']
+    print(f"✅ {len(X)} baris identik dengan formula skalar baseline")
+
+
+def test_batch_accepts_dataframe():
+    print("📋 Testing input DataFrame...")
+    X = _random_inputs(10, seed=1)
+    df = pd.DataFrame(X[:, ::-1], columns=FEATURE_NAMES[::-1])
+    risk_from_df, _ = predict_flood_ann_batch(df)
+    risk_from_array, _ = predict_flood_ann_batch(X)
+    assert np.array_equal(risk_from_df, risk_from_array)
+    print("✅ Kolom DataFrame dipetakan sesuai nama")
+
+
+def test_mlp_training_and_npz_roundtrip():
+    print("🏋️ Testing training MLP 4-8-4-1 + simpan/muat .npz...")
+    X, y = generate_training_data(400, seed=3)
+    model = train_flood_mlp(X, y, epochs=40, validation_samples=2000)
+    assert model.architecture == (4, 8, 4, 1)
+    assert model.metadata['validation_mae'] < 0.1
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'weights.npz')
+        model.save(path)
+        restored = FloodMLP.load(path)
+
+    X_test = _random_inputs(100, seed=4)
+    assert np.allclose(model.predict(X_test), restored.predict(X_test))
+    assert restored.predict(X_test).dtype == np.float32
+    assert restored.metadata['training_samples'] == 400
+    print(f"✅ MAE validasi {model.metadata['validation_mae']:.4f}")
+
+
+def test_shipped_weights_describe_mlp():
+    print("📦 Testing versi aktif model_registry/ann...")
+    params = get_ann_parameters()
+    assert params['architecture'].startswith('4-8-4-1')
+    assert params['training_samples'] == 1245
+    print(f"✅ Akurasi status tercatat: {params['accuracy']}")
+
+
+def test_parameters_describe_serving_model():
+    print("🧾 Testing parameters_used mengikuti model yang melayani...")
+    active = get_active_ann_version()
+    mlp = FloodMLP.from_params(active.params)
+    used = predict_flood_ann(120.0, 110.0, 80.0, 28.0)['parameters_used']
+    assert used['kind'] == 'mlp' and 'normalization_factors' not in used
+    assert np.allclose(used['feature_mean'], mlp.feature_mean)
+    assert np.allclose(used['feature_scale'], mlp.feature_scale)
+    params = get_ann_parameters()
+    assert params['feature_mean'] == used['feature_mean'] and 'normalization_factors' not in params
+
+    interactive = predict_flood_ann_interactive(120.0, 110.0, 80.0, 28.0)
+    expected = (np.array([120.0, 110.0, 80.0, 28.0]) - mlp.feature_mean) / mlp.feature_scale
+    assert np.allclose(interactive['normalized_features'], expected)
+
+    rule = predict_flood_ann(120.0, 110.0, 80.0, 28.0, version=ANN_RULE_VERSION)['parameters_used']
+    legacy = predict_flood_ann(120.0, 110.0, 80.0, 28.0, version=ANN_LEGACY_VERSION)['parameters_used']
+    assert rule['kind'] == legacy['kind'] == 'rule'
+    assert rule['normalization_factors'] == [300.0, 150.0, 100.0, 35.0]
+    assert legacy['weights'] == np.asarray(RULE_PARAMS_LEGACY['weights'], dtype=float).tolist()
+    assert legacy['sigmoid_gain'] == float(RULE_PARAMS_LEGACY['sigmoid_gain'])
+    print("✅ MLP: feature_mean/scale, model aturan: parameternya sendiri")
+
+
+def test_risk_surface_matches_point_predictions():
+    print("🗺️ Testing sweep risiko curah hujan x tinggi air...")
+    surface = compute_risk_surface(55.0, 27.0, rainfall_steps=51, water_level_steps=31)
+    assert surface['risk'].shape == (31, 51)
+    assert compute_risk_surface(55.0, 27.0, 51, 31) is surface
+
+    i, j = 10, 20
+    point, _ = predict_flood_ann_batch(
+        [[surface['rainfall'][j], surface['water_level'][i], 55.0, 27.0]]
+    )
+    assert np.isclose(surface['risk'][i, j], point[0])
+    print("✅ Grid konsisten dengan prediksi per titik dan ter-cache")
+
+
+def test_surface_frames_follow_model_version():
+    print("🔁 Testing cache heatmap view mengikuti versi ANN...")
+    from views.risk_surface import _surface_frames
+    active = get_active_ann_version().version
+    cells, _ = _surface_frames(55.0, 27.0, 21, 11, active)
+    assert _surface_frames(55.0, 27.0, 21, 11, active)[0] is cells
+    # Versi lain (mis. setelah aktivasi / hot reload) -> entri cache baru, risiko model itu
+    rule_cells, _ = _surface_frames(55.0, 27.0, 21, 11, ANN_RULE_VERSION)
+    expected = compute_risk_surface(55.0, 27.0, 21, 11, version=ANN_RULE_VERSION)['risk'].ravel()
+    assert np.allclose(rule_cells['risk'], np.round(expected, 3))
+    assert active == ANN_RULE_VERSION or not rule_cells['risk'].equals(cells['risk'])
+    print("✅ Surface per versi, tidak tertahan di versi lama")
+
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_batch_accepts_dataframe()
+    test_mlp_training_and_npz_roundtrip()
+    test_shipped_weights_describe_mlp()
+    test_parameters_describe_serving_model()
+    test_risk_surface_matches_point_predictions()
+    test_surface_frames_follow_model_version()
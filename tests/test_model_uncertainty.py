@@ -0,0 +1,119 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+import model_uncertainty
+from model_uncertainty import (
+    ann_uncertainty_batch, gumbel_uncertainty_batch, sample_inputs,
+    predict_flood_ann_uncertainty, predict_flood_gumbel_uncertainty
+)
+from model_ann import predict_flood_ann_batch
+from gumbel_distribution import predict_flood_gumbel_batch
+from gumbel_fitting import fit_stations, register_station_fits
+import utils.ModelRegistry as model_registry
+
+NO_ERROR = {
+    name: {'type': 'normal', 'sigma': 0.0}
+    for name in ('rainfall', 'water_level', 'humidity', 'temperature')
+}
+
+
+def test_zero_error_collapses_to_point_prediction():
+    print("🎯 Testing galat nol = prediksi titik...")
+    X = np.array([[40.0, 95.0, 60.0, 27.0], [250.0, 135.0, 90.0, 30.0]])
+    result = ann_uncertainty_batch(X, n_samples=50, error_models=NO_ERROR)
+    point, status = predict_flood_ann_batch(X)
+    assert np.allclose(result['risk_percentiles'], point[:, None])
+    assert np.array_equal(result['status_probabilities'].argmax(axis=1), status)
+
+    gumbel = gumbel_uncertainty_batch([60.0, 120.0], n_samples=50, error_models=NO_ERROR)
+    gumbel_point, _ = predict_flood_gumbel_batch([60.0, 120.0])
+    assert np.allclose(gumbel['risk_mean'], gumbel_point)
+    print("✅ Pita menyempit ke nilai titik")
+
+
+def test_sampling_respects_sensor_bounds():
+    print("📏 Testing batas fisik sensor...")
+    samples = sample_inputs([[0.0, 100.0, 99.0, 25.0]], n_samples=5000)
+    assert samples.shape == (1, 5000, 4)
+    assert samples[..., 0].min() >= 0.0
+    assert samples[..., 2].max() <= 100.0
+    assert abs(samples[..., 3].std() - 0.5) < 0.05
+    print("✅ Curah hujan >= 0 dan kelembapan <= 100%")
+
+
+def test_bands_are_ordered_and_reproducible():
+    print("🎲 Testing persentil, probabilitas status dan seed...")
+    original = model_uncertainty.MAX_BATCH_ROWS
+    model_uncertainty.MAX_BATCH_ROWS = 1000
+    try:
+        X = np.random.default_rng(0).uniform([0, 60, 0, 15], [500, 150, 100, 40], size=(12, 4))
+        first = ann_uncertainty_batch(X, n_samples=400, seed=7)
+        second = ann_uncertainty_batch(X, n_samples=400, seed=7)
+    finally:
+        model_uncertainty.MAX_BATCH_ROWS = original
+
+    assert np.array_equal(first['risk_percentiles'], second['risk_percentiles'])
+    assert np.all(np.diff(first['risk_percentiles'], axis=1) >= 0)
+    assert np.allclose(first['status_probabilities'].sum(axis=1), 1.0)
+    print("✅ Persentil monoton, probabilitas berjumlah 1, hasil deterministik")
+
+
+def test_single_input_summary():
+    print("📋 Testing ringkasan untuk halaman Simulasi...")
+    summary = predict_flood_ann_uncertainty(180.0, 125.0, 85.0, 28.0, n_samples=500)
+    assert set(summary['status_probabilities']) == {'RENDAH', 'MENENGAH', 'TINGGI'}
+    assert summary['risk_percentiles']['p5'] <= summary['risk_percentiles']['p95']
+    print(f"✅ {summary['most_likely_status']} {summary['status_probabilities']}")
+
+
+def _annual_peaks(mu, beta, years, seed):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('1995-01-01', periods=365 * years, freq='D')
+    rainfall = rng.gamma(0.6, 8.0, len(index))
+    rainfall[np.arange(years) * 365 + 40] = rng.gumbel(mu, beta, years)
+    return index, rainfall
+
+
+def test_gumbel_band_uses_station_parameters():
+    print("🗺️ Testing pita Gumbel memakai parameter per stasiun...")
+    fits = fit_stations({
+        'ngadipiro': _annual_peaks(120.0, 25.0, 30, seed=2),
+        'colo_weir': _annual_peaks(70.0, 12.0, 30, seed=3)
+    })
+    saved = model_registry._registry
+    model_registry._registry = None
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            registry = model_registry.get_model_registry(root=tmp, watch_interval=0)
+            register_station_fits(fits, activate=True, registry=registry)
+
+            stations = ['ngadipiro', 'colo_weir', 'tidak_dikenal']
+            result = gumbel_uncertainty_batch([110.0] * 3, n_samples=50, error_models=NO_ERROR,
+                                              station_ids=stations)
+            point, _ = predict_flood_gumbel_batch([110.0] * 3, station_ids=stations)
+            assert np.allclose(result['risk_mean'], point)
+            assert result['risk_mean'][0] < result['risk_mean'][1]
+            assert result['station_fit'].tolist() == [True, True, False]
+
+            default = gumbel_uncertainty_batch([110.0], n_samples=50, error_models=NO_ERROR)
+            assert np.isclose(default['risk_mean'][0], result['risk_mean'][2])
+
+            summary = predict_flood_gumbel_uncertainty(110.0, station_id='colo_weir', n_samples=200)
+            assert summary['station_fit'] and summary['risk_mean'] > result['risk_mean'][0]
+    finally:
+        model_registry._registry = saved
+    print("✅ Stasiun hasil fit memakai mu/beta sendiri, lainnya parameter global")
+
+
+if __name__ == "__main__":
+    test_zero_error_collapses_to_point_prediction()
+    test_sampling_respects_sensor_bounds()
+    test_bands_are_ordered_and_reproducible()
+    test_single_input_summary()
+    test_gumbel_band_uses_station_parameters()
@@ -0,0 +1,118 @@
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.Nowcaster import (
+    Nowcaster, fit_station_model, forecast_batch, design_matrix, target_matrix,
+    HOUR, HORIZONS, NOWCAST_STATIONS, REFIT_INTERVAL
+)
+from utils.TimeSeriesStore import TimeSeriesStore
+
+T0 = 1_700_000_000 - 1_700_000_000 % HOUR - 7 * HOUR  # tengah malam WIB
+
+
+def _simulate(hours, seed=0, base=120.0):
+    """ARX: Δy_t = 0.6 Δy_{t-1} + 0.02 r_t + 0.01 r_{t-1} - 0.005 + ε (σ 1 cm), hujan acak 8% jam"""
+    rng = np.random.default_rng(seed)
+    rain = np.where(rng.random(hours) < 0.08, rng.gamma(2.0, 6.0, hours), 0.0)
+    change = np.zeros(hours)
+    for t in range(1, hours):
+        change[t] = 0.6 * change[t - 1] + 0.02 * rain[t] + 0.01 * rain[t - 1] - 0.005 + rng.normal(0, 0.01)
+    return base + np.cumsum(change), rain
+
+
+def test_forecast_skill_and_interval_coverage():
+    print("📐 Testing akurasi prakiraan dan cakupan interval prediksi...")
+    level, rain = _simulate(24 * 60)
+    split = 24 * 30
+    model = fit_station_model(level[:split], rain[:split])
+    assert abs(model.sigma[0] - 0.085) < 0.015 and np.all(np.diff(model.sigma) > 0), model.sigma
+    # Kolom hujan nol semua (pos tanpa data hujan) tetap bisa difaktorkan
+    assert fit_station_model(level[:split], np.zeros(split)) is not None
+
+    # Backtest 30 hari berikutnya: semua jam diprakirakan dalam satu batch
+    X, Y = design_matrix(level, rain)[split:], target_matrix(level)[split:]
+    rows = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+    base = level[split:][rows]
+    mean, lower, upper = forecast_batch([model] * rows.sum(), X[rows], base)
+    actual = base[:, None] + Y[rows]
+    coverage = ((actual >= lower) & (actual <= upper)).mean(axis=0)
+    assert np.all(np.abs(coverage - 0.9) < 0.06), coverage
+    # Horizon 1 mendekati prakiraan oracle dari model pembangkit (hujan jam depan tidak diketahui)
+    change = np.diff(level, prepend=np.nan)[split:][rows]
+    oracle = base + 0.6 * change + 0.01 * rain[split:][rows] + 0.02 * rain.mean() - 0.005
+    rmse = np.sqrt(((actual[:, 0] - mean[:, 0]) ** 2).mean())
+    rmse_oracle = np.sqrt(((actual[:, 0] - oracle) ** 2).mean())
+    assert rmse < 1.05 * rmse_oracle, (rmse, rmse_oracle)
+    print(f"✅ Cakupan interval 90%: {np.round(coverage, 3).tolist()}, RMSE +1 jam {rmse * 100:.1f} cm "
+          f"(oracle {rmse_oracle * 100:.1f} cm)")
+
+
+def test_batch_matches_single_station():
+    print("🧮 Testing batch multi-stasiun = prakiraan per stasiun...")
+    models, features, bases = [], [], []
+    for seed in range(3):
+        level, rain = _simulate(24 * 20, seed=seed, base=100.0 + seed * 10)
+        models.append(fit_station_model(level, rain))
+        features.append(design_matrix(level, rain)[-1])
+        bases.append(level[-1])
+    batch = forecast_batch(models, np.array(features), np.array(bases))
+    for i in range(3):
+        single = forecast_batch(models[i:i + 1], np.array(features[i:i + 1]), np.array(bases[i:i + 1]))
+        for batched, alone in zip(batch, single):
+            assert np.allclose(batched[i], alone[0])
+    assert fit_station_model(*_simulate(24)) is None
+    print("✅ Hasil identik, data 24 jam ditolak (terlalu sedikit)")
+
+
+def test_nowcaster_from_store():
+    print("🗄️ Testing nowcaster dari time series store (refit ter-cache)...")
+    root = tempfile.mkdtemp()
+    try:
+        store = TimeSeriesStore(root=root)
+        hours = 24 * 35
+        for seed, station in enumerate(NOWCAST_STATIONS[:2]):
+            level, rain = _simulate(hours, seed=seed)
+            # Pembacaan 10 menit (nilai jam diulang) agar rata-rata per jam = nilai jam itu
+            times = T0 + np.arange(hours * 6) * 600
+            store.append(station, times, water_level_mdpl=np.repeat(level, 6), rainfall_mm=np.repeat(rain, 6))
+        # Stasiun ketiga baru punya 1 hari data: tidak ada prakiraan
+        level, rain = _simulate(24, seed=9)
+        store.append(NOWCAST_STATIONS[2], T0 + (hours - 24 + np.arange(24)) * HOUR,
+                     water_level_mdpl=level, rainfall_mm=rain)
+
+        nowcaster = Nowcaster(store, names={'ngadipiro': 'Ngadipiro'})
+        now = T0 + hours * HOUR - 60
+        result = nowcaster.forecast_all(now)
+        assert sorted(result) == sorted(NOWCAST_STATIONS[:2])
+        forecast = result['ngadipiro']
+        assert forecast['location'] == 'Ngadipiro' and forecast['horizons'] == HORIZONS.tolist()
+        assert forecast['times'][0] == forecast['base_time'] + HOUR and forecast['base_time'] == now + 60 - HOUR
+        assert all(lo < mean < hi for lo, mean, hi in zip(forecast['lower'], forecast['mean'], forecast['upper']))
+        widths = np.subtract(forecast['upper'], forecast['lower'])
+        assert np.all(np.diff(widths) > 0) and len(forecast['history_levels']) == 12
+        assert nowcaster.stats['fits'] == 3
+
+        # Refresh berikutnya memakai model cache; refit setelah REFIT_INTERVAL
+        nowcaster.forecast_all(now + 300)
+        assert nowcaster.stats['fits'] == 3
+        nowcaster.forecast_all(now + REFIT_INTERVAL)
+        assert nowcaster.stats['fits'] == 6
+
+        # Data terakhir terlalu tua: tidak ada prakiraan
+        assert nowcaster.forecast_all(now + 2 * REFIT_INTERVAL) == {}
+        assert nowcaster.latest == {}
+    finally:
+        shutil.rmtree(root)
+    print("✅ 2 dari 3 stasiun diprakirakan, model dilatih ulang per interval")
+
+
+if __name__ == "__main__":
+    test_forecast_skill_and_interval_coverage()
+    test_batch_matches_single_station()
+    test_nowcaster_from_store()
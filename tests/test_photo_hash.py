@@ -0,0 +1,120 @@
+import os
+import sys
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+
+import utils.PhotoHashIndex as photo_hash_index
+from controllers.FloodReportController import FloodReportController
+from models.PhotoHashModel import PhotoHashModel
+from utils.PhotoHashIndex import (
+    PhotoHashIndex, compute_phash, compute_dhash, hamming_distance, hamming_distances
+)
+
+
+def _sample_image(seed):
+    rng = np.random.default_rng(seed)
+    pixels = rng.integers(0, 255, size=(64, 64), dtype=np.uint8)
+    return Image.fromarray(pixels).resize((256, 256))
+
+
+def test_recycled_photo_is_close():
+    print("🖼️ Testing pHash/dHash pada foto yang di-resize ulang...")
+    original = _sample_image(1)
+    recycled = original.resize((180, 180)).resize((256, 256))
+    other = _sample_image(2)
+
+    assert hamming_distance(compute_phash(original), compute_phash(recycled)) <= 8
+    assert hamming_distance(compute_dhash(original), compute_dhash(recycled)) <= 8
+    assert hamming_distance(compute_phash(original), compute_phash(other)) > 8
+    print("✅ Foto daur ulang terdeteksi, foto berbeda tidak")
+
+
+def test_multi_index_query_matches_linear_scan():
+    print("🔎 Testing index vectorized vs linear scan...")
+    random.seed(7)
+    hashes = [random.getrandbits(64) for _ in range(2000)]
+    base = hashes[0]
+    for bits in (1, 3, 6, 8):
+        flipped = base
+        for bit in random.sample(range(64), bits):
+            flipped ^= 1 << bit
+        hashes.append(flipped)
+
+    index = PhotoHashIndex()
+    for i, value in enumerate(hashes):
+        index.add(f"photo_{i}.jpg", value, report_id=i)
+
+    found = {m['key'] for m in index.query(base, max_distance=8)}
+    expected = {
+        f"photo_{i}.jpg" for i, value in enumerate(hashes)
+        if hamming_distance(base, value) <= 8
+    }
+    assert found == expected
+
+    index.remove("photo_0.jpg")
+    assert "photo_0.jpg" not in {m['key'] for m in index.query(base, max_distance=8)}
+    print(f"✅ {len(found)} kandidat cocok dengan linear scan")
+
+
+def test_popcount_fallback_and_removal():
+    print("🧮 Testing popcount SWAR (NumPy < 2.0) dan hapus foto...")
+    rng = random.Random(3)
+    hashes = [rng.getrandbits(64) for _ in range(500)] + [0, (1 << 64) - 1]
+    array = np.array(hashes, dtype=np.uint64)
+    expected = [hamming_distance(hashes[0], value) for value in hashes]
+    saved, photo_hash_index._bitwise_count = photo_hash_index._bitwise_count, None
+    try:
+        assert hamming_distances(array, hashes[0]).tolist() == expected
+    finally:
+        photo_hash_index._bitwise_count = saved
+    assert hamming_distances(array, hashes[0]).tolist() == expected
+
+    index = PhotoHashIndex(capacity=4)
+    for i, value in enumerate(hashes):
+        index.add(f"photo_{i}.jpg", value, report_id=i)
+    for i in range(0, len(hashes), 3):
+        assert index.remove(f"photo_{i}.jpg")
+    index.add("photo_1.jpg", hashes[0], report_id=1)
+    assert len(index) == len(hashes) - len(range(0, len(hashes), 3))
+    for probe in hashes[:20]:
+        found = {m['key'] for m in index.query(probe, max_distance=20)}
+        expected_keys = {
+            key for key, (value, _, _) in index._entries.items() if hamming_distance(probe, value) <= 20
+        }
+        assert found == expected_keys
+    print("✅ SWAR = bitwise_count, index tetap konsisten setelah hapus/ganti")
+
+
+def test_duplicate_info_loaded_in_one_query():
+    print("📋 Testing info duplikat satu tabel laporan dalam satu query...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model = PhotoHashModel(os.path.join(tmp, 'hashes.db'))
+        model.save_hash(1, 'uploads/a.jpg', '00ff00ff00ff00ff')
+        model.save_hash(2, 'uploads/b.jpg', '00ff00ff00ff00fe', duplicate_of=1,
+                        duplicate_path='uploads/a.jpg', duplicate_distance=1)
+        paths = [f'uploads/missing_{i}.jpg' for i in range(1500)] + ['uploads/a.jpg', 'uploads/b.jpg', '']
+        rows = model.get_hashes_by_photos(paths)
+        assert set(rows) == {'uploads/a.jpg', 'uploads/b.jpg'}
+
+        controller = FloodReportController.__new__(FloodReportController)
+        controller.photo_hash_model = model
+        queries = []
+        connect = model.get_connection
+        model.get_connection = lambda: queries.append(1) or connect()
+        duplicates = controller.get_photo_duplicate_info_many(['uploads/a.jpg', 'uploads/b.jpg', None])
+        assert list(duplicates) == ['uploads/b.jpg'] and duplicates['uploads/b.jpg']['duplicate_of'] == 1
+        assert len(queries) == 1
+        assert duplicates['uploads/b.jpg'] == controller.get_photo_duplicate_info('uploads/b.jpg')
+    print("✅ 1 koneksi untuk seluruh tabel, hasil sama dengan lookup per foto")
+
+
+if __name__ == "__main__":
+    test_recycled_photo_is_close()
+    test_multi_index_query_matches_linear_scan()
+    test_popcount_fallback_and_removal()
+    test_duplicate_info_loaded_in_one_query()
@@ -0,0 +1,84 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.PredictionCache import PredictionCache, quantize
+import model_ann
+import gumbel_distribution
+from model_ann import predict_flood_ann, ANN_RULE_VERSION, ANN_LEGACY_VERSION
+from gumbel_distribution import predict_flood_gumbel
+
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_and_ttl():
+    print("🗃️ Testing LRU + TTL PredictionCache...")
+    clock = FakeClock()
+    cache = PredictionCache(maxsize=2, ttl=60, clock=clock)
+
+    cache.put('a', 1)
+    cache.put('b', 2)
+    assert cache.get('a') == 1
+    cache.put('c', 3)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1 and cache.get('c') == 3
+
+    clock.now += 61
+    assert cache.get('a') is None
+
+    stats = cache.stats()
+    assert stats['hits'] == 3 and stats['misses'] == 2
+    assert stats['evictions'] == 1 and stats['expired'] == 1
+    print("✅ Eviction LRU, kedaluwarsa TTL dan counter sesuai")
+
+
+def test_quantize_to_sensor_precision():
+    print("📏 Testing kuantisasi presisi sensor...")
+    assert quantize(120.04, 'rainfall') == 120.0
+    assert quantize(112.346, 'water_level') == 112.35
+    assert quantize('n/a', 'humidity') == 'n/a'
+    print("✅ Input dibulatkan sesuai sensor")
+
+
+def test_ann_predictions_memoized_per_version():
+    print("🧠 Testing memoization predict_flood_ann...")
+    before = model_ann.get_prediction_cache_stats()
+
+    first = predict_flood_ann(150.02, 101.001, 80.0, 27.0, version=ANN_RULE_VERSION)
+    second = predict_flood_ann(150.04, 101.004, 80.01, 27.02, version=ANN_RULE_VERSION)
+    legacy = predict_flood_ann(150.02, 101.001, 80.0, 27.0, version=ANN_LEGACY_VERSION)
+
+    after = model_ann.get_prediction_cache_stats()
+    assert after['hits'] - before['hits'] == 1
+    assert after['misses'] - before['misses'] == 2
+    assert first == second and first is not second
+    assert legacy['model_version'] == ANN_LEGACY_VERSION
+
+    second['temperature_range'] = {'min': 25, 'max': 29}
+    assert 'temperature_range' not in predict_flood_ann(150.0, 101.0, 80.0, 27.0, version=ANN_RULE_VERSION)
+    print("✅ Input setara presisi sensor memakai hasil ter-cache, terpisah per versi")
+
+
+def test_gumbel_predictions_memoized():
+    print("📈 Testing memoization predict_flood_gumbel...")
+    before = gumbel_distribution.get_prediction_cache_stats()
+    first = predict_flood_gumbel(97.31)
+    second = predict_flood_gumbel(97.33)
+    after = gumbel_distribution.get_prediction_cache_stats()
+    assert first == second
+    assert after['hits'] - before['hits'] == 1
+    print("✅ Gumbel ter-cache")
+
+
+if __name__ == "__main__":
+    test_lru_and_ttl()
+    test_quantize_to_sensor_precision()
+    test_ann_predictions_memoized_per_version()
+    test_gumbel_predictions_memoized()
@@ -0,0 +1,136 @@
+import os
+import sys
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.RateLimitModel import RateLimitModel
+from utils.RateLimiter import SlidingWindowRateLimiter, normalize_phone
+from utils.client_ip import resolve_client_ip
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_sliding_window_per_ip_and_phone():
+    print("⏱️ Testing sliding window per IP dan per nomor HP...")
+    clock = FakeClock()
+    limiter = SlidingWindowRateLimiter(limits={'ip': (3, 60), 'phone': (2, 60)}, clock=clock)
+
+    for _ in range(2):
+        assert limiter.allow(ip='10.0.0.1', phone='0812')[0]
+        limiter.record(ip='10.0.0.1', phone='0812')
+
+    assert limiter.allow(ip='10.0.0.1', phone='0812') == (False, 'phone')
+    assert limiter.allow(ip='10.0.0.1', phone='0899')[0]
+    limiter.record(ip='10.0.0.1', phone='0899')
+    assert limiter.allow(ip='10.0.0.1') == (False, 'ip')
+
+    clock.now += 61
+    assert limiter.allow(ip='10.0.0.1', phone='0812')[0]
+    print("✅ Window bergeser dan limit terbuka kembali")
+
+
+def test_limits_survive_restart():
+    print("💾 Testing persistensi window ke SQLite...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RateLimitModel(os.path.join(tmp, 'limits.db'))
+        clock = FakeClock()
+        limiter = SlidingWindowRateLimiter(model, limits={'ip': (2, 60)}, clock=clock)
+        limiter.record(ip='10.0.0.2')
+        limiter.record(ip='10.0.0.2')
+
+        restarted = SlidingWindowRateLimiter(model, limits={'ip': (2, 60)}, clock=clock)
+        assert restarted.count('ip', '10.0.0.2') == 2
+        assert not restarted.allow(ip='10.0.0.2')[0]
+    print("✅ Window dipulihkan setelah restart")
+
+
+def test_concurrent_submits_cannot_both_pass():
+    print("🔒 Testing cek + catat atomic untuk submit paralel...")
+    with tempfile.TemporaryDirectory() as tmp:
+        model = RateLimitModel(os.path.join(tmp, 'limits.db'))
+        limiter = SlidingWindowRateLimiter(model, limits={'ip': (3, 60), 'phone': (3, 60)}, clock=FakeClock())
+        barrier = threading.Barrier(16)
+        results = []
+
+        def submit():
+            barrier.wait()
+            results.append(limiter.allow_and_record(ip='10.0.0.3', phone='0812'))
+
+        threads = [threading.Thread(target=submit) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        granted = [ts for allowed, _, ts in results if allowed]
+        assert len(granted) == 3 and limiter.count('ip', '10.0.0.3') == 3
+        assert all(scope == 'ip' for allowed, scope, _ in results if not allowed)
+
+        # Submit yang gagal disimpan mengembalikan slotnya (memori dan SQLite)
+        limiter.release(granted[0], ip='10.0.0.3', phone='0812')
+        assert limiter.allow(ip='10.0.0.3', phone='0812')[0]
+        restarted = SlidingWindowRateLimiter(model, limits={'ip': (3, 60), 'phone': (3, 60)}, clock=FakeClock())
+        assert restarted.count('ip', '10.0.0.3') == 2 and restarted.count('phone', '0812') == 2
+    print("✅ Tepat 3 dari 16 submit paralel lolos")
+
+
+def test_client_ip_from_proxy_headers():
+    print("🌐 Testing X-Forwarded-For parsing...")
+    headers = {'X-Forwarded-For': '6.6.6.6, 203.0.113.7'}
+    assert resolve_client_ip(headers, trusted_proxies=1) == '203.0.113.7'
+    assert resolve_client_ip({'X-Real-Ip': '198.51.100.4'}, remote_ip='127.0.0.1') == '198.51.100.4'
+    assert resolve_client_ip({'X-Forwarded-For': 'garbage'}) is None
+    assert resolve_client_ip({'X-Forwarded-For': 'garbage'}, remote_ip='198.51.100.8') == '198.51.100.8'
+    assert normalize_phone('+62 812-3456-7890') == '081234567890'
+    print("✅ IP klien asli terdeteksi")
+
+
+def test_spoofed_real_ip_without_proxy():
+    print("🕵️ Testing X-Real-Ip palsu tanpa X-Forwarded-For...")
+    # Peer bukan proxy terpercaya: header dari klien sendiri, tiap submit beda nilai
+    for spoofed in ('1.1.1.1', '2.2.2.2', '3.3.3.3'):
+        headers = {'X-Real-Ip': spoofed}
+        assert resolve_client_ip(headers, remote_ip='198.51.100.23') == '198.51.100.23'
+    assert resolve_client_ip({'X-Real-Ip': '1.1.1.1'}, remote_ip=None) is None
+    assert resolve_client_ip({'X-Real-Ip': '1.1.1.1'}, remote_ip='10.0.0.2',
+                             proxy_networks=('10.0.0.0/8',)) == '1.1.1.1'
+    print("✅ Alamat peer dipakai, kunci rate limit tidak bisa diganti klien")
+
+
+def test_unresolved_ip_is_not_cached():
+    print("🔁 Testing IP gagal terdeteksi tidak disimpan di sesi...")
+    import streamlit as st
+    import controllers.FloodReportController as module
+
+    answers = iter([None, '203.0.113.9', '198.51.100.1'])
+    original = module.resolve_request_ip
+    module.resolve_request_ip = lambda: next(answers)
+    try:
+        st.session_state.pop('user_ip', None)
+        controller = module.FloodReportController.__new__(module.FloodReportController)
+        assert controller.get_client_ip() == "unknown"
+        assert 'user_ip' not in st.session_state
+        assert controller.get_client_ip() == '203.0.113.9'
+        # IP yang berhasil tetap di-cache per sesi
+        assert controller.get_client_ip() == '203.0.113.9'
+    finally:
+        module.resolve_request_ip = original
+        st.session_state.pop('user_ip', None)
+    print("✅ Resolusi dicoba lagi pada submit berikutnya")
+
+
+if __name__ == "__main__":
+    test_sliding_window_per_ip_and_phone()
+    test_limits_survive_restart()
+    test_concurrent_submits_cannot_both_pass()
+    test_client_ip_from_proxy_headers()
+    test_spoofed_real_ip_without_proxy()
+    test_unresolved_ip_is_not_cached()
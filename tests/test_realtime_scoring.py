@@ -0,0 +1,133 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+import controllers.RealTimeDataController as realtime
+from controllers.RealTimeDataController import RealTimeDataController, FALLBACK_READINGS
+from model_ann import predict_flood_ann
+from gumbel_distribution import predict_flood_gumbel
+from utils.RiseTracker import RiseTracker
+from utils.FeatureImputer import FeatureImputer, FEATURE_DEFAULTS, OBSERVED, CARRIED, NETWORK, DEFAULT
+from utils.StationPoller import StationPoller
+
+
+def _controller():
+    # Poller tanpa thread: test ini hanya memakai tahap scoring
+    return RealTimeDataController(poller=StationPoller(fetch=lambda: {}, interval=60), rise_tracker=RiseTracker())
+
+
+def test_imputer_order():
+    print("🧩 Testing urutan imputasi kelembapan/suhu...")
+    imputer = FeatureImputer(max_age=3600)
+    stations = ['A', 'B', 'C']
+
+    values, sources = imputer.impute('humidity', stations, [np.nan] * 3, now=0)
+    assert list(values) == [FEATURE_DEFAULTS['humidity']] * 3 and list(sources) == [DEFAULT] * 3
+
+    values, sources = imputer.impute('humidity', stations, [70.0, 90.0, np.nan], now=100)
+    assert list(sources) == [OBSERVED, OBSERVED, NETWORK] and values[2] == 80.0
+
+    values, sources = imputer.impute('humidity', stations, [np.nan, np.nan, 60.0], now=200)
+    assert list(sources) == [CARRIED, CARRIED, OBSERVED] and list(values) == [70.0, 90.0, 60.0]
+
+    # Nilai terakhir kedaluwarsa -> median stasiun terukur
+    values, sources = imputer.impute('humidity', stations, [np.nan, np.nan, 50.0], now=5000)
+    assert list(sources) == [NETWORK, NETWORK, OBSERVED] and list(values) == [50.0] * 3
+    assert imputer.stats[CARRIED] == 2
+    print("✅ terukur -> terakhir -> median jaringan -> default")
+
+
+def test_batch_matches_scalar_predictions():
+    print("🧮 Testing scoring batch sama dengan prediksi per pos...")
+    predictions = _controller().get_fallback_predictions()
+    assert [p['location'] for p in predictions] == [r['location'] for r in FALLBACK_READINGS]
+    for prediction in predictions:
+        ann = predict_flood_ann(prediction['rainfall_mm'], prediction['water_level_mdpl'],
+                                prediction['humidity'], prediction['temperature'])
+        gumbel = predict_flood_gumbel(prediction['rainfall_mm'])
+        assert abs(prediction['ann_risk'] - ann['risk_level']) <= 1e-3
+        assert prediction['ann_status'] == ann['status']
+        assert prediction['ann_message'] == f"Prediksi ANN: {ann['message']}"
+        assert abs(prediction['gumbel_risk'] - gumbel['risk_level']) <= 1e-3
+        assert prediction['gumbel_status'] == gumbel['status']
+        assert prediction['gumbel_message'] == gumbel['message']
+        assert prediction['imputed_features'] == ['humidity', 'temperature']
+    print(f"✅ {len(predictions)} pos fallback di-score model, bukan angka tetap")
+
+
+def test_one_model_call_per_refresh():
+    print("📦 Testing satu panggilan model per refresh...")
+    calls = {'ann': 0, 'gumbel': 0}
+    ann_batch, gumbel_batch = realtime.predict_flood_ann_batch, realtime.predict_flood_gumbel_batch
+
+    def count_ann(X, *args, **kwargs):
+        calls['ann'] += 1
+        return ann_batch(X, *args, **kwargs)
+
+    def count_gumbel(rainfall, *args, **kwargs):
+        calls['gumbel'] += 1
+        return gumbel_batch(rainfall, *args, **kwargs)
+
+    rng = np.random.default_rng(0)
+    water = [{'location': f'Pos{i} (S. x)', 'water_level_mdpl': float(rng.uniform(60, 150)),
+              'last_update': '06:00', 'humidity': 85.0 if i % 2 else None} for i in range(300)]
+    water.append({'location': 'Jurug', 'water_level_mdpl': None, 'last_update': '06:00'})
+    rain = [{'location': f'Pos{i}', 'rainfall_mm': float(i % 50)} for i in range(300)]
+
+    realtime.predict_flood_ann_batch, realtime.predict_flood_gumbel_batch = count_ann, count_gumbel
+    try:
+        predictions = _controller().score_readings(water, rain, now=0)
+    finally:
+        realtime.predict_flood_ann_batch, realtime.predict_flood_gumbel_batch = ann_batch, gumbel_batch
+
+    assert calls == {'ann': 1, 'gumbel': 1}
+    assert len(predictions) == 300
+    assert predictions[7]['rainfall_mm'] == 7.0 and predictions[7]['humidity'] == 85.0
+    assert predictions[8]['imputed_features'] == ['humidity', 'temperature']
+    assert predictions[7]['imputed_features'] == ['temperature']
+    print("✅ 300 pos: 1 panggilan ANN, 1 panggilan Gumbel")
+
+
+def test_snapshot_cache_follows_active_model_versions():
+    print("🔄 Testing cache prediksi snapshot ikut versi model aktif...")
+
+    class Registry:
+        active = {'ann': 'v2.0-rule', 'gumbel': 'v1.0'}
+
+        def active_version_name(self, model_name):
+            return self.active[model_name]
+
+    class Snapshot:
+        version = 7
+        fetched_at = {'tma': 0}
+        water_levels = FALLBACK_READINGS
+        rainfall = ()
+
+    controller = _controller()
+    scored = []
+    controller.score_readings = lambda *args: scored.append(args) or [len(scored)]
+    registry = Registry()
+    original, realtime._predictions_cache = realtime.get_model_registry, (None, None)
+    realtime.get_model_registry = lambda: registry
+    try:
+        assert controller.get_snapshot_predictions(Snapshot()) == [1]
+        assert controller.get_snapshot_predictions(Snapshot()) == [1]
+        registry.active['ann'] = 'v3.0-mlp'
+        assert controller.get_snapshot_predictions(Snapshot()) == [2]
+        registry.active['gumbel'] = 'v2.0'
+        assert controller.get_snapshot_predictions(Snapshot()) == [3]
+        assert controller.get_snapshot_predictions(Snapshot()) == [3]
+    finally:
+        realtime.get_model_registry, realtime._predictions_cache = original, (None, None)
+    assert len(scored) == 3
+    print("✅ Promosi versi ANN/Gumbel memicu scoring ulang snapshot yang sama")
+
+
+if __name__ == "__main__":
+    test_imputer_order()
+    test_batch_matches_scalar_predictions()
+    test_one_model_call_per_refresh()
+    test_snapshot_cache_follows_active_model_versions()
@@ -0,0 +1,114 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from controllers.RealTimeDataController import RealTimeDataController
+from utils.RiseTracker import (
+    RiseTracker, StationWindow, WINDOWS, SLOPE_WINDOW, MIN_COVERAGE,
+    TREND_RAPID, TREND_RISING, TREND_STEADY, TREND_FALLING
+)
+from utils.StationPoller import StationPoller
+
+
+def _irregular_series(n=3000, seed=0):
+    """Cadence 1-10 menit dengan beberapa celah panjang"""
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([60, 60, 60, 120, 600], size=n).astype(float)
+    steps[rng.choice(n, 5, replace=False)] = 4 * 3600
+    times = 1.7e9 + np.cumsum(steps)
+    values = 120 + np.cumsum(rng.normal(0, 0.02, n))
+    return times, values
+
+
+def _brute_force(times, values, i):
+    """Hitung ulang seluruh jendela pada sampel ke-i (referensi)"""
+    t = times[i]
+    expected = {}
+    in_slope = (times[:i + 1] >= t - SLOPE_WINDOW)
+    x, y = times[:i + 1][in_slope], values[:i + 1][in_slope]
+    if len(x) >= 3 and x[-1] - x[0] >= MIN_COVERAGE * SLOPE_WINDOW:
+        expected['slope_m_per_h'] = np.polyfit((x - x[0]) / 3600.0, y, 1)[0]
+    else:
+        expected['slope_m_per_h'] = None
+    for name, window in WINDOWS:
+        inside = times[:i + 1] >= t - window
+        first = np.flatnonzero(inside)[0]
+        covered = t - times[first] >= MIN_COVERAGE * window
+        expected[f'delta_{name}'] = values[i] - values[first] if covered else None
+        expected[f'max_{name}'] = values[:i + 1][inside].max()
+    return expected
+
+
+def test_incremental_matches_brute_force():
+    print("📈 Testing statistik bergulir vs hitung ulang penuh...")
+    times, values = _irregular_series()
+    window = StationWindow()
+    checked = 0
+    for i, (t, y) in enumerate(zip(times, values)):
+        assert window.update(t, y)
+        if i % 37:
+            continue
+        features = window.features()
+        expected = _brute_force(times, values, i)
+        for key, value in expected.items():
+            if value is None:
+                assert features[key] is None, (i, key)
+            else:
+                assert abs(features[key] - value) < 1e-3, (i, key, features[key], value)
+        checked += 1
+    print(f"✅ {checked} titik cocok (termasuk celah 4 jam dan rebase harian)")
+
+
+def test_ring_buffer_capacity_and_ordering():
+    print("🔁 Testing kapasitas ring buffer dan urutan waktu...")
+    window = StationWindow(capacity=16)
+    for k in range(100):
+        window.update(60.0 * k, float(k % 7))
+    # Hanya 16 sampel terakhir tersimpan: jendela terpotong, tetap konsisten
+    features = window.features()
+    assert features['value'] == 99 % 7 and features['max_6h'] == 6.0
+    assert window.count - window.starts[-1] <= 16
+    assert not window.update(60.0 * 50, 1.0)
+    assert not window.update(60.0 * 200, float('nan'))
+    print("✅ Sampel lama ditimpa, pembacaan mundur/NaN diabaikan")
+
+
+def test_trend_labels_and_status_escalation():
+    print("🚨 Testing tren dan kenaikan status...")
+    tracker = RiseTracker()
+    for minute in range(0, 61, 10):
+        t = 1.7e9 + minute * 60
+        tracker.update('rapid', t, 100 + 0.5 * minute / 60)
+        tracker.update('rising', t, 100 + 0.15 * minute / 60)
+        tracker.update('steady', t, 100.0)
+        tracker.update('falling', t, 100 - 0.2 * minute / 60)
+    assert tracker.features('rapid')['trend'] == TREND_RAPID
+    assert tracker.features('rising')['trend'] == TREND_RISING
+    assert tracker.features('steady')['trend'] == TREND_STEADY
+    assert tracker.features('falling')['trend'] == TREND_FALLING
+    assert abs(tracker.features('rapid')['delta_1h'] - 0.5) < 1e-9
+    assert tracker.features('rapid', now=1.7e9 + 7 * 3600 + 1) is None
+
+    # Rise tracker memakai kunci stasiun kanonik, sama dengan controller
+    tracker = RiseTracker()
+    controller = RealTimeDataController(poller=StationPoller(fetch=lambda: {}, interval=60), rise_tracker=tracker)
+    tracker.station_key = controller.registry.station_key
+    for minute in range(0, 61, 10):
+        tracker.update('Colo Weir (S. bengawan solo)', 1.7e9 + minute * 60, 100 + 0.6 * minute / 60)
+    water = [{'location': 'Colo Weir (S. bengawan solo)', 'water_level_mdpl': 100.6, 'last_update': '06:00'},
+             {'location': 'Jurug', 'water_level_mdpl': 90.0, 'last_update': '06:00'}]
+    colo, jurug = controller.score_readings(water, (), now=1.7e9 + 3600)
+    assert colo['trend'] == TREND_RAPID and abs(colo['rise_rate_m_per_h'] - 0.6) < 1e-6
+    order = ['RENDAH', 'MENENGAH', 'TINGGI']
+    assert order.index(colo['effective_status']) == min(order.index(colo['ann_status']) + 1, 2)
+    assert jurug['trend'] is None and jurug['effective_status'] == jurug['ann_status']
+    print("✅ Air naik cepat menaikkan status satu tingkat")
+
+
+if __name__ == "__main__":
+    test_incremental_matches_brute_force()
+    test_ring_buffer_capacity_and_ordering()
+    test_trend_labels_and_status_escalation()
@@ -0,0 +1,181 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.StationPoller import StationPoller, StationSnapshot, FRESH, STALE, EXPIRED
+
+WATER = [{'location': 'Ngadipiro (S. keduang)', 'water_level_mdpl': 143.74, 'last_update': '06:00', 'status': 'RENDAH'}]
+RAIN = [{'location': 'Ngadipiro', 'rainfall_mm': 45.5, 'last_update': '06:00'}]
+
+
+class FakeFetch:
+    """Pengganti BBWSScraper.fetch_all: lambat, bisa dibuat gagal per sumber"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.fail = set()
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        with self.lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        errors = {f'/{name}': 'timeout' for name in self.fail}
+        return {
+            'water_levels': [] if 'water_levels' in self.fail else list(WATER),
+            'rainfall': [] if 'rainfall' in self.fail else list(RAIN),
+            'errors': errors,
+            'latency': self.delay
+        }
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_get_never_blocks_on_upstream():
+    print("⏱️ Testing pembaca tidak menunggu upstream...")
+    fetch = FakeFetch(delay=0.5)
+    poller = StationPoller(fetch=fetch, interval=60, seed=1)
+    try:
+        start = time.perf_counter()
+        snapshot, freshness = poller.get()
+        elapsed = time.perf_counter() - start
+        assert snapshot is None and freshness == EXPIRED
+        assert elapsed < 0.1, elapsed
+
+        assert _wait_for(lambda: poller.get()[0] is not None)
+        snapshot, freshness = poller.get()
+        assert freshness == FRESH and snapshot.version == 1
+        assert snapshot.water_levels[0]['water_level_mdpl'] == 143.74
+    finally:
+        poller.stop()
+    print(f"✅ get() {elapsed * 1000:.1f} ms saat fetch butuh 500 ms")
+
+
+def test_snapshot_is_immutable():
+    print("🧊 Testing snapshot immutable...")
+    source = [dict(WATER[0])]
+    snapshot = StationSnapshot(source, RAIN, {'water_levels': time.time(), 'rainfall': time.time()}, 1)
+    source[0]['water_level_mdpl'] = 0.0
+    assert snapshot.water_levels[0]['water_level_mdpl'] == 143.74
+    for mutate in (
+        lambda: setattr(snapshot, 'version', 2),
+        lambda: snapshot.water_levels[0].__setitem__('water_level_mdpl', 1.0),
+        lambda: snapshot.water_levels.append({})
+    ):
+        try:
+            mutate()
+        except (AttributeError, TypeError):
+            continue
+        raise AssertionError("snapshot bisa diubah")
+    print("✅ Snapshot tidak bisa diubah pembaca")
+
+
+def test_freshness_and_revalidation():
+    print("♻️ Testing stale-while-revalidate...")
+    fetch = FakeFetch()
+    poller = StationPoller(fetch=fetch, interval=100, min_gap=0.05, seed=2)
+    now = time.time()
+    snapshot = StationSnapshot(WATER, RAIN, {'water_levels': now - 100, 'rainfall': now - 10}, 1)
+    assert poller.freshness(snapshot, now) == FRESH
+    snapshot = StationSnapshot(WATER, RAIN, {'water_levels': now - 400, 'rainfall': now}, 1)
+    assert poller.freshness(snapshot, now) == STALE
+    snapshot = StationSnapshot(WATER, RAIN, {'water_levels': now - 700, 'rainfall': now}, 1)
+    assert poller.freshness(snapshot, now) == EXPIRED
+
+    try:
+        poller.start()
+        assert _wait_for(lambda: fetch.calls == 1)
+        # Snapshot dibuat basi: pembaca tetap dilayani, poll ulang dipicu
+        poller._snapshot = snapshot
+        served, freshness = poller.get()
+        assert served is snapshot and freshness == EXPIRED
+        assert _wait_for(lambda: fetch.calls == 2)
+        assert _wait_for(lambda: poller.get()[1] == FRESH)
+        assert poller.stats['revalidations'] >= 1
+    finally:
+        poller.stop()
+    print(f"✅ Revalidasi tanpa menunggu interval 100 s ({poller.stats['polls']} poll)")
+
+
+def test_failed_source_keeps_previous_data():
+    print("🛟 Testing sumber gagal mempertahankan data sebelumnya...")
+    fetch = FakeFetch()
+    poller = StationPoller(fetch=fetch, interval=60, seed=3)
+    assert poller.poll_once() is True
+    first = poller._snapshot
+
+    fetch.fail = {'rainfall'}
+    assert poller.poll_once() is False
+    second = poller._snapshot
+    assert second.version == 2 and second.rainfall == first.rainfall
+    assert second.fetched_at['rainfall'] == first.fetched_at['rainfall']
+    assert second.fetched_at['water_levels'] >= first.fetched_at['water_levels']
+    assert '/rainfall' in second.errors
+
+    fetch.fail = {'water_levels', 'rainfall'}
+    assert poller.poll_once() is False
+    assert poller._snapshot is second and poller.stats['failures'] == 2
+    print("✅ Snapshot lama tetap disajikan saat BBWS gagal")
+
+
+def test_jitter_bounds():
+    print("🎲 Testing jitter interval...")
+    poller = StationPoller(fetch=FakeFetch(), interval=300, jitter=0.1, seed=4)
+    delays = [poller._next_delay(False) for _ in range(1000)]
+    assert 270 <= min(delays) and max(delays) <= 330
+    assert max(delays) - min(delays) > 30
+    retries = [poller._next_delay(True) for _ in range(100)]
+    assert max(retries) <= 33 and min(retries) >= poller.min_gap
+    print(f"✅ Interval {min(delays):.1f}-{max(delays):.1f} s, retry <= {max(retries):.1f} s")
+
+
+def test_many_readers_single_poll():
+    print("👥 Testing banyak sesi, satu poll upstream...")
+    from controllers.RealTimeDataController import RealTimeDataController
+    from utils.RiseTracker import RiseTracker
+
+    fetch = FakeFetch(delay=0.05)
+    poller = StationPoller(fetch=fetch, interval=60, seed=5)
+    tracker = RiseTracker()
+    try:
+        poller.start()
+        assert _wait_for(lambda: poller.get()[0] is not None)
+
+        results = []
+        def session():
+            results.append(RealTimeDataController(poller=poller, rise_tracker=tracker).get_comprehensive_data())
+        threads = [threading.Thread(target=session) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        poller.stop()
+
+    assert fetch.calls == 1, fetch.calls
+    assert len(results) == 50
+    prediction = results[0][0]
+    assert prediction['location'] == 'Ngadipiro (S. keduang)'
+    assert prediction['rainfall_mm'] == 45.5 and prediction['data_freshness'] == FRESH
+    assert all(result == results[0] for result in results)
+    print(f"✅ 50 sesi, {fetch.calls} fetch upstream")
+
+
+if __name__ == "__main__":
+    test_get_never_blocks_on_upstream()
+    test_snapshot_is_immutable()
+    test_freshness_and_revalidation()
+    test_failed_source_keeps_previous_data()
+    test_jitter_bounds()
+    test_many_readers_single_poll()
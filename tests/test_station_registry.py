@@ -0,0 +1,98 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bbws_fixture_server import FIXTURE_DIR
+from models.StationAliasModel import StationAliasModel
+from utils.BBWSTableParser import parse_station_columns
+from utils.StationRegistry import StationRegistry, normalize_name, name_key
+
+
+def _fixture(name):
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+def _alias_model():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    return StationAliasModel(db_path=path), path
+
+
+def test_normalization():
+    print("🔤 Testing normalisasi nama pos...")
+    assert normalize_name('Ngadipiro (S. keduang)') == (('ngadipiro',), ('keduang',))
+    assert name_key('Waduk Wonogiri') == name_key('Wonogiri Dam (Spillway)') == 'wonogiri'
+    assert name_key('PCH  Colo-Hulu') == 'colo hulu' == name_key('Hulu Colo')
+    assert name_key('Bendung') == 'bendung'
+    print("✅ Token inti, petunjuk sungai, stopword")
+
+
+def test_join_fixture_feeds():
+    print("🔗 Testing join feed /tma dan /ch per stasiun...")
+    registry = StationRegistry()
+    water = parse_station_columns(_fixture('tma.html'), 'water_level_mdpl', backend='python').to_rows()
+    rain = parse_station_columns(_fixture('ch.html'), 'rainfall_mm', backend='python').to_rows()
+
+    rain_by_station = {registry.station_key(row['location']): row['rainfall_mm'] for row in rain}
+    joined = {registry.station_key(row['location']): rain_by_station.get(registry.station_key(row['location']))
+              for row in water}
+    assert joined == {'ngadipiro': 45.5, 'wonogiri-dam': 32.0, 'colo-weir': 28.5}
+    assert registry.resolve('Jurug').river == 'Bengawan Solo'
+    assert registry.is_same_station('Colo Weir (S. bengawan solo)', 'Colo')
+    assert not registry.is_same_station('Colo', 'Jurug')
+
+    # Refresh berikutnya: semua nama dari memo, tanpa pencocokan ulang
+    before = dict(registry.stats)
+    for row in water + rain:
+        registry.station_key(row['location'])
+    assert registry.stats['exact'] == before['exact'] and registry.stats['fuzzy'] == before['fuzzy']
+    print(f"✅ {len(joined)} pos tergabung, statistik {registry.stats}")
+
+
+def test_fuzzy_match_learns_persistent_alias():
+    print("🧠 Testing alias hasil fuzzy match tersimpan...")
+    model, path = _alias_model()
+    try:
+        registry = StationRegistry(alias_model=model)
+        assert registry.resolve('PCH Ngadipiroo').id == 'ngadipiro'
+        assert registry.resolve('Bojonegor (Bengawan Solo)').id == 'bojonegoro'
+        assert registry.resolve('Kajangan') is None
+        assert registry.station_key('Kajangan') == 'kajangan'
+        assert registry.stats['fuzzy'] == 2
+        aliases = {row['alias_key']: row['station_id'] for row in model.get_all_aliases()}
+        assert aliases == {'ngadipiroo': 'ngadipiro', 'bojonegor': 'bojonegoro'}
+
+        # Start berikutnya: alias langsung cocok exact
+        reloaded = StationRegistry(alias_model=StationAliasModel(db_path=path))
+        assert reloaded.resolve('Ngadipiroo').id == 'ngadipiro'
+        assert reloaded.stats == {'exact': 1, 'fuzzy': 0, 'unmatched': 0, 'cached': 0}
+
+        # Koreksi manual menggantikan alias yang salah
+        reloaded.add_alias('Bojonegor', 'babat')
+        assert reloaded.resolve('Bojonegor').id == 'babat'
+        assert reloaded.resolve('Bojonegoro').id == 'bojonegoro'
+    finally:
+        os.remove(path)
+    print("✅ Alias dimuat ulang dari database")
+
+
+def test_ambiguous_names_rejected():
+    print("⚖️ Testing nama ambigu tidak dipaksa cocok...")
+    registry = StationRegistry(stations=(
+        {'id': 'colo-hulu', 'name': 'Colo Hulu'},
+        {'id': 'colo-hilir', 'name': 'Colo Hilir'}
+    ))
+    assert registry.resolve('Colo') is None
+    assert registry.resolve('Colo Hulu').id == 'colo-hulu'
+    assert registry.resolve('Colo Hilr').id == 'colo-hilir'
+    print("✅ Kandidat dengan selisih skor kecil ditolak")
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_join_fixture_feeds()
+    test_fuzzy_match_learns_persistent_alias()
+    test_ambiguous_names_rejected()
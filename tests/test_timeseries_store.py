@@ -0,0 +1,181 @@
+import datetime
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.StationPoller import StationSnapshot
+from utils.TimeSeriesStore import (
+    TimeSeriesStore, WIB, aggregate_buckets, reading_time, station_slug
+)
+
+# 2024-01-31 00:00 WIB, 10 menit sekali selama 2 hari (melewati batas bulan)
+START = int(datetime.datetime(2024, 1, 31, tzinfo=WIB).timestamp())
+STEP = 600
+
+
+def _series(n=288, seed=0):
+    rng = np.random.default_rng(seed)
+    times = START + STEP * np.arange(n, dtype=np.int64)
+    water = 120 + np.cumsum(rng.normal(0, 0.05, n))
+    rain = np.clip(rng.gamma(0.3, 3.0, n), 0, None)
+    return times, water, rain
+
+
+def _make_store():
+    return TimeSeriesStore(tempfile.mkdtemp(prefix='ts_store_'))
+
+
+def test_append_and_range_query():
+    print("🗄️ Testing append + query rentang waktu...")
+    store = _make_store()
+    try:
+        times, water, rain = _series()
+        assert store.append('Ngadipiro (S. keduang)', times, water, rain) == len(times)
+        slug = station_slug('Ngadipiro (S. keduang)')
+        assert sorted(os.listdir(os.path.join(store.root, slug))) == ['2024-01.bin', '2024-02.bin', 'index.json']
+        assert store.time_range('Ngadipiro (S. keduang)') == (int(times[0]), int(times[-1]))
+
+        # Rentang setengah terbuka [start, end) melintasi dua segmen
+        start, end = int(times[100]), int(times[200])
+        rows = store.query('Ngadipiro (S. keduang)', start, end)
+        assert np.array_equal(rows['time'], times[100:200])
+        assert np.allclose(rows['water_level_mdpl'], water[100:200].astype(np.float32))
+        assert rows['rainfall_mm'].dtype == np.float32
+
+        # Batas di antara dua pembacaan, di luar data, dan stasiun tidak dikenal
+        rows = store.query('Ngadipiro (S. keduang)', start + 1, start + STEP + 1)
+        assert list(rows['time']) == [times[101]]
+        assert len(store.query('Ngadipiro (S. keduang)', 0, int(times[0]))['time']) == 0
+        assert len(store.query('Jurug', None, None)['time']) == 0
+        assert store.latest('Ngadipiro (S. keduang)')['time'] == times[-1]
+
+        # Data bertahan setelah store dibuka ulang
+        reopened = TimeSeriesStore(store.root)
+        assert np.array_equal(reopened.query('Ngadipiro (S. keduang)')['time'], times)
+        assert reopened.stations() == [slug]
+    finally:
+        shutil.rmtree(store.root)
+    print("✅ Query dua segmen bulanan sesuai")
+
+
+def test_duplicates_and_late_readings():
+    print("🔁 Testing pembacaan ganda dan terlambat...")
+    store = _make_store()
+    try:
+        times, water, rain = _series()
+        store.append('Colo', times[:150], water[:150])
+        # Poll berulang dengan data sama tidak menambah baris
+        assert store.append('Colo', times[140:150], water[140:150]) == 0
+        # Data terlambat di tengah segmen: digabung dan tetap terurut
+        late = np.array([times[10] + 60, times[150]], dtype=np.int64)
+        assert store.append('Colo', late, [1.0, 2.0]) == 2
+        rows = store.query('Colo')
+        assert len(rows['time']) == 152 and np.all(np.diff(rows['time']) > 0)
+        assert rows['water_level_mdpl'][11] == 1.0 and np.isnan(rows['rainfall_mm']).all()
+    finally:
+        shutil.rmtree(store.root)
+    print("✅ Append idempoten, data susulan tersisip terurut")
+
+
+def test_repeated_poll_skips_rewrite():
+    print("🔂 Testing poll berulang tanpa baca segmen / tulis index...")
+    store = _make_store()
+    writes = []
+    write_index = store._write_index
+    store._write_index = lambda slug, index: writes.append(slug) or write_index(slug, index)
+    fromfile = np.fromfile
+    try:
+        times, water, _ = _series(100)
+        store.append('Jurug', times[:50], water[:50])
+        assert writes == ['jurug']
+
+        def no_fromfile(*args, **kwargs):
+            raise AssertionError('segmen dibaca penuh')
+        np.fromfile = no_fromfile
+        # Pembacaan terakhir yang sama terulang: tidak ada baris, tidak ada tulis index
+        assert store.append('Jurug', times[49:50], water[49:50]) == 0
+        assert store.append('Jurug', times[40:50], water[40:50]) == 0
+        assert writes == ['jurug']
+        # Ulangan + pembacaan baru: jalur append biasa, bukan gabung segmen
+        assert store.append('Jurug', times[49:52], water[49:52]) == 2
+        assert writes == ['jurug', 'jurug']
+        np.fromfile = fromfile
+
+        rows = store.query('Jurug')
+        assert len(rows['time']) == 52 and np.all(np.diff(rows['time']) > 0)
+        assert store.time_range('Jurug') == (int(times[0]), int(times[51]))
+    finally:
+        np.fromfile = fromfile
+        shutil.rmtree(store.root)
+    print("✅ Waktu yang sudah ada dibuang lewat searchsorted, index hanya ditulis jika ada baris baru")
+
+
+def test_vectorized_downsampling():
+    print("📉 Testing downsample per jam dan maksimum harian...")
+    store = _make_store()
+    try:
+        times, water, rain = _series()
+        water[5] = np.nan
+        store.append('Wonogiri Dam', times, water, rain)
+
+        hours, hourly = store.resample('Wonogiri Dam', freq='1h', how='mean')
+        assert len(hours) == 48 and np.all(np.diff(hours) == 3600)
+        stored = water.astype(np.float32).astype(np.float64)
+        expected = [np.nanmean(stored[i * 6:(i + 1) * 6]) for i in range(48)]
+        assert np.allclose(hourly, expected)
+
+        days, daily_max = store.resample('Wonogiri Dam', freq='1d', how='max', field='rainfall_mm')
+        assert list(days) == [START, START + 86400]
+        stored_rain = rain.astype(np.float32)
+        assert np.allclose(daily_max, [stored_rain[:144].max(), stored_rain[144:].max()])
+
+        _, daily_sum = store.resample('Wonogiri Dam', freq='1d', how='sum', field='rainfall_mm')
+        assert np.allclose(daily_sum, [stored_rain[:144].sum(), stored_rain[144:].sum()], rtol=1e-5)
+
+        bucket_times, last = aggregate_buckets(
+            np.array([0, 10, 20, 3600], dtype=np.int64), np.array([1.0, 2.0, np.nan, np.nan]), 3600, 'last'
+        )
+        assert list(bucket_times) == [0, 3600] and last[0] == 2.0 and np.isnan(last[1])
+    finally:
+        shutil.rmtree(store.root)
+    print("✅ Resample cocok dengan perhitungan manual")
+
+
+def test_record_snapshot_and_reading_time():
+    print("📥 Testing simpan snapshot poller...")
+    now = datetime.datetime(2024, 3, 1, 6, 30, tzinfo=WIB)
+    assert reading_time('06:00', now) == int(now.replace(minute=0).timestamp())
+    # Jam di masa depan = kemarin; tanpa jam = waktu poll
+    assert reading_time('23:50', now) == int((now - datetime.timedelta(days=1)).replace(hour=23, minute=50).timestamp())
+    assert reading_time(None, now) == int(now.timestamp())
+
+    store = _make_store()
+    try:
+        snapshot = StationSnapshot(
+            [{'location': 'Ngadipiro', 'water_level_mdpl': 143.74, 'last_update': '06:00'},
+             {'location': 'Jurug', 'water_level_mdpl': None, 'last_update': '06:00'}],
+            [{'location': 'Ngadipiro', 'rainfall_mm': 45.5, 'last_update': '06:00'}],
+            {'water_levels': now.timestamp(), 'rainfall': now.timestamp()}, 1
+        )
+        store.record_snapshot(snapshot)
+        store.record_snapshot(snapshot)
+        rows = store.query('Ngadipiro')
+        assert len(rows['time']) == 1
+        assert np.isclose(rows['water_level_mdpl'][0], 143.74) and np.isclose(rows['rainfall_mm'][0], 45.5)
+        assert store.stations() == ['ngadipiro']
+    finally:
+        shutil.rmtree(store.root)
+    print("✅ Snapshot tersimpan sekali per pembacaan")
+
+
+if __name__ == "__main__":
+    test_append_and_range_query()
+    test_duplicates_and_late_readings()
+    test_repeated_poll_skips_rewrite()
+    test_vectorized_downsampling()
+    test_record_snapshot_and_reading_time()
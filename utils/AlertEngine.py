@@ -0,0 +1,310 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from utils.AlertSenders import senders_from_env
+
+# Level alert; indeks sama dengan kode status model (0=RENDAH, 1=MENENGAH, 2=TINGGI)
+LEVEL_LABELS = ('NORMAL', 'MENENGAH', 'TINGGI')
+STATUS_LEVELS = {'RENDAH': 0, 'MENENGAH': 1, 'TINGGI': 2}
+
+# Ambang default = ambang status ANN; level baru turun jika nilai < ambang - hysteresis
+DEFAULT_THRESHOLDS = (0.5, 0.8)
+DEFAULT_HYSTERESIS = 0.05
+# Level harus bertahan di bawah level yang sudah dinotifikasi selama COOLDOWN
+# sebelum episode ditutup; naik lagi dalam rentang itu tidak mengirim ulang
+COOLDOWN = 30 * 60
+# Pengingat jika level tetap tinggi
+REMINDER_INTERVAL = 3 * 3600
+
+BATCH_SIZE = 50
+MAX_BATCHES_PER_DRAIN = 20
+MAX_ATTEMPTS = 5
+RETRY_BACKOFF = 60
+# Worker pengirim: dibangunkan saat ada alert baru di outbox, dan tiap
+# DRAIN_INTERVAL detik untuk pesan yang menunggu retry
+DRAIN_INTERVAL = 30.0
+
+KIND_RAISED = 'naik'
+KIND_REMINDER = 'pengingat'
+KIND_CLEARED = 'pulih'
+
+
+class AlertRule:
+    """Ambang satu stasiun: metrik record prediksi, ambang (MENENGAH, TINGGI), hysteresis"""
+    __slots__ = ('metric', 'thresholds', 'hysteresis', 'status_field')
+
+    def __init__(self, metric='ann_risk', thresholds=DEFAULT_THRESHOLDS, hysteresis=DEFAULT_HYSTERESIS,
+                status_field='effective_status'):
+        self.metric = metric
+        self.thresholds = tuple(float(threshold) for threshold in thresholds)
+        self.hysteresis = float(hysteresis)
+        self.status_field = status_field
+
+    def level(self, record, current_level):
+        """(level baru, nilai metrik) dengan hysteresis terhadap current_level"""
+        value = record.get(self.metric)
+        level = 0
+        if value is not None:
+            level = sum(value >= threshold for threshold in self.thresholds)
+            # Pertahankan level sekarang selama nilai belum turun melewati pita hysteresis
+            for held in range(min(current_level, len(self.thresholds)), level, -1):
+                if value >= self.thresholds[held - 1] - self.hysteresis:
+                    level = held
+                    break
+        if self.status_field:
+            level = max(level, STATUS_LEVELS.get(record.get(self.status_field), 0))
+        return level, value
+
+
+def load_rules(path):
+    """
+    JSON {"default": {...}, "stations": {"<station_id>": {...}}}; isi tiap rule:
+    metric, thresholds, hysteresis, status_field. Return (rule default, {station_id: rule}).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    default = AlertRule(**config['default']) if config.get('default') else AlertRule()
+    stations = {station_id: AlertRule(**rule) for station_id, rule in (config.get('stations') or {}).items()}
+    return default, stations
+
+
+def _new_state(station_id):
+    return {'station_id': station_id, 'level': 0, 'notified_level': 0, 'notified_at': None,
+            'below_since': None, 'last_value': None, 'updated_at': None}
+
+
+class AlertEngine:
+    """
+    Evaluasi ambang per stasiun setelah setiap refresh (satu lintasan, O(stasiun)),
+    dengan hysteresis, cooldown dan pengingat. Stasiun yang berubah pada refresh
+    yang sama digabung per (jenis, level, sub-DAS) menjadi satu pesan, lalu
+    masuk outbox persisten (AlertOutboxModel) untuk setiap channel. drain()
+    mengirim outbox per batch lewat sender yang terpasang, dengan retry backoff;
+    di aplikasi drain() berjalan di thread worker sendiri (start()) sehingga
+    sender yang lambat tidak menahan thread StationPoller.
+    """
+
+    def __init__(self, model, senders=None, default_rule=None, rules=None, cooldown=COOLDOWN,
+                reminder_interval=REMINDER_INTERVAL, batch_size=BATCH_SIZE,
+                max_attempts=MAX_ATTEMPTS, retry_backoff=RETRY_BACKOFF, drain_interval=DRAIN_INTERVAL):
+        self.model = model
+        self.senders = list(senders) if senders is not None else senders_from_env()
+        self.default_rule = default_rule or AlertRule()
+        self.rules = dict(rules or {})
+        self.cooldown = cooldown
+        self.reminder_interval = reminder_interval
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.drain_interval = drain_interval
+        self.states = model.get_states()
+        self._lock = threading.Lock()
+        # Satu drain sekaligus: baris outbox yang sama tidak terkirim dua kali
+        self._drain_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    # ============ EVALUASI ============
+
+    def _transition(self, state, level, now):
+        """Update state (in-place) untuk level baru; return jenis notifikasi atau None"""
+        kind = None
+        if level > state['notified_level']:
+            kind = KIND_RAISED
+            state.update(notified_level=level, notified_at=now, below_since=None)
+        elif level == state['notified_level']:
+            state['below_since'] = None
+            if level > 0 and now - (state['notified_at'] or now) >= self.reminder_interval:
+                kind = KIND_REMINDER
+                state['notified_at'] = now
+        else:
+            state['below_since'] = state['below_since'] or now
+            if now - state['below_since'] >= self.cooldown:
+                if level == 0:
+                    kind = KIND_CLEARED
+                state.update(notified_level=level, notified_at=now, below_since=None)
+        state['level'] = level
+        return kind
+
+    def evaluate(self, predictions, now=None):
+        """Evaluasi semua record prediksi; return list event (jenis, level, record)"""
+        now = time.time() if now is None else now
+        events, changed = [], []
+        with self._lock:
+            for record in predictions:
+                station_id = record.get('station_id') or record['location']
+                state = self.states.get(station_id) or _new_state(station_id)
+                before = (state['level'], state['notified_level'], state['notified_at'], state['below_since'])
+
+                rule = self.rules.get(station_id, self.default_rule)
+                level, value = rule.level(record, state['level'])
+                kind = self._transition(state, level, now)
+                state['last_value'] = value
+
+                if kind is not None:
+                    events.append((kind, LEVEL_LABELS[level if kind != KIND_CLEARED else 0], record))
+                if (state['level'], state['notified_level'], state['notified_at'], state['below_since']) != before:
+                    state['updated_at'] = now
+                    changed.append(state)
+                self.states[station_id] = state
+
+        self.model.save_states(changed)
+        if events:
+            self.enqueue(events, now)
+        return events
+
+    def current_alerts(self):
+        """Stasiun dengan level alert aktif -> {station_id: label level}"""
+        return {station_id: LEVEL_LABELS[state['notified_level']]
+                for station_id, state in self.states.items() if state['notified_level'] > 0}
+
+    # ============ OUTBOX ============
+
+    def _compose(self, kind, level, basin, records):
+        stations = sorted(records, key=lambda record: record.get('location', ''))
+        area = f" ({basin})" if basin else ''
+        if kind == KIND_CLEARED:
+            subject = f"[PULIH] {len(stations)} pos kembali normal{area}"
+        elif kind == KIND_REMINDER:
+            subject = f"[{level}] Masih siaga: {len(stations)} pos{area}"
+        else:
+            subject = f"[{level}] Peringatan banjir: {len(stations)} pos{area}"
+
+        lines = []
+        for record in stations:
+            parts = [f"TMA {record['water_level_mdpl']} mdpl"] if record.get('water_level_mdpl') is not None else []
+            if record.get('ann_risk') is not None:
+                parts.append(f"risiko ANN {record['ann_risk']:.0%}")
+            if record.get('trend'):
+                parts.append(f"tren {record['trend']}")
+            lines.append(f"- {record['location']}: {', '.join(parts)}")
+        payload = [
+            {key: record.get(key) for key in ('station_id', 'location', 'water_level_mdpl', 'rainfall_mm',
+                                              'ann_risk', 'effective_status', 'trend', 'last_update')}
+            for record in stations
+        ]
+        return subject, '\n'.join(lines), payload
+
+    def enqueue(self, events, now):
+        """Gabung event per (jenis, level, sub-DAS) -> satu pesan per channel di outbox"""
+        groups = {}
+        for kind, level, record in events:
+            groups.setdefault((kind, level, record.get('basin')), []).append(record)
+
+        messages = []
+        for (kind, level, basin), records in groups.items():
+            subject, body, payload = self._compose(kind, level, basin, records)
+            station_ids = ','.join(sorted(str(record.get('station_id') or record['location']) for record in records))
+            for sender in self.senders:
+                key = f"{sender.channel}|{kind}|{level}|{basin}|{station_ids}|{int(now // self.cooldown)}"
+                messages.append({
+                    'dedup_key': hashlib.sha1(key.encode('utf-8')).hexdigest(),
+                    'channel': sender.channel, 'kind': kind, 'level': level,
+                    'subject': subject, 'body': body,
+                    'payload': json.dumps(payload, ensure_ascii=False), 'created_at': now
+                })
+        inserted = self.model.enqueue(messages)
+        if inserted:
+            print(f"📮 {inserted} alert masuk outbox ({len(groups)} grup, {len(events)} pos)")
+        return inserted
+
+    def drain(self, now=None):
+        """Kirim pesan outbox yang jatuh tempo, per channel dan per batch"""
+        with self._drain_lock:
+            return self._drain(time.time() if now is None else now)
+
+    def _drain(self, now):
+        result = {'sent': 0, 'failed': 0}
+        for sender in self.senders:
+            for _ in range(MAX_BATCHES_PER_DRAIN):
+                rows = self.model.fetch_due(sender.channel, now, self.batch_size)
+                if not rows:
+                    break
+                try:
+                    errors = sender.send_batch(rows)
+                except Exception as e:
+                    errors = [str(e)] * len(rows)
+
+                sent, failed = [], []
+                for row, error in zip(rows, errors):
+                    if error is None:
+                        sent.append(row['id'])
+                    else:
+                        attempts = row['attempts'] + 1
+                        retry_at = None if attempts >= self.max_attempts \
+                            else now + self.retry_backoff * 2 ** (attempts - 1)
+                        failed.append((row['id'], error, retry_at))
+                self.model.mark_results(sent, failed, now)
+                result['sent'] += len(sent)
+                result['failed'] += len(failed)
+                if failed:
+                    print(f"⚠️ Alert channel {sender.channel}: {len(failed)} gagal ({failed[0][1]})")
+                    break
+        return result
+
+    # ============ WORKER PENGIRIM ============
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='alert-drain', daemon=True)
+                self._thread.start()
+                print(f"✅ Alert drain worker started (interval {self.drain_interval:.0f}s)")
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.drain_interval)
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+            try:
+                self.drain()
+            except Exception as e:
+                print(f"⚠️ Pengiriman alert gagal: {e}")
+
+    def on_snapshot(self, snapshot):
+        """
+        Listener StationPoller: prediksi snapshot baru -> evaluasi -> outbox.
+        Hanya evaluasi/enqueue di thread poller; pengiriman dikerjakan worker.
+        """
+        try:
+            from controllers.RealTimeDataController import RealTimeDataController
+            predictions = RealTimeDataController().get_snapshot_predictions(snapshot)
+            if self.evaluate(predictions):
+                self._wake.set()
+        except Exception as e:
+            print(f"⚠️ Evaluasi alert gagal: {e}")
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_alert_engine():
+    """Engine bersama per proses; ambang per stasiun dari ALERT_RULES_PATH (JSON) jika ada"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            from models.AlertOutboxModel import AlertOutboxModel
+            default_rule, rules = None, None
+            rules_path = os.environ.get('ALERT_RULES_PATH')
+            if rules_path:
+                try:
+                    default_rule, rules = load_rules(rules_path)
+                except Exception as e:
+                    print(f"⚠️ Aturan alert {rules_path} tidak bisa dibaca, pakai default: {e}")
+            _engine = AlertEngine(AlertOutboxModel(), default_rule=default_rule, rules=rules).start()
+        return _engine
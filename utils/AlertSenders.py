@@ -0,0 +1,179 @@
+import json
+import os
+import smtplib
+from email.message import EmailMessage
+
+import requests
+
+SEND_TIMEOUT = (3.05, 10)
+
+
+class AlertSender:
+    """
+    Antarmuka sender outbox: channel (nama unik) dan send_batch(messages) yang
+    mengembalikan list error per pesan (None = terkirim), urutan sama dengan input.
+    Pesan: dict baris alert_outbox (id, subject, body, payload JSON, level, ...).
+    """
+    channel = None
+
+    def send_batch(self, messages):
+        raise NotImplementedError
+
+
+class SmtpSender(AlertSender):
+    """Email lewat SMTP: satu koneksi per batch, satu email per pesan"""
+    channel = 'email'
+
+    def __init__(self, host, port=587, username=None, password=None, sender=None, recipients=(),
+                use_tls=True, timeout=SEND_TIMEOUT[1]):
+        self.host = host
+        self.port = int(port)
+        self.username = username
+        self.password = password
+        self.sender = sender or username
+        self.recipients = list(recipients)
+        self.use_tls = use_tls
+        self.timeout = timeout
+
+    def send_batch(self, messages):
+        try:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        except Exception as e:
+            return [f"SMTP connect: {e}"] * len(messages)
+
+        errors = []
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.username:
+                server.login(self.username, self.password or '')
+            for message in messages:
+                email = EmailMessage()
+                email['Subject'] = message['subject']
+                email['From'] = self.sender
+                email['To'] = ', '.join(self.recipients)
+                email.set_content(message['body'])
+                try:
+                    server.send_message(email)
+                    errors.append(None)
+                except Exception as e:
+                    errors.append(str(e))
+        except Exception as e:
+            errors.extend([str(e)] * (len(messages) - len(errors)))
+        finally:
+            try:
+                server.quit()
+            except Exception:
+                pass
+        return errors
+
+
+class WebhookSender(AlertSender):
+    """POST JSON {'alerts': [...]} sekali per batch; gagal = seluruh batch diulang"""
+    channel = 'webhook'
+
+    def __init__(self, url, session=None, headers=None, timeout=SEND_TIMEOUT):
+        self.url = url
+        self.session = session or requests.Session()
+        self.headers = dict(headers or {})
+        self.timeout = timeout
+
+    def send_batch(self, messages):
+        alerts = [
+            {'id': message['id'], 'level': message['level'], 'kind': message['kind'],
+             'subject': message['subject'], 'body': message['body'],
+             'data': json.loads(message['payload']) if message.get('payload') else None}
+            for message in messages
+        ]
+        try:
+            response = self.session.post(self.url, json={'alerts': alerts}, headers=self.headers,
+                                         timeout=self.timeout)
+            response.raise_for_status()
+            return [None] * len(messages)
+        except Exception as e:
+            return [f"Webhook: {e}"] * len(messages)
+
+
+class WhatsAppGatewaySender(AlertSender):
+    """
+    Gateway WhatsApp HTTP (format umum penyedia lokal): POST form
+    {target, message} dengan header Authorization token, satu request per pesan
+    untuk semua nomor tujuan (dipisah koma).
+    """
+    channel = 'whatsapp'
+
+    def __init__(self, url, token, recipients, session=None, timeout=SEND_TIMEOUT):
+        self.url = url
+        self.token = token
+        self.recipients = list(recipients)
+        self.session = session or requests.Session()
+        self.timeout = timeout
+
+    def send_batch(self, messages):
+        errors = []
+        for message in messages:
+            try:
+                response = self.session.post(
+                    self.url,
+                    data={'target': ','.join(self.recipients), 'message': f"*{message['subject']}*\n{message['body']}"},
+                    headers={'Authorization': self.token},
+                    timeout=self.timeout
+                )
+                response.raise_for_status()
+                errors.append(None)
+            except Exception as e:
+                errors.append(f"WhatsApp: {e}")
+        return errors
+
+
+class MemorySender(AlertSender):
+    """Pengganti lokal untuk test / pengembangan: simpan batch di memori"""
+
+    def __init__(self, channel='memory', fail=False):
+        self.channel = channel
+        self.fail = fail
+        self.batches = []
+
+    @property
+    def messages(self):
+        return [message for batch in self.batches for message in batch]
+
+    def send_batch(self, messages):
+        if self.fail:
+            return [self.fail if isinstance(self.fail, str) else 'gagal (simulasi)'] * len(messages)
+        self.batches.append([dict(message) for message in messages])
+        return [None] * len(messages)
+
+
+class LogSender(AlertSender):
+    """Cetak alert ke log server; dipakai jika tidak ada channel yang dikonfigurasi"""
+    channel = 'log'
+
+    def send_batch(self, messages):
+        for message in messages:
+            print(f"🚨 ALERT [{message['level']}] {message['subject']}\n{message['body']}")
+        return [None] * len(messages)
+
+
+def _split(value):
+    return [item.strip() for item in (value or '').split(',') if item.strip()]
+
+
+def senders_from_env(environ=None):
+    """Sender dari variabel lingkungan ALERT_*; LogSender jika tidak ada yang diatur"""
+    env = os.environ if environ is None else environ
+    senders = []
+    if env.get('ALERT_SMTP_HOST') and env.get('ALERT_EMAIL_TO'):
+        senders.append(SmtpSender(
+            env['ALERT_SMTP_HOST'], env.get('ALERT_SMTP_PORT', 587),
+            env.get('ALERT_SMTP_USER'), env.get('ALERT_SMTP_PASSWORD'),
+            env.get('ALERT_EMAIL_FROM'), _split(env['ALERT_EMAIL_TO']),
+            use_tls=env.get('ALERT_SMTP_TLS', '1') != '0'
+        ))
+    if env.get('ALERT_WEBHOOK_URL'):
+        senders.append(WebhookSender(env['ALERT_WEBHOOK_URL']))
+    if env.get('ALERT_WHATSAPP_URL') and env.get('ALERT_WHATSAPP_TO'):
+        senders.append(WhatsAppGatewaySender(
+            env['ALERT_WHATSAPP_URL'], env.get('ALERT_WHATSAPP_TOKEN', ''), _split(env['ALERT_WHATSAPP_TO'])
+        ))
+    return senders or [LogSender()]
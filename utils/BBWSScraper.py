@@ -1,21 +1,277 @@
 import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 from datetime import datetime
 import streamlit as st
 import re
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
+
+from utils.CircuitBreaker import get_breaker
+from utils.HttpCache import ResponseCache, content_hash
+from utils.BBWSTableParser import parse_number, parse_station_columns, detail_pairs
+
+BBWS_BASE_URL = "https://hidrologi.bbws-bsolo.net"
+WATER_LEVEL_PATH = "/tma"
+RAINFALL_PATH = "/ch"
+LIST_VALUE_FIELDS = {WATER_LEVEL_PATH: 'water_level_mdpl', RAINFALL_PATH: 'rainfall_mm'}
+
+# (connect, read) per halaman; seluruh refresh dibatasi REFRESH_DEADLINE detik
+REQUEST_TIMEOUT = (3.05, 10)
+REFRESH_DEADLINE = 15.0
+MAX_WORKERS = 8
+
+# Nama breaker per endpoint: bbws:<base_url><endpoint>
+BREAKER_PREFIX = 'bbws:'
+
+# Status pos di tabel TMA BBWS -> status dashboard
+STATUS_MAP = {
+    'normal': 'RENDAH',
+    'aman': 'RENDAH',
+    'waspada': 'MENENGAH',
+    'siaga': 'TINGGI',
+    'awas': 'TINGGI'
+}
+
+
+def parse_station_table(html, value_field, backend=None):
+    """
+    Tabel daftar pos (/tma atau /ch) -> list dict per baris:
+    location, value_field, last_update, status (jika ada), detail_path (link pos).
+    Parsing lewat utils/BBWSTableParser (selectolax/lxml jika terpasang).
+    """
+    columns = parse_station_columns(html, value_field, STATUS_MAP, backend)
+    return columns.to_rows() if columns is not None else []
+
+
+def parse_station_detail(html, backend=None):
+    """Halaman detail pos (pasangan th/td) -> dict; elevasi ambang jadi float"""
+    detail = {}
+    for label, text in detail_pairs(html, backend):
+        key = label.lower()
+        for level in ('waspada', 'siaga', 'awas'):
+            if level in key:
+                detail[f'threshold_{level}'] = parse_number(text)
+                break
+        else:
+            detail[re.sub(r'\W+', '_', key).strip('_')] = text
+    return detail
+
+
+def status_from_thresholds(water_level, detail):
+    """Status dari elevasi ambang halaman detail (Siaga/Awas -> TINGGI, Waspada -> MENENGAH)"""
+    if water_level is None:
+        return None
+    siaga = detail.get('threshold_siaga')
+    waspada = detail.get('threshold_waspada')
+    if siaga is not None and water_level >= siaga:
+        return 'TINGGI'
+    if waspada is not None and water_level >= waspada:
+        return 'MENENGAH'
+    if siaga is None and waspada is None:
+        return None
+    return 'RENDAH'
+
 
 class BBWSScraper:
-    def __init__(self):
-        self.base_url = "https://hidrologi.bbws-bsolo.net"
+    def __init__(self, base_url=None, timeout=REQUEST_TIMEOUT, max_workers=MAX_WORKERS, cache=None):
+        # BBWS_BASE_URL dari env: arahkan ke fixture server (tests/bbws_fixture_server.py)
+        self.base_url = (base_url or os.environ.get('BBWS_BASE_URL') or BBWS_BASE_URL).rstrip('/')
+        self.timeout = timeout
+
+        # Satu session dengan pool koneksi seukuran jumlah worker (keep-alive dipakai ulang)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({'User-Agent': 'FloodEarlyWarning/1.0 (+BBWS Bengawan Solo)'})
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bbws')
+
+        # Cache respons di disk (ETag/Last-Modified + hasil parse); cache=False untuk mematikan
+        self.cache = ResponseCache() if cache is None else (cache or None)
+
+        # Link detail yang sudah diketahui: di-request bersamaan dengan /tma dan /ch
+        self._known_details = {WATER_LEVEL_PATH: set(), RAINFALL_PATH: set()}
+        self._lock = threading.Lock()
+        self.last_refresh = None
+    
+    def _breaker(self, path):
+        """Breaker per endpoint: /tma, /ch, dan satu untuk semua halaman detail /tma/detail"""
+        endpoint = '/'.join(path.split('?')[0].split('/')[:3])
+        return get_breaker(f"{BREAKER_PREFIX}{self.base_url}{endpoint}")
+    
+    def _get(self, path, headers=None):
+        """
+        GET lewat circuit breaker endpoint. Error koneksi, timeout dan 5xx dihitung
+        gagal; breaker terbuka -> CircuitOpenError seketika tanpa request.
+        """
+        def request():
+            response = self.session.get(f"{self.base_url}{path}", timeout=self.timeout, headers=headers)
+            if response.status_code >= 500:
+                response.raise_for_status()
+            return response
+        return self._breaker(path).call(request)
+    
+    def fetch_page(self, path):
+        """GET satu halaman; return (html atau None, latency detik, error atau None)"""
+        started = time.perf_counter()
+        try:
+            response = self._get(path)
+            response.raise_for_status()
+            return response.text, time.perf_counter() - started, None
+        except Exception as e:
+            return None, time.perf_counter() - started, str(e)
+    
+    def _parse(self, kind, html):
+        if kind == 'detail':
+            return parse_station_detail(html)
+        return parse_station_table(html, kind)
+    
+    def fetch_parsed(self, path, kind):
+        """
+        GET kondisional + parse satu halaman. kind: 'water_level_mdpl' / 'rainfall_mm'
+        (tabel daftar) atau 'detail'. Return (hasil parse atau None, latency, error, outcome)
+        dengan outcome 'not_modified' (304, hasil parse dari cache), 'unchanged'
+        (isi sama dengan hash tersimpan, parse dilewati) atau 'parsed'.
+        """
+        started = time.perf_counter()
+        url = f"{self.base_url}{path}"
+        try:
+            entry = self.cache.get(url) if self.cache else None
+            headers = self.cache.conditional_headers(entry) if self.cache else {}
+            response = self._get(path, headers=headers)
+
+            if response.status_code == 304 and entry is not None:
+                parsed = self.cache.cached_parse(entry, kind)
+                if parsed is None:
+                    parsed = self._parse(kind, entry['body'])
+                    self.cache.store(url, response.headers, entry['body'], kind, parsed, previous=entry)
+                else:
+                    self.cache.refresh_validators(url, entry, response.headers)
+                return parsed, time.perf_counter() - started, None, 'not_modified'
+
+            response.raise_for_status()
+            html = response.text
+            if entry is not None and entry.get('content_hash') == content_hash(html):
+                parsed = self.cache.cached_parse(entry, kind)
+                if parsed is not None:
+                    self.cache.refresh_validators(url, entry, response.headers)
+                    return parsed, time.perf_counter() - started, None, 'unchanged'
+
+            parsed = self._parse(kind, html)
+            if self.cache:
+                self.cache.store(url, response.headers, html, kind, parsed, previous=entry)
+            return parsed, time.perf_counter() - started, None, 'parsed'
+        except Exception as e:
+            return None, time.perf_counter() - started, str(e), 'error'
+    
+    def fetch_all(self, list_paths=(WATER_LEVEL_PATH, RAINFALL_PATH), deadline=REFRESH_DEADLINE):
+        """
+        Satu refresh paralel: halaman daftar + semua halaman detail pos.
+        Detail yang sudah dikenal dari refresh sebelumnya ikut di gelombang pertama,
+        detail baru di-submit begitu halaman daftarnya selesai, sehingga latensi
+        total ~ halaman paling lambat, bukan jumlah semua halaman.
+        """
+        started = time.perf_counter()
+        futures = {}
+        submitted = set()
+
+        def submit(path, list_path=None):
+            if path in submitted:
+                return None
+            submitted.add(path)
+            kind = 'detail' if list_path else LIST_VALUE_FIELDS[path]
+            future = self._executor.submit(self.fetch_parsed, path, kind)
+            futures[future] = (path, list_path)
+            return future
+
+        with self._lock:
+            known = {list_path: set(self._known_details.get(list_path, ())) for list_path in list_paths}
+        for list_path in list_paths:
+            submit(list_path)
+            for detail_path in known[list_path]:
+                submit(detail_path, list_path)
+
+        details, latency, errors, tables = {}, {}, {}, {}
+        outcomes = {'parsed': 0, 'unchanged': 0, 'not_modified': 0, 'error': 0}
+        pending = set(futures)
+        while pending:
+            remaining = deadline - (time.perf_counter() - started)
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, parent = futures[future]
+                parsed, elapsed, error, outcome = future.result()
+                latency[path] = elapsed
+                outcomes[outcome] += 1
+                if error:
+                    errors[path] = error
+                    continue
+                if parent is not None:
+                    details[path] = parsed
+                else:
+                    tables[path] = parsed
+                    for row in tables[path]:
+                        future = submit(row['detail_path'], path) if row['detail_path'] else None
+                        if future is not None:
+                            pending.add(future)
+
+        for future in pending:
+            path, _ = futures[future]
+            future.cancel()
+            errors[path] = f"timeout (> {deadline:.0f}s)"
+
+        with self._lock:
+            for list_path, rows in tables.items():
+                self._known_details[list_path] = {row['detail_path'] for row in rows if row['detail_path']}
+
+        snapshot = {
+            'water_levels': self._build_records(tables.get(WATER_LEVEL_PATH), details, is_water=True),
+            'rainfall': self._build_records(tables.get(RAINFALL_PATH), details, is_water=False),
+            'fetched_at': datetime.now().isoformat(timespec='seconds'),
+            'latency': time.perf_counter() - started,
+            'page_latency': latency,
+            'errors': errors,
+            'cache': outcomes
+        }
+        self.last_refresh = snapshot
+        return snapshot
+    
+    def _build_records(self, rows, details, is_water):
+        """Baris tabel + detail pos -> format record yang sama dengan get_fallback_*"""
+        if not rows:
+            return []
+        records = []
+        for row in rows:
+            detail = details.get(row['detail_path']) or {}
+            record = {
+                'location': row['location'],
+                'last_update': row['last_update'] or '-',
+                'source': 'BBWS Bengawan Solo'
+            }
+            if is_water:
+                record['water_level_mdpl'] = row['water_level_mdpl']
+                record['status'] = (row.get('status')
+                                    or status_from_thresholds(row['water_level_mdpl'], detail)
+                                    or 'RENDAH')
+            else:
+                record['rainfall_mm'] = row['rainfall_mm']
+            if detail:
+                record['detail'] = dict(detail)
+            records.append(record)
+        return records
     
     def scrape_water_levels(self):
         """Scrape data tinggi muka air dari BBWS Bengawan Solo (/tma)"""
         try:
             st.info("🔄 Mengambil data tinggi air dari BBWS Bengawan Solo...")
-            
-            return self.get_fallback_water_data()
-            
+
+            records = self.fetch_all((WATER_LEVEL_PATH,))['water_levels']
+            return records or self.get_fallback_water_data()
+
         except Exception as e:
             st.error(f"Error scraping water levels: {str(e)}")
             return self.get_fallback_water_data()
@@ -24,13 +280,26 @@ class BBWSScraper:
         """Scrape data curah hujan dari BBWS Bengawan Solo (/ch)"""
         try:
             st.info("🔄 Mengambil data curah hujan dari BBWS Bengawan Solo...")
-            
-            return self.get_fallback_rainfall_data()
-            
+
+            records = self.fetch_all((RAINFALL_PATH,))['rainfall']
+            return records or self.get_fallback_rainfall_data()
+
         except Exception as e:
             st.error(f"Error scraping rainfall data: {str(e)}")
             return self.get_fallback_rainfall_data()
     
+    def scrape_all(self):
+        """/tma dan /ch dalam satu refresh paralel; return (water_levels, rainfall)"""
+        try:
+            snapshot = self.fetch_all()
+            for path, error in snapshot['errors'].items():
+                print(f"⚠️ BBWS {path}: {error}")
+            return (snapshot['water_levels'] or self.get_fallback_water_data(),
+                    snapshot['rainfall'] or self.get_fallback_rainfall_data())
+        except Exception as e:
+            print(f"❌ BBWS refresh error: {e}")
+            return self.get_fallback_water_data(), self.get_fallback_rainfall_data()
+    
     def get_fallback_water_data(self):
         """Data fallback untuk water levels - HAPUS KONVERSI KE cm"""
         return [
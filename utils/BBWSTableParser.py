@@ -0,0 +1,308 @@
+import os
+import re
+from html.parser import HTMLParser
+
+import numpy as np
+
+# Backend parser HTML opsional; urutan preferensi: selectolax > lxml > python (stdlib)
+try:
+    from selectolax.parser import HTMLParser as SelectolaxParser
+except ImportError:
+    SelectolaxParser = None
+
+try:
+    import lxml.html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from bs4 import BeautifulSoup
+except ImportError:
+    BeautifulSoup = None
+
+# Kata kunci header kolom (dicek berurutan, yang pertama cocok dipakai)
+COLUMN_KEYWORDS = {
+    'rainfall_mm': ('curah hujan', 'hujan', 'ch (mm)'),
+    'water_level_mdpl': ('tma', 'tinggi muka air', 'muka air', 'elevasi'),
+    'location': ('nama pos', 'pos', 'lokasi', 'stasiun', 'nama'),
+    'river': ('sungai', 'das'),
+    'time': ('waktu', 'jam', 'update'),
+    'status': ('status', 'siaga')
+}
+
+_NUMBER = re.compile(r'-?\d+(?:[.,]\d+)?')
+_TIME = re.compile(r'(\d{1,2})[:.](\d{2})')
+
+
+def _clean(text):
+    return ' '.join(text.split())
+
+
+def parse_number(text):
+    """'143,74' / '143.74 m' / '-' -> float atau None"""
+    match = _NUMBER.search(text or '')
+    if not match:
+        return None
+    return float(match.group(0).replace(',', '.'))
+
+
+# ============ BACKEND: HTML -> tabel mentah ============
+# Setiap backend mengembalikan list tabel; tabel = list baris; baris = list sel
+# (teks, href link pertama atau None, True jika <th>).
+
+class _StdlibTableExtractor(HTMLParser):
+    """Tokenizer html.parser: tanpa membangun pohon DOM, hanya tabel/baris/sel"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables = []
+        self._rows = None
+        self._row = None
+        self._cell = None
+        self._depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'table':
+            self._depth += 1
+            if self._depth == 1:
+                self._rows = []
+        elif self._depth != 1:
+            return
+        elif tag == 'tr':
+            self._close_row()
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._close_cell()
+            self._cell = [[], None, tag == 'th']
+        elif tag == 'a' and self._cell is not None and self._cell[1] is None:
+            self._cell[1] = dict(attrs).get('href')
+        elif tag == 'br' and self._cell is not None:
+            self._cell[0].append(' ')
+
+    def handle_endtag(self, tag):
+        if tag == 'table':
+            if self._depth == 1:
+                self._close_row()
+                self.tables.append(self._rows)
+            self._depth = max(0, self._depth - 1)
+        elif self._depth != 1:
+            return
+        elif tag in ('td', 'th'):
+            self._close_cell()
+        elif tag == 'tr':
+            self._close_row()
+
+    def handle_data(self, data):
+        if self._cell is not None and self._depth == 1:
+            self._cell[0].append(data)
+
+    def _close_cell(self):
+        if self._cell is not None:
+            self._row.append((_clean(''.join(self._cell[0])), self._cell[1], self._cell[2]))
+            self._cell = None
+
+    def _close_row(self):
+        self._close_cell()
+        if self._row:
+            self._rows.append(self._row)
+        self._row = None
+
+
+def _extract_python(html):
+    extractor = _StdlibTableExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return extractor.tables
+
+
+def _extract_selectolax(html):
+    tables = []
+    for table in SelectolaxParser(html).css('table'):
+        rows = []
+        for tr in table.css('tr'):
+            row = []
+            for cell in tr.css('th, td'):
+                link = cell.css_first('a')
+                row.append((
+                    _clean(cell.text(separator=' ')),
+                    link.attributes.get('href') if link is not None else None,
+                    cell.tag == 'th'
+                ))
+            if row:
+                rows.append(row)
+        tables.append(rows)
+    return tables
+
+
+def _extract_lxml(html):
+    tables = []
+    for table in lxml_html.fromstring(html).iter('table'):
+        rows = []
+        for tr in table.iter('tr'):
+            row = []
+            for cell in tr:
+                if cell.tag not in ('td', 'th'):
+                    continue
+                hrefs = cell.xpath('.//a/@href')
+                row.append((_clean(cell.text_content()), hrefs[0] if hrefs else None, cell.tag == 'th'))
+            if row:
+                rows.append(row)
+        tables.append(rows)
+    return tables
+
+
+def _extract_bs4(html):
+    tables = []
+    for table in BeautifulSoup(html, 'html.parser').find_all('table'):
+        rows = []
+        for tr in table.find_all('tr'):
+            row = []
+            for cell in tr.find_all(['th', 'td']):
+                link = cell.find('a', href=True)
+                row.append((_clean(cell.get_text(' ')), link['href'] if link else None, cell.name == 'th'))
+            if row:
+                rows.append(row)
+        tables.append(rows)
+    return tables
+
+
+BACKENDS = {
+    'selectolax': _extract_selectolax if SelectolaxParser is not None else None,
+    'lxml': _extract_lxml if lxml_html is not None else None,
+    'python': _extract_python,
+    'bs4': _extract_bs4 if BeautifulSoup is not None else None
+}
+
+
+def available_backends():
+    return [name for name, extract in BACKENDS.items() if extract is not None]
+
+
+def default_backend():
+    """BBWS_PARSER (env) jika tersedia, selain itu backend tercepat yang terpasang"""
+    requested = os.environ.get('BBWS_PARSER')
+    if requested and BACKENDS.get(requested) is not None:
+        return requested
+    return next(name for name in ('selectolax', 'lxml', 'python') if BACKENDS[name] is not None)
+
+
+def extract_tables(html, backend=None):
+    extract = BACKENDS.get(backend or default_backend())
+    if extract is None:
+        raise ValueError(f"Parser backend tidak tersedia: {backend}")
+    return extract(html)
+
+
+# ============ TABEL MENTAH -> KOLOM BERTIPE ============
+
+def _column_map(headers):
+    """Header tabel -> {field: index kolom}"""
+    columns = {}
+    normalized = [header.strip().lower() for header in headers]
+    for field, keywords in COLUMN_KEYWORDS.items():
+        for keyword in keywords:
+            index = next((i for i, header in enumerate(normalized)
+                        if keyword in header and i not in columns.values()), None)
+            if index is not None:
+                columns[field] = index
+                break
+    return columns
+
+
+class StationColumns:
+    """
+    Baris tabel pos sebagai array kolom bertipe:
+    location (str), values (float64, NaN = kosong), last_update (str),
+    update_minutes (int16 menit sejak 00:00, -1 = tidak ada), status (str atau None),
+    detail_path (str atau None).
+    """
+    __slots__ = ('value_field', 'location', 'values', 'last_update', 'update_minutes',
+                'status', 'detail_path')
+
+    def __init__(self, value_field, location, values, last_update, update_minutes, status, detail_path):
+        self.value_field = value_field
+        self.location = location
+        self.values = values
+        self.last_update = last_update
+        self.update_minutes = update_minutes
+        self.status = status
+        self.detail_path = detail_path
+
+    def __len__(self):
+        return len(self.location)
+
+    def to_rows(self):
+        """Format list dict yang dipakai BBWSScraper (dan disimpan di HTTP cache)"""
+        rows = []
+        for i in range(len(self)):
+            value = self.values[i]
+            row = {
+                'location': str(self.location[i]),
+                self.value_field: None if np.isnan(value) else float(value),
+                'last_update': self.last_update[i],
+                'detail_path': self.detail_path[i]
+            }
+            if self.status is not None:
+                row['status'] = self.status[i]
+            rows.append(row)
+        return rows
+
+
+def station_columns(tables, value_field, status_map=None):
+    """Tabel pertama yang punya kolom lokasi + value_field -> StationColumns (None jika tidak ada)"""
+    for rows in tables:
+        if not rows:
+            continue
+        columns = _column_map([text for text, _, _ in rows[0]])
+        if 'location' not in columns or value_field not in columns:
+            continue
+
+        width = max(columns.values())
+        body = [row for row in rows[1:] if len(row) > width and not all(is_th for _, _, is_th in row)]
+        locations, values, times, minutes, statuses, links = [], [], [], [], [], []
+        for row in body:
+            location, link, _ = row[columns['location']]
+            if 'river' in columns and row[columns['river']][0]:
+                location = f"{location} ({row[columns['river']][0]})"
+            locations.append(location)
+            links.append(link)
+
+            number = parse_number(row[columns[value_field]][0])
+            values.append(np.nan if number is None else number)
+
+            update = row[columns['time']][0] if 'time' in columns else None
+            times.append(update or None)
+            match = _TIME.search(update or '')
+            minutes.append(int(match.group(1)) * 60 + int(match.group(2)) if match else -1)
+
+            if 'status' in columns:
+                raw = row[columns['status']][0].lower().split()
+                statuses.append((status_map or {}).get(raw[0]) if raw else None)
+
+        return StationColumns(
+            value_field,
+            np.array(locations, dtype=object),
+            np.array(values, dtype=np.float64),
+            times,
+            np.array(minutes, dtype=np.int16),
+            statuses if 'status' in columns else None,
+            links
+        )
+    return None
+
+
+def parse_station_columns(html, value_field, status_map=None, backend=None):
+    """HTML /tma atau /ch -> StationColumns"""
+    return station_columns(extract_tables(html, backend), value_field, status_map)
+
+
+def detail_pairs(html, backend=None):
+    """Pasangan (label th, nilai td) dari halaman detail pos"""
+    pairs = []
+    for rows in extract_tables(html, backend):
+        for row in rows:
+            label = next((text for text, _, is_th in row if is_th), None)
+            value = next((text for text, _, is_th in row if not is_th), None)
+            if label is not None and value is not None:
+                pairs.append((label, value))
+    return pairs
@@ -0,0 +1,189 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Breaker terbuka jika FAILURE_THRESHOLD kegagalan terjadi dalam FAILURE_WINDOW detik
+FAILURE_THRESHOLD = 3
+FAILURE_WINDOW = 120.0
+# Lama breaker terbuka sebelum satu request percobaan (half-open) diizinkan
+RESET_TIMEOUT = 60.0
+HALF_OPEN_MAX_CALLS = 1
+
+# Worker per breaker untuk call dengan timeout: pemanggil berhenti menunggu, request
+# yang menggantung selesai sendiri di latar (sumber tetap harus punya timeout
+# transport sendiri). Jika semua worker masih terpakai, call langsung gagal
+# alih-alih mengantre di belakang request yang menggantung.
+MAX_CONCURRENT_CALLS = 2
+
+
+class CircuitOpenError(Exception):
+    """Request tidak dijalankan karena breaker endpoint sedang terbuka"""
+
+    def __init__(self, name, retry_after):
+        super().__init__(f"circuit open: {name} (coba lagi dalam {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker satu endpoint upstream. CLOSED: request jalan, kegagalan
+    dihitung dalam jendela waktu bergulir. OPEN: request langsung ditolak
+    (CircuitOpenError) selama reset_timeout sehingga pemanggil bisa langsung
+    menyajikan data terakhir. HALF_OPEN: sejumlah kecil request percobaan;
+    berhasil -> CLOSED, gagal -> OPEN lagi.
+    """
+
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, window=FAILURE_WINDOW,
+                 reset_timeout=RESET_TIMEOUT, half_open_max=HALF_OPEN_MAX_CALLS, timeout=None,
+                 max_workers=MAX_CONCURRENT_CALLS, clock=time.monotonic):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+        self.half_open_max = half_open_max
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self._clock = clock
+        self._executor = None
+        self._in_flight = 0
+
+        self._state = CLOSED
+        self._failures = deque()
+        self._opened_at = None
+        self._probes = 0
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'failures': 0, 'rejected': 0, 'opened': 0,
+                      'last_error': None, 'last_success_at': None, 'last_failure_at': None}
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now):
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def retry_after(self):
+        """Detik sampai request percobaan berikutnya diizinkan (0 jika tidak terbuka)"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.reset_timeout - (self._clock() - self._opened_at))
+
+    def allow(self):
+        """True jika request boleh dijalankan; di HALF_OPEN hanya half_open_max sekaligus"""
+        with self._lock:
+            state = self._current_state(self._clock())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max:
+                self._probes += 1
+                return True
+            self.stats['rejected'] += 1
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                print(f"✅ Circuit {self.name} tertutup kembali")
+            self._state = CLOSED
+            self._failures.clear()
+            self._probes = 0
+            self.stats['calls'] += 1
+            self.stats['last_success_at'] = time.time()
+
+    def record_failure(self, error=None):
+        with self._lock:
+            now = self._clock()
+            self.stats['calls'] += 1
+            self.stats['failures'] += 1
+            self.stats['last_error'] = str(error) if error is not None else None
+            self.stats['last_failure_at'] = time.time()
+
+            state = self._current_state(now)
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window:
+                self._failures.popleft()
+            if state == HALF_OPEN or len(self._failures) >= self.failure_threshold:
+                if state != OPEN:
+                    self.stats['opened'] += 1
+                    print(f"⚠️ Circuit {self.name} terbuka ({len(self._failures)} gagal): {error}")
+                self._state = OPEN
+                self._opened_at = now
+                self._probes = 0
+
+    def _submit(self, func, args, kwargs):
+        """Jalankan func di worker breaker ini; None jika semua worker masih sibuk"""
+        with self._lock:
+            if self._in_flight >= self.max_workers:
+                return None
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='breaker')
+            self._in_flight += 1
+        future = self._executor.submit(func, *args, **kwargs)
+        future.add_done_callback(self._call_done)
+        return future
+
+    def _call_done(self, future):
+        with self._lock:
+            self._in_flight -= 1
+
+    def call(self, func, *args, timeout=None, **kwargs):
+        """
+        Jalankan func lewat breaker. Breaker terbuka -> CircuitOpenError tanpa
+        menyentuh jaringan. timeout (detik, default self.timeout) membatasi lama
+        pemanggil menunggu; lewat batas dihitung gagal (TimeoutError).
+        """
+        if not self.allow():
+            raise CircuitOpenError(self.name, self.retry_after())
+        timeout = self.timeout if timeout is None else timeout
+        try:
+            if timeout:
+                future = self._submit(func, args, kwargs)
+                if future is None:
+                    raise TimeoutError(f"{self.name}: {self.max_workers} request sebelumnya belum selesai")
+                try:
+                    result = future.result(timeout=timeout)
+                except FutureTimeout:
+                    raise TimeoutError(f"{self.name}: tidak ada respons dalam {timeout:.0f}s")
+            else:
+                result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        self.record_success()
+        return result
+
+    def describe(self):
+        """Ringkasan untuk dashboard / log"""
+        state = self.state
+        return dict(self.stats, name=self.name, state=state, retry_after=round(self.retry_after()))
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name, **options):
+    """Breaker bersama per proses untuk satu endpoint; options hanya dipakai saat dibuat"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name, **options)
+        return breaker
+
+
+def open_breakers(prefix=''):
+    """Breaker yang sedang tidak CLOSED (opsional dengan awalan nama) -> list describe()"""
+    with _breakers_lock:
+        breakers = [breaker for name, breaker in _breakers.items() if name.startswith(prefix)]
+    return [info for info in (breaker.describe() for breaker in breakers) if info['state'] != CLOSED]
@@ -0,0 +1,64 @@
+import threading
+import time
+
+import numpy as np
+
+# Nilai tipikal musim hujan DAS Bengawan Solo, dipakai jika tidak ada data sama sekali
+FEATURE_DEFAULTS = {'humidity': 80.0, 'temperature': 27.0}
+# Nilai terakhir sebuah stasiun masih dipakai selama umurnya <= MAX_CARRY_AGE detik
+MAX_CARRY_AGE = 6 * 3600
+
+# Asal nilai per baris
+OBSERVED = 'observed'
+CARRIED = 'carried'
+NETWORK = 'network'
+DEFAULT = 'default'
+
+
+class FeatureImputer:
+    """
+    Mengisi fitur ANN yang tidak diukur pos BBWS (kelembapan, suhu), berurutan:
+    nilai terukur -> nilai terakhir stasiun itu (<= max_age) -> median stasiun
+    lain pada refresh yang sama -> FEATURE_DEFAULTS.
+    """
+
+    def __init__(self, defaults=None, max_age=MAX_CARRY_AGE):
+        self.defaults = dict(FEATURE_DEFAULTS, **(defaults or {}))
+        self.max_age = max_age
+        self._recent = {}
+        self._lock = threading.Lock()
+        self.stats = {OBSERVED: 0, CARRIED: 0, NETWORK: 0, DEFAULT: 0}
+
+    def impute(self, feature, stations, observed, now=None):
+        """
+        observed: float[N] (NaN = tidak terukur) untuk stasiun stations.
+        Return (nilai float64[N] tanpa NaN, asal nilai str[N]). Nilai terukur
+        disimpan sebagai nilai terakhir stasiun.
+        """
+        now = time.time() if now is None else now
+        values = np.array(observed, dtype=np.float64)
+        missing = np.isnan(values)
+        sources = np.where(missing, DEFAULT, OBSERVED).astype(object)
+        measured = values[~missing]
+
+        with self._lock:
+            for i in np.flatnonzero(~missing):
+                self._recent[(feature, stations[i])] = (values[i], now)
+            for i in np.flatnonzero(missing):
+                recent = self._recent.get((feature, stations[i]))
+                if recent is not None and now - recent[1] <= self.max_age:
+                    values[i] = recent[0]
+                    sources[i] = CARRIED
+
+        missing = np.isnan(values)
+        if missing.any():
+            if len(measured):
+                values[missing] = np.median(measured)
+                sources[missing] = NETWORK
+            else:
+                values[missing] = self.defaults[feature]
+                sources[missing] = DEFAULT
+
+        for source in (OBSERVED, CARRIED, NETWORK, DEFAULT):
+            self.stats[source] += int(np.count_nonzero(sources == source))
+        return values, sources
@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = 'bbws_cache'
+
+
+def content_hash(body):
+    """Sidik jari isi halaman (bytes atau str)"""
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    return hashlib.sha1(body).hexdigest()
+
+
+class ResponseCache:
+    """
+    Cache respons HTTP di disk, satu entri per URL (nama file = sha1 URL):
+    validator (ETag / Last-Modified), hash konten, isi halaman dan hasil parse
+    per parser. Entri juga disimpan di memori agar refresh tidak membaca disk.
+    """
+
+    def __init__(self, cache_dir=None):
+        self.cache_dir = cache_dir or os.environ.get('BBWS_CACHE_DIR') or DEFAULT_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def _path(self, url):
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.json')
+
+    def get(self, url):
+        """Entri cache URL (dict) atau None"""
+        with self._lock:
+            entry = self._entries.get(url)
+        if entry is not None:
+            return entry
+        try:
+            with open(self._path(url), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"⚠️ HTTP cache entry for {url} unreadable, ignored: {e}")
+            return None
+        with self._lock:
+            self._entries[url] = entry
+        return entry
+
+    def conditional_headers(self, entry):
+        """Header If-None-Match / If-Modified-Since dari validator yang tersimpan"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def cached_parse(self, entry, parse_key):
+        """Hasil parse tersimpan untuk parser parse_key, atau None"""
+        if entry is None:
+            return None
+        return (entry.get('parsed') or {}).get(parse_key)
+
+    def store(self, url, response_headers, body, parse_key, parsed, previous=None):
+        """
+        Simpan entri baru. Jika hash konten sama dengan entri sebelumnya, hasil
+        parse parser lain ikut dipertahankan.
+        """
+        digest = content_hash(body)
+        parsed_by_key = {}
+        if previous is not None and previous.get('content_hash') == digest:
+            parsed_by_key.update(previous.get('parsed') or {})
+        parsed_by_key[parse_key] = parsed
+
+        entry = {
+            'url': url,
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'content_hash': digest,
+            'body': body,
+            'parsed': parsed_by_key,
+            'stored_at': time.time()
+        }
+        self._write(url, entry)
+        return entry
+
+    def refresh_validators(self, url, entry, response_headers):
+        """304 atau isi sama: perbarui validator/waktu tanpa menyentuh isi dan hasil parse"""
+        updated = dict(entry)
+        updated['etag'] = response_headers.get('ETag') or entry.get('etag')
+        updated['last_modified'] = response_headers.get('Last-Modified') or entry.get('last_modified')
+        updated['stored_at'] = time.time()
+        self._write(url, updated)
+        return updated
+
+    def _write(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+        try:
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(url))
+        except Exception as e:
+            print(f"⚠️ Cannot write HTTP cache entry for {url}: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.json'):
+                os.remove(os.path.join(self.cache_dir, name))
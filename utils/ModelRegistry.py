@@ -0,0 +1,371 @@
+import json
+import os
+import random
+import tempfile
+import threading
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+DEFAULT_REGISTRY_ROOT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'model_registry'
+)
+REGISTRY_FILE = 'registry.json'
+CANDIDATE_MODES = ('shadow', 'ab')
+
+
+class ModelVersion:
+    """Satu versi parameter model (immutable setelah dimuat)"""
+
+    def __init__(self, model_name, version, params, manifest):
+        self.model_name = model_name
+        self.version = version
+        self.params = params
+        self.manifest = dict(manifest)
+        # Objek turunan (mis. bobot terkompilasi) milik modul model
+        self.cache = {}
+        for value in self.params.values():
+            if isinstance(value, np.ndarray):
+                value.setflags(write=False)
+
+    @property
+    def kind(self):
+        return self.manifest.get('kind', '')
+
+    def __repr__(self):
+        return f"ModelVersion({self.model_name}:{self.version})"
+
+
+class ShadowStats:
+    """Ringkasan perbandingan skor active vs candidate pada input live"""
+
+    def __init__(self, active_version, candidate_version):
+        self.active_version = active_version
+        self.candidate_version = candidate_version
+        self.samples = 0
+        self.abs_diff_sum = 0.0
+        self.max_abs_diff = 0.0
+        self.status_disagreements = 0
+        self._lock = threading.Lock()
+
+    def update(self, active_risk, candidate_risk, active_status=None, candidate_status=None):
+        active_risk = np.asarray(active_risk, dtype=np.float64)
+        candidate_risk = np.asarray(candidate_risk, dtype=np.float64)
+        diff = np.abs(active_risk - candidate_risk)
+        with self._lock:
+            self.samples += diff.size
+            self.abs_diff_sum += float(diff.sum())
+            if diff.size:
+                self.max_abs_diff = max(self.max_abs_diff, float(diff.max()))
+            if active_status is not None and candidate_status is not None:
+                self.status_disagreements += int(
+                    np.count_nonzero(np.asarray(active_status) != np.asarray(candidate_status))
+                )
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'active_version': self.active_version,
+                'candidate_version': self.candidate_version,
+                'samples': self.samples,
+                'mean_abs_diff': self.abs_diff_sum / self.samples if self.samples else 0.0,
+                'max_abs_diff': self.max_abs_diff,
+                'status_agreement': (
+                    1.0 - self.status_disagreements / self.samples if self.samples else 1.0
+                )
+            }
+
+
+class ModelRegistry:
+    """
+    Registry parameter model berversi di disk:
+      model_registry/registry.json            -> manifest + pointer active/candidate
+      model_registry/<model>/<version>.npz    -> parameter (array/scalar)
+    Versi yang sudah dimuat di-cache di memori. Watcher memantau mtime
+    registry.json dan menukar state secara atomik (assignment referensi),
+    sehingga pembaca tidak pernah melihat state setengah jadi.
+    """
+
+    def __init__(self, root=DEFAULT_REGISTRY_ROOT, builtin_versions=None):
+        self.root = root
+        self._builtin = {}
+        self._versions = {}
+        self._state = {'models': {}}
+        self._state_mtime = None
+        self._shadow_stats = {}
+        self._lock = threading.RLock()
+        self._watcher = None
+        self._stop_event = threading.Event()
+
+        for model_name, versions in (builtin_versions or {}).items():
+            for version, (params, manifest) in versions.items():
+                self.add_builtin(model_name, version, params, manifest)
+
+        self.reload()
+
+    # ============ STATE REGISTRY ============
+
+    @property
+    def registry_path(self):
+        return os.path.join(self.root, REGISTRY_FILE)
+
+    def _read_state(self):
+        try:
+            with open(self.registry_path, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {'models': {}}
+        except Exception as e:
+            print(f"⚠️ Registry file unreadable, keeping previous state: {e}")
+            return None
+
+    def reload(self):
+        """Baca ulang registry.json; return True jika state berubah"""
+        try:
+            mtime = os.path.getmtime(self.registry_path)
+        except OSError:
+            mtime = None
+
+        if mtime is not None and mtime == self._state_mtime:
+            return False
+
+        state = self._read_state()
+        if state is None:
+            return False
+
+        with self._lock:
+            # Versi yang manifest-nya berubah (artifact diganti) dimuat ulang
+            self._versions = {
+                key: model_version for key, model_version in self._versions.items()
+                if self._model_state(key[0], state).get('versions', {}).get(key[1]) == model_version.manifest
+            }
+            self._state = state
+            self._state_mtime = mtime
+        print(f"✅ Model registry loaded ({len(state.get('models', {}))} models)")
+        return True
+
+    def _write_state(self, state):
+        os.makedirs(self.root, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.registry_path)
+        with self._lock:
+            self._state = state
+            self._state_mtime = os.path.getmtime(self.registry_path)
+
+    def _model_state(self, model_name, state=None):
+        state = state if state is not None else self._state
+        return state.get('models', {}).get(model_name, {})
+
+    # ============ REGISTRASI VERSI ============
+
+    def add_builtin(self, model_name, version, params, manifest):
+        """Versi bawaan kode; dipakai jika registry di disk belum ada/rusak"""
+        manifest = dict(manifest)
+        manifest.setdefault('source', 'builtin')
+        self._builtin.setdefault(model_name, {})[version] = ModelVersion(
+            model_name, version, {k: np.asarray(v) for k, v in params.items()}, manifest
+        )
+
+    def register(self, model_name, params, kind, training_data_range=None, metrics=None,
+                description='', version=None, created_at=None, activate=False):
+        """Simpan parameter sebagai versi baru (.npz + manifest) dan return nama versinya"""
+        version = version or datetime.now().strftime('v%Y%m%d-%H%M%S')
+        model_dir = os.path.join(self.root, model_name)
+        os.makedirs(model_dir, exist_ok=True)
+
+        artifact = f"{model_name}/{version}.npz"
+        fd, tmp_path = tempfile.mkstemp(dir=model_dir, suffix='.npz')
+        os.close(fd)
+        np.savez(tmp_path, **{k: np.asarray(v) for k, v in params.items()})
+        os.replace(tmp_path, os.path.join(self.root, artifact))
+
+        with self._lock:
+            state = json.loads(json.dumps(self._state))
+            model_state = state.setdefault('models', {}).setdefault(model_name, {})
+            model_state.setdefault('versions', {})[version] = {
+                'kind': kind,
+                'artifact': artifact,
+                'created_at': created_at or datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                'training_data_range': training_data_range,
+                'metrics': metrics or {},
+                'description': description
+            }
+            if activate or not (model_state.get('active') or self._builtin.get(model_name)):
+                model_state['active'] = version
+            self._write_state(state)
+
+        print(f"✅ Registered {model_name}:{version}")
+        return version
+
+    def list_versions(self, model_name):
+        versions = dict(self._model_state(model_name).get('versions', {}))
+        for version, model_version in self._builtin.get(model_name, {}).items():
+            versions.setdefault(version, model_version.manifest)
+        return versions
+
+    def load(self, model_name, version):
+        """Muat satu versi (di-cache di memori)"""
+        key = (model_name, version)
+        cached = self._versions.get(key)
+        if cached is not None:
+            return cached
+
+        manifest = self._model_state(model_name).get('versions', {}).get(version)
+        if manifest is None:
+            builtin = self._builtin.get(model_name, {}).get(version)
+            if builtin is None:
+                raise KeyError(f"Unknown model version {model_name}:{version}")
+            return builtin
+
+        with np.load(os.path.join(self.root, manifest['artifact'])) as data:
+            params = {name: data[name] for name in data.files}
+        model_version = ModelVersion(model_name, version, params, manifest)
+
+        with self._lock:
+            self._versions[key] = model_version
+        return model_version
+
+    # ============ ACTIVE / CANDIDATE ============
+
+    def active_version_name(self, model_name):
+        active = self._model_state(model_name).get('active')
+        if active:
+            return active
+        builtin = self._builtin.get(model_name, {})
+        for version, model_version in builtin.items():
+            if model_version.manifest.get('default'):
+                return version
+        return next(iter(builtin), None)
+
+    def active(self, model_name):
+        """Versi aktif; jika gagal dimuat, fallback ke versi bawaan"""
+        version = self.active_version_name(model_name)
+        try:
+            return self.load(model_name, version)
+        except Exception as e:
+            print(f"⚠️ Cannot load {model_name}:{version} ({e}), using builtin")
+            builtin = self._builtin.get(model_name, {})
+            for model_version in builtin.values():
+                if model_version.manifest.get('default'):
+                    return model_version
+            return next(iter(builtin.values()))
+
+    def candidate(self, model_name):
+        """(ModelVersion, mode, ab_fraction) atau (None, None, 0.0)"""
+        model_state = self._model_state(model_name)
+        version = model_state.get('candidate')
+        if not version:
+            return None, None, 0.0
+        try:
+            return (
+                self.load(model_name, version),
+                model_state.get('candidate_mode', 'shadow'),
+                float(model_state.get('ab_fraction', 0.0))
+            )
+        except Exception as e:
+            print(f"⚠️ Cannot load candidate {model_name}:{version}: {e}")
+            return None, None, 0.0
+
+    def set_active(self, model_name, version):
+        self.load(model_name, version)
+        with self._lock:
+            state = json.loads(json.dumps(self._state))
+            state.setdefault('models', {}).setdefault(model_name, {})['active'] = version
+            self._write_state(state)
+
+    def set_candidate(self, model_name, version, mode='shadow', ab_fraction=0.0):
+        """Pasang candidate untuk shadow scoring atau A/B (version=None untuk melepas)"""
+        if mode not in CANDIDATE_MODES:
+            raise ValueError(f"mode harus salah satu dari {CANDIDATE_MODES}")
+        if version is not None:
+            self.load(model_name, version)
+        with self._lock:
+            state = json.loads(json.dumps(self._state))
+            model_state = state.setdefault('models', {}).setdefault(model_name, {})
+            model_state['candidate'] = version
+            model_state['candidate_mode'] = mode
+            model_state['ab_fraction'] = float(ab_fraction)
+            self._write_state(state)
+            self._shadow_stats.pop(model_name, None)
+
+    def route(self, model_name, routing_key=None):
+        """
+        Pilih versi untuk satu permintaan.
+        Return (versi_yang_melayani, versi_shadow_atau_None).
+        Dengan routing_key (mis. id sesi/stasiun) pembagian A/B deterministik.
+        """
+        active = self.active(model_name)
+        candidate, mode, ab_fraction = self.candidate(model_name)
+        if candidate is None:
+            return active, None
+        if mode == 'shadow':
+            return active, candidate
+
+        if routing_key is None:
+            bucket = random.random()
+        else:
+            bucket = (zlib.crc32(str(routing_key).encode()) % 10000) / 10000.0
+        return (candidate if bucket < ab_fraction else active), None
+
+    def shadow_stats(self, model_name, active_version, candidate_version):
+        with self._lock:
+            stats = self._shadow_stats.get(model_name)
+            if (stats is None or stats.active_version != active_version
+                    or stats.candidate_version != candidate_version):
+                stats = ShadowStats(active_version, candidate_version)
+                self._shadow_stats[model_name] = stats
+            return stats
+
+    def shadow_report(self, model_name):
+        stats = self._shadow_stats.get(model_name)
+        return stats.to_dict() if stats else None
+
+    # ============ FILE WATCH ============
+
+    def start_watching(self, interval=5.0):
+        """Thread daemon yang memuat ulang registry.json saat berubah (tanpa restart Streamlit)"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return self._watcher
+
+        def watch():
+            while not self._stop_event.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"⚠️ Registry watch error: {e}")
+
+        self._stop_event.clear()
+        self._watcher = threading.Thread(target=watch, name='model-registry-watch', daemon=True)
+        self._watcher.start()
+        return self._watcher
+
+    def stop_watching(self):
+        self._stop_event.set()
+
+
+_registry = None
+_registry_lock = threading.Lock()
+_builtin_providers = []
+
+
+def register_builtin_provider(provider):
+    """Modul model mendaftarkan versi bawaan: provider(registry) dipanggil saat registry dibuat"""
+    _builtin_providers.append(provider)
+    if _registry is not None:
+        provider(_registry)
+
+
+def get_model_registry(root=None, watch_interval=5.0):
+    """Registry bersama per proses, dengan watcher hot reload aktif"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ModelRegistry(root or os.environ.get('MODEL_REGISTRY_ROOT', DEFAULT_REGISTRY_ROOT))
+            for provider in _builtin_providers:
+                provider(_registry)
+            if watch_interval:
+                _registry.start_watching(watch_interval)
+        return _registry
@@ -0,0 +1,236 @@
+import threading
+import time
+
+import numpy as np
+
+from utils.TimeSeriesStore import aggregate_buckets
+
+HOUR = 3600
+# Horizon prakiraan (jam ke depan)
+HORIZONS = np.arange(1, 7)
+# Regressor: perubahan muka air 3 jam terakhir + hujan jam t, t-1, t-2
+AR_ORDER = 3
+RAIN_LAGS = 3
+N_FEATURES = 1 + AR_ORDER + RAIN_LAGS
+
+# Model dilatih ulang dari 30 hari terakhir paling cepat tiap REFIT_INTERVAL
+TRAIN_SPAN = 30 * 86400
+REFIT_INTERVAL = 6 * HOUR
+MIN_TRAIN_ROWS = 72
+# Penalti ridge kecil per kolom (relatif terhadap diagonal X'X, + lantai absolut)
+# agar faktorisasi tetap stabil saat kolom hujan semuanya nol
+RIDGE = 1e-6
+# Prakiraan hanya jika jam terakhir berisi data tidak lebih tua dari ini
+MAX_BASE_AGE = 3 * HOUR
+# Interval prediksi 90% (z normal)
+INTERVAL_LEVEL = 0.9
+INTERVAL_Z = 1.645
+HISTORY_HOURS = 12
+
+# Stasiun yang diprakirakan (id StationRegistry)
+NOWCAST_STATIONS = ('ngadipiro', 'wonogiri-dam', 'colo-weir')
+
+
+def hourly_grid(rows):
+    """
+    Hasil TimeSeriesStore.query -> grid per jam tanpa lubang:
+    (waktu awal jam pertama, muka air float64[n], hujan float64[n]); jam kosong = NaN.
+    """
+    times, level = aggregate_buckets(rows['time'], rows['water_level_mdpl'], HOUR, 'mean')
+    if not len(times):
+        return None, np.empty(0), np.empty(0)
+    _, rain = aggregate_buckets(rows['time'], rows['rainfall_mm'], HOUR, 'mean')
+    index = (times - times[0]) // HOUR
+    grid_level = np.full(index[-1] + 1, np.nan)
+    grid_rain = np.full(index[-1] + 1, np.nan)
+    grid_level[index] = level
+    grid_rain[index] = rain
+    return int(times[0]), grid_level, grid_rain
+
+
+def _lagged(values, lags):
+    out = np.full((len(values), lags), np.nan)
+    for lag in range(lags):
+        out[lag:, lag] = values[:len(values) - lag]
+    return out
+
+
+def design_matrix(level, rain):
+    """
+    Baris regressor untuk setiap jam grid (NaN jika lag tidak lengkap):
+    [1, Δy_t .. Δy_{t-p+1}, r_t .. r_{t-q+1}]. Hujan kosong dianggap 0 mm.
+    """
+    change = np.diff(level, prepend=np.nan)
+    rain = np.nan_to_num(rain, nan=0.0)
+    return np.column_stack([np.ones(len(level)), _lagged(change, AR_ORDER), _lagged(rain, RAIN_LAGS)])
+
+
+def target_matrix(level):
+    """Target langsung per horizon: Y[t, h-1] = y_{t+h} - y_t"""
+    targets = np.full((len(level), len(HORIZONS)), np.nan)
+    for column, horizon in enumerate(HORIZONS):
+        targets[:len(level) - horizon, column] = level[horizon:] - level[:len(level) - horizon]
+    return targets
+
+
+class StationModel:
+    """
+    ARX langsung multi-horizon satu stasiun. Semua horizon berbagi matriks X,
+    jadi satu faktorisasi Cholesky X'X dipakai untuk seluruh koefisien dan
+    disimpan (sebagai L^-1) untuk varians prediksi x'(X'X)^-1 x.
+    """
+    __slots__ = ('coef', 'chol_inv', 'sigma', 'n_train', 'fitted_at')
+
+    def __init__(self, coef, chol_inv, sigma, n_train, fitted_at):
+        self.coef = coef
+        self.chol_inv = chol_inv
+        self.sigma = sigma
+        self.n_train = n_train
+        self.fitted_at = fitted_at
+
+
+def fit_station_model(level, rain, fitted_at=None):
+    """Least squares (ridge kecil) untuk semua horizon sekaligus; None jika data kurang"""
+    X, Y = design_matrix(level, rain), target_matrix(level)
+    rows = np.isfinite(X).all(axis=1) & np.isfinite(Y).all(axis=1)
+    X, Y = X[rows], Y[rows]
+    if len(X) < max(MIN_TRAIN_ROWS, 2 * N_FEATURES):
+        return None
+
+    gram = X.T @ X
+    diagonal = np.arange(1, len(gram))
+    gram[diagonal, diagonal] += RIDGE * (gram[diagonal, diagonal] + 1.0)
+    chol_inv = np.linalg.inv(np.linalg.cholesky(gram))
+    coef = chol_inv.T @ (chol_inv @ (X.T @ Y))
+
+    residuals = Y - X @ coef
+    sigma = np.sqrt((residuals ** 2).sum(axis=0) / (len(X) - X.shape[1]))
+    return StationModel(coef, chol_inv, sigma, len(X), fitted_at)
+
+
+def forecast_batch(models, features, base_levels, z=INTERVAL_Z):
+    """
+    Prakiraan semua stasiun dalam satu operasi: models[s], features float[S, k],
+    base_levels float[S] -> (mean, lower, upper) float[S, H].
+    Varians: sigma_h^2 * (1 + |L^-1 x|^2).
+    """
+    coef = np.stack([model.coef for model in models])
+    chol_inv = np.stack([model.chol_inv for model in models])
+    sigma = np.stack([model.sigma for model in models])
+
+    mean = base_levels[:, None] + np.einsum('sk,skh->sh', features, coef)
+    leverage = (np.einsum('sij,sj->si', chol_inv, features) ** 2).sum(axis=1)
+    half_width = z * sigma * np.sqrt(1.0 + leverage)[:, None]
+    return mean, mean - half_width, mean + half_width
+
+
+class Nowcaster:
+    """
+    Prakiraan muka air 1-6 jam per stasiun dari time series store. Model ARX
+    dilatih ulang per REFIT_INTERVAL dan di-cache; setiap snapshot baru semua
+    stasiun diprakirakan sekaligus (forecast_batch), hasilnya di `latest`
+    untuk dibaca semua sesi.
+    """
+
+    def __init__(self, store, stations=NOWCAST_STATIONS, names=None, refit_interval=REFIT_INTERVAL,
+                 train_span=TRAIN_SPAN):
+        self.store = store
+        self.stations = tuple(stations)
+        self.names = dict(names or {})
+        self.refit_interval = refit_interval
+        self.train_span = train_span
+        self.models = {}
+        self._attempted_at = {}
+        self.latest = {}
+        self.stats = {'fits': 0, 'forecasts': 0, 'last_duration': None}
+        self._lock = threading.Lock()
+
+    def _model(self, station, now):
+        """Model cache; dilatih ulang jika belum ada atau sudah lebih tua dari refit_interval"""
+        attempted = self._attempted_at.get(station)
+        if attempted is not None and now - attempted < self.refit_interval:
+            return self.models.get(station)
+
+        self._attempted_at[station] = now
+        _, level, rain = hourly_grid(self.store.query(station, now - self.train_span, now + 1))
+        model = fit_station_model(level, rain, fitted_at=now)
+        self.stats['fits'] += 1
+        if model is None:
+            print(f"⚠️ Nowcast {station}: data latih belum cukup ({np.isfinite(level).sum()} jam)")
+        self.models[station] = model
+        return model
+
+    def forecast_all(self, now=None):
+        """{station_id: prakiraan} untuk semua stasiun yang punya model dan data terbaru"""
+        now = time.time() if now is None else now
+        started = time.perf_counter()
+        with self._lock:
+            models, features, bases, context = [], [], [], []
+            for station in self.stations:
+                model = self._model(station, now)
+                if model is None:
+                    continue
+                start, level, rain = hourly_grid(
+                    self.store.query(station, now - HISTORY_HOURS * HOUR, now + 1)
+                )
+                if start is None:
+                    continue
+                base_time = start + (len(level) - 1) * HOUR
+                row = design_matrix(level, rain)[-1]
+                if now - base_time > MAX_BASE_AGE or not np.isfinite(row).all():
+                    continue
+                models.append(model)
+                features.append(row)
+                bases.append(level[-1])
+                context.append((station, model, base_time, start, level))
+
+            result = {}
+            if models:
+                mean, lower, upper = forecast_batch(models, np.array(features), np.array(bases))
+                for i, (station, model, base_time, start, level) in enumerate(context):
+                    history = np.isfinite(level)
+                    result[station] = {
+                        'station_id': station,
+                        'location': self.names.get(station, station),
+                        'base_time': base_time,
+                        'base_level': float(bases[i]),
+                        'horizons': HORIZONS.tolist(),
+                        'times': (base_time + HORIZONS * HOUR).tolist(),
+                        'mean': mean[i].tolist(),
+                        'lower': lower[i].tolist(),
+                        'upper': upper[i].tolist(),
+                        'interval': INTERVAL_LEVEL,
+                        'rmse': model.sigma.tolist(),
+                        'n_train': model.n_train,
+                        'history_times': (start + np.flatnonzero(history) * HOUR).tolist(),
+                        'history_levels': level[history].tolist()
+                    }
+            self.stats['forecasts'] += 1
+            self.stats['last_duration'] = time.perf_counter() - started
+            self.latest = result
+            return result
+
+    def record_snapshot(self, snapshot):
+        """Listener StationPoller (setelah store menyimpan snapshot): prakirakan ulang"""
+        try:
+            now = max(snapshot.fetched_at.values()) if snapshot.fetched_at else None
+            self.forecast_all(now)
+        except Exception as e:
+            print(f"⚠️ Nowcast gagal: {e}")
+
+
+_nowcaster = None
+_nowcaster_lock = threading.Lock()
+
+
+def get_nowcaster():
+    """Satu nowcaster per proses, membaca time series store bersama"""
+    global _nowcaster
+    with _nowcaster_lock:
+        if _nowcaster is None:
+            from utils.StationRegistry import get_station_registry
+            from utils.TimeSeriesStore import get_timeseries_store
+            registry = get_station_registry()
+            names = {station.id: station.name for station in registry.stations()}
+            _nowcaster = Nowcaster(get_timeseries_store(), names=names)
+        return _nowcaster
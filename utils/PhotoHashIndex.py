@@ -0,0 +1,207 @@
+import threading
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8
+PHASH_IMAGE_SIZE = 32
+DEFAULT_MAX_DISTANCE = 8
+
+
+def _dct_matrix(n):
+    """Matriks DCT-II ortonormal n x n (dipakai untuk pHash tanpa scipy)"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0, :] = np.sqrt(1.0 / n)
+    return matrix
+
+
+_DCT = _dct_matrix(PHASH_IMAGE_SIZE)
+
+
+def _bits_to_int(bits):
+    """Ubah array boolean 64 elemen menjadi integer 64-bit"""
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), 'big')
+
+
+def _to_grayscale(image, size):
+    if not isinstance(image, Image.Image):
+        image = Image.open(image)
+    image = image.convert('L').resize(size, Image.LANCZOS)
+    return np.asarray(image, dtype=np.float64)
+
+
+def compute_phash(image):
+    """pHash 64-bit: DCT 32x32, ambil 8x8 frekuensi rendah, bandingkan dengan median"""
+    pixels = _to_grayscale(image, (PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE))
+    dct = _DCT @ pixels @ _DCT.T
+    low_freq = dct[:HASH_SIZE, :HASH_SIZE]
+    median = np.median(low_freq.ravel()[1:])
+    return _bits_to_int(low_freq > median)
+
+
+def compute_dhash(image):
+    """dHash 64-bit: gradien horizontal pada gambar 9x8"""
+    pixels = _to_grayscale(image, (HASH_SIZE + 1, HASH_SIZE))
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def compute_hashes(image):
+    """Hitung (phash, dhash) sekaligus dari path file atau objek PIL"""
+    if not isinstance(image, Image.Image):
+        with Image.open(image) as img:
+            img.load()
+            return compute_phash(img), compute_dhash(img)
+    return compute_phash(image), compute_dhash(image)
+
+
+def hamming_distance(hash_a, hash_b):
+    return (hash_a ^ hash_b).bit_count()
+
+
+def hash_to_hex(value):
+    return f"{value:016x}"
+
+
+def hex_to_hash(value):
+    return int(value, 16)
+
+
+# np.bitwise_count (NumPy >= 2.0) memakai instruksi popcount CPU; NumPy lama
+# memakai popcount SWAR (paralel per byte) dengan operasi in-place
+_bitwise_count = getattr(np, 'bitwise_count', None)
+_M1 = np.uint64(0x5555555555555555)
+_M2 = np.uint64(0x3333333333333333)
+_M4 = np.uint64(0x0f0f0f0f0f0f0f0f)
+_H01 = np.uint64(0x0101010101010101)
+_SHIFTS = tuple(np.uint64(k) for k in (1, 2, 4, 56))
+
+
+def _popcount_swar(x):
+    """Jumlah bit 1 per elemen uint64 (x ditimpa)"""
+    s1, s2, s4, s56 = _SHIFTS
+    t = np.right_shift(x, s1)
+    np.bitwise_and(t, _M1, out=t)
+    np.subtract(x, t, out=x)
+    np.right_shift(x, s2, out=t)
+    np.bitwise_and(t, _M2, out=t)
+    np.bitwise_and(x, _M2, out=x)
+    np.add(x, t, out=x)
+    np.right_shift(x, s4, out=t)
+    np.add(x, t, out=x)
+    np.bitwise_and(x, _M4, out=x)
+    np.multiply(x, _H01, out=x)
+    np.right_shift(x, s56, out=x)
+    return x
+
+
+def hamming_distances(hashes, value):
+    """Jarak Hamming antara satu hash 64-bit dan array uint64, vectorized"""
+    x = np.bitwise_xor(hashes, np.uint64(value))
+    if _bitwise_count is not None:
+        return _bitwise_count(x)
+    return _popcount_swar(x)
+
+
+class PhotoHashIndex:
+    """
+    Index foto near-duplicate. Semua pHash disimpan berurutan dalam satu array
+    uint64, jadi satu query = XOR + popcount vectorized atas seluruh koleksi
+    tanpa loop Python per kandidat (100k foto: ~0.1 ms dengan np.bitwise_count,
+    ~0.5 ms dengan fallback SWAR; lihat tests/benchmark_photo_hash_index.py).
+    """
+
+    def __init__(self, capacity=1024):
+        self._hashes = np.empty(capacity, dtype=np.uint64)
+        self._keys = []
+        self._positions = {}
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def add(self, key, phash, dhash=None, report_id=None):
+        """Tambahkan foto ke index (key biasanya path foto)"""
+        with self._lock:
+            if key in self._entries:
+                self.remove(key)
+            position = len(self._keys)
+            if position == len(self._hashes):
+                grown = np.empty(max(2 * len(self._hashes), 1024), dtype=np.uint64)
+                grown[:position] = self._hashes[:position]
+                self._hashes = grown
+            self._hashes[position] = phash
+            self._keys.append(key)
+            self._positions[key] = position
+            self._entries[key] = (phash, dhash, report_id)
+
+    def remove(self, key):
+        """Hapus foto; posisi yang kosong diisi elemen terakhir (array tetap rapat)"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return False
+            position = self._positions.pop(key)
+            last_key = self._keys.pop()
+            if last_key != key:
+                self._keys[position] = last_key
+                self._positions[last_key] = position
+                self._hashes[position] = self._hashes[len(self._keys)]
+            return True
+
+    def get(self, key):
+        return self._entries.get(key)
+
+    def query(self, phash, max_distance=DEFAULT_MAX_DISTANCE, exclude_key=None):
+        """Cari foto dengan jarak pHash <= max_distance, urut dari yang paling mirip"""
+        with self._lock:
+            count = len(self._keys)
+            if not count:
+                return []
+            distances = hamming_distances(self._hashes[:count], phash)
+            positions = np.flatnonzero(distances <= max_distance)
+            matches = []
+            for position, distance in zip(positions.tolist(), distances[positions].tolist()):
+                key = self._keys[position]
+                if key == exclude_key:
+                    continue
+                _, stored_dhash, report_id = self._entries[key]
+                matches.append({
+                    'key': key,
+                    'report_id': report_id,
+                    'distance': int(distance),
+                    'dhash': stored_dhash
+                })
+
+        matches.sort(key=lambda m: m['distance'])
+        return matches
+
+
+_shared_indexes = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_photo_index(hash_model):
+    """
+    Index dibangun sekali per proses (bukan per sesi Streamlit) dari tabel
+    photo_hashes, lalu dipakai bersama oleh semua controller.
+    """
+    with _shared_lock:
+        index = _shared_indexes.get(hash_model.db_path)
+        if index is None:
+            index = PhotoHashIndex()
+            for row in hash_model.get_all_hashes():
+                index.add(
+                    row['photo_path'],
+                    hex_to_hash(row['phash']),
+                    hex_to_hash(row['dhash']) if row['dhash'] else None,
+                    row['report_id']
+                )
+            _shared_indexes[hash_model.db_path] = index
+            print(f"✅ Photo hash index loaded: {len(index)} photos")
+        return index
@@ -0,0 +1,106 @@
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 4096
+# Data stasiun berubah tiap beberapa menit; TTL membatasi umur entri basi
+DEFAULT_TTL_SECONDS = 600.0
+
+# Jumlah desimal presisi sensor; input dibulatkan ke sini sebelum jadi key cache
+SENSOR_PRECISION = {
+    'rainfall': 1,       # mm
+    'water_level': 2,    # m / mdpl
+    'humidity': 1,       # %
+    'temperature': 1     # °C
+}
+
+
+def quantize(value, feature):
+    """Bulatkan pembacaan sensor ke presisinya (nilai non-numerik dikembalikan apa adanya)"""
+    try:
+        return round(float(value), SENSOR_PRECISION[feature])
+    except (TypeError, ValueError):
+        return value
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL untuk hasil prediksi.
+    Key disusun pemanggil dari versi model + input terkuantisasi, sehingga
+    pergantian versi di registry otomatis memakai entri baru.
+    """
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL_SECONDS, clock=time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return nilai ter-cache atau None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            value, expires_at = entry
+            if expires_at < self.clock():
+                del self._entries[key]
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expired': self.expired,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_prediction_cache(name, maxsize=DEFAULT_MAXSIZE, ttl=DEFAULT_TTL_SECONDS):
+    """Satu cache per model per proses, dipakai bersama semua sesi Streamlit"""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = PredictionCache(maxsize, ttl)
+            _caches[name] = cache
+        return cache
+
+
+def get_prediction_cache_stats():
+    """Counter hit/miss semua cache prediksi, mis. {'ann': {...}, 'gumbel': {...}}"""
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
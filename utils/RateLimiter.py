@@ -0,0 +1,146 @@
+import threading
+import time
+from collections import deque
+
+DAY_SECONDS = 24 * 60 * 60
+
+# scope -> (jumlah maksimum, panjang window dalam detik)
+DEFAULT_LIMITS = {
+    'ip': (10, DAY_SECONDS),
+    'phone': (5, DAY_SECONDS),
+}
+
+
+class SlidingWindowRateLimiter:
+    """
+    Rate limiter sliding-window in-memory.
+    Setiap key menyimpan deque timestamp; event kedaluwarsa dibuang dari kiri
+    sehingga pengecekan limit O(1) amortized tanpa query database.
+    Event ditulis ke SQLite (RateLimitModel) agar window bertahan saat restart.
+    """
+
+    def __init__(self, model=None, limits=None, clock=time.time):
+        self.model = model
+        self.limits = dict(limits or DEFAULT_LIMITS)
+        self.clock = clock
+        self._windows = {scope: {} for scope in self.limits}
+        self._lock = threading.Lock()
+
+        if self.model is not None:
+            self._load_from_model()
+
+    def _load_from_model(self):
+        now = self.clock()
+        max_window = max(window for _, window in self.limits.values())
+        events = self.model.load_events_since(now - max_window)
+        with self._lock:
+            for scope, key, ts in events:
+                if scope in self._windows:
+                    self._windows[scope].setdefault(key, deque()).append(ts)
+        print(f"✅ Rate limiter restored {len(events)} events")
+
+    def _prune(self, scope, key, now):
+        window = self._windows[scope].get(key)
+        if window is None:
+            return None
+        horizon = now - self.limits[scope][1]
+        while window and window[0] < horizon:
+            window.popleft()
+        if not window:
+            del self._windows[scope][key]
+            return None
+        return window
+
+    def count(self, scope, key):
+        with self._lock:
+            window = self._prune(scope, key, self.clock())
+            return len(window) if window else 0
+
+    def allow(self, **keys):
+        """
+        Cek semua scope sekaligus, mis. allow(ip='1.2.3.4', phone='0812...').
+        Return (boleh, scope_yang_melanggar).
+        """
+        now = self.clock()
+        with self._lock:
+            for scope, key in keys.items():
+                if not key or scope not in self.limits:
+                    continue
+                window = self._prune(scope, key, now)
+                if window and len(window) >= self.limits[scope][0]:
+                    return False, scope
+        return True, None
+
+    def allow_and_record(self, **keys):
+        """
+        Cek dan catat dalam satu lock: dua submit paralel dari IP/nomor yang sama
+        tidak bisa sama-sama lolos. Return (boleh, scope_yang_melanggar, timestamp);
+        timestamp dipakai release() jika submit akhirnya gagal disimpan.
+        """
+        now = self.clock()
+        scopes = [(scope, key) for scope, key in keys.items() if key and scope in self.limits]
+        with self._lock:
+            for scope, key in scopes:
+                window = self._prune(scope, key, now)
+                if window and len(window) >= self.limits[scope][0]:
+                    return False, scope, None
+            for scope, key in scopes:
+                self._windows[scope].setdefault(key, deque()).append(now)
+
+        if self.model is not None:
+            for scope, key in scopes:
+                self.model.record_event(scope, key, now)
+        return True, None, now
+
+    def release(self, ts, **keys):
+        """Batalkan slot dari allow_and_record (submit gagal, tidak dihitung)"""
+        scopes = [(scope, key) for scope, key in keys.items() if key and scope in self.limits]
+        with self._lock:
+            for scope, key in scopes:
+                window = self._windows[scope].get(key)
+                if window is not None and ts in window:
+                    window.remove(ts)
+                    if not window:
+                        del self._windows[scope][key]
+
+        if self.model is not None:
+            for scope, key in scopes:
+                self.model.delete_event(scope, key, ts)
+
+    def record(self, **keys):
+        """Catat satu submit untuk setiap scope yang diberikan"""
+        now = self.clock()
+        with self._lock:
+            for scope, key in keys.items():
+                if not key or scope not in self.limits:
+                    continue
+                self._windows[scope].setdefault(key, deque()).append(now)
+
+        if self.model is not None:
+            for scope, key in keys.items():
+                if key and scope in self.limits:
+                    self.model.record_event(scope, key, now)
+
+
+def normalize_phone(phone):
+    """Samakan format nomor HP: hanya digit, awalan 62 menjadi 0"""
+    if not phone:
+        return None
+    digits = ''.join(ch for ch in str(phone) if ch.isdigit())
+    if digits.startswith('62'):
+        digits = '0' + digits[2:]
+    return digits or None
+
+
+_shared_limiters = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(model):
+    """Satu limiter per proses agar semua sesi Streamlit berbagi window yang sama"""
+    with _shared_lock:
+        limiter = _shared_limiters.get(model.db_path)
+        if limiter is None:
+            limiter = SlidingWindowRateLimiter(model)
+            _shared_limiters[model.db_path] = limiter
+        return limiter
@@ -0,0 +1,239 @@
+import math
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from utils.TimeSeriesStore import reading_time, station_slug
+
+# Jendela delta dan maksimum bergulir (nama, detik)
+WINDOWS = (('1h', 3600), ('3h', 3 * 3600), ('6h', 6 * 3600))
+# Jendela regresi linear untuk laju naik
+SLOPE_WINDOW = 3600
+# Kapasitas ring buffer per stasiun: 6 jam pada cadence 1 menit + cadangan
+DEFAULT_CAPACITY = 512
+# Delta/laju hanya dilaporkan jika data menutupi >= 75% jendela
+MIN_COVERAGE = 0.75
+# Jumlah berjalan regresi dihitung ulang (rebase waktu acuan) paling lama sehari sekali
+REBASE_SPAN = 86400.0
+
+# Laju muka air (m/jam): <= FALL_THRESHOLD turun, >= RISE_THRESHOLDS[0] naik, >= [1] naik cepat
+FALL_THRESHOLD = -0.10
+RISE_THRESHOLDS = (0.10, 0.30)
+TREND_FALLING = 'TURUN'
+TREND_STEADY = 'STABIL'
+TREND_RISING = 'NAIK'
+TREND_RAPID = 'NAIK CEPAT'
+
+
+def trend_label(slope):
+    if slope is None:
+        return None
+    if slope >= RISE_THRESHOLDS[1]:
+        return TREND_RAPID
+    if slope >= RISE_THRESHOLDS[0]:
+        return TREND_RISING
+    if slope <= FALL_THRESHOLD:
+        return TREND_FALLING
+    return TREND_STEADY
+
+
+class StationWindow:
+    """
+    Ring buffer pembacaan satu stasiun dengan statistik bergulir O(1) per update:
+    - penunjuk sampel tertua per jendela (maju monoton -> delta 1h/3h/6h),
+    - deque monoton per jendela (maksimum bergulir),
+    - jumlah berjalan n, Σx, Σy, Σxx, Σxy (regresi linear laju naik),
+      x = jam sejak waktu acuan agar presisi float terjaga.
+    Sampel diberi nomor urut; sampel k disimpan di slot k % capacity.
+    """
+    __slots__ = ('capacity', 'times', 'values', 'count', 'starts', 'maxima',
+                'slope_start', 't_ref', 'n', 'sx', 'sy', 'sxx', 'sxy')
+
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.times = [0.0] * capacity
+        self.values = [0.0] * capacity
+        self.count = 0
+        self.starts = [0] * len(WINDOWS)
+        self.maxima = [deque() for _ in WINDOWS]
+        self.slope_start = 0
+        self.t_ref = None
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+
+    def last_time(self):
+        return self.times[(self.count - 1) % self.capacity] if self.count else None
+
+    def _add_sums(self, t, y, sign):
+        x = (t - self.t_ref) / 3600.0
+        self.n += sign
+        self.sx += sign * x
+        self.sy += sign * y
+        self.sxx += sign * x * x
+        self.sxy += sign * x * y
+
+    def _rebase(self, t_ref):
+        self.t_ref = t_ref
+        self.n = self.sx = self.sy = self.sxx = self.sxy = 0.0
+        for seq in range(self.slope_start, self.count):
+            slot = seq % self.capacity
+            self._add_sums(self.times[slot], self.values[slot], 1)
+
+    def update(self, t, y):
+        """Tambah pembacaan (waktu epoch detik, nilai); waktu yang tidak maju diabaikan"""
+        if y is None or math.isnan(y):
+            return False
+        if self.count and t <= self.last_time():
+            return False
+
+        capacity = self.capacity
+        times, values = self.times, self.values
+        seq = self.count
+
+        # Keluarkan sampel lama dari regresi (kedaluwarsa atau akan ditimpa ring buffer)
+        while self.slope_start < seq and (
+            times[self.slope_start % capacity] < t - SLOPE_WINDOW or seq - self.slope_start >= capacity
+        ):
+            slot = self.slope_start % capacity
+            self._add_sums(times[slot], values[slot], -1)
+            self.slope_start += 1
+
+        slot = seq % capacity
+        times[slot] = t
+        values[slot] = y
+        self.count = seq + 1
+
+        if self.t_ref is None:
+            self.t_ref = t
+        self._add_sums(t, y, 1)
+        if t - self.t_ref > REBASE_SPAN:
+            self._rebase(times[self.slope_start % capacity])
+
+        oldest = self.count - capacity
+        for k, (_, window) in enumerate(WINDOWS):
+            start = max(self.starts[k], oldest)
+            while times[start % capacity] < t - window:
+                start += 1
+            self.starts[k] = start
+
+            maxima = self.maxima[k]
+            while maxima and values[maxima[-1] % capacity] <= y:
+                maxima.pop()
+            maxima.append(seq)
+            while maxima[0] < start:
+                maxima.popleft()
+        return True
+
+    def slope(self):
+        """Laju naik (m/jam) dari regresi linear jendela SLOPE_WINDOW, atau None"""
+        if self.n < 3:
+            return None
+        span = self.last_time() - self.times[self.slope_start % self.capacity]
+        if span < MIN_COVERAGE * SLOPE_WINDOW:
+            return None
+        denominator = self.n * self.sxx - self.sx * self.sx
+        if denominator <= 0:
+            return None
+        return (self.n * self.sxy - self.sx * self.sy) / denominator
+
+    def features(self):
+        """Laju, delta dan maksimum bergulir per jendela (None jika data belum cukup)"""
+        if not self.count:
+            return None
+        capacity = self.capacity
+        last = (self.count - 1) % capacity
+        t, y = self.times[last], self.values[last]
+        slope = self.slope()
+        result = {
+            'time': t,
+            'value': y,
+            'slope_m_per_h': None if slope is None else round(slope, 4),
+            'trend': trend_label(slope)
+        }
+        for k, (name, window) in enumerate(WINDOWS):
+            first = self.starts[k] % capacity
+            covered = t - self.times[first] >= MIN_COVERAGE * window
+            result[f'delta_{name}'] = round(y - self.values[first], 3) if covered else None
+            result[f'max_{name}'] = self.values[self.maxima[k][0] % capacity]
+        return result
+
+
+class RiseTracker:
+    """
+    StationWindow per stasiun (kunci = slug id stasiun, sama dengan TimeSeriesStore).
+    Update satu pembacaan O(1) teramortisasi, tidak pernah menghitung ulang jendela.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, station_key=None):
+        self.capacity = capacity
+        self.station_key = station_key
+        self._stations = {}
+        self._lock = threading.Lock()
+
+    def _key(self, station):
+        return station_slug(self.station_key(station) if self.station_key else station)
+
+    def update(self, station, t, value):
+        return self._update(self._key(station), t, value)
+
+    def _update(self, key, t, value):
+        with self._lock:
+            window = self._stations.get(key)
+            if window is None:
+                window = self._stations[key] = StationWindow(self.capacity)
+            return window.update(float(t), float(value))
+
+    def features(self, station, now=None, max_age=WINDOWS[-1][1]):
+        """Fitur laju naik stasiun; None jika belum ada data atau data terakhir > max_age"""
+        with self._lock:
+            window = self._stations.get(self._key(station))
+            features = window.features() if window is not None else None
+        if features is None or (now is not None and now - features['time'] > max_age):
+            return None
+        return features
+
+    def stations(self):
+        return list(self._stations)
+
+    def record_snapshot(self, snapshot):
+        """Listener StationPoller: masukkan tinggi muka air dari snapshot baru"""
+        try:
+            now = max(snapshot.fetched_at.values()) if snapshot.fetched_at else None
+            for record in snapshot.water_levels:
+                if record.get('water_level_mdpl') is not None:
+                    self.update(record['location'], reading_time(record.get('last_update'), now),
+                                record['water_level_mdpl'])
+        except Exception as e:
+            print(f"⚠️ Gagal memperbarui laju naik: {e}")
+
+    def warm_start(self, store, now):
+        """Isi jendela dari TimeSeriesStore (6 jam terakhir) setelah restart"""
+        loaded = 0
+        for slug in store.stations():
+            rows = store.query(slug, now - WINDOWS[-1][1], None, fields=('water_level_mdpl',))
+            for t, value in zip(rows['time'].tolist(), rows['water_level_mdpl'].tolist()):
+                if not np.isnan(value):
+                    loaded += self._update(slug, t, value)
+        if loaded:
+            print(f"✅ Rise tracker: {loaded} pembacaan dimuat dari time series store")
+        return loaded
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_rise_tracker():
+    """Satu tracker per proses, dihangatkan dari time series store"""
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            from utils.StationRegistry import get_station_registry
+            from utils.TimeSeriesStore import get_timeseries_store
+            _tracker = RiseTracker(station_key=get_station_registry().station_key)
+            try:
+                _tracker.warm_start(get_timeseries_store(), time.time())
+            except Exception as e:
+                print(f"⚠️ Warm start rise tracker gagal: {e}")
+        return _tracker
@@ -0,0 +1,234 @@
+import os
+import random
+import threading
+import time
+from types import MappingProxyType
+
+DEFAULT_POLL_INTERVAL = 300.0
+DEFAULT_JITTER = 0.1
+# Gagal poll: coba lagi lebih cepat dari interval normal
+FAILURE_RETRY = 30.0
+# Jarak minimum antar poll, juga saat revalidasi dipicu oleh pembaca
+MIN_POLL_GAP = 10.0
+
+# Umur snapshot (kelipatan interval): <= FRESH_FACTOR segar, <= STALE_FACTOR basi
+# (tetap disajikan sambil revalidasi), lebih dari itu kedaluwarsa
+FRESH_FACTOR = 1.5
+STALE_FACTOR = 6.0
+
+FRESH = 'fresh'
+STALE = 'stale'
+EXPIRED = 'expired'
+
+
+def _freeze_records(records):
+    return tuple(MappingProxyType(dict(record)) for record in records or ())
+
+
+class StationSnapshot:
+    """
+    Snapshot data pos yang immutable (tuple + MappingProxyType): dibagi ke semua
+    sesi Streamlit tanpa lock dan tanpa copy. fetched_at per sumber (epoch detik).
+    """
+    __slots__ = ('water_levels', 'rainfall', 'fetched_at', 'version', 'errors', 'latency')
+
+    def __init__(self, water_levels, rainfall, fetched_at, version, errors=None, latency=None):
+        object.__setattr__(self, 'water_levels', _freeze_records(water_levels))
+        object.__setattr__(self, 'rainfall', _freeze_records(rainfall))
+        object.__setattr__(self, 'fetched_at', MappingProxyType(dict(fetched_at)))
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'errors', MappingProxyType(dict(errors or {})))
+        object.__setattr__(self, 'latency', latency)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("StationSnapshot is immutable")
+
+    def age(self, now=None):
+        """Umur data tertua di snapshot (detik)"""
+        if not self.fetched_at:
+            return float('inf')
+        return (now or time.time()) - min(self.fetched_at.values())
+
+
+class StationPoller:
+    """
+    Satu thread latar per proses yang mem-poll BBWS tiap interval (+/- jitter)
+    dan menerbitkan StationSnapshot baru. Pembaca (semua sesi) hanya membaca
+    referensi snapshot terakhir: tidak pernah menunggu upstream. Snapshot basi
+    tetap disajikan sambil poll ulang dipicu (stale-while-revalidate).
+    """
+
+    def __init__(self, fetch=None, interval=None, jitter=DEFAULT_JITTER,
+                min_gap=MIN_POLL_GAP, failure_retry=FAILURE_RETRY, seed=None):
+        self.interval = float(interval or os.environ.get('BBWS_POLL_INTERVAL') or DEFAULT_POLL_INTERVAL)
+        self.jitter = jitter
+        self.min_gap = min(min_gap, self.interval)
+        self.failure_retry = min(failure_retry, self.interval)
+        self._fetch = fetch
+        self._random = random.Random(seed)
+
+        self._snapshot = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._listeners = []
+        self.stats = {'polls': 0, 'failures': 0, 'last_error': None, 'last_duration': None,
+                      'last_poll_at': None, 'revalidations': 0}
+
+    def _default_fetch(self):
+        from utils.BBWSScraper import BBWSScraper
+        scraper = BBWSScraper()
+        self._fetch = scraper.fetch_all
+        return self._fetch()
+
+    # ============ THREAD ============
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='station-poller', daemon=True)
+                self._thread.start()
+                print(f"✅ Station poller started (interval {self.interval:.0f}s, jitter {self.jitter:.0%})")
+        return self
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _next_delay(self, failed):
+        base = self.failure_retry if failed else self.interval
+        return max(self.min_gap, base * (1.0 + self._random.uniform(-self.jitter, self.jitter)))
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            failed = not self.poll_once()
+            delay = self._next_delay(failed)
+
+            # Bangun lebih awal jika ada revalidasi, tapi tidak sebelum min_gap
+            self._wake.wait(delay)
+            if self._stop.is_set():
+                break
+            self._wake.clear()
+            remaining = self.min_gap - (time.monotonic() - started)
+            if remaining > 0:
+                self._stop.wait(remaining)
+
+    def poll_once(self):
+        """Satu poll (dipanggil thread latar); return True jika semua sumber berhasil"""
+        started = time.time()
+        try:
+            result = (self._fetch or self._default_fetch)()
+        except Exception as e:
+            result = {'errors': {'fetch': str(e)}}
+
+        self.stats['polls'] += 1
+        self.stats['last_poll_at'] = started
+        self.stats['last_duration'] = time.time() - started
+
+        previous = self._snapshot
+        errors = result.get('errors') or {}
+        fetched_at = dict(previous.fetched_at) if previous else {}
+        sources, updated = {}, []
+        for name in ('water_levels', 'rainfall'):
+            if result.get(name):
+                sources[name] = result[name]
+                fetched_at[name] = started
+                updated.append(name)
+            elif previous is not None and getattr(previous, name):
+                # Sumber gagal: pertahankan data sebelumnya (umurnya terus bertambah)
+                sources[name] = getattr(previous, name)
+
+        complete = len(updated) == 2 and not errors
+        if not complete:
+            self.stats['failures'] += 1
+            self.stats['last_error'] = '; '.join(f"{path}: {error}" for path, error in errors.items()) \
+                or 'data kosong'
+            print(f"⚠️ Station poll incomplete: {self.stats['last_error']}")
+        if not updated:
+            return False
+
+        # Tukar referensi (atomic): pembaca melihat snapshot lama atau baru, tidak pernah setengah jadi
+        self._snapshot = StationSnapshot(
+            sources.get('water_levels'), sources.get('rainfall'), fetched_at,
+            version=(previous.version + 1) if previous else 1,
+            errors=errors, latency=result.get('latency')
+        )
+        self._notify(self._snapshot)
+        return complete
+
+    def subscribe(self, callback):
+        """callback(snapshot) dipanggil di thread poller setiap snapshot baru terbit"""
+        self._listeners.append(callback)
+        return callback
+
+    def _notify(self, snapshot):
+        for callback in list(self._listeners):
+            try:
+                callback(snapshot)
+            except Exception as e:
+                print(f"⚠️ Station poller listener {callback!r} gagal: {e}")
+
+    # ============ PEMBACA ============
+
+    def freshness(self, snapshot, now=None):
+        if snapshot is None:
+            return EXPIRED
+        age = snapshot.age(now)
+        if age <= self.interval * FRESH_FACTOR:
+            return FRESH
+        if age <= self.interval * STALE_FACTOR:
+            return STALE
+        return EXPIRED
+
+    def get(self):
+        """
+        (snapshot atau None, freshness) tanpa blocking. Snapshot basi/kedaluwarsa
+        memicu revalidasi di thread latar.
+        """
+        if self._thread is None:
+            self.start()
+        snapshot = self._snapshot
+        freshness = self.freshness(snapshot)
+        if freshness != FRESH and snapshot is not None:
+            self.revalidate()
+        return snapshot, freshness
+
+    def revalidate(self):
+        """Minta poll secepatnya (dibatasi min_gap)"""
+        if not self._wake.is_set():
+            self.stats['revalidations'] += 1
+            self._wake.set()
+
+
+_poller = None
+_poller_lock = threading.Lock()
+
+
+def get_station_poller():
+    """Satu poller per proses untuk semua sesi Streamlit"""
+    global _poller
+    with _poller_lock:
+        if _poller is None:
+            from utils.TimeSeriesStore import get_timeseries_store
+            from utils.RiseTracker import get_rise_tracker
+            _poller = StationPoller()
+            _poller.subscribe(get_timeseries_store().record_snapshot)
+            _poller.subscribe(get_rise_tracker().record_snapshot)
+            from utils.Nowcaster import get_nowcaster
+            _poller.subscribe(get_nowcaster().record_snapshot)
+            from gumbel_online import get_shared_online_estimator
+            from models.GumbelStateModel import GumbelStateModel
+            from utils.StationRegistry import get_station_registry
+            _poller.subscribe(get_shared_online_estimator(
+                GumbelStateModel(), station_key=get_station_registry().station_key
+            ).record_snapshot)
+            # Alert setelah store dan rise tracker: prediksi memakai laju naik terbaru
+            from utils.AlertEngine import get_alert_engine
+            _poller.subscribe(get_alert_engine().on_snapshot)
+            _poller.start()
+        return _poller
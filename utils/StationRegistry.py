@@ -0,0 +1,260 @@
+import re
+import threading
+import unicodedata
+from collections import Counter
+
+# Pos BBWS Bengawan Solo yang dikenal; koordinat perkiraan (derajat desimal, WGS84)
+STATIONS = (
+    {'id': 'ngadipiro', 'name': 'Ngadipiro', 'river': 'Keduang', 'basin': 'Bengawan Solo Hulu',
+     'lat': -7.82, 'lon': 110.99, 'aliases': ('Pos Ngadipiro',)},
+    {'id': 'wonogiri-dam', 'name': 'Wonogiri Dam', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Hulu',
+     'lat': -7.85, 'lon': 110.92, 'aliases': ('Waduk Wonogiri', 'Waduk Gajah Mungkur')},
+    {'id': 'colo-weir', 'name': 'Colo Weir', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Hulu',
+     'lat': -7.68, 'lon': 110.84, 'aliases': ('Bendung Colo',)},
+    {'id': 'jurug', 'name': 'Jurug', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Hulu',
+     'lat': -7.57, 'lon': 110.86, 'aliases': ()},
+    {'id': 'napel', 'name': 'Napel', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Tengah',
+     'lat': -7.39, 'lon': 111.46, 'aliases': ()},
+    {'id': 'cepu', 'name': 'Cepu', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Tengah',
+     'lat': -7.15, 'lon': 111.59, 'aliases': ()},
+    {'id': 'bojonegoro', 'name': 'Bojonegoro', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Hilir',
+     'lat': -7.15, 'lon': 111.88, 'aliases': ()},
+    {'id': 'babat', 'name': 'Babat', 'river': 'Bengawan Solo', 'basin': 'Bengawan Solo Hilir',
+     'lat': -7.11, 'lon': 112.17, 'aliases': ()}
+)
+
+# Kata yang tidak membedakan pos (jenis bangunan / alat / singkatan sungai)
+STOPWORDS = frozenset((
+    's', 'sungai', 'k', 'kali', 'pos', 'pda', 'pch', 'arr', 'awlr', 'tma', 'ch',
+    'bendung', 'bendungan', 'weir', 'waduk', 'dam', 'spillway', 'stasiun', 'station'
+))
+
+MATCH_THRESHOLD = 0.6
+# Kandidat terbaik harus unggul sejauh ini dari stasiun lain, selain itu dianggap ambigu
+MATCH_MARGIN = 0.1
+# Nama sungai dalam kurung yang cocok menambah skor
+RIVER_BONUS = 0.1
+
+_WORD = re.compile(r'[a-z0-9]+')
+_PAREN = re.compile(r'\(([^)]*)\)?')
+
+
+def _tokens(text):
+    text = unicodedata.normalize('NFKD', str(text)).encode('ascii', 'ignore').decode('ascii').lower()
+    return _WORD.findall(text)
+
+
+def normalize_name(name):
+    """
+    'Ngadipiro (S. keduang)' -> (('ngadipiro',), ('keduang',)):
+    token inti terurut tanpa STOPWORDS, dan token petunjuk dari dalam kurung.
+    """
+    core = _tokens(_PAREN.sub(' ', str(name)))
+    hints = [token for part in _PAREN.findall(str(name)) for token in _tokens(part)]
+    kept = [token for token in core if token not in STOPWORDS]
+    return tuple(sorted(set(kept or core))), tuple(token for token in hints if token not in STOPWORDS)
+
+
+def name_key(name):
+    """Kunci exact-match nama pos (token inti dipisah spasi)"""
+    return ' '.join(normalize_name(name)[0])
+
+
+def _trigrams(tokens):
+    """Trigram per token (dengan padding spasi), agar urutan kata tidak berpengaruh"""
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+class Station:
+    """Stasiun kanonik: id stabil, nama tampilan, sungai, sub-DAS, koordinat"""
+    __slots__ = ('id', 'name', 'river', 'basin', 'lat', 'lon', 'aliases')
+
+    def __init__(self, id, name, river=None, basin=None, lat=None, lon=None, aliases=()):
+        self.id = id
+        self.name = name
+        self.river = river
+        self.basin = basin
+        self.lat = lat
+        self.lon = lon
+        self.aliases = tuple(aliases)
+
+    def to_dict(self):
+        return {field: getattr(self, field) for field in self.__slots__}
+
+    def __repr__(self):
+        return f"Station({self.id!r})"
+
+
+class StationRegistry:
+    """
+    Registry stasiun dengan index nama yang dihitung sekali:
+    kunci exact (token ternormalisasi) -> id, index token -> varian nama, dan
+    index trigram -> varian nama. Resolusi nama hanya menyentuh posting list
+    token/trigram nama itu (bukan membandingkan dengan semua stasiun) dan
+    hasilnya di-memoize, jadi join feed /tma dan /ch O(n). Nama yang cocok
+    secara fuzzy disimpan sebagai alias (StationAliasModel) untuk start berikutnya.
+    """
+
+    def __init__(self, stations=STATIONS, alias_model=None, match_threshold=MATCH_THRESHOLD):
+        self.alias_model = alias_model
+        self.match_threshold = match_threshold
+        self._stations = {}
+        self._exact = {}
+        self._variants = []
+        self._token_index = {}
+        self._trigram_index = {}
+        self._resolved = {}
+        self._lock = threading.RLock()
+        self.stats = {'exact': 0, 'fuzzy': 0, 'unmatched': 0, 'cached': 0}
+
+        for station in stations:
+            self.add_station(**station)
+        if alias_model is not None:
+            for row in alias_model.get_all_aliases():
+                if row['station_id'] in self._stations:
+                    self._add_variant(row['station_id'], tuple(row['alias_key'].split()))
+
+    # ============ INDEX ============
+
+    def add_station(self, id, name, river=None, basin=None, lat=None, lon=None, aliases=()):
+        with self._lock:
+            station = Station(id, name, river, basin, lat, lon, aliases)
+            self._stations[id] = station
+            for variant in (name,) + tuple(aliases):
+                self._add_variant(id, normalize_name(variant)[0])
+            self._resolved.clear()
+            return station
+
+    def _add_variant(self, station_id, tokens):
+        key = ' '.join(tokens)
+        if not key:
+            return
+        existing = self._exact.get(key)
+        if existing is not None:
+            if existing != station_id:
+                print(f"⚠️ Nama '{key}' sudah dipakai stasiun {existing}, alias untuk {station_id} diabaikan")
+            return
+        self._exact[key] = station_id
+
+        index = len(self._variants)
+        trigrams = _trigrams(tokens)
+        self._variants.append((station_id, frozenset(tokens), trigrams))
+        for token in tokens:
+            self._token_index.setdefault(token, []).append(index)
+        for gram in trigrams:
+            self._trigram_index.setdefault(gram, []).append(index)
+
+    # ============ RESOLUSI ============
+
+    def get(self, station_id):
+        return self._stations.get(station_id)
+
+    def stations(self):
+        return list(self._stations.values())
+
+    def resolve(self, name):
+        """Nama pos dari feed BBWS -> Station, atau None jika tidak dikenali"""
+        with self._lock:
+            if name in self._resolved:
+                self.stats['cached'] += 1
+                station_id = self._resolved[name]
+                return self._stations.get(station_id) if station_id else None
+
+            tokens, hints = normalize_name(name)
+            key = ' '.join(tokens)
+            station_id = self._exact.get(key)
+            if station_id is not None:
+                self.stats['exact'] += 1
+            elif tokens:
+                station_id, score = self._best_match(tokens, hints)
+                if station_id is not None:
+                    self.stats['fuzzy'] += 1
+                    self._learn_alias(key, station_id, name, score)
+            if station_id is None:
+                self.stats['unmatched'] += 1
+
+            self._resolved[name] = station_id
+            return self._stations.get(station_id) if station_id else None
+
+    def _best_match(self, tokens, hints):
+        """(id stasiun, skor) terbaik dari index token + trigram, atau (None, skor)"""
+        query_tokens = frozenset(tokens)
+        query_trigrams = _trigrams(tokens)
+        trigram_hits = Counter()
+        for gram in query_trigrams:
+            trigram_hits.update(self._trigram_index.get(gram, ()))
+        token_hits = Counter()
+        for token in query_tokens:
+            token_hits.update(self._token_index.get(token, ()))
+
+        best = {}
+        for index in trigram_hits.keys() | token_hits.keys():
+            station_id, variant_tokens, variant_trigrams = self._variants[index]
+            dice = 2.0 * trigram_hits[index] / (len(query_trigrams) + len(variant_trigrams))
+            jaccard = token_hits[index] / len(query_tokens | variant_tokens)
+            score = max(dice, (dice + jaccard) / 2.0)
+            river = self._stations[station_id].river
+            if hints and river and set(hints) & set(_tokens(river)):
+                score += RIVER_BONUS
+            best[station_id] = max(best.get(station_id, 0.0), score)
+
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < self.match_threshold:
+            return None, ranked[0][1] if ranked else 0.0
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < MATCH_MARGIN:
+            print(f"⚠️ Nama pos {tokens} ambigu: {ranked[:2]}")
+            return None, ranked[0][1]
+        return ranked[0]
+
+    def _learn_alias(self, key, station_id, raw_name, score):
+        self._add_variant(station_id, tuple(key.split()))
+        print(f"🔗 Alias pos '{raw_name}' -> {station_id} (skor {score:.2f})")
+        if self.alias_model is not None:
+            self.alias_model.save_alias(key, station_id, raw_name, round(float(score), 3))
+
+    def add_alias(self, name, station_id):
+        """Alias manual (koreksi operator); menggantikan hasil pencocokan sebelumnya"""
+        if station_id not in self._stations:
+            raise KeyError(f"Stasiun tidak dikenal: {station_id}")
+        key = name_key(name)
+        with self._lock:
+            if self._exact.get(key) not in (None, station_id):
+                self._rebuild_without(key)
+            self._add_variant(station_id, tuple(key.split()))
+            self._resolved.clear()
+        if self.alias_model is not None:
+            self.alias_model.save_alias(key, station_id, name, 1.0, source='manual')
+
+    def _rebuild_without(self, key):
+        variants = [(station_id, tuple(sorted(tokens))) for station_id, tokens, _ in self._variants
+                    if ' '.join(sorted(tokens)) != key]
+        self._exact, self._variants, self._token_index, self._trigram_index = {}, [], {}, {}
+        for station_id, tokens in variants:
+            self._add_variant(station_id, tokens)
+
+    def station_key(self, name):
+        """Kunci join antar feed: id kanonik, atau kunci nama jika pos belum terdaftar"""
+        station = self.resolve(name)
+        return station.id if station is not None else name_key(name)
+
+    def is_same_station(self, name1, name2):
+        key = self.station_key(name1)
+        return bool(key) and key == self.station_key(name2)
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_station_registry():
+    """Registry bersama per proses, alias dimuat dari database"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            from models.StationAliasModel import StationAliasModel
+            _registry = StationRegistry(alias_model=StationAliasModel())
+        return _registry
@@ -0,0 +1,346 @@
+import datetime
+import json
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+DEFAULT_STORE_DIR = 'station_timeseries'
+
+# Satu baris = 16 byte: waktu (epoch detik UTC) + nilai float32 (NaN = tidak ada)
+RECORD_DTYPE = np.dtype([
+    ('time', '<i8'),
+    ('water_level_mdpl', '<f4'),
+    ('rainfall_mm', '<f4')
+])
+VALUE_FIELDS = ('water_level_mdpl', 'rainfall_mm')
+
+# Jam BBWS dalam WIB; batas harian resample juga tengah malam WIB
+WIB = datetime.timezone(datetime.timedelta(hours=7))
+WIB_OFFSET = 7 * 3600
+
+FREQUENCIES = {'10min': 600, '1h': 3600, '3h': 3 * 3600, '6h': 6 * 3600, '1d': 86400}
+MAX_OPEN_SEGMENTS = 64
+
+_SLUG = re.compile(r'[^a-z0-9]+')
+
+
+def station_slug(station):
+    """'Ngadipiro (S. keduang)' -> 'ngadipiro-s-keduang' (nama direktori stasiun)"""
+    slug = _SLUG.sub('-', str(station).lower()).strip('-')
+    if not slug:
+        raise ValueError(f"Nama stasiun tidak valid: {station!r}")
+    return slug
+
+
+def reading_time(last_update, now=None):
+    """
+    Jam 'HH:MM' (WIB) dari tabel BBWS -> epoch detik. Jam di masa depan berarti
+    pembacaan kemarin. Tanpa jam yang valid dipakai waktu now.
+    """
+    now = now or datetime.datetime.now(WIB)
+    if isinstance(now, (int, float)):
+        now = datetime.datetime.fromtimestamp(now, WIB)
+    match = re.search(r'(\d{1,2})[:.](\d{2})', last_update or '')
+    if not match or int(match.group(1)) > 23 or int(match.group(2)) > 59:
+        return int(now.timestamp())
+    local = now.astimezone(WIB).replace(hour=int(match.group(1)), minute=int(match.group(2)),
+                                        second=0, microsecond=0)
+    if local > now + datetime.timedelta(minutes=5):
+        local -= datetime.timedelta(days=1)
+    return int(local.timestamp())
+
+
+def _segment_keys(times):
+    """Epoch detik -> kunci segmen bulanan 'YYYY-MM' (UTC), vektorisasi"""
+    return np.datetime_as_string(times.astype('datetime64[s]').astype('datetime64[M]'), unit='M')
+
+
+def _contains(sorted_times, times):
+    """Mask bool: times yang ada di sorted_times (terurut naik), via searchsorted"""
+    if not len(sorted_times):
+        return np.zeros(len(times), dtype=bool)
+    positions = np.minimum(np.searchsorted(sorted_times, times), len(sorted_times) - 1)
+    return sorted_times[positions] == times
+
+
+class TimeSeriesStore:
+    """
+    Penyimpanan time series per stasiun, append-only dan kolumnar:
+    <root>/<stasiun>/<YYYY-MM>.bin berisi baris RECORD_DTYPE terurut waktu,
+    dibaca lewat np.memmap (hanya halaman yang disentuh yang masuk RAM).
+    <root>/<stasiun>/index.json menyimpan rentang waktu tiap segmen sehingga
+    query hanya membuka segmen yang beririsan; di dalam segmen batas rentang
+    dicari dengan binary search (np.searchsorted).
+    """
+
+    def __init__(self, root=None, station_key=None):
+        self.root = root or os.environ.get('STATION_STORE_DIR') or DEFAULT_STORE_DIR
+        # Nama pos BBWS -> kunci stasiun (mis. StationRegistry.station_key); default nama apa adanya
+        self.station_key = station_key
+        os.makedirs(self.root, exist_ok=True)
+        self._indexes = {}
+        self._segments = OrderedDict()
+        self._lock = threading.RLock()
+
+    # ============ INDEX ============
+
+    def _station_dir(self, slug):
+        return os.path.join(self.root, slug)
+
+    def _segment_path(self, slug, month):
+        return os.path.join(self._station_dir(slug), f"{month}.bin")
+
+    def _index(self, slug):
+        """{bulan: [waktu awal, waktu akhir, jumlah baris]} untuk satu stasiun"""
+        index = self._indexes.get(slug)
+        if index is not None:
+            return index
+        path = os.path.join(self._station_dir(slug), 'index.json')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {}
+        except Exception as e:
+            print(f"⚠️ Index time series {slug} rusak, dibangun ulang: {e}")
+            index = self._rebuild_index(slug)
+        self._indexes[slug] = index
+        return index
+
+    def _rebuild_index(self, slug):
+        index = {}
+        directory = self._station_dir(slug)
+        for name in sorted(os.listdir(directory)) if os.path.isdir(directory) else ():
+            if name.endswith('.bin'):
+                rows = np.fromfile(os.path.join(directory, name), dtype=RECORD_DTYPE)
+                if len(rows):
+                    index[name[:-4]] = [int(rows['time'][0]), int(rows['time'][-1]), len(rows)]
+        return index
+
+    def _write_index(self, slug, index):
+        directory = self._station_dir(slug)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(index, f, sort_keys=True)
+        os.replace(tmp_path, os.path.join(directory, 'index.json'))
+
+    def stations(self):
+        return sorted(name for name in os.listdir(self.root)
+                    if os.path.isfile(os.path.join(self.root, name, 'index.json')))
+
+    def time_range(self, station):
+        """(waktu pertama, waktu terakhir) atau None jika stasiun belum punya data"""
+        index = self._index(station_slug(station))
+        if not index:
+            return None
+        return min(entry[0] for entry in index.values()), max(entry[1] for entry in index.values())
+
+    # ============ TULIS ============
+
+    def append(self, station, times, water_level_mdpl=None, rainfall_mm=None):
+        """
+        Tambah pembacaan (array waktu epoch detik + kolom nilai). Waktu yang
+        sudah tersimpan diabaikan; return jumlah baris baru.
+        """
+        times = np.atleast_1d(np.asarray(times, dtype=np.int64))
+        rows = np.empty(len(times), dtype=RECORD_DTYPE)
+        rows['time'] = times
+        for field, values in (('water_level_mdpl', water_level_mdpl), ('rainfall_mm', rainfall_mm)):
+            rows[field] = np.nan if values is None else np.asarray(values, dtype=np.float64)
+        if not len(rows):
+            return 0
+
+        # Urutkan, buang waktu ganda dalam batch (pembacaan pertama dipakai)
+        rows = rows[np.argsort(rows['time'], kind='stable')]
+        rows = rows[np.concatenate(([True], np.diff(rows['time']) > 0))]
+
+        slug = station_slug(station)
+        added = 0
+        with self._lock:
+            os.makedirs(self._station_dir(slug), exist_ok=True)
+            index = self._index(slug)
+            months = _segment_keys(rows['time'])
+            boundaries = np.flatnonzero(months[1:] != months[:-1]) + 1
+            for first, chunk in zip(np.concatenate(([0], boundaries)), np.split(rows, boundaries)):
+                added += self._append_segment(slug, index, str(months[first]), chunk)
+            if added:
+                self._write_index(slug, index)
+        return added
+
+    def _append_segment(self, slug, index, month, rows):
+        path = self._segment_path(slug, month)
+        entry = index.get(month)
+        if entry is not None and rows['time'][0] <= entry[1]:
+            # Pembacaan HH:MM yang sama terulang tiap poll: buang waktu yang sudah
+            # tersimpan lewat binary search pada memmap, tanpa membaca seluruh segmen
+            rows = rows[~_contains(self._segment(slug, month, entry[2])['time'], rows['time'])]
+            if not len(rows):
+                return 0
+        if entry is None or rows['time'][0] > entry[1]:
+            # Jalur umum: data lebih baru dari akhir segmen -> tulis di ujung file
+            with open(path, 'ab') as f:
+                if entry is not None:
+                    f.truncate(entry[2] * RECORD_DTYPE.itemsize)
+                f.write(rows.tobytes())
+            start = rows['time'][0] if entry is None else entry[0]
+            count = len(rows) if entry is None else entry[2] + len(rows)
+            index[month] = [int(start), int(rows['time'][-1]), int(count)]
+        else:
+            # Data susulan / terlambat: gabung dan tulis ulang segmen (jarang)
+            self._segments.pop((slug, month), None)
+            existing = np.fromfile(path, dtype=RECORD_DTYPE, count=entry[2])
+            merged = np.concatenate([existing, rows])
+            merged = merged[np.argsort(merged['time'], kind='stable')]
+            fd, tmp_path = tempfile.mkstemp(dir=self._station_dir(slug), suffix='.tmp')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(merged.tobytes())
+            os.replace(tmp_path, path)
+            index[month] = [int(merged['time'][0]), int(merged['time'][-1]), len(merged)]
+        self._segments.pop((slug, month), None)
+        return len(rows)
+
+    def append_readings(self, records, now=None):
+        """
+        Baris dict BBWS (location, water_level_mdpl / rainfall_mm, last_update)
+        -> append per stasiun. Return jumlah baris baru.
+        """
+        grouped = {}
+        for record in records or ():
+            values = [record.get(field) for field in VALUE_FIELDS]
+            if not record.get('location') or all(value is None for value in values):
+                continue
+            timestamp = reading_time(record.get('last_update'), now)
+            station = self.station_key(record['location']) if self.station_key else record['location']
+            row = grouped.setdefault(station, {}).setdefault(timestamp, [np.nan, np.nan])
+            for i, value in enumerate(values):
+                if value is not None:
+                    row[i] = value
+
+        added = 0
+        for station, by_time in grouped.items():
+            times = np.fromiter(by_time.keys(), dtype=np.int64, count=len(by_time))
+            values = np.array(list(by_time.values()), dtype=np.float64)
+            added += self.append(station, times, values[:, 0], values[:, 1])
+        return added
+
+    def record_snapshot(self, snapshot):
+        """Listener StationPoller: simpan pembacaan dari snapshot yang baru terbit"""
+        try:
+            now = max(snapshot.fetched_at.values()) if snapshot.fetched_at else None
+            added = self.append_readings(list(snapshot.water_levels) + list(snapshot.rainfall), now)
+            if added:
+                print(f"💾 Time series: {added} pembacaan baru (snapshot v{snapshot.version})")
+        except Exception as e:
+            print(f"⚠️ Gagal menyimpan time series: {e}")
+
+    # ============ BACA ============
+
+    def _segment(self, slug, month, count):
+        """memmap read-only segmen; dibuka ulang jika jumlah baris berubah"""
+        key = (slug, month)
+        cached = self._segments.get(key)
+        if cached is not None and len(cached) == count:
+            self._segments.move_to_end(key)
+            return cached
+        segment = np.memmap(self._segment_path(slug, month), dtype=RECORD_DTYPE, mode='r', shape=(count,))
+        self._segments[key] = segment
+        while len(self._segments) > MAX_OPEN_SEGMENTS:
+            self._segments.popitem(last=False)
+        return segment
+
+    def query(self, station, start=None, end=None, fields=VALUE_FIELDS):
+        """
+        Pembacaan dengan start <= time < end (epoch detik, None = tanpa batas)
+        -> {'time': int64[n], field: float32[n]}. Hasil berupa salinan kecil,
+        bukan view memmap.
+        """
+        slug = station_slug(station)
+        start = np.iinfo(np.int64).min if start is None else int(start)
+        end = np.iinfo(np.int64).max if end is None else int(end)
+        parts = []
+        with self._lock:
+            for month, (first, last, count) in sorted(self._index(slug).items()):
+                if last < start or first >= end or not count:
+                    continue
+                segment = self._segment(slug, month, count)
+                times = segment['time']
+                lo = 0 if first >= start else int(np.searchsorted(times, start, side='left'))
+                hi = count if last < end else int(np.searchsorted(times, end, side='left'))
+                if hi > lo:
+                    parts.append(np.array(segment[lo:hi]))
+
+        rows = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD_DTYPE)
+        result = {'time': rows['time']}
+        for field in fields:
+            result[field] = rows[field]
+        return result
+
+    def latest(self, station):
+        """Baris terakhir sebagai dict, atau None"""
+        time_range = self.time_range(station)
+        if time_range is None:
+            return None
+        rows = self.query(station, time_range[1], time_range[1] + 1)
+        return {key: values[0].item() for key, values in rows.items()}
+
+    def resample(self, station, start=None, end=None, freq='1h', how='mean', field='water_level_mdpl'):
+        """
+        Downsample satu kolom ke bucket freq ('1h', '1d', ... atau detik),
+        rata ke tengah malam WIB. how: mean / max / min / sum / last.
+        Return (waktu awal bucket int64[m], nilai float64[m]); bucket kosong tidak muncul,
+        NaN diabaikan (bucket berisi NaN semua -> NaN).
+        """
+        seconds = FREQUENCIES.get(freq, freq)
+        if not isinstance(seconds, (int, np.integer)) or seconds <= 0:
+            raise ValueError(f"Frekuensi tidak dikenal: {freq}")
+        rows = self.query(station, start, end, fields=(field,))
+        return aggregate_buckets(rows['time'], rows[field], seconds, how)
+
+
+def aggregate_buckets(times, values, seconds, how='mean'):
+    """Agregasi vektor (reduceat) nilai terurut waktu ke bucket berukuran seconds"""
+    if not len(times):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+    buckets = (times + WIB_OFFSET) // seconds
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+    bucket_times = buckets[starts] * seconds - WIB_OFFSET
+    values = values.astype(np.float64)
+    valid = ~np.isnan(values)
+
+    if how == 'max':
+        result = np.fmax.reduceat(values, starts)
+    elif how == 'min':
+        result = np.fmin.reduceat(values, starts)
+    elif how in ('mean', 'sum'):
+        totals = np.add.reduceat(np.where(valid, values, 0.0), starts)
+        counts = np.add.reduceat(valid.astype(np.int64), starts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = totals / counts if how == 'mean' else np.where(counts > 0, totals, np.nan)
+    elif how == 'last':
+        # Nilai valid terakhir per bucket: indeks valid terakhir lewat maximum.accumulate
+        positions = np.where(valid, np.arange(len(values)), -1)
+        last_valid = np.maximum.accumulate(positions)
+        ends = np.append(starts[1:], len(values)) - 1
+        picked = last_valid[ends]
+        result = np.where(picked >= starts, values[np.maximum(picked, 0)], np.nan)
+    else:
+        raise ValueError(f"Agregasi tidak dikenal: {how}")
+    return bucket_times, result
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_timeseries_store():
+    """Satu store per proses"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            from utils.StationRegistry import get_station_registry
+            _store = TimeSeriesStore(station_key=get_station_registry().station_key)
+        return _store
@@ -0,0 +1,127 @@
+import ipaddress
+import os
+
+import streamlit as st
+
+# Jumlah reverse proxy milik kita di depan Streamlit (mis. nginx)
+TRUSTED_PROXY_COUNT = 1
+# Alamat peer yang boleh menyetel X-Real-Ip (proxy kita); override lewat
+# TRUSTED_PROXY_NETWORKS, dipisah koma (mis. "127.0.0.1/32,10.0.0.0/8")
+TRUSTED_PROXY_NETWORKS = tuple(
+    network.strip() for network in
+    os.environ.get('TRUSTED_PROXY_NETWORKS', '127.0.0.0/8,::1/128').split(',') if network.strip()
+)
+
+
+def get_request_headers():
+    """Header HTTP request websocket sesi Streamlit saat ini"""
+    try:
+        context = getattr(st, 'context', None)
+        if context is not None and getattr(context, 'headers', None) is not None:
+            return dict(context.headers)
+    except Exception:
+        pass
+
+    try:
+        from streamlit.web.server.websocket_headers import _get_websocket_headers
+        headers = _get_websocket_headers()
+        return dict(headers) if headers else {}
+    except Exception:
+        return {}
+
+
+def _valid_ip(value):
+    try:
+        return str(ipaddress.ip_address(value.strip()))
+    except (ValueError, AttributeError):
+        return None
+
+
+def _is_trusted_proxy(ip, networks=TRUSTED_PROXY_NETWORKS):
+    if not ip:
+        return False
+    address = ipaddress.ip_address(ip)
+    for network in networks:
+        try:
+            if address in ipaddress.ip_network(network, strict=False):
+                return True
+        except ValueError:
+            continue
+    return False
+
+
+def resolve_client_ip(headers, trusted_proxies=TRUSTED_PROXY_COUNT, remote_ip=None,
+                      proxy_networks=TRUSTED_PROXY_NETWORKS):
+    """
+    Ambil IP klien asli. Proxy terpercaya menambahkan alamat yang dilihatnya
+    di ujung X-Forwarded-For, jadi alamat klien ada di posisi ke-N dari kanan;
+    entri di kirinya bisa dipalsukan klien sehingga diabaikan. X-Real-Ip hanya
+    dipakai jika peer (remote_ip) adalah proxy terpercaya; selain itu header
+    tersebut datang dari klien sendiri, jadi yang dipakai alamat peer.
+    """
+    lowered = {str(k).lower(): v for k, v in (headers or {}).items()}
+
+    forwarded = lowered.get('x-forwarded-for')
+    if forwarded and trusted_proxies > 0:
+        hops = [hop.strip() for hop in forwarded.split(',') if hop.strip()]
+        if hops:
+            candidate = hops[-trusted_proxies] if len(hops) >= trusted_proxies else hops[0]
+            ip = _valid_ip(candidate)
+            if ip:
+                return ip
+
+    remote_ip = _valid_ip(remote_ip or '')
+    if _is_trusted_proxy(remote_ip, proxy_networks):
+        ip = _valid_ip(lowered.get('x-real-ip', ''))
+        if ip:
+            return ip
+
+    return remote_ip
+
+
+_session_mgr_warned = False
+
+
+def _remote_ip_from_session_manager():
+    """
+    Fallback Streamlit lama (tanpa st.context.ip_address): baca lewat
+    session manager internal. Bukan API publik, jadi setiap bagian dicek dan
+    kegagalan dicatat (sekali) alih-alih diam-diam mengembalikan None.
+    """
+    global _session_mgr_warned
+    try:
+        from streamlit.runtime import get_instance
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+        ctx = get_script_run_ctx()
+        if ctx is None:
+            return None
+        session_mgr = getattr(get_instance(), '_session_mgr', None)
+        if session_mgr is None or not hasattr(session_mgr, 'get_session_info'):
+            raise AttributeError("runtime tidak punya _session_mgr.get_session_info")
+        session_info = session_mgr.get_session_info(ctx.session_id)
+        if session_info is None:
+            return None
+        return _valid_ip(session_info.client.request.remote_ip)
+    except Exception as e:
+        if not _session_mgr_warned:
+            _session_mgr_warned = True
+            print(f"⚠️ Alamat peer websocket tidak bisa dibaca dari runtime Streamlit: {e}")
+        return None
+
+
+def get_remote_ip():
+    """Alamat peer koneksi websocket (tanpa proxy), jika runtime tersedia"""
+    try:
+        context = getattr(st, 'context', None)
+        if context is not None and hasattr(type(context), 'ip_address'):
+            return _valid_ip(context.ip_address or '')
+    except Exception as e:
+        print(f"⚠️ Error reading st.context.ip_address: {e}")
+        return None
+    return _remote_ip_from_session_manager()
+
+
+def get_client_ip(trusted_proxies=TRUSTED_PROXY_COUNT):
+    """IP klien asli dari header proxy, fallback ke alamat peer websocket"""
+    return resolve_client_ip(get_request_headers(), trusted_proxies, remote_ip=get_remote_ip())
@@ -0,0 +1,40 @@
+import streamlit as st
+
+
+def format_age(seconds):
+    """Umur data dalam bahasa sehari-hari: '45 detik', '12 menit', '3 jam'"""
+    if seconds is None:
+        return None
+    if seconds < 60:
+        return f"{int(seconds)} detik"
+    if seconds < 3600:
+        return f"{int(seconds // 60)} menit"
+    return f"{seconds / 3600:.1f} jam"
+
+
+def show_data_status_banner(controller):
+    """
+    Banner kesegaran data dari controller.get_data_status(): peringatan jika
+    sumber upstream sedang gagal dan yang disajikan adalah data terakhir / cadangan.
+    """
+    get_status = getattr(controller, 'get_data_status', None)
+    if get_status is None:
+        return
+    try:
+        status = get_status()
+    except Exception as e:
+        print(f"⚠️ Status data tidak tersedia: {e}")
+        return
+
+    age = format_age(status.get('age_seconds'))
+    if not status.get('degraded'):
+        if age:
+            st.caption(f"🟢 Data {status['source']} diperbarui {age} lalu")
+        return
+
+    retry = f" Koneksi dicoba lagi dalam {status['retry_after']} detik." if status.get('retry_after') else ''
+    if age:
+        st.warning(f"⚠️ {status['source']} sedang tidak merespons. Menampilkan data terakhir "
+                   f"yang berhasil diambil ({age} lalu).{retry}")
+    else:
+        st.warning(f"⚠️ {status['source']} sedang tidak tersedia. Menampilkan data cadangan/lokal.{retry}")
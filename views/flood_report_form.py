@@ -1,8 +1,18 @@
+import uuid
+
 import streamlit as st
 
+def _get_submission_token():
+    """Token idempotensi per isian form; tetap sama selama rerun sampai submit berhasil"""
+    if 'report_submission_token' not in st.session_state:
+        st.session_state.report_submission_token = uuid.uuid4().hex
+    return st.session_state.report_submission_token
+
 def show_flood_report_form(controller):
     """Display flood report form with simple design"""
     
+    submission_token = _get_submission_token()
+    
     with st.container():
         st.markdown("###  Form Laporan Banjir")
         st.caption("Isi form di bawah untuk melaporkan kondisi banjir di sekitar Anda")
@@ -75,10 +85,12 @@ def show_flood_report_form(controller):
                             flood_height=flood_height,
                             reporter_name=reporter_name.strip(),
                             reporter_phone=reporter_phone.strip() if reporter_phone else None,
-                            photo_file=photo_file
+                            photo_file=photo_file,
+                            submission_token=submission_token
                         )
                         
                         if success:
+                            st.session_state.report_submission_token = uuid.uuid4().hex
                             st.success(message)
 
                         else:
@@ -3,6 +3,8 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from views.data_status_banner import show_data_status_banner
+
 def show_current_month_reports(controller):
     """Display current month's reports dengan error handling"""
     
@@ -47,6 +49,8 @@ def show_current_month_reports(controller):
         st.error(f"❌ Error mendapatkan data: {e}")
         return
     
+    show_data_status_banner(controller)
+    
     if not reports:
         st.info(" Tidak ada laporan banjir untuk hari ini.")
         return
@@ -55,6 +59,10 @@ def show_current_month_reports(controller):
     
     st.markdown(f"###  Daftar Laporan Hari Ini ({len(reports)} laporan)")
     
+    duplicates = controller.get_photo_duplicate_info_many(
+        [report.get('Photo URL', report.get('photo_url', '')) for report in reports]
+    )
+    
     for i, report in enumerate(reports, 1):
         with st.container():
             st.markdown('<div class="report-card">', unsafe_allow_html=True)
@@ -75,6 +83,11 @@ def show_current_month_reports(controller):
                     if time_display:
                         st.markdown(f'<span class="timestamp-badge"> {time_display}</span>', 
                                 unsafe_allow_html=True)
+                
+                duplicate_info = duplicates.get(str(report.get('Photo URL', report.get('photo_url', ''))))
+                if duplicate_info:
+                    st.caption(f"⚠️ Foto mirip laporan #{duplicate_info['duplicate_of']} "
+                            f"(jarak {duplicate_info['duplicate_distance']})")
             
             with col2:
                 flood_height = report.get('Tinggi Banjir', report.get('tinggi_banjir', 'N/A'))
@@ -112,6 +125,8 @@ def show_current_month_reports(controller):
         if i < len(reports):
             st.divider()
     
+    show_duplicate_moderation(controller)
+    
     with st.expander(" Analisis Hari Ini", expanded=False):
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -127,6 +142,26 @@ def show_current_month_reports(controller):
             ))
             st.metric("Pelapor Berbeda", unique_reporters)
 
+def show_duplicate_moderation(controller):
+    """Panel moderasi untuk foto yang terindikasi duplikat/daur ulang"""
+    duplicates = controller.get_suspected_duplicates()
+    if not duplicates:
+        return
+    
+    with st.expander(f"⚠️ Foto Terindikasi Duplikat ({len(duplicates)})", expanded=False):
+        st.caption("Foto berikut sangat mirip dengan foto laporan sebelumnya (pHash). Periksa sebelum diverifikasi.")
+        for item in duplicates:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.write(f"**Laporan #{item['report_id']}** ({item['created_at']})")
+                if os.path.exists(str(item['photo_path'])):
+                    st.image(item['photo_path'], use_column_width=True)
+            with col2:
+                st.write(f"**Mirip laporan #{item['duplicate_of']}** (jarak {item['duplicate_distance']})")
+                if os.path.exists(str(item['duplicate_path'])):
+                    st.image(item['duplicate_path'], use_column_width=True)
+            st.divider()
+
 def format_timestamp_for_display(timestamp):
     """Format timestamp untuk display yang konsisten dengan rekapan bulanan"""
     try:
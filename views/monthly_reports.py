@@ -3,6 +3,8 @@ import pandas as pd
 import os
 from datetime import datetime
 
+from views.data_status_banner import show_data_status_banner
+
 def show_monthly_reports_summary(controller):
     """Display monthly reports summary dengan struktur baru"""
     
@@ -22,6 +24,7 @@ def show_monthly_reports_summary(controller):
     """, unsafe_allow_html=True)
     
     reports = controller.get_month_reports()
+    show_data_status_banner(controller)
     
     if not reports:
         st.info(" Tidak ada laporan banjir untuk bulan ini.")
@@ -49,6 +52,8 @@ def show_monthly_reports_summary(controller):
     
     st.markdown(f"###  Daftar Laporan Bulan {current_month}")
     
+    duplicates = controller.get_photo_duplicate_info_many([report.get('Photo URL', '') for report in reports])
+    
     for i, report in enumerate(reports, 1):
         with st.container():
             col1, col2, col3, col4, col5 = st.columns([4, 2, 2, 2, 1])
@@ -63,6 +68,10 @@ def show_monthly_reports_summary(controller):
                 time_display = format_time(report.get('report_time', ''))
                 if time_display:
                     st.markdown(f'<span class="time-badge"> {time_display}</span>', unsafe_allow_html=True)
+                
+                duplicate_info = duplicates.get(str(report.get('Photo URL', '')))
+                if duplicate_info:
+                    st.caption(f"⚠️ Foto mirip laporan #{duplicate_info['duplicate_of']}")
             
             with col2:
                 st.write(f"**{report.get('Tinggi Banjir', 'N/A')}**")
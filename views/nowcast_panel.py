@@ -0,0 +1,71 @@
+import altair as alt
+import pandas as pd
+import streamlit as st
+
+
+def _wib(times):
+    """Epoch detik -> datetime WIB tanpa zona (sumbu waktu Altair apa adanya)"""
+    return pd.to_datetime(times, unit='s', utc=True).tz_convert('Asia/Jakarta').tz_localize(None)
+
+
+def _nowcast_chart(forecast):
+    history = pd.DataFrame({
+        'waktu': _wib(forecast['history_times']),
+        'muka_air': forecast['history_levels'],
+        'seri': 'Observasi (rata-rata per jam)'
+    })
+    # Garis prakiraan dimulai dari jam dasar agar menyambung dengan observasi
+    ahead = pd.DataFrame({
+        'waktu': _wib([forecast['base_time']] + forecast['times']),
+        'muka_air': [forecast['base_level']] + forecast['mean'],
+        'bawah': [forecast['base_level']] + forecast['lower'],
+        'atas': [forecast['base_level']] + forecast['upper'],
+        'seri': 'Prakiraan'
+    })
+
+    x = alt.X('waktu:T', title='Waktu (WIB)')
+    band = alt.Chart(ahead).mark_area(opacity=0.25, color='#60a5fa').encode(
+        x=x, y=alt.Y('bawah:Q', title='Muka air (mdpl)', scale=alt.Scale(zero=False)), y2='atas:Q'
+    )
+    lines = alt.Chart(pd.concat([history, ahead[['waktu', 'muka_air', 'seri']]])).mark_line(point=True).encode(
+        x=x,
+        y=alt.Y('muka_air:Q', scale=alt.Scale(zero=False)),
+        color=alt.Color('seri:N', title=None, scale=alt.Scale(range=['#9ca3af', '#2563eb'])),
+        strokeDash=alt.condition("datum.seri == 'Prakiraan'", alt.value([5, 3]), alt.value([1, 0])),
+        tooltip=[alt.Tooltip('waktu:T', format='%d %b %H:%M'), alt.Tooltip('muka_air:Q', format='.2f')]
+    )
+    return (band + lines).properties(height=220)
+
+
+def show_nowcast_panel(controller):
+    """Prakiraan muka air 1-6 jam per stasiun dengan interval prediksi"""
+    get_nowcasts = getattr(controller, 'get_nowcasts', None)
+    if get_nowcasts is None:
+        return
+    try:
+        forecasts = get_nowcasts()
+    except Exception as e:
+        st.caption(f"Prakiraan muka air tidak tersedia: {e}")
+        return
+
+    st.markdown("### Prakiraan Muka Air 1–6 Jam")
+    if not forecasts:
+        st.caption("Prakiraan belum tersedia: riwayat data pos belum cukup atau data terbaru terlambat.")
+        return
+    st.caption(
+        f"Model autoregresif dengan input curah hujan per stasiun, dilatih dari riwayat data pos. "
+        f"Area biru: interval prediksi {forecasts[0]['interval']:.0%}."
+    )
+
+    for forecast in forecasts:
+        st.markdown(f"**{forecast['location']}**")
+        col_chart, col_table = st.columns([3, 2])
+        with col_chart:
+            st.altair_chart(_nowcast_chart(forecast), use_container_width=True)
+        with col_table:
+            st.dataframe(pd.DataFrame({
+                'Jam': [f"+{horizon}" for horizon in forecast['horizons']],
+                'Waktu': _wib(forecast['times']).strftime('%H:%M'),
+                'Prakiraan (mdpl)': [f"{value:.2f}" for value in forecast['mean']],
+                'Rentang': [f"{low:.2f} – {high:.2f}" for low, high in zip(forecast['lower'], forecast['upper'])]
+            }), hide_index=True, use_container_width=True)
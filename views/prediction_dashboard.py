@@ -1,5 +1,10 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
+
+from gumbel_distribution import get_return_level_table
+from views.data_status_banner import show_data_status_banner
+from views.nowcast_panel import show_nowcast_panel
 
 def show_prediction_dashboard(controller):
     """Display flood prediction dashboard with clean design"""
@@ -11,6 +16,8 @@ def show_prediction_dashboard(controller):
         st.warning("Data prediksi tidak tersedia saat ini.")
         return
     
+    show_data_status_banner(controller)
+    
     overall_status, _ = controller.get_overall_risk_status(predictions)
     
     if overall_status == "RENDAH":
@@ -72,6 +79,10 @@ def show_prediction_dashboard(controller):
             
             with col2:
                 st.markdown(f"**Tinggi Air:** {pred['water_level_mdpl']} mdpl")
+                if pred.get('rise_rate_m_per_h') is not None:
+                    rate_cm = pred['rise_rate_m_per_h'] * 100
+                    icon = "⬆️" if rate_cm > 0 else "⬇️" if rate_cm < 0 else "➡️"
+                    st.caption(f"{icon} Tren: {pred['trend']} ({rate_cm:+.1f} cm/jam)")
                 status_text = f"**Status:** {pred['water_status']}"
                 if pred['water_status'] == "RENDAH":
                     st.success(status_text)
@@ -107,5 +118,47 @@ def show_prediction_dashboard(controller):
                     st.write(f"- Status: {pred['gumbel_status']}")
                     st.write(f"- Risk Level: {pred['gumbel_risk']:.3f}")
                     st.write(f"- Analisis: {pred['gumbel_message']}")
+                
+                if pred.get('trend') is not None or pred.get('delta_1h') is not None:
+                    st.markdown("** Laju Naik Muka Air**")
+                    deltas = [
+                        f"{label}: {pred[key] * 100:+.0f} cm" for key, label in
+                        (('delta_1h', '1 jam'), ('delta_3h', '3 jam'), ('delta_6h', '6 jam'))
+                        if pred.get(key) is not None
+                    ]
+                    st.write(f"- Perubahan: {', '.join(deltas) or 'data belum cukup'}")
+                    if pred.get('max_6h') is not None:
+                        st.write(f"- Maksimum 6 jam: {pred['max_6h']:.2f} mdpl")
+                    if pred.get('effective_status') not in (None, pred['ann_status']):
+                        st.write(f"- Status dinaikkan ke {pred['effective_status']} karena air naik cepat")
             
             st.markdown("---")
+    
+    show_nowcast_panel(controller)
+    show_return_level_table()
+
+def show_return_level_table():
+    """Tabel curah hujan periode ulang per stasiun (precomputed per versi Gumbel)"""
+    try:
+        table = get_return_level_table()
+    except Exception as e:
+        st.caption(f"Tabel periode ulang tidak tersedia: {e}")
+        return
+    
+    st.markdown("### Curah Hujan Periode Ulang")
+    st.caption(f"Distribusi Gumbel versi {table['model_version']} (mm); "
+            "baris 'default' dipakai untuk stasiun tanpa parameter hasil fit")
+    columns = [f"{period} tahun" for period in table['return_periods']]
+    df = pd.DataFrame(table['levels'], index=table['station_ids'], columns=columns).round(1)
+    st.dataframe(df, use_container_width=True)
+    
+    if table['lower'] is not None:
+        st.caption(f"Interval kepercayaan bootstrap {table['confidence']:.0%} (mm)")
+        intervals = pd.DataFrame([
+            [
+                "-" if np.isnan(lower) else f"{lower:.1f} – {upper:.1f}"
+                for lower, upper in zip(lower_row, upper_row)
+            ]
+            for lower_row, upper_row in zip(table['lower'], table['upper'])
+        ], index=table['station_ids'], columns=columns)
+        st.dataframe(intervals, use_container_width=True)
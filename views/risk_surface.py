@@ -0,0 +1,121 @@
+from functools import lru_cache
+
+import altair as alt
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from model_ann import compute_risk_surface, get_active_ann_version, STATUS_THRESHOLDS
+
+RISK_COLOR_SCALE = alt.Scale(
+    domain=[0.0, 0.5, 0.8, 1.0],
+    range=['#10b981', '#f59e0b', '#ef4444', '#7f1d1d']
+)
+CONTOUR_COLORS = {0.5: '#fde68a', 0.8: '#ffffff'}
+
+
+@lru_cache(maxsize=64)
+def _surface_frames(humidity, temperature, rainfall_steps, water_level_steps, version):
+    """
+    DataFrame sel heatmap + garis kontur ambang, di-cache per parameter tetap dan
+    versi ANN aktif (aktivasi / hot reload registry langsung terlihat)
+    """
+    surface = compute_risk_surface(humidity, temperature, rainfall_steps, water_level_steps, version)
+    rainfall = surface['rainfall']
+    water_level = surface['water_level']
+    risk = surface['risk']
+
+    rain_half = (rainfall[1] - rainfall[0]) / 2
+    water_half = (water_level[1] - water_level[0]) / 2
+    rain_grid, water_grid = np.meshgrid(rainfall, water_level)
+
+    cells = pd.DataFrame({
+        'rainfall': rain_grid.ravel(),
+        'water_level': water_grid.ravel(),
+        'rain_lo': rain_grid.ravel() - rain_half,
+        'rain_hi': rain_grid.ravel() + rain_half,
+        'water_lo': water_grid.ravel() - water_half,
+        'water_hi': water_grid.ravel() + water_half,
+        'risk': np.round(risk.ravel().astype(np.float64), 3)
+    })
+
+    return cells, _threshold_contours(rainfall, water_level, risk)
+
+
+def _threshold_contours(rainfall, water_level, risk):
+    """Garis iso-risk pada ambang status (0.5 dan 0.8) via contourpy (dependency matplotlib)"""
+    try:
+        from contourpy import contour_generator
+    except ImportError:
+        return pd.DataFrame(columns=['rainfall', 'water_level', 'threshold', 'segment', 'order'])
+
+    generator = contour_generator(x=rainfall, y=water_level, z=np.asarray(risk, dtype=np.float64))
+    frames = []
+    for threshold in STATUS_THRESHOLDS:
+        for segment_id, line in enumerate(generator.lines(float(threshold))):
+            frames.append(pd.DataFrame({
+                'rainfall': line[:, 0],
+                'water_level': line[:, 1],
+                'threshold': f"{threshold:.1f}",
+                'segment': f"{threshold:.1f}-{segment_id}",
+                'order': np.arange(len(line))
+            }))
+
+    if not frames:
+        return pd.DataFrame(columns=['rainfall', 'water_level', 'threshold', 'segment', 'order'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def show_risk_surface(humidity, temperature, rainfall=None, water_level=None,
+                    rainfall_steps=101, water_level_steps=91):
+    """Heatmap interaktif risiko ANN di seluruh ruang curah hujan x tinggi air"""
+    st.markdown("### Peta Risiko")
+    st.caption(
+        f"Risiko ANN untuk seluruh kombinasi curah hujan (0–500 mm) dan tinggi air "
+        f"(60–150 mdpl) pada kelembapan {humidity:.1f}% dan suhu {temperature:.1f}°C. "
+        f"Garis menandai ambang MENENGAH (0.5) dan TINGGI (0.8)."
+    )
+
+    cells, contours = _surface_frames(
+        round(float(humidity), 1), round(float(temperature), 1),
+        int(rainfall_steps), int(water_level_steps),
+        get_active_ann_version().version
+    )
+
+    heatmap = alt.Chart(cells).mark_rect().encode(
+        x=alt.X('rain_lo:Q', title='Curah Hujan (mm)', scale=alt.Scale(domain=[0, 500], nice=False)),
+        x2='rain_hi:Q',
+        y=alt.Y('water_lo:Q', title='Tinggi Air (mdpl)', scale=alt.Scale(domain=[60, 150], nice=False)),
+        y2='water_hi:Q',
+        color=alt.Color('risk:Q', scale=RISK_COLOR_SCALE, title='Risk'),
+        tooltip=[
+            alt.Tooltip('rainfall:Q', title='Curah Hujan (mm)', format='.1f'),
+            alt.Tooltip('water_level:Q', title='Tinggi Air (mdpl)', format='.1f'),
+            alt.Tooltip('risk:Q', title='Risk', format='.3f')
+        ]
+    )
+
+    layers = [heatmap]
+
+    if not contours.empty:
+        layers.append(alt.Chart(contours).mark_line(strokeWidth=2).encode(
+            x='rainfall:Q',
+            y='water_level:Q',
+            detail='segment:N',
+            order='order:Q',
+            color=alt.Color(
+                'threshold:N',
+                scale=alt.Scale(domain=[f"{t:.1f}" for t in CONTOUR_COLORS],
+                                range=list(CONTOUR_COLORS.values())),
+                title='Ambang'
+            )
+        ))
+
+    if rainfall is not None and water_level is not None:
+        point = pd.DataFrame({'rainfall': [float(rainfall)], 'water_level': [float(water_level)]})
+        layers.append(alt.Chart(point).mark_point(
+            shape='diamond', size=160, filled=True, color='#00aee6', stroke='#041016'
+        ).encode(x='rainfall:Q', y='water_level:Q'))
+
+    chart = alt.layer(*layers).resolve_scale(color='independent').properties(height=420).interactive()
+    st.altair_chart(chart, use_container_width=True)
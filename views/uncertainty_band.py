@@ -0,0 +1,55 @@
+import streamlit as st
+
+from model_uncertainty import (
+    predict_flood_ann_uncertainty, predict_flood_gumbel_uncertainty,
+    SENSOR_ERROR_MODELS, DEFAULT_SAMPLES
+)
+
+STATUS_COLORS = {
+    'RENDAH': '#10b981',
+    'MENENGAH': '#f59e0b',
+    'TINGGI': '#ef4444'
+}
+
+
+def _show_band(title, summary):
+    st.markdown(f"**{title}**")
+    if summary is None:
+        st.caption("Tidak tersedia")
+        return
+
+    bands = summary['risk_percentiles']
+    st.markdown(
+        f"Risk median **{bands['p50']:.3f}** "
+        f"(rentang 90%: {bands['p5']:.3f} – {bands['p95']:.3f})"
+    )
+    for label, probability in summary['status_probabilities'].items():
+        color = STATUS_COLORS.get(label, '#6b7280')
+        st.markdown(
+            f"<span style='color: {color}; font-weight: 600;'>{label}</span> {probability:.1%}",
+            unsafe_allow_html=True
+        )
+        st.progress(float(probability))
+
+
+def show_uncertainty_band(rainfall, water_level, humidity, temperature, station_id=None):
+    """
+    Pita ketidakpastian Monte-Carlo akibat galat sensor untuk ANN dan Gumbel.
+    station_id memakai parameter Gumbel hasil fit stasiun tersebut jika ada.
+    """
+    st.markdown("### Ketidakpastian Sensor")
+    rain_spec = SENSOR_ERROR_MODELS['rainfall']
+    st.caption(
+        f"{DEFAULT_SAMPLES:,} sampel Monte-Carlo dengan galat sensor: curah hujan "
+        f"±{rain_spec['sigma']:.0%}, tinggi air ±{SENSOR_ERROR_MODELS['water_level']['sigma']} m, "
+        f"kelembapan ±{SENSOR_ERROR_MODELS['humidity']['sigma']:.0f}%, "
+        f"suhu ±{SENSOR_ERROR_MODELS['temperature']['sigma']}°C (1σ)."
+    )
+
+    col1, col2 = st.columns(2)
+    with col1:
+        _show_band("Neural Network", predict_flood_ann_uncertainty(
+            rainfall, water_level, humidity, temperature
+        ))
+    with col2:
+        _show_band("Distribusi Gumbel", predict_flood_gumbel_uncertainty(rainfall, station_id=station_id))